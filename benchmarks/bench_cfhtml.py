@@ -0,0 +1,90 @@
+"""Benchmark: the bytes CF_HTML codec against the str-based code it replaced.
+
+Times writing and reading the Windows "HTML Format" payload for HTML
+fragments from 10 KB to 20 MB. No Windows APIs are used, so it runs on
+any platform:
+    
+    python benchmarks/bench_cfhtml.py
+"""
+
+import argparse
+import time
+from typing import Callable
+
+from zclipboard.codecs import cfhtml
+
+
+def legacy_encode(html_content: str) -> bytes:
+    """The Windows backend's encoder before zclipboard.codecs.cfhtml, plus the copy it made for the clipboard."""
+    header_template = (
+        "Version:0.9\r\n"
+        "StartHTML:{start_html:010d}\r\n"
+        "EndHTML:{end_html:010d}\r\n"
+        "StartFragment:{start_fragment:010d}\r\n"
+        "EndFragment:{end_fragment:010d}\r\n"
+    )
+    prefix = "<!DOCTYPE html><html><body><!--StartFragment-->"
+    suffix = "<!--EndFragment--></body></html>"
+    header_length = len(header_template.format(start_html=0, end_html=0, start_fragment=0, end_fragment=0))
+    start_fragment = header_length + len(prefix)
+    end_fragment = start_fragment + len(html_content.encode("utf-8"))
+    header = header_template.format(
+        start_html=header_length,
+        end_html=end_fragment + len(suffix),
+        start_fragment=start_fragment,
+        end_fragment=end_fragment,
+    )
+    return (header + prefix + html_content + suffix).encode("utf-8") + b"\x00"
+
+
+def legacy_decode(data: bytes) -> str:
+    """The Windows backend's decoder before zclipboard.codecs.cfhtml."""
+    html_format = data.decode("utf-8", errors="ignore")
+    start_idx = html_format.find("<!--StartFragment-->")
+    end_idx = html_format.find("<!--EndFragment-->")
+    if start_idx != -1 and end_idx != -1:
+        return html_format[start_idx + len("<!--StartFragment-->") : end_idx]
+    return html_format
+
+
+def fragment(size: int) -> str:
+    """Table markup with some non-ASCII text, about size bytes of UTF-8."""
+    row = "<tr><td>Zürich</td><td>1 234,50 €</td><td><a href='https://example.com/'>détails</a></td></tr>\n"
+    return "<table>\n" + row * (size // len(row.encode("utf-8"))) + "</table>"
+
+
+def measure(label: str, func: Callable[[], object], iterations: int) -> float:
+    """Run func repeatedly and print and return the time per call."""
+    func()
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    elapsed = (time.perf_counter() - start) / iterations
+    print(f"  {label:<28} {elapsed * 1000:9.3f} ms/call")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-n", "--iterations", type=int, default=5)
+    args = parser.parse_args()
+    
+    for size in (10_000, 1_000_000, 20_000_000):
+        html = fragment(size)
+        payload = cfhtml.encode(html) + b"\x00"
+        assert legacy_encode(html) == payload
+        assert legacy_decode(payload) == str(cfhtml.decode(payload).fragment, "utf-8")
+        n = max(1, args.iterations * 1_000_000 // size)
+        
+        print(f"{len(payload) / 1e6:.2f} MB payload:")
+        old = measure("encode: str", lambda: legacy_encode(html), n)
+        new = measure("encode: codec parts", lambda: cfhtml.encode_parts(html), n)
+        print(f"  {'':<28} {old / new:9.1f}x")
+        old = measure("decode to str: str", lambda: legacy_decode(payload), n)
+        new = measure("decode to str: codec", lambda: str(cfhtml.decode(payload).fragment, "utf-8", "ignore"), n)
+        print(f"  {'':<28} {old / new:9.1f}x")
+        measure("decode, views only: codec", lambda: cfhtml.decode(payload).fragment, n)
+
+
+if __name__ == "__main__":
+    main()
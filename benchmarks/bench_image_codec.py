@@ -0,0 +1,129 @@
+"""Benchmark: the built-in PNG/BMP codec against Pillow on 4K screenshots.
+
+Renders a synthetic screenshot (gradient desktop, window with antialiased
+text, a photo) and times the conversions the backends make. Pillow rows
+are skipped when it is not installed. The first PNG decoded has the
+Average and Paeth row filters libpng and Pillow favour, the slowest case
+for the codec: written by Pillow if it is installed, otherwise with
+Paeth on every row. Needs NumPy to render; --pure then times the codec
+without it:
+    
+    python benchmarks/bench_image_codec.py
+    python benchmarks/bench_image_codec.py --size 1920x1080 --pure
+"""
+
+import argparse
+import contextlib
+import struct
+import time
+import zlib
+from io import BytesIO
+from typing import Any, Callable, Optional
+from unittest.mock import patch
+
+import numpy
+
+from zclipboard.codecs import image as codec
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+
+def screenshot(width: int, height: int) -> Any:
+    """A uint8 RGBA array that compresses roughly like a desktop screenshot."""
+    rng = numpy.random.default_rng(0)
+    pixels = numpy.full((height, width, 4), 255, numpy.uint8)
+    pixels[:, :, 0] = numpy.linspace(30, 90, width).astype(numpy.uint8)
+    pixels[:, :, 1] = 40
+    pixels[:, :, 2] = numpy.linspace(60, 120, height).astype(numpy.uint8)[:, None]
+    top, left, bottom, right = height // 10, width // 12, height * 9 // 10, width * 11 // 12
+    pixels[top:bottom, left:right, :3] = 245
+    for y in range(top + 20, bottom - 20, 18):
+        glyphs = (rng.random((10, right - left - 100)) < 0.4).astype(numpy.float32)
+        glyphs = (glyphs + numpy.roll(glyphs, 1, 1) + numpy.roll(glyphs, 1, 0)) / 3
+        pixels[y : y + 10, left + 50 : right - 50, :3] = (245 - glyphs[..., None] * 225).astype(numpy.uint8)
+    photo = rng.normal(128, 10, (height // 4, width // 4, 3)) + numpy.linspace(0, 80, width // 4)[None, :, None]
+    pixels[height // 3 : height // 3 + height // 4, width // 2 : width // 2 + width // 4, :3] = photo.clip(0, 255)
+    return pixels
+
+
+def paeth_png(pixels: Any) -> bytes:
+    """Encode with the Paeth filter on every row, as libpng often chooses for screenshots."""
+    height, width, channels = pixels.shape
+    values = pixels.astype(numpy.int16)
+    left, up, corner = (numpy.zeros_like(values) for _ in range(3))
+    left[:, 1:], up[1:], corner[1:, 1:] = values[:, :-1], values[:-1], values[:-1, :-1]
+    pa, pb, pc = abs(up - corner), abs(left - corner), abs(left + up - 2 * corner)
+    predictor = numpy.where((pa <= pb) & (pa <= pc), left, numpy.where(pb <= pc, up, corner))
+    rows = numpy.empty((height, 1 + width * channels), numpy.uint8)
+    rows[:, 0] = codec.FILTER_PAETH
+    rows[:, 1:] = ((values - predictor) & 0xFF).reshape(height, -1)
+    header = struct.pack(">IIBBBBB", width, height, 8, 6, 0, 0, 0)
+    chunks = [(b"IHDR", header), (b"IDAT", zlib.compress(rows, 6)), (b"IEND", b"")]
+    return codec.PNG_SIGNATURE + b"".join(codec._png_chunk(kind, data) for kind, data in chunks)
+
+
+def measure(label: str, func: Callable[[], Optional[bytes]], iterations: int) -> None:
+    """Run func repeatedly and print the time per call and the output size."""
+    func()
+    start = time.perf_counter()
+    for _ in range(iterations):
+        result = func()
+    elapsed = (time.perf_counter() - start) / iterations
+    size = f"{len(result) / 1e6:8.2f} MB" if result is not None else ""
+    print(f"  {label:<38} {elapsed * 1000:9.1f} ms/call {size}")
+
+
+def pillow_save(image: Any, format_name: str) -> bytes:
+    output = BytesIO()
+    image.save(output, format=format_name)
+    return output.getvalue()
+
+
+def pillow(data: bytes, format_name: str, mode: Optional[str] = None) -> bytes:
+    """Convert like zclipboard.image.transcode() does with Pillow."""
+    with Image.open(BytesIO(data)) as image:
+        return pillow_save(image.convert(mode) if mode else image, format_name)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-n", "--iterations", type=int, default=3)
+    parser.add_argument("--size", default="3840x2160", help="screenshot size, WIDTHxHEIGHT")
+    parser.add_argument("--pure", action="store_true", help="time the codec without NumPy")
+    args = parser.parse_args()
+    
+    width, height = (int(part) for part in args.size.split("x"))
+    pixels = screenshot(width, height)
+    bitmap = codec.Bitmap(width, height, "RGBA", pixels.tobytes())
+    if Image is not None:
+        source_png = pillow_save(Image.frombytes("RGBA", (width, height), bitmap.pixels), "PNG")
+    else:
+        source_png = paeth_png(pixels)
+    codec_png = codec.encode_png(bitmap)
+    bmp = codec.encode_bmp(bitmap.convert("RGB"))
+    n = args.iterations
+    
+    print(f"{width}x{height} screenshot, codec {'without' if args.pure else 'with'} NumPy:")
+    with patch.object(codec, "_numpy", return_value=None) if args.pure else contextlib.nullcontext():
+        measure("decode filtered PNG: codec", lambda: codec.decode_png(source_png).pixels, n)
+        if Image is not None:
+            measure("decode filtered PNG: Pillow", lambda: Image.open(BytesIO(source_png)).tobytes(), n)
+        measure("decode codec-written PNG: codec", lambda: codec.decode_png(codec_png).pixels, n)
+        measure("encode PNG: codec, adaptive", lambda: codec.encode_png(bitmap), n)
+        measure("encode PNG: codec, no filter", lambda: codec.encode_png(bitmap, 6, codec.FILTER_NONE), n)
+        if Image is not None:
+            image = Image.frombytes("RGBA", (width, height), bitmap.pixels)
+            measure("encode PNG: Pillow", lambda: pillow_save(image, "PNG"), n)
+        measure("BMP to PNG: codec", lambda: codec.transcode(bmp, "PNG"), n)
+        if Image is not None:
+            measure("BMP to PNG: Pillow", lambda: pillow(bmp, "PNG"), n)
+        measure("PNG to DIB: codec", lambda: codec.encode_dib(codec.decode_png(codec_png).convert("RGBA")), n)
+        if Image is not None:
+            measure("PNG to DIB: Pillow", lambda: pillow(codec_png, "BMP", "RGBA")[14:], n)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Benchmark: xclip-based vs in-process X11 Linux backends.
+
+Run against a real or virtual X server, for example:
+    
+    xvfb-run -a python benchmarks/bench_linux_backends.py
+"""
+
+import argparse
+import shutil
+import time
+from typing import Callable
+
+from zclipboard import Clipboard
+from zclipboard.backends.base import ClipboardBackend
+
+
+def measure(label: str, func: Callable[[], object], iterations: int) -> None:
+    """Run func repeatedly and print the mean time per call."""
+    func()
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<28} {elapsed / iterations * 1000:8.3f} ms/call")
+
+
+def bench_backend(name: str, backend: ClipboardBackend, iterations: int) -> None:
+    """Time the common operations on one backend."""
+    clipboard = Clipboard(backend=backend)
+    print(f"{name}:")
+    measure("set_text", lambda: clipboard.set_text("benchmark"), iterations)
+    measure("get_text", clipboard.get_text, iterations)
+    measure("get_available_formats", clipboard.get_available_formats, iterations)
+    measure("get()", clipboard.get, iterations)
+    payload = b"\x89PNG\r\n\x1a\n" + bytes(1024 * 1024)
+    clipboard.set_image(payload)
+    measure("get_image (1 MB)", clipboard.get_image, max(1, iterations // 10))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-n", "--iterations", type=int, default=100)
+    args = parser.parse_args()
+    
+    from zclipboard.backends.x11 import X11ClipboardBackend
+    
+    if shutil.which("xclip"):
+        from zclipboard.backends.linux import LinuxClipboardBackend
+        bench_backend("LinuxClipboardBackend (xclip)", LinuxClipboardBackend(), args.iterations)
+    else:
+        print("xclip not installed; skipping LinuxClipboardBackend")
+    
+    # Measure reads served by another client, not the in-process shortcut.
+    writer = X11ClipboardBackend()
+    reader = X11ClipboardBackend()
+    bench_backend("X11ClipboardBackend (writer)", writer, args.iterations)
+    writer.set_text("benchmark")
+    clipboard = Clipboard(backend=reader)
+    print("X11ClipboardBackend (cross-client reads):")
+    measure("get_text", clipboard.get_text, args.iterations)
+    measure("get_available_formats", clipboard.get_available_formats, args.iterations)
+    writer.close()
+    reader.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Benchmark: pipe throughput of the subprocess-based Linux backend.
+
+Compares subprocess.run(capture_output=True), which the xclip backend used
+to read payloads with, against pipeio.run(), and a joined FRAME_SET write
+against one sent from parts. `cat` stands in for xclip, so no X server is
+needed:
+    
+    python benchmarks/bench_pipe_io.py
+"""
+
+import argparse
+import os
+import subprocess
+import tempfile
+import time
+from typing import Callable
+
+from zclipboard.backends import pipeio
+from zclipboard.backends.ownership import FRAME_SET, encode_items, item_parts, write_frame
+
+SIZES = [("1 KB", 1024), ("1 MB", 1024 * 1024), ("100 MB", 100 * 1024 * 1024)]
+
+
+def measure(label: str, func: Callable[[], object], size: int, iterations: int) -> None:
+    """Run func repeatedly and print the throughput in MB/s."""
+    func()
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    elapsed = (time.perf_counter() - start) / iterations
+    print(f"  {label:<34} {elapsed * 1000:9.3f} ms/call {size / elapsed / 1e6:9.1f} MB/s")
+
+
+def bench_read(path: str, size: int, iterations: int) -> None:
+    args = ["cat", path]
+    measure("read: subprocess.run", lambda: subprocess.run(args, capture_output=True), size, iterations)
+    measure("read: pipeio.run", lambda: pipeio.run(args), size, iterations)
+    measure("read: pipeio.run + size hint", lambda: pipeio.run(args, size_hint=size), size, iterations)
+
+
+def bench_write(payload: bytes, iterations: int) -> None:
+    items = {"image/png": payload, "text/html": None}
+    
+    def send(frame_parts, enlarge: bool) -> None:
+        process = subprocess.Popen(["cat"], stdin=subprocess.PIPE, stdout=subprocess.DEVNULL)
+        if enlarge:
+            pipeio.enlarge_pipe(process.stdin.fileno())
+        write_frame(process.stdin, FRAME_SET, *frame_parts())
+        process.stdin.close()
+        process.wait()
+    
+    size = len(payload)
+    measure("write: joined payload", lambda: send(lambda: [encode_items(items)], False), size, iterations)
+    measure("write: parts + enlarged pipe", lambda: send(lambda: item_parts(items), True), size, iterations)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-n", "--iterations", type=int, default=20)
+    args = parser.parse_args()
+    
+    for label, size in SIZES:
+        payload = os.urandom(size)
+        iterations = args.iterations if size <= 1024 * 1024 else max(1, args.iterations // 10)
+        with tempfile.NamedTemporaryFile() as file:
+            file.write(payload)
+            file.flush()
+            print(f"{label}:")
+            bench_read(file.name, size, iterations)
+            bench_write(payload, iterations)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,58 +1,39 @@
 """Example: Monitor clipboard for changes."""
 
 import time
-from typing import Optional
 
 from zclipboard import Clipboard, ClipboardFormat
 
 
-def get_clipboard_signature(clipboard: Clipboard) -> Optional[str]:
-    """Get a simple signature of current clipboard content."""
-    text = clipboard.get_text()
-    if text:
-        return f"text:{hash(text)}"
-    
-    image = clipboard.get_image()
-    if image:
-        return f"image:{hash(image)}"
-    
-    return None
-
-
 def main():
     clipboard = Clipboard()
     print("Clipboard monitor started. Press Ctrl+C to stop.")
     print("Copy something to see changes!\n")
     
-    last_signature = get_clipboard_signature(clipboard)
-    
+    watcher = clipboard.watch()
     try:
-        while True:
-            current_signature = get_clipboard_signature(clipboard)
+        for change in watcher:
+            print(f"[{time.strftime('%H:%M:%S')}] Clipboard changed!")
+            print(f"  Available formats: {[f.name for f in change.formats]}")
+            
+            # Payloads are only fetched for formats that actually changed.
+            if ClipboardFormat.PLAIN_TEXT in change.changed:
+                # Only the first characters are transferred, however large the text.
+                text = clipboard.get_text(max_chars=51)
+                preview = text[:50] + "..." if text and len(text) > 50 else text
+                print(f"  Text preview: {preview}")
             
-            if current_signature != last_signature:
-                print(f"[{time.strftime('%H:%M:%S')}] Clipboard changed!")
-                
-                formats = clipboard.get_available_formats()
-                print(f"  Available formats: {[f.name for f in formats]}")
-                
-                if ClipboardFormat.PLAIN_TEXT in formats:
-                    text = clipboard.get_text()
-                    preview = text[:50] + "..." if text and len(text) > 50 else text
-                    print(f"  Text preview: {preview}")
-                
-                if ClipboardFormat.IMAGE in formats:
-                    image = clipboard.get_image()
-                    if image:
-                        print(f"  Image size: {len(image)} bytes")
-                
-                print()
-                last_signature = current_signature
+            if ClipboardFormat.IMAGE in change.changed:
+                image = clipboard.get_image()
+                if image:
+                    print(f"  Image size: {len(image)} bytes")
             
-            time.sleep(0.5)
+            print()
     
     except KeyboardInterrupt:
         print("\nMonitor stopped.")
+    finally:
+        watcher.stop()
 
 
 if __name__ == "__main__":
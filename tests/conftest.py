@@ -113,3 +113,13 @@ def skip_unless_platform(platform: str):
 skip_unless_windows = skip_unless_platform("windows")
 skip_unless_macos = skip_unless_platform("darwin")
 skip_unless_linux = skip_unless_platform("linux")
+
+
+@pytest.fixture
+def fake_x_server(tmp_path):
+    """Provide a minimal X server listening on a Unix socket."""
+    from tests.fake_xserver import FakeXServer
+    
+    server = FakeXServer(str(tmp_path / "X0"))
+    yield server
+    server.close()
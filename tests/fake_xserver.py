@@ -0,0 +1,282 @@
+"""A tiny in-process X server implementing the selection-related requests.
+
+Only what the X11 backend needs is supported: atoms, windows, properties,
+selection ownership/conversion, SendEvent and a few round-trip requests.
+It listens on a Unix socket so tests can point DISPLAY at "<path>:0".
+"""
+
+import os
+import socket
+import struct
+import threading
+from typing import Dict, Tuple
+
+PREDEFINED_ATOMS = {"PRIMARY": 1, "SECONDARY": 2, "ATOM": 4, "INTEGER": 19, "STRING": 31}
+PROPERTY_CHANGE_MASK = 0x00400000
+ROOT_WINDOW = 0x100
+XFIXES = ("XFIXES", 138, 90, 140)
+
+
+def _pad(length: int) -> int:
+    return -length % 4
+
+
+class _Client:
+    def __init__(self, server: "FakeXServer", sock: socket.socket, index: int):
+        self.server = server
+        self.sock = sock
+        self.seq = 0
+        self.id_base = (index + 1) << 21
+        self.send_lock = threading.Lock()
+    
+    def send(self, packet: bytes) -> None:
+        with self.send_lock:
+            try:
+                self.sock.sendall(packet)
+            except OSError:
+                pass
+    
+    def send_event(self, event: bytes) -> None:
+        event = event[:2] + struct.pack("<H", self.seq & 0xFFFF) + event[4:32]
+        self.send(event.ljust(32, b"\0"))
+    
+    def reply(self, data1: int = 0, body: bytes = b"") -> None:
+        body = body.ljust(24, b"\0")
+        body += b"\0" * _pad(len(body))
+        extra = (len(body) - 24) // 4
+        self.send(struct.pack("<BBHI", 1, data1, self.seq & 0xFFFF, extra) + body)
+    
+    def recv_exact(self, size: int) -> bytes:
+        data = b""
+        while len(data) < size:
+            chunk = self.sock.recv(size - len(data))
+            if not chunk:
+                raise ConnectionError
+            data += chunk
+        return data
+
+
+class FakeXServer:
+    """Serve the X protocol subset on a Unix socket."""
+    
+    def __init__(self, path: str, max_request_length: int = 65535, xfixes: bool = True):
+        self.path = path
+        self.max_request_length = max_request_length
+        self.extensions = {XFIXES[0]: XFIXES[1:]} if xfixes else {}
+        self.selection_inputs = []
+        self.atoms: Dict[str, int] = dict(PREDEFINED_ATOMS)
+        self.windows: Dict[int, _Client] = {ROOT_WINDOW: None}
+        self.event_masks: Dict[Tuple[int, _Client], int] = {}
+        self.properties: Dict[Tuple[int, int], Tuple[int, int, bytes]] = {}
+        self.selections: Dict[int, Tuple[int, int]] = {}
+        self.time = 1000
+        self.lock = threading.RLock()
+        self.clients = []
+        self.request_counts: Dict[int, int] = {}
+        self._listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._listener.bind(path)
+        self._listener.listen(8)
+        self._thread = threading.Thread(target=self._accept_loop, daemon=True)
+        self._thread.start()
+    
+    @property
+    def display(self) -> str:
+        return f"{self.path}:0"
+    
+    def close(self) -> None:
+        self._listener.close()
+        for client in self.clients:
+            try:
+                client.sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            client.sock.close()
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+    
+    def selection_owner(self, name: str) -> int:
+        with self.lock:
+            atom = self.atoms.get(name)
+            return self.selections.get(atom, (0, 0))[0]
+    
+    def _accept_loop(self) -> None:
+        while True:
+            try:
+                sock, _ = self._listener.accept()
+            except OSError:
+                return
+            client = _Client(self, sock, len(self.clients))
+            self.clients.append(client)
+            threading.Thread(target=self._serve_client, args=(client,), daemon=True).start()
+    
+    def _serve_client(self, client: _Client) -> None:
+        try:
+            self._setup(client)
+            while True:
+                header = client.recv_exact(4)
+                opcode, data1, length = struct.unpack("<BBH", header)
+                body = client.recv_exact(length * 4 - 4)
+                client.seq += 1
+                with self.lock:
+                    self.request_counts[opcode] = self.request_counts.get(opcode, 0) + 1
+                    if opcode == XFIXES[1] and XFIXES[0] in self.extensions:
+                        opcode = f"xfixes_{data1}"
+                    handler = getattr(self, f"_op_{opcode}", None)
+                    if handler is not None:
+                        handler(client, data1, body)
+        except (ConnectionError, OSError):
+            pass
+    
+    def _setup(self, client: _Client) -> None:
+        _, _, _, name_len, data_len = struct.unpack("<BxHHHHxx", client.recv_exact(12))
+        client.recv_exact(name_len + _pad(name_len) + data_len + _pad(data_len))
+        additional = struct.pack(
+            "<IIIIHHBBBBBBBBxxxx",
+            0, client.id_base, 0x1FFFFF, 0, 0, self.max_request_length, 1, 0, 0, 0, 32, 32, 8, 255,
+        )
+        additional += struct.pack("<IIIIIHHHHHHIBBBB", ROOT_WINDOW, 0, 0, 0, 0, 1, 1, 1, 1, 1, 1, 0x21, 0, 0, 24, 0)
+        client.send(struct.pack("<BxHHH", 1, 11, 0, len(additional) // 4) + additional)
+    
+    def _tick(self) -> int:
+        self.time += 1
+        return self.time
+    
+    def _atom(self, name: str) -> int:
+        if name not in self.atoms:
+            self.atoms[name] = 100 + len(self.atoms)
+        return self.atoms[name]
+    
+    def _atom_name(self, atom: int) -> str:
+        for name, value in self.atoms.items():
+            if value == atom:
+                return name
+        return ""
+    
+    def _property_notify(self, window: int, atom: int, state: int) -> None:
+        event = struct.pack("<BxxxIIIB", 28, window, atom, self._tick(), state)
+        for (masked_window, client), mask in list(self.event_masks.items()):
+            if masked_window == window and mask & PROPERTY_CHANGE_MASK:
+                client.send_event(event)
+    
+    def _owner_changed(self, selection: int, owner: int, timestamp: int, subtype: int) -> None:
+        event = struct.pack("<BBxxIIIII", XFIXES[2], subtype, 0, owner, selection, timestamp, timestamp)
+        for client, window, selected, mask in self.selection_inputs:
+            if selected == selection and mask & (1 << subtype):
+                client.send_event(event[:4] + struct.pack("<I", window) + event[8:])
+    
+    # Requests
+    
+    def _op_1(self, client, data1, body):  # CreateWindow
+        window = struct.unpack_from("<I", body, 0)[0]
+        value_mask = struct.unpack_from("<I", body, 24)[0]
+        self.windows[window] = client
+        if value_mask & 0x800:
+            self.event_masks[(window, client)] = struct.unpack_from("<I", body, 28)[0]
+    
+    def _op_2(self, client, data1, body):  # ChangeWindowAttributes
+        window, value_mask = struct.unpack_from("<II", body, 0)
+        if value_mask & 0x800:
+            self.event_masks[(window, client)] = struct.unpack_from("<I", body, 8)[0]
+    
+    def _op_4(self, client, data1, body):  # DestroyWindow
+        window = struct.unpack_from("<I", body, 0)[0]
+        self.windows.pop(window, None)
+        for key in [key for key in self.event_masks if key[0] == window]:
+            del self.event_masks[key]
+        for selection, (owner, _) in list(self.selections.items()):
+            if owner == window:
+                self.selections[selection] = (0, self.time)
+                self._owner_changed(selection, 0, self.time, 1)
+    
+    def _op_16(self, client, data1, body):  # InternAtom
+        length = struct.unpack_from("<H", body, 0)[0]
+        name = body[4:4 + length].decode("latin-1")
+        atom = self.atoms.get(name, 0) if data1 else self._atom(name)
+        client.reply(body=struct.pack("<I", atom))
+    
+    def _op_17(self, client, data1, body):  # GetAtomName
+        name = self._atom_name(struct.unpack_from("<I", body, 0)[0]).encode("latin-1")
+        client.reply(body=struct.pack("<H22x", len(name)) + name)
+    
+    def _op_18(self, client, data1, body):  # ChangeProperty
+        window, atom, prop_type, fmt, units = struct.unpack_from("<IIIBxxxI", body, 0)
+        data = body[20:20 + units * fmt // 8]
+        if data1 == 2 and (window, atom) in self.properties:
+            old_type, old_format, old = self.properties[(window, atom)]
+            data = old + data
+        self.properties[(window, atom)] = (prop_type, fmt, data)
+        self._property_notify(window, atom, 0)
+    
+    def _op_19(self, client, data1, body):  # DeleteProperty
+        key = struct.unpack_from("<II", body, 0)
+        if self.properties.pop(key, None) is not None:
+            self._property_notify(key[0], key[1], 1)
+    
+    def _op_20(self, client, data1, body):  # GetProperty
+        window, atom = struct.unpack_from("<II", body, 0)
+        if (window, atom) not in self.properties:
+            client.reply(body=struct.pack("<IIII", 0, 0, 0, 0))
+            return
+        prop_type, fmt, data = self.properties[(window, atom)]
+        units = len(data) // max(fmt // 8, 1)
+        client.reply(fmt, struct.pack("<IIII8x", prop_type, 0, units, 0) + data)
+        if data1:
+            del self.properties[(window, atom)]
+            self._property_notify(window, atom, 1)
+    
+    def _op_22(self, client, data1, body):  # SetSelectionOwner
+        owner, selection, timestamp = struct.unpack_from("<III", body, 0)
+        timestamp = timestamp or self.time
+        previous, last_change = self.selections.get(selection, (0, 0))
+        if timestamp < last_change or timestamp > self.time:
+            return
+        if previous and previous != owner and self.windows.get(previous) is not None:
+            event = struct.pack("<BxxxIII", 29, timestamp, previous, selection)
+            self.windows[previous].send_event(event)
+        self.selections[selection] = (owner, timestamp)
+        self._owner_changed(selection, owner, timestamp, 0)
+    
+    def _op_23(self, client, data1, body):  # GetSelectionOwner
+        selection = struct.unpack_from("<I", body, 0)[0]
+        client.reply(body=struct.pack("<I", self.selections.get(selection, (0, 0))[0]))
+    
+    def _op_24(self, client, data1, body):  # ConvertSelection
+        requestor, selection, target, prop, timestamp = struct.unpack_from("<IIIII", body, 0)
+        owner = self.selections.get(selection, (0, 0))[0]
+        if owner and self.windows.get(owner) is not None:
+            event = struct.pack("<BxxxIIIIII", 30, timestamp, owner, requestor, selection, target, prop)
+            self.windows[owner].send_event(event)
+        else:
+            event = struct.pack("<BxxxIIIII", 31, timestamp, requestor, selection, target, 0)
+            client.send_event(event)
+    
+    def _op_25(self, client, data1, body):  # SendEvent
+        destination = struct.unpack_from("<I", body, 0)[0]
+        event = bytearray(body[8:40])
+        event[0] |= 0x80
+        target_client = self.windows.get(destination)
+        if target_client is not None:
+            target_client.send_event(bytes(event))
+    
+    def _op_43(self, client, data1, body):  # GetInputFocus
+        client.reply(body=struct.pack("<I", ROOT_WINDOW))
+    
+    def _op_98(self, client, data1, body):  # QueryExtension
+        length = struct.unpack_from("<H", body, 0)[0]
+        name = body[4:4 + length].decode("latin-1")
+        if name in self.extensions:
+            major, first_event, first_error = self.extensions[name]
+            client.reply(body=struct.pack("<BBBB", 1, major, first_event, first_error))
+        else:
+            client.reply(body=struct.pack("<BBBB", 0, 0, 0, 0))
+    
+    def _op_xfixes_0(self, client, data1, body):  # XFixesQueryVersion
+        client.reply(body=struct.pack("<II", 5, 0))
+    
+    def _op_xfixes_2(self, client, data1, body):  # XFixesSelectSelectionInput
+        window, selection, mask = struct.unpack_from("<III", body, 0)
+        self.selection_inputs = [
+            entry for entry in self.selection_inputs if entry[:3] != (client, window, selection)
+        ]
+        if mask:
+            self.selection_inputs.append((client, window, selection, mask))
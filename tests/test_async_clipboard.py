@@ -0,0 +1,219 @@
+"""Tests for AsyncClipboard."""
+
+import asyncio
+import os
+import sys
+import textwrap
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+
+from tests.conftest import MockClipboardBackend, skip_unless_linux
+from zclipboard import AsyncClipboard, ClipboardFormat
+from zclipboard.backends import MemoryClipboardBackend
+from zclipboard.exceptions import ClipboardFormatError, ClipboardTimeoutError
+
+FAKE_XCLIP = textwrap.dedent("""\
+    #!{python}
+    import os, sys, time
+    target = sys.argv[sys.argv.index("-target") + 1]
+    with open(os.environ["FAKE_XCLIP_PIDS"], "a") as pids:
+        pids.write(f"{{os.getpid()}}\\n")
+    if os.environ.get("FAKE_XCLIP_DELAY"):
+        time.sleep(float(os.environ["FAKE_XCLIP_DELAY"]))
+    offered = {{"TARGETS": b"TARGETS\\nUTF8_STRING\\ntext/html\\n", "UTF8_STRING": b"async text", "text/html": b"<b>x</b>"}}
+    if target not in offered:
+        sys.exit(1)
+    sys.stdout.buffer.write(offered[target])
+""")
+
+
+class SlowBackend(MockClipboardBackend):
+    """Mock backend whose reads block."""
+    
+    def __init__(self, delay: float):
+        super().__init__()
+        self.delay = delay
+        self.threads = set()
+    
+    def get_text(self):
+        self.threads.add(threading.current_thread().name)
+        time.sleep(self.delay)
+        return super().get_text()
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+class TestAsyncClipboard:
+    """Tests for AsyncClipboard over blocking backends."""
+    
+    def test_round_trip(self):
+        async def scenario():
+            async with AsyncClipboard(MemoryClipboardBackend()) as clipboard:
+                await clipboard.set_html("<b>x</b>", "x")
+                return (
+                    await clipboard.get_html(),
+                    await clipboard.get_text(),
+                    await clipboard.get_available_formats(),
+                    (await clipboard.get()).format_type,
+                )
+        
+        html, text, formats, first = run(scenario())
+        assert (html, text) == ("<b>x</b>", "x")
+        assert formats == [ClipboardFormat.HTML, ClipboardFormat.PLAIN_TEXT]
+        assert first == ClipboardFormat.HTML
+    
+    def test_bounded_reads(self):
+        async def scenario():
+            async with AsyncClipboard(MemoryClipboardBackend()) as clipboard:
+                await clipboard.set_html("<b>bold</b>", "bold")
+                return await clipboard.get_text(max_chars=2), await clipboard.get_html(max_chars=3)
+        
+        assert run(scenario()) == ("bo", "<b>")
+    
+    def test_state_queries(self):
+        async def scenario():
+            async with AsyncClipboard(MemoryClipboardBackend()) as clipboard:
+                empty = await clipboard.is_empty()
+                await clipboard.set_image(b"png")
+                return empty, await clipboard.has_format(ClipboardFormat.IMAGE), await clipboard.get()
+        
+        empty, has_image, data = run(scenario())
+        assert empty and has_image
+        assert data.data == b"png"
+    
+    def test_set_lazy(self):
+        calls = []
+        
+        async def scenario():
+            async with AsyncClipboard(MemoryClipboardBackend()) as clipboard:
+                await clipboard.set_lazy({ClipboardFormat.PLAIN_TEXT: lambda: calls.append(1) or "late"})
+                assert calls == []
+                return await clipboard.get_text()
+        
+        assert run(scenario()) == "late"
+        assert calls == [1]
+    
+    def test_validation_errors_propagate(self):
+        async def scenario():
+            async with AsyncClipboard(MemoryClipboardBackend()) as clipboard:
+                await clipboard.set_lazy({})
+        
+        with pytest.raises(ClipboardFormatError):
+            run(scenario())
+    
+    def test_blocking_backend_does_not_block_loop(self):
+        backend = SlowBackend(0.2)
+        backend.set_text("slow")
+        ticks = []
+        
+        async def ticker():
+            for _ in range(5):
+                ticks.append(time.monotonic())
+                await asyncio.sleep(0.01)
+        
+        async def scenario():
+            async with AsyncClipboard(backend) as clipboard:
+                text, _ = await asyncio.gather(clipboard.get_text(), ticker())
+                return text
+        
+        assert run(scenario()) == "slow"
+        assert len(ticks) == 5
+        assert threading.current_thread().name not in backend.threads
+    
+    def test_per_call_timeout(self):
+        async def scenario():
+            async with AsyncClipboard(SlowBackend(0.5), timeout=10) as clipboard:
+                await clipboard.get_text(timeout=0.05)
+        
+        with pytest.raises(ClipboardTimeoutError):
+            run(scenario())
+    
+    def test_default_timeout(self):
+        async def scenario():
+            async with AsyncClipboard(SlowBackend(0.5), timeout=0.05) as clipboard:
+                await clipboard.get_text()
+        
+        with pytest.raises(ClipboardTimeoutError):
+            run(scenario())
+
+
+@skip_unless_linux
+class TestAsyncClipboardLinux:
+    """Tests for native asyncio reads on the xclip backend."""
+    
+    @pytest.fixture
+    def xclip_backend(self, tmp_path, monkeypatch):
+        script = tmp_path / "xclip"
+        script.write_text(FAKE_XCLIP.format(python=sys.executable))
+        script.chmod(0o755)
+        monkeypatch.setenv("FAKE_XCLIP_PIDS", str(tmp_path / "pids"))
+        with patch("shutil.which", return_value=str(script)):
+            from zclipboard.backends.linux import LinuxClipboardBackend
+            backend = LinuxClipboardBackend()
+        yield backend
+        backend.owners.close()
+    
+    @staticmethod
+    def spawned_pids(tmp_path):
+        return [int(line) for line in (tmp_path / "pids").read_text().split()]
+    
+    def test_reads_use_asyncio_subprocesses(self, xclip_backend):
+        async def scenario():
+            async with AsyncClipboard(xclip_backend) as clipboard:
+                return await clipboard.get_text(), await clipboard.get_available_formats()
+        
+        with patch("zclipboard.backends.pipeio.run", side_effect=AssertionError("blocking subprocess used")):
+            text, formats = run(scenario())
+        assert text == "async text"
+        assert formats == [ClipboardFormat.PLAIN_TEXT, ClipboardFormat.HTML]
+    
+    def test_decoding_runs_off_the_loop(self, xclip_backend):
+        decode = xclip_backend._decode
+        threads = []
+        
+        def recording_decode(*args):
+            threads.append(threading.current_thread())
+            return decode(*args)
+        
+        async def scenario():
+            async with AsyncClipboard(xclip_backend) as clipboard:
+                return await clipboard.get_text()
+        
+        with patch.object(xclip_backend, "_decode", side_effect=recording_decode):
+            assert run(scenario()) == "async text"
+        assert threads and threading.current_thread() not in threads
+    
+    def test_timeout_kills_xclip(self, xclip_backend, tmp_path, monkeypatch):
+        monkeypatch.setenv("FAKE_XCLIP_DELAY", "30")
+        
+        async def scenario():
+            async with AsyncClipboard(xclip_backend) as clipboard:
+                await clipboard.get_text(timeout=0.5)
+        
+        with pytest.raises(ClipboardTimeoutError):
+            run(scenario())
+        for pid in self.spawned_pids(tmp_path):
+            with pytest.raises(ProcessLookupError):
+                os.kill(pid, 0)
+    
+    def test_cancellation_kills_xclip(self, xclip_backend, tmp_path, monkeypatch):
+        monkeypatch.setenv("FAKE_XCLIP_DELAY", "30")
+        
+        async def scenario():
+            async with AsyncClipboard(xclip_backend) as clipboard:
+                task = asyncio.ensure_future(clipboard.get_html())
+                await asyncio.sleep(0.5)
+                task.cancel()
+                with pytest.raises(asyncio.CancelledError):
+                    await task
+        
+        run(scenario())
+        assert self.spawned_pids(tmp_path)
+        for pid in self.spawned_pids(tmp_path):
+            with pytest.raises(ProcessLookupError):
+                os.kill(pid, 0)
@@ -31,6 +31,16 @@ class TestClipboardBackendInterface:
             method = getattr(ClipboardBackend, method_name)
             assert callable(method)
     
+    def test_default_fingerprint_hashes_contents(self, mock_backend):
+        mock_backend.set_html("<b>x</b>", "x")
+        first = mock_backend.fingerprint()
+        assert mock_backend.fingerprint() == first
+        
+        mock_backend.set_html("<b>y</b>", "x")
+        assert mock_backend.fingerprint() != first
+        mock_backend.set_html("<b>x</b>", "x")
+        assert mock_backend.fingerprint() == first
+    
     def test_incomplete_implementation_raises_error(self):
         class IncompleteBackend(ClipboardBackend):
             def clear(self):
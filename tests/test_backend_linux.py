@@ -1,6 +1,7 @@
 """Tests for Linux clipboard backend."""
 
 import shutil
+import struct
 import subprocess
 import sys
 from unittest.mock import MagicMock, patch
@@ -8,7 +9,27 @@ from unittest.mock import MagicMock, patch
 import pytest
 
 from tests.conftest import skip_unless_linux
+from zclipboard.codecs.image import decode_png
 from zclipboard.exceptions import ClipboardAccessError, ClipboardTimeoutError
+from zclipboard.image import pillow_available
+
+
+def fake_xclip_run(offered):
+    """Build a pipeio.run replacement serving the given targets."""
+    def run(args, **kwargs):
+        target = args[args.index("-target") + 1]
+        if target == "TARGETS":
+            output = "\n".join(["TARGETS"] + list(offered)) + "\n"
+            return MagicMock(returncode=0, stdout=output.encode())
+        if target in offered:
+            return MagicMock(returncode=0, stdout=offered[target])
+        return MagicMock(returncode=1, stdout=b"")
+    return run
+
+
+def requested_targets(mock_run):
+    """Return the -target argument of every recorded xclip call."""
+    return [call.args[0][call.args[0].index("-target") + 1] for call in mock_run.call_args_list]
 
 
 class TestLinuxBackendImport:
@@ -49,11 +70,8 @@ class TestLinuxBackendWithMock:
             return LinuxClipboardBackend()
     
     def test_get_text_calls_xclip(self, mock_xclip_backend):
-        with patch("subprocess.run") as mock_run:
-            mock_run.return_value = MagicMock(
-                returncode=0,
-                stdout=b"test text"
-            )
+        with patch("zclipboard.backends.pipeio.run") as mock_run:
+            mock_run.side_effect = fake_xclip_run({"UTF8_STRING": b"test text"})
             
             result = mock_xclip_backend.get_text()
             
@@ -61,7 +79,7 @@ class TestLinuxBackendWithMock:
             mock_run.assert_called()
     
     def test_get_text_returns_none_on_failure(self, mock_xclip_backend):
-        with patch("subprocess.run") as mock_run:
+        with patch("zclipboard.backends.pipeio.run") as mock_run:
             mock_run.return_value = MagicMock(
                 returncode=1,
                 stdout=b""
@@ -71,29 +89,50 @@ class TestLinuxBackendWithMock:
             
             assert result is None
     
-    def test_set_text_calls_xclip(self, mock_xclip_backend):
-        with patch("subprocess.Popen") as mock_popen:
-            mock_process = MagicMock()
-            mock_process.returncode = 0
-            mock_process.communicate.return_value = (b"", b"")
-            mock_popen.return_value = mock_process
-            
+    def test_set_text_uses_owner_manager(self, mock_xclip_backend):
+        with patch.object(mock_xclip_backend.owners, "own") as mock_own:
             mock_xclip_backend.set_text("test")
             
-            mock_popen.assert_called()
-            mock_process.communicate.assert_called()
+            mock_own.assert_called_once_with({"UTF8_STRING": b"test"})
+    
+    def test_set_html_serves_both_targets_from_one_owner(self, mock_xclip_backend):
+        with patch.object(mock_xclip_backend.owners, "own") as mock_own:
+            mock_xclip_backend.set_html("<b>x</b>", "x")
+            
+            mock_own.assert_called_once_with({"text/html": b"<b>x</b>", "UTF8_STRING": b"x"})
+    
+    def test_set_lazy_defers_encoding_to_owner(self, mock_xclip_backend):
+        from zclipboard import ClipboardFormat
+        
+        calls = []
+        with patch.object(mock_xclip_backend.owners, "own") as mock_own:
+            mock_xclip_backend.set_lazy({ClipboardFormat.HTML: lambda: calls.append(1) or "<b>é</b>"})
+            
+            items = mock_own.call_args[0][0]
+            assert list(items) == ["text/html"]
+            assert calls == []
+            assert items["text/html"]() == "<b>é</b>".encode("utf-8")
+    
+    def test_fingerprint_uses_timestamp_target(self, mock_xclip_backend):
+        with patch("zclipboard.backends.pipeio.run") as mock_run:
+            mock_run.side_effect = fake_xclip_run({"TIMESTAMP": b"\x10\x27\x00\x00", "image/png": b"png"})
+            
+            token = mock_xclip_backend.fingerprint()
+            
+            assert token == ("TIMESTAMP", b"\x10\x27\x00\x00")
+            assert requested_targets(mock_run) == ["TIMESTAMP"]
     
     def test_timeout_raises_error(self, mock_xclip_backend):
-        with patch("subprocess.run") as mock_run:
+        with patch("zclipboard.backends.pipeio.run") as mock_run:
             mock_run.side_effect = subprocess.TimeoutExpired(cmd="xclip", timeout=5)
             
             with pytest.raises(ClipboardTimeoutError):
                 mock_xclip_backend.get_text()
     
     def test_get_available_formats_parses_targets(self, mock_xclip_backend):
-        targets_output = "UTF8_STRING\ntext/plain\ntext/html\nimage/png\n"
+        targets_output = b"UTF8_STRING\ntext/plain\ntext/html\nimage/png\n"
         
-        with patch("subprocess.run") as mock_run:
+        with patch("zclipboard.backends.pipeio.run") as mock_run:
             mock_run.return_value = MagicMock(
                 returncode=0,
                 stdout=targets_output
@@ -106,16 +145,235 @@ class TestLinuxBackendWithMock:
             assert ClipboardFormat.HTML in formats
             assert ClipboardFormat.IMAGE in formats
     
-    def test_clear_sends_empty_input(self, mock_xclip_backend):
-        with patch("subprocess.Popen") as mock_popen:
-            mock_process = MagicMock()
-            mock_process.returncode = 0
-            mock_process.communicate.return_value = (b"", b"")
-            mock_popen.return_value = mock_process
-            
+    def test_clear_goes_through_owner_manager(self, mock_xclip_backend):
+        with patch.object(mock_xclip_backend.owners, "clear") as mock_clear:
             mock_xclip_backend.clear()
             
-            mock_process.communicate.assert_called_with(input=b"", timeout=5)
+            mock_clear.assert_called_once_with()
+
+
+class TestLinuxBackendTargetNegotiation:
+    """Tests for TARGETS-driven format negotiation."""
+    
+    @pytest.fixture
+    def backend(self):
+        with patch("shutil.which", return_value="/usr/bin/xclip"):
+            from zclipboard.backends.linux import LinuxClipboardBackend
+            return LinuxClipboardBackend()
+    
+    def test_fetches_only_best_offered_target(self, backend):
+        with patch("zclipboard.backends.pipeio.run") as mock_run:
+            mock_run.side_effect = fake_xclip_run({"image/bmp": b"BM..."})
+            with patch.object(backend, "_convert_image_to_png", return_value=b"png") as convert:
+                assert backend.get_image() == b"png"
+            
+            convert.assert_called_once_with(b"BM...", "image/bmp")
+            assert requested_targets(mock_run) == ["TARGETS", "image/bmp"]
+    
+    def test_image_object_keeps_native_encoding(self, backend):
+        with patch("zclipboard.backends.pipeio.run") as mock_run:
+            mock_run.side_effect = fake_xclip_run({"image/jpeg": b"\xff\xd8jpeg"})
+            with patch.object(backend, "_convert_image_to_png", return_value=b"png") as convert:
+                image = backend.get_image_object()
+                assert (image.data, image.mime_type, image.format_name) == (b"\xff\xd8jpeg", "image/jpeg", "JPEG")
+                convert.assert_not_called()
+                assert image.to_png() == b"png"
+                assert image.to_png() == b"png"
+            
+            convert.assert_called_once_with(b"\xff\xd8jpeg", "image/jpeg")
+    
+    def test_set_image_serves_native_type(self, backend):
+        with patch.object(backend, "_set_targets") as set_targets:
+            backend.set_image(b"\xff\xd8\xff\xe0jpeg")
+            backend.set_image(b"\x89PNG\r\n\x1a\npng")
+            backend.set_image(b"not an image")
+        jpeg_targets, png_targets, other_targets = [call.args[0] for call in set_targets.call_args_list]
+        assert jpeg_targets["image/jpeg"] == b"\xff\xd8\xff\xe0jpeg"
+        assert ("image/png" in jpeg_targets) == pillow_available()
+        assert png_targets == {"image/png": b"\x89PNG\r\n\x1a\npng"}
+        assert other_targets == {"image/png": b"not an image"}
+    
+    def test_set_image_converts_bmp_without_pillow(self, backend):
+        data = b"BM" + struct.pack("<I4xI", 58, 54) + struct.pack("<IiiHH24x", 40, 1, 1, 1, 24) + b"\x01\x02\x03\x00"
+        with patch.object(backend, "_set_targets") as set_targets:
+            backend.set_image(data)
+        targets = set_targets.call_args.args[0]
+        assert targets["image/bmp"] == data
+        assert decode_png(targets["image/png"]()).pixels == b"\x03\x02\x01"
+    
+    def test_image_read_preallocated_from_length(self, backend):
+        with patch("zclipboard.backends.pipeio.run") as mock_run:
+            mock_run.side_effect = fake_xclip_run({"LENGTH": (5).to_bytes(8, "little"), "image/png": b"\x89PNG"})
+            assert backend.get_image() == b"\x89PNG"
+            assert requested_targets(mock_run) == ["TARGETS", "LENGTH", "image/png"]
+            assert mock_run.call_args.kwargs["size_hint"] == 5
+    
+    def test_cached_targets_reused(self, backend):
+        with patch("zclipboard.backends.pipeio.run") as mock_run:
+            mock_run.side_effect = fake_xclip_run({"UTF8_STRING": b"one", "text/html": b"<b>two</b>"})
+            assert backend.get_text() == "one"
+            assert backend.get_html() == "<b>two</b>"
+            
+            assert requested_targets(mock_run) == ["TARGETS", "UTF8_STRING", "text/html"]
+    
+    def test_stale_cache_is_refreshed(self, backend):
+        with patch("zclipboard.backends.pipeio.run") as mock_run:
+            mock_run.side_effect = fake_xclip_run({"UTF8_STRING": b"text"})
+            backend.get_text()
+            mock_run.side_effect = fake_xclip_run({"STRING": "caf\xe9".encode("latin-1")})
+            
+            assert backend.get_text() == "caf\xe9"
+            assert requested_targets(mock_run)[2:] == ["UTF8_STRING", "TARGETS", "STRING"]
+    
+    def test_charset_aware_text(self, backend):
+        data = "hello".encode("utf-16")
+        with patch("zclipboard.backends.pipeio.run") as mock_run:
+            mock_run.side_effect = fake_xclip_run({"text/plain;charset=utf-16": data})
+            assert backend.get_text() == "hello"
+    
+    def test_available_formats_refetch_targets(self, backend):
+        with patch("zclipboard.backends.pipeio.run") as mock_run:
+            mock_run.side_effect = fake_xclip_run({"UTF8_STRING": b"text"})
+            backend.get_available_formats()
+            mock_run.side_effect = fake_xclip_run({"image/png": b"png"})
+            
+            from zclipboard import ClipboardFormat
+            assert backend.get_available_formats() == [ClipboardFormat.IMAGE]
+
+
+STREAMING_XCLIP = """#!{python}
+import os, sys
+target = sys.argv[sys.argv.index("-target") + 1]
+path = os.path.join(os.environ["FAKE_XCLIP_DIR"], target.replace("/", "_"))
+if not os.path.exists(path):
+    sys.exit(1)
+with open(path, "rb") as source:
+    while True:
+        chunk = source.read(65536)
+        if not chunk:
+            break
+        sys.stdout.buffer.write(chunk)
+        sys.stdout.buffer.flush()
+"""
+
+
+@skip_unless_linux
+class TestLinuxBackendStreaming:
+    """Tests for read_into() against an xclip stand-in that writes in chunks."""
+    
+    @pytest.fixture
+    def serve(self, tmp_path, monkeypatch):
+        script = tmp_path / "xclip"
+        script.write_text(STREAMING_XCLIP.format(python=sys.executable))
+        script.chmod(0o755)
+        targets = tmp_path / "targets"
+        targets.mkdir()
+        monkeypatch.setenv("FAKE_XCLIP_DIR", str(targets))
+        
+        def serve(offered):
+            listing = "\n".join(["TARGETS"] + list(offered)) + "\n"
+            (targets / "TARGETS").write_bytes(listing.encode())
+            for target, data in offered.items():
+                (targets / target.replace("/", "_")).write_bytes(data)
+            with patch("shutil.which", return_value=str(script)):
+                from zclipboard.backends.linux import LinuxClipboardBackend
+                return LinuxClipboardBackend()
+        
+        return serve
+    
+    def test_png_streams_in_chunks(self, serve):
+        from zclipboard.data_types import ClipboardFormat
+        
+        payload = b"\x89PNG\r\n\x1a\n" + bytes(range(256)) * 8192
+        backend = serve({"image/png": payload})
+        assert backend.get_available_formats() == [ClipboardFormat.IMAGE]
+        chunks = []
+        with patch("zclipboard.backends.pipeio.run", side_effect=AssertionError("payload buffered")):
+            assert backend.read_into(ClipboardFormat.IMAGE, chunks.append)
+        assert len(chunks) > 1
+        assert b"".join(chunks) == payload
+    
+    def test_utf16_text_is_transcoded(self, serve):
+        from zclipboard.data_types import ClipboardFormat
+        
+        backend = serve({"text/html": "<b>wide</b>".encode("utf-16")})
+        chunks = []
+        assert backend.read_into(ClipboardFormat.HTML, chunks.append)
+        assert b"".join(chunks) == b"<b>wide</b>"
+    
+    def test_missing_format(self, serve):
+        from zclipboard.data_types import ClipboardFormat
+        
+        backend = serve({"UTF8_STRING": b"text"})
+        assert not backend.read_into(ClipboardFormat.IMAGE, lambda chunk: None)
+    
+    def test_closing_stream_stops_xclip(self, serve):
+        from zclipboard.data_types import ClipboardFormat
+        
+        backend = serve({"UTF8_STRING": b"x" * (8 * 1024 * 1024)})
+        stream = backend.open_stream(ClipboardFormat.PLAIN_TEXT)
+        assert stream.read(10) == b"x" * 10
+        process = stream.raw._process
+        assert process.poll() is None
+        stream.close()
+        assert process.returncode is not None
+    
+    def test_utf16_text_stream_is_transcoded(self, serve):
+        from zclipboard.data_types import ClipboardFormat
+        
+        backend = serve({"text/html": "<b>wide</b>".encode("utf-16")})
+        with backend.open_stream(ClipboardFormat.HTML) as stream:
+            assert stream.read() == b"<b>wide</b>"
+    
+    def test_info_reads_only_the_header(self, serve):
+        from tests.test_imageinfo import jpeg
+        from zclipboard.data_types import ClipboardFormat
+        
+        payload = jpeg(4000, 3000) + bytes(32 * 1024 * 1024)
+        backend = serve({"image/jpeg": payload, "LENGTH": str(len(payload)).encode()})
+        with patch.object(backend, "_convert_image_to_png", side_effect=AssertionError("image converted")):
+            info = backend.get_info(ClipboardFormat.IMAGE)
+        assert (info.mime_type, info.width, info.height, info.size) == ("image/jpeg", 4000, 3000, len(payload))
+        assert backend.get_info(ClipboardFormat.HTML) is None
+    
+    def test_empty_target_stream(self, serve):
+        from zclipboard.data_types import ClipboardFormat
+        
+        backend = serve({"UTF8_STRING": b""})
+        assert backend.open_stream(ClipboardFormat.PLAIN_TEXT) is None
+    
+    def test_png_spliced_into_file(self, serve, tmp_path):
+        from zclipboard.data_types import ClipboardFormat
+        
+        payload = b"\x89PNG\r\n\x1a\n" + bytes(range(256)) * 8192
+        backend = serve({"image/png": payload})
+        backend.get_available_formats()
+        with open(tmp_path / "out.png", "wb") as file:
+            with patch.object(backend, "read_into", side_effect=AssertionError("payload passed through Python")):
+                assert backend.read_to_file(ClipboardFormat.IMAGE, file)
+        assert (tmp_path / "out.png").read_bytes() == payload
+    
+    def test_utf16_text_transcoded_into_file(self, serve, tmp_path):
+        from zclipboard.data_types import ClipboardFormat
+        
+        backend = serve({"text/html": "<b>wide</b>".encode("utf-16")})
+        with open(tmp_path / "out.html", "wb") as file:
+            assert backend.read_to_file(ClipboardFormat.HTML, file)
+        assert (tmp_path / "out.html").read_bytes() == b"<b>wide</b>"
+    
+    def test_set_from_file_hands_file_to_owner(self, serve, tmp_path):
+        from zclipboard.backends.ownership import FileSlice
+        from zclipboard.data_types import ClipboardFormat
+        
+        backend = serve({})
+        path = tmp_path / "in.png"
+        path.write_bytes(b"\x89PNG data")
+        with open(path, "rb") as file, patch.object(backend.owners, "own") as own:
+            backend.set_from_file(ClipboardFormat.IMAGE, file)
+        (items,), _ = own.call_args
+        assert list(items) == ["image/png"]
+        assert isinstance(items["image/png"], FileSlice)
+        assert len(items["image/png"]) == len(b"\x89PNG data")
 
 
 @skip_unless_linux
@@ -0,0 +1,114 @@
+"""Tests for the in-memory reference backend."""
+
+import pytest
+
+from zclipboard import Clipboard, ClipboardFormat
+from zclipboard.backends import MemoryClipboardBackend
+
+
+class Provider:
+    """Callable returning fixed content and counting its calls."""
+    
+    def __init__(self, content):
+        self.calls = 0
+        self.content = content
+    
+    def __call__(self):
+        self.calls += 1
+        return self.content
+
+
+@pytest.fixture
+def backend():
+    return MemoryClipboardBackend()
+
+
+class TestMemoryBackend:
+    """Tests for eager content."""
+    
+    def test_text_round_trip(self, backend):
+        backend.set_text("hello")
+        assert backend.get_text() == "hello"
+        assert backend.get_available_formats() == [ClipboardFormat.PLAIN_TEXT]
+    
+    def test_html_with_fallback(self, backend):
+        backend.set_html("<b>x</b>", "x")
+        assert backend.get_html() == "<b>x</b>"
+        assert backend.get_text() == "x"
+    
+    def test_set_replaces_previous_content(self, backend):
+        backend.set_html("<b>x</b>", "x")
+        backend.set_image(b"png")
+        assert backend.get_available_formats() == [ClipboardFormat.IMAGE]
+    
+    def test_fingerprint_changes_on_every_write(self, backend):
+        tokens = [backend.fingerprint()]
+        backend.set_text("same")
+        tokens.append(backend.fingerprint())
+        backend.set_text("same")
+        tokens.append(backend.fingerprint())
+        backend.set_lazy({ClipboardFormat.HTML: lambda: "<b>x</b>"})
+        tokens.append(backend.fingerprint())
+        backend.get_html()
+        tokens.append(backend.fingerprint())
+        
+        assert len(set(tokens[:4])) == 4
+        assert tokens[4] == tokens[3]
+    
+    def test_clear(self, backend):
+        backend.set_rtf("{\\rtf1 x}")
+        backend.clear()
+        assert backend.get_available_formats() == []
+        assert backend.get_rtf() is None
+
+
+class TestMemoryBackendLazy:
+    """Tests for deferred content."""
+    
+    def test_provider_not_called_until_read(self, backend):
+        html = Provider("<b>report</b>")
+        backend.set_lazy({ClipboardFormat.HTML: html})
+        
+        assert backend.get_available_formats() == [ClipboardFormat.HTML]
+        assert html.calls == 0
+        assert backend.get_html() == "<b>report</b>"
+        assert html.calls == 1
+    
+    def test_result_memoized(self, backend):
+        text = Provider("plain")
+        backend.set_lazy({ClipboardFormat.PLAIN_TEXT: text})
+        
+        for _ in range(3):
+            assert backend.get_text() == "plain"
+        assert text.calls == 1
+    
+    def test_only_requested_format_rendered(self, backend):
+        html, image = Provider("<i>x</i>"), Provider(b"png")
+        backend.set_lazy({ClipboardFormat.HTML: html, ClipboardFormat.IMAGE: image})
+        
+        backend.get_html()
+        assert image.calls == 0
+    
+    def test_replaced_before_paste_never_rendered(self, backend):
+        image = Provider(b"png")
+        backend.set_lazy({ClipboardFormat.IMAGE: image})
+        backend.set_text("newer")
+        
+        assert backend.get_image() is None
+        assert image.calls == 0
+    
+    def test_none_result_not_memoized(self, backend):
+        text = Provider(None)
+        backend.set_lazy({ClipboardFormat.PLAIN_TEXT: text})
+        
+        assert backend.get_text() is None
+        assert backend.get_text() is None
+        assert text.calls == 2
+    
+    def test_through_clipboard(self, backend):
+        text = Provider("lazy")
+        clipboard = Clipboard(backend=backend)
+        clipboard.set_lazy({ClipboardFormat.PLAIN_TEXT: text})
+        
+        assert clipboard.get(ClipboardFormat.PLAIN_TEXT).data == "lazy"
+        assert text.calls == 1
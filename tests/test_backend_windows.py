@@ -1,11 +1,28 @@
 """Tests for Windows clipboard backend."""
 
 import sys
-from unittest.mock import MagicMock, patch
+import threading
+import time
 
 import pytest
 
 from tests.conftest import skip_unless_windows
+from zclipboard.backends.win32api import FakeWin32Api
+from zclipboard.backends.windows import CF_DIB, CF_UNICODETEXT, OPEN_ATTEMPTS, WindowsClipboardBackend
+from zclipboard.codecs import cfhtml
+from zclipboard.codecs.image import Bitmap, decode_dib, encode_bmp, encode_png
+from zclipboard.data_types import ClipboardFormat
+from zclipboard.exceptions import ClipboardAccessError, ClipboardPlatformError
+
+
+@pytest.fixture
+def fake_api():
+    return FakeWin32Api()
+
+
+@pytest.fixture
+def backend(fake_api):
+    return WindowsClipboardBackend(api=fake_api)
 
 
 class TestWindowsBackendImport:
@@ -13,55 +30,166 @@ class TestWindowsBackendImport:
     
     @skip_unless_windows
     def test_import_on_windows(self):
-        from zclipboard.backends.windows import WindowsClipboardBackend
         assert WindowsClipboardBackend is not None
     
     @pytest.mark.skipif(sys.platform == "win32", reason="Test for non-Windows platforms")
-    def test_import_fails_gracefully_on_non_windows(self):
-        # On non-Windows, ctypes.windll doesn't exist
-        with pytest.raises(AttributeError):
-            from zclipboard.backends.windows import WindowsClipboardBackend
+    def test_real_api_unavailable_on_non_windows(self):
+        with pytest.raises(ClipboardPlatformError):
+            WindowsClipboardBackend()
+    
+    def test_fake_api_works_anywhere(self, fake_api):
+        backend = WindowsClipboardBackend(api=fake_api)
+        backend.set_text("hello")
+        
+        assert backend.get_text() == "hello"
+        assert not fake_api.is_open
 
 
-class TestWindowsBackendHtmlFormat:
-    """Tests for Windows HTML clipboard format handling."""
+class TestWindowsBackendSession:
+    """Tests for opening the clipboard once per session, with the fake Win32 API."""
     
-    @skip_unless_windows
-    def test_create_html_format(self):
-        from zclipboard.backends.windows import WindowsClipboardBackend
+    def test_each_call_opens_without_session(self, backend, fake_api):
+        backend.set_html("<b>x</b>")
+        fake_api.calls.clear()
         
-        backend = WindowsClipboardBackend()
-        html = "<b>test</b>"
-        result = backend._create_html_format(html)
-        
-        assert "Version:0.9" in result
-        assert "StartHTML:" in result
-        assert "EndHTML:" in result
-        assert "StartFragment:" in result
-        assert "EndFragment:" in result
-        assert "<!--StartFragment-->" in result
-        assert "<!--EndFragment-->" in result
-        assert html in result
+        backend.get_available_formats()
+        backend.get_html()
+        
+        assert fake_api.calls["open_clipboard"] == 2
     
-    @skip_unless_windows
-    def test_parse_html_format(self):
-        from zclipboard.backends.windows import WindowsClipboardBackend
+    def test_session_opens_once(self, backend, fake_api):
+        backend.set_html("<b>x</b>", plain_text_fallback="x")
+        fake_api.calls.clear()
         
-        backend = WindowsClipboardBackend()
-        html_format = "Header<!--StartFragment--><b>test</b><!--EndFragment-->Footer"
-        result = backend._parse_html_format(html_format)
+        with backend.session():
+            assert backend.get_available_formats() == [ClipboardFormat.HTML, ClipboardFormat.PLAIN_TEXT]
+            assert backend.get_html() == "<b>x</b>"
+            assert backend.get_text() == "x"
+            assert fake_api.is_open
         
-        assert result == "<b>test</b>"
+        assert fake_api.calls["open_clipboard"] == 1
+        assert fake_api.calls["close_clipboard"] == 1
+        assert not fake_api.is_open
     
-    @skip_unless_windows
-    def test_parse_html_format_without_markers(self):
-        from zclipboard.backends.windows import WindowsClipboardBackend
+    def test_sessions_nest(self, backend, fake_api):
+        with backend.session():
+            with backend.session():
+                backend.set_text("a")
+            assert fake_api.is_open
+            assert backend.get_text() == "a"
         
-        backend = WindowsClipboardBackend()
-        html = "<b>test</b>"
-        result = backend._parse_html_format(html)
+        assert fake_api.calls["open_clipboard"] == 1
+        assert not fake_api.is_open
+    
+    def test_session_closes_on_error(self, backend, fake_api):
+        with pytest.raises(RuntimeError):
+            with backend.session():
+                raise RuntimeError
+        
+        assert not fake_api.is_open
+    
+    def test_other_threads_wait_for_session(self, backend, fake_api):
+        backend.set_text("before")
+        results = []
+        
+        with backend.session():
+            reader = threading.Thread(target=lambda: results.append(backend.get_text()))
+            reader.start()
+            time.sleep(0.05)
+            assert results == []
+            backend.set_text("after")
+        reader.join(5)
+        
+        assert results == ["after"]
+        assert fake_api.calls["open_clipboard"] == 3
+    
+    def test_busy_clipboard_is_retried(self, backend, fake_api):
+        fake_api.busy_opens = 2
+        
+        backend.set_text("x")
+        
+        assert fake_api.calls["open_clipboard"] == 3
+    
+    def test_busy_clipboard_raises_after_all_attempts(self, backend, fake_api):
+        fake_api.busy_opens = OPEN_ATTEMPTS
+        
+        with pytest.raises(ClipboardAccessError):
+            backend.get_text()
+        
+        assert fake_api.calls["open_clipboard"] == OPEN_ATTEMPTS
+        assert fake_api.calls["close_clipboard"] == 0
+    
+    def test_snapshot_reads_in_one_session(self, backend, fake_api):
+        from zclipboard import Clipboard
+        
+        backend.set_rtf("{\\rtf1 x}", plain_text_fallback="x")
+        fake_api.calls.clear()
+        
+        contents = Clipboard(backend=backend).get_many([ClipboardFormat.RTF, ClipboardFormat.PLAIN_TEXT])
+        
+        assert contents == {ClipboardFormat.RTF: "{\\rtf1 x}", ClipboardFormat.PLAIN_TEXT: "x"}
+        assert fake_api.calls["open_clipboard"] == 1
+
+
+class TestWindowsBackendFormats:
+    """Tests for the formats the backend writes and reads, with the fake Win32 API."""
+    
+    def test_html_is_written_as_cf_html(self, backend, fake_api):
+        backend.set_html("<p>naïve</p>", plain_text_fallback="naïve")
+        
+        payload = fake_api.formats[fake_api.register_clipboard_format("HTML Format")]
+        assert payload.endswith(b"\x00")
+        assert str(cfhtml.decode(payload).fragment, "utf-8") == "<p>naïve</p>"
+        assert fake_api.formats[CF_UNICODETEXT] == "naïve\x00".encode("utf-16-le")
+        assert backend.get_html() == "<p>naïve</p>"
+    
+    def test_html_from_other_programs(self, backend, fake_api):
+        fake_api.open_clipboard()
+        fake_api.set_clipboard_data(fake_api.register_clipboard_format("HTML Format"), [b"<i>plain</i>\x00"])
+        fake_api.close_clipboard()
+        
+        assert backend.get_html() == "<i>plain</i>"
+    
+    def test_image_round_trips_through_cf_dib(self, backend, fake_api):
+        bitmap = Bitmap(2, 2, "RGB", bytes(range(12)))
+        
+        backend.set_image(encode_bmp(bitmap))
+        
+        assert decode_dib(fake_api.formats[CF_DIB]).pixels == bitmap.pixels
+        del fake_api.formats[fake_api.register_clipboard_format("PNG")]
+        image = backend.get_image_object()
+        assert image.mime_type == "image/bmp"
+        assert image.data[14:] == fake_api.formats[CF_DIB]
+    
+    def test_png_is_also_offered_as_cf_dib(self, backend, fake_api):
+        bitmap = Bitmap(3, 1, "RGBA", bytes(range(12)))
+        png = encode_png(bitmap)
+        
+        backend.set_image(png)
+        
+        assert backend.get_image() == png
+        assert decode_dib(fake_api.formats[CF_DIB]).pixels == bitmap.convert("RGB").pixels
+        assert backend.get_info(ClipboardFormat.IMAGE).size == len(png)
+    
+    def test_clear(self, backend, fake_api):
+        backend.set_text("x")
+        sequence_number = backend.fingerprint()
+        
+        backend.clear()
+        
+        assert backend.get_available_formats() == []
+        assert backend.fingerprint() != sequence_number
+
+    
+    def test_set_lazy_keeps_every_format(self, backend, fake_api):
+        png = encode_png(Bitmap(1, 1, "RGB", b"\x01\x02\x03"))
+        
+        backend.set_lazy({ClipboardFormat.IMAGE: lambda: png, ClipboardFormat.PLAIN_TEXT: lambda: "caption"})
+        assert (backend.get_image(), backend.get_text()) == (png, "caption")
         
-        assert result == html
+        backend.set_lazy({ClipboardFormat.HTML: lambda: "<b>x</b>", ClipboardFormat.RTF: lambda: r"{\rtf1 x}"})
+        assert (backend.get_html(), backend.get_rtf()) == ("<b>x</b>", r"{\rtf1 x}")
+        assert fake_api.calls["empty_clipboard"] == 2
 
 
 @skip_unless_windows
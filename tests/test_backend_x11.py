@@ -0,0 +1,232 @@
+"""Tests for the in-process X11 clipboard backend."""
+
+import struct
+
+import pytest
+
+from zclipboard import Clipboard, ClipboardFormat
+from zclipboard.backends.linux import LinuxClipboardBackend
+from zclipboard.backends.xproto import parse_display, read_xauthority
+from zclipboard.exceptions import ClipboardAccessError
+
+
+def _xauth_entry(family: int, address: bytes, number: bytes, name: bytes, data: bytes) -> bytes:
+    entry = struct.pack(">H", family)
+    for field in (address, number, name, data):
+        entry += struct.pack(">H", len(field)) + field
+    return entry
+
+
+class TestDisplayParsing:
+    """Tests for DISPLAY string parsing."""
+    
+    def test_local_display(self):
+        assert parse_display(":0") == ("", 0)
+        assert parse_display(":1.0") == ("", 1)
+        assert parse_display("unix:2") == ("", 2)
+    
+    def test_remote_display(self):
+        assert parse_display("localhost:10.0") == ("localhost", 10)
+    
+    def test_socket_path_display(self):
+        assert parse_display("/tmp/launch-abc/org.xquartz:0") == ("/tmp/launch-abc/org.xquartz", 0)
+    
+    def test_invalid_display(self):
+        with pytest.raises(ClipboardAccessError):
+            parse_display("nonsense")
+
+
+class TestXauthority:
+    """Tests for Xauthority cookie lookup."""
+    
+    def test_matches_local_entry(self, tmp_path):
+        path = tmp_path / "Xauthority"
+        path.write_bytes(
+            _xauth_entry(256, b"otherhost", b"0", b"MIT-MAGIC-COOKIE-1", b"wrong")
+            + _xauth_entry(256, b"myhost", b"1", b"MIT-MAGIC-COOKIE-1", b"secret")
+        )
+        assert read_xauthority(1, str(path), "myhost") == (b"MIT-MAGIC-COOKIE-1", b"secret")
+    
+    def test_matches_wildcard_entry(self, tmp_path):
+        path = tmp_path / "Xauthority"
+        path.write_bytes(_xauth_entry(65535, b"", b"0", b"MIT-MAGIC-COOKIE-1", b"wild"))
+        assert read_xauthority(0, str(path), "anyhost") == (b"MIT-MAGIC-COOKIE-1", b"wild")
+    
+    def test_missing_file(self, tmp_path):
+        assert read_xauthority(0, str(tmp_path / "missing"), "myhost") == (b"", b"")
+
+
+class TestX11Backend:
+    """Tests for X11ClipboardBackend against a fake X server."""
+    
+    @pytest.fixture
+    def x11_backends(self, fake_x_server):
+        from zclipboard.backends.x11 import X11ClipboardBackend
+        
+        writer = X11ClipboardBackend(display=fake_x_server.display)
+        reader = X11ClipboardBackend(display=fake_x_server.display)
+        yield writer, reader
+        writer.close()
+        reader.close()
+    
+    def test_is_linux_backend(self, x11_backends):
+        assert isinstance(x11_backends[0], LinuxClipboardBackend)
+    
+    def test_requires_display(self, monkeypatch):
+        from zclipboard.backends.x11 import X11ClipboardBackend
+        
+        monkeypatch.delenv("DISPLAY", raising=False)
+        with pytest.raises(ClipboardAccessError):
+            X11ClipboardBackend()
+    
+    def test_text_between_clients(self, x11_backends):
+        writer, reader = x11_backends
+        writer.set_text("Hello 世界 🌍")
+        assert reader.get_text() == "Hello 世界 🌍"
+    
+    def test_available_formats(self, x11_backends):
+        writer, reader = x11_backends
+        writer.set_html("<b>bold</b>")
+        assert reader.get_available_formats() == [ClipboardFormat.HTML]
+        assert reader.get_html() == "<b>bold</b>"
+    
+    def test_owner_reads_its_own_data(self, x11_backends):
+        writer, _ = x11_backends
+        writer.set_text("mine")
+        assert writer.get_text() == "mine"
+        assert writer.get_available_formats() == [ClipboardFormat.PLAIN_TEXT]
+    
+    def test_ownership_moves_to_last_writer(self, x11_backends, fake_x_server):
+        writer, reader = x11_backends
+        writer.set_text("first")
+        reader.set_text("second")
+        assert writer.get_text() == "second"
+        assert not writer._owner.owns
+    
+    def test_large_payload_uses_incremental_transfer(self, x11_backends):
+        writer, reader = x11_backends
+        payload = bytes(range(256)) * 4096
+        writer.set_image(payload)
+        assert reader.get_image() == payload
+    
+    def test_read_into_streams_incremental_chunks(self, x11_backends):
+        writer, reader = x11_backends
+        payload = bytes(range(256)) * 4096
+        writer.set_image(payload)
+        chunks = []
+        assert reader.read_into(ClipboardFormat.IMAGE, chunks.append)
+        assert len(chunks) > 1
+        assert b"".join(chunks) == payload
+    
+    def test_open_stream(self, x11_backends):
+        writer, reader = x11_backends
+        writer.set_text("streamed")
+        with reader.open_stream(ClipboardFormat.PLAIN_TEXT) as stream:
+            assert stream.read() == b"streamed"
+        assert reader.open_stream(ClipboardFormat.IMAGE) is None
+    
+    def test_files_between_clients(self, x11_backends, tmp_path):
+        writer, reader = x11_backends
+        payload = bytes(range(256)) * 4096
+        (tmp_path / "in.png").write_bytes(payload)
+        with open(tmp_path / "in.png", "rb") as file:
+            writer.set_from_file(ClipboardFormat.IMAGE, file)
+        with open(tmp_path / "out.png", "wb") as file:
+            assert reader.read_to_file(ClipboardFormat.IMAGE, file)
+        assert (tmp_path / "out.png").read_bytes() == payload
+    
+    def test_clear(self, x11_backends):
+        writer, reader = x11_backends
+        writer.set_text("gone soon")
+        reader.clear()
+        assert writer.get_text() is None
+        assert reader.get_available_formats() == []
+    
+    def test_no_subprocess_on_hot_path(self, x11_backends, monkeypatch):
+        import subprocess
+        
+        def fail(*args, **kwargs):
+            raise AssertionError("subprocess used")
+        
+        monkeypatch.setattr(subprocess, "run", fail)
+        monkeypatch.setattr(subprocess, "Popen", fail)
+        writer, reader = x11_backends
+        clipboard = Clipboard(backend=reader)
+        writer.set_text("fast")
+        assert clipboard.get().data == "fast"
+    
+    def test_targets_cached_per_owner(self, x11_backends, fake_x_server):
+        writer, reader = x11_backends
+        writer.set_text("cached")
+        reader.get_text()
+        reader.get_text()
+        # One TARGETS conversion for the owner, then one fetch per read.
+        assert fake_x_server.request_counts[24] == 3
+    
+    
+    def test_reacquired_ownership_invalidates_targets(self, x11_backends):
+        writer, reader = x11_backends
+        writer.set_text("text first")
+        assert reader.get_available_formats() == [ClipboardFormat.PLAIN_TEXT]
+        
+        # Same owner window, new contents: must not be served from the cache.
+        writer.set_html("<i>x</i>")
+        assert reader.get_available_formats() == [ClipboardFormat.HTML]
+        assert reader.get_text() is None
+        assert reader.get_html() == "<i>x</i>"
+    
+    def test_fingerprint_tracks_ownership_without_payloads(self, x11_backends, fake_x_server):
+        writer, reader = x11_backends
+        assert reader.fingerprint() == writer.fingerprint()
+        
+        writer.set_image(bytes(1 << 20))
+        first = reader.fingerprint()
+        conversions = fake_x_server.request_counts[24]
+        assert reader.fingerprint() == first
+        assert fake_x_server.request_counts[24] == conversions + 1
+        assert writer.fingerprint() == first
+        
+        writer.set_image(bytes(1 << 20))
+        assert reader.fingerprint() != first
+    
+    def test_lazy_content_rendered_on_paste(self, x11_backends):
+        writer, reader = x11_backends
+        calls = []
+        
+        def render_html():
+            calls.append("html")
+            return "<b>report</b>"
+        
+        writer.set_lazy({ClipboardFormat.HTML: render_html, ClipboardFormat.IMAGE: lambda: calls.append("png")})
+        assert reader.get_available_formats() == [ClipboardFormat.HTML, ClipboardFormat.IMAGE]
+        assert calls == []
+        
+        assert reader.get_html() == "<b>report</b>"
+        assert reader.get_html() == "<b>report</b>"
+        assert calls == ["html"]
+    
+    def test_lazy_content_dropped_with_ownership(self, x11_backends):
+        writer, reader = x11_backends
+        calls = []
+        writer.set_lazy({ClipboardFormat.PLAIN_TEXT: lambda: calls.append("text") or "lazy"})
+        reader.set_text("taken")
+        
+        assert writer.get_text() == "taken"
+        assert calls == []
+    
+    def test_without_xfixes(self, tmp_path):
+        from tests.fake_xserver import FakeXServer
+        from zclipboard.backends.x11 import X11ClipboardBackend
+        
+        server = FakeXServer(str(tmp_path / "X1"), xfixes=False)
+        writer = X11ClipboardBackend(display=server.display)
+        reader = X11ClipboardBackend(display=server.display)
+        try:
+            writer.set_text("plain")
+            assert reader.get_text() == "plain"
+            reader.set_text("swap")
+            assert writer.get_text() == "swap"
+        finally:
+            writer.close()
+            reader.close()
+            server.close()
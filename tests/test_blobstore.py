@@ -0,0 +1,151 @@
+"""Tests for the on-disk blob store and spilling reads."""
+
+import os
+
+import pytest
+
+from zclipboard import Clipboard, ClipboardFormat
+from zclipboard.backends import MemoryClipboardBackend
+from zclipboard.blobstore import BlobStore, Spool
+
+
+@pytest.fixture
+def store(tmp_path):
+    return BlobStore(str(tmp_path / "blobs"))
+
+
+@pytest.fixture
+def windows_files(monkeypatch):
+    """Make os.replace and os.unlink refuse paths in mapped, as Windows does for mapped files."""
+    mapped = set()
+    replace, unlink = os.replace, os.unlink
+    
+    def refuse_mapped(func):
+        def wrapper(*paths):
+            if paths[-1] in mapped:
+                raise PermissionError(13, "The process cannot access the file", paths[-1])
+            return func(*paths)
+        return wrapper
+    
+    monkeypatch.setattr(os, "replace", refuse_mapped(replace))
+    monkeypatch.setattr(os, "unlink", refuse_mapped(unlink))
+    return mapped
+
+
+class TestBlobStore:
+    """Tests for BlobStore."""
+    
+    def test_content_addressed(self, store):
+        first = store.put(b"payload")
+        second = store.put(b"payload")
+        assert first.digest == second.digest
+        assert os.listdir(store.directory) == [first.digest]
+        assert bytes(store.open(first.digest).view) == b"payload"
+    
+    def test_view_is_read_only(self, store):
+        view = store.put(b"payload").view
+        with pytest.raises(TypeError):
+            view[0] = 0
+    
+    def test_removed_blob_stays_mapped(self, store):
+        blob = store.put(b"still here")
+        store.remove(blob.digest)
+        assert store.open(blob.digest) is None
+        assert bytes(blob.view) == b"still here"
+    
+    def test_commit_reuses_mapped_payload(self, store, windows_files):
+        first = store.put(b"payload")
+        windows_files.add(first.path)
+        
+        second = store.put(b"payload")
+        
+        assert second.path == first.path
+        assert os.listdir(store.directory) == [first.digest]
+        assert bytes(second.view) == b"payload"
+    
+    def test_remove_of_mapped_payload_is_deferred(self, store, windows_files):
+        blob = store.put(b"still here")
+        windows_files.add(blob.path)
+        
+        store.remove(blob.digest)
+        
+        assert store.open(blob.digest) is None
+        assert os.path.exists(blob.path)
+        assert bytes(blob.view) == b"still here"
+        windows_files.clear()
+        assert store.open(blob.digest) is None
+        assert not os.path.exists(blob.path)
+    
+    def test_put_after_deferred_remove(self, store, windows_files):
+        blob = store.put(b"again")
+        windows_files.add(blob.path)
+        store.remove(blob.digest)
+        
+        assert bytes(store.put(b"again").view) == b"again"
+        assert bytes(store.open(blob.digest).view) == b"again"
+    
+    def test_aborted_writer_leaves_nothing(self, store):
+        with store.writer() as writer:
+            writer.write(b"partial")
+        assert os.listdir(store.directory) == []
+    
+    def test_empty_blob(self, store):
+        assert bytes(store.put(b"").view) == b""
+    
+    def test_temporary_directory_removed_on_close(self):
+        store = BlobStore()
+        directory = store.directory
+        store.put(b"x")
+        store.close()
+        assert not os.path.exists(directory)
+
+
+class TestSpool:
+    """Tests for Spool."""
+    
+    def test_small_payload_stays_in_memory(self, store):
+        spool = Spool(store, threshold=10)
+        spool.write(b"12345")
+        spool.write(b"67890")
+        assert spool.finish() == b"1234567890"
+        assert os.listdir(store.directory) == []
+    
+    def test_large_payload_spills(self, store):
+        spool = Spool(store, threshold=10)
+        spool.write(b"12345")
+        spool.write(b"678901")
+        assert spool.spilled
+        spool.write(b"more")
+        blob = spool.finish()
+        assert bytes(blob.view) == b"12345678901more"
+        assert os.listdir(store.directory) == [blob.digest]
+
+
+class TestClipboardSpill:
+    """Tests for Clipboard.get() with a spill threshold."""
+    
+    @pytest.fixture
+    def clipboard(self, store):
+        return Clipboard(MemoryClipboardBackend(), spill_threshold=64, blob_store=store)
+    
+    def test_small_payloads_unchanged(self, clipboard):
+        clipboard.set_html("<b>x</b>", "x")
+        assert clipboard.get().data == "<b>x</b>"
+        assert clipboard.get(ClipboardFormat.PLAIN_TEXT).data == "x"
+        assert clipboard.get(ClipboardFormat.IMAGE) is None
+    
+    def test_large_image_is_mapped(self, clipboard, store):
+        payload = bytes(range(256)) * 4
+        clipboard.set_image(payload)
+        data = clipboard.get(ClipboardFormat.IMAGE)
+        assert isinstance(data.data, memoryview)
+        assert data.data.readonly
+        assert data.data == payload
+        assert len(os.listdir(store.directory)) == 1
+    
+    def test_large_text_is_utf8_view(self, clipboard):
+        text = "世界 " * 100
+        clipboard.set_text(text)
+        data = clipboard.get(ClipboardFormat.PLAIN_TEXT)
+        assert isinstance(data.data, memoryview)
+        assert bytes(data.data).decode("utf-8") == text
@@ -0,0 +1,190 @@
+"""Tests for CachedClipboard."""
+
+import sys
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+
+from zclipboard import ClipboardFormat
+from zclipboard.backends import MemoryClipboardBackend
+from zclipboard.cache import CachedClipboard
+from zclipboard.exceptions import ClipboardTimeoutError
+from zclipboard.watch import PollingChangeSource
+
+
+@pytest.fixture
+def backend():
+    return MemoryClipboardBackend()
+
+
+@pytest.fixture
+def clipboard(backend):
+    return CachedClipboard(backend=backend)
+
+
+def wait_until(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return predicate()
+
+
+class TestCachedReads:
+    """Tests for read-through caching."""
+    
+    def test_repeated_reads_hit_cache(self, clipboard, backend):
+        backend.set_text("cached")
+        assert clipboard.get_text() == "cached"
+        with patch.object(backend, "get_text", side_effect=AssertionError("backend read")):
+            assert clipboard.get_text() == "cached"
+        assert (clipboard.hits, clipboard.misses) == (1, 1)
+    
+    def test_bounded_reads(self, clipboard, backend):
+        backend.set_text("abcdef")
+        assert clipboard.get_text(max_chars=3) == "abc"
+        assert clipboard.get_text() == "abcdef"
+        with patch.object(backend, "open_stream", side_effect=AssertionError("backend read")):
+            assert clipboard.get_text(max_chars=2) == "ab"
+    
+    def test_format_queries_hit_cache(self, clipboard, backend):
+        backend.set_html("<b>x</b>", "x")
+        assert clipboard.get_available_formats() == [ClipboardFormat.HTML, ClipboardFormat.PLAIN_TEXT]
+        with patch.object(backend, "get_available_formats", side_effect=AssertionError("backend read")):
+            assert clipboard.has_format(ClipboardFormat.HTML)
+            assert not clipboard.is_empty()
+            assert clipboard.get().format_type == ClipboardFormat.HTML
+    
+    def test_missing_format_answered_from_format_list(self, clipboard, backend):
+        backend.set_text("only text")
+        clipboard.get_available_formats()
+        with patch.object(backend, "get_image", side_effect=AssertionError("backend read")):
+            assert clipboard.get_image() is None
+    
+    def test_external_change_invalidates(self, clipboard, backend):
+        backend.set_text("before")
+        assert clipboard.get_text() == "before"
+        backend.set_text("after")
+        assert clipboard.get_text() == "after"
+        assert clipboard.misses == 2
+    
+    def test_writes_invalidate(self, clipboard):
+        clipboard.set_text("first")
+        assert clipboard.get_text() == "first"
+        clipboard.set_html("<i>second</i>", "second")
+        assert clipboard.get_text() == "second"
+        assert clipboard.get_html() == "<i>second</i>"
+        clipboard.clear()
+        assert clipboard.is_empty()
+        assert clipboard.cached_bytes == 0
+    
+    def test_lru_eviction_within_budget(self, backend):
+        text = "t" * 1000
+        html = "<p>" + "h" * 1000 + "</p>"
+        clipboard = CachedClipboard(backend=backend, max_bytes=sys.getsizeof(html) + 100)
+        backend.set_html(html, text)
+        clipboard.get_text()
+        clipboard.get_html()
+        assert clipboard.cached_bytes <= clipboard.max_bytes
+        
+        clipboard.get_html()
+        assert clipboard.hits == 1
+        clipboard.get_text()
+        assert clipboard.misses == 3
+    
+    def test_oversize_payload_not_cached(self, backend):
+        clipboard = CachedClipboard(backend=backend, max_bytes=64)
+        backend.set_image(b"x" * 1000)
+        assert clipboard.get_image() == b"x" * 1000
+        assert clipboard.cached_bytes == 0
+    
+    def test_stale_fetch_not_stored(self, clipboard, backend):
+        backend.set_text("old")
+        real_get_text = backend.get_text
+        
+        def racing_get_text():
+            value = real_get_text()
+            clipboard.invalidate()
+            return value
+        
+        with patch.object(backend, "get_text", side_effect=racing_get_text):
+            assert clipboard.get_text() == "old"
+        assert clipboard.cached_bytes == 0
+
+
+class TestRefresher:
+    """Tests for the background refresher."""
+    
+    def test_warms_and_follows_changes(self, clipboard, backend):
+        backend.set_text("initial")
+        source = PollingChangeSource(clipboard.backend, min_interval=0.01, max_interval=0.05)
+        clipboard.start_refresher(source=source, debounce=0.01)
+        try:
+            assert clipboard.refreshing
+            misses = clipboard.misses
+            assert clipboard.get_text() == "initial"
+            assert clipboard.misses == misses
+            
+            backend.set_text("updated")
+            assert wait_until(lambda: clipboard.get_text() == "updated")
+            misses = clipboard.misses
+            assert clipboard.get_text() == "updated"
+            assert clipboard.misses == misses
+        finally:
+            clipboard.stop_refresher()
+        assert not clipboard.refreshing
+        assert source.closed
+    
+    def test_double_start_rejected(self, clipboard):
+        source = PollingChangeSource(clipboard.backend, min_interval=0.01, max_interval=0.05)
+        clipboard.start_refresher(source=source)
+        try:
+            with pytest.raises(RuntimeError):
+                clipboard.start_refresher(source=source)
+        finally:
+            clipboard.stop_refresher()
+    
+    def test_failed_warm_read_keeps_refreshing(self, clipboard, backend):
+        backend.set_text("one")
+        get_text = backend.get_text
+        calls = []
+        
+        def flaky_get_text(*args):
+            calls.append(args)
+            if len(calls) == 3:
+                raise ClipboardTimeoutError("xclip timed out")
+            return get_text(*args)
+        
+        source = PollingChangeSource(clipboard.backend, min_interval=0.01, max_interval=0.05)
+        with patch.object(backend, "get_text", side_effect=flaky_get_text):
+            clipboard.start_refresher(source=source, debounce=0.01)
+            try:
+                backend.set_text("two")
+                assert wait_until(lambda: clipboard.get_text() == "two")
+                backend.set_text("three")
+                assert wait_until(lambda: len(calls) >= 3)
+                assert clipboard.get_text() == "three"
+                
+                backend.set_html("<b>four</b>", plain_text_fallback="four")
+                assert wait_until(lambda: clipboard.get_text() == "four")
+                assert clipboard.refreshing
+                assert set(clipboard.get_available_formats()) == {ClipboardFormat.HTML, ClipboardFormat.PLAIN_TEXT}
+            finally:
+                clipboard.stop_refresher()
+    
+    @pytest.mark.filterwarnings("ignore::pytest.PytestUnhandledThreadExceptionWarning")
+    def test_refresher_error_falls_back_to_validation(self, clipboard, backend):
+        backend.set_text("one")
+        source = PollingChangeSource(clipboard.backend, min_interval=0.01, max_interval=0.05)
+        clipboard.start_refresher(source=source, debounce=0.01)
+        with patch.object(clipboard, "_warm", side_effect=RuntimeError("bug")):
+            backend.set_text("two")
+            assert wait_until(lambda: not clipboard.refreshing)
+            assert wait_until(lambda: "zclipboard-watch" not in [t.name for t in threading.enumerate()])
+        
+        assert source.closed
+        backend.set_text("three")
+        assert clipboard.get_text() == "three"
@@ -1,5 +1,8 @@
 """Tests for main Clipboard class."""
 
+import io
+from unittest.mock import patch
+
 import pytest
 
 from zclipboard import Clipboard, ClipboardFormat
@@ -91,6 +94,26 @@ class TestClipboardImageOperations:
     def test_get_image_returns_none_when_empty(self, clipboard_with_mock):
         clipboard_with_mock.clear()
         assert clipboard_with_mock.get_image() is None
+    
+    def test_get_image_object(self, clipboard_with_mock, sample_png_bytes):
+        assert clipboard_with_mock.get_image_object() is None
+        clipboard_with_mock.set_image(sample_png_bytes)
+        image = clipboard_with_mock.get_image_object()
+        assert image.mime_type == "image/png"
+        assert image.to_png() == sample_png_bytes
+    
+    def test_get_image_thumbnail(self, clipboard_with_mock):
+        assert clipboard_with_mock.get_image_thumbnail() is None
+        clipboard_with_mock.set_image(b"\x89PNG thumbnail")
+        with patch("zclipboard.image.thumbnail", return_value=b"small") as make:
+            assert clipboard_with_mock.get_image_thumbnail(128) == b"small"
+        make.assert_called_once_with(b"\x89PNG thumbnail", 128, "PNG")
+    
+    def test_image_array_round_trip(self, clipboard_with_mock):
+        numpy = pytest.importorskip("numpy")
+        assert clipboard_with_mock.get_image_array() is None
+        clipboard_with_mock.set_image_array(numpy.zeros((2, 2, 3), numpy.uint8))
+        assert clipboard_with_mock.get_image().startswith(b"\x89PNG")
 
 
 class TestClipboardClear:
@@ -184,3 +207,126 @@ class TestClipboardDataOperations:
         clipboard_with_mock.clear()
         result = clipboard_with_mock.get()
         assert result is None
+
+
+class TestClipboardFingerprint:
+    """Tests for Clipboard.fingerprint()."""
+    
+    def test_delegates_to_backend(self, clipboard_with_mock, mock_backend):
+        with patch.object(mock_backend, "fingerprint", return_value="token") as fingerprint:
+            assert clipboard_with_mock.fingerprint() == "token"
+        fingerprint.assert_called_once_with()
+    
+    def test_changes_with_contents(self, clipboard_with_mock):
+        clipboard_with_mock.set_text("a")
+        before = clipboard_with_mock.fingerprint()
+        clipboard_with_mock.set_text("b")
+        assert clipboard_with_mock.fingerprint() != before
+
+
+class TestClipboardLazy:
+    """Tests for deferred content through Clipboard."""
+    
+    def test_eager_fallback_for_backend_without_deferral(self, clipboard_with_mock, sample_html):
+        clipboard_with_mock.set_lazy({
+            ClipboardFormat.HTML: lambda: sample_html,
+            ClipboardFormat.PLAIN_TEXT: lambda: "fallback",
+        })
+        assert clipboard_with_mock.get_html() == sample_html
+        assert clipboard_with_mock.get_text() == "fallback"
+    
+    def test_empty_providers_rejected(self, clipboard_with_mock):
+        with pytest.raises(ClipboardFormatError):
+            clipboard_with_mock.set_lazy({})
+    
+    def test_non_callable_provider_rejected(self, clipboard_with_mock):
+        with pytest.raises(ClipboardFormatError):
+            clipboard_with_mock.set_lazy({ClipboardFormat.PLAIN_TEXT: "text"})
+    
+    def test_unknown_format_rejected(self, clipboard_with_mock):
+        with pytest.raises(ClipboardFormatError):
+            clipboard_with_mock.set_lazy({"html": lambda: "x"})
+
+
+class TestClipboardFiles:
+    """Tests for copying clipboard content to and from files."""
+    
+    def test_image_round_trip_through_paths(self, clipboard_with_mock, sample_png_bytes, tmp_path):
+        source = tmp_path / "in.png"
+        source.write_bytes(sample_png_bytes)
+        clipboard_with_mock.set_image_from_file(source)
+        assert clipboard_with_mock.get_image() == sample_png_bytes
+        
+        destination = tmp_path / "out.png"
+        assert clipboard_with_mock.get_image_to_file(str(destination))
+        assert destination.read_bytes() == sample_png_bytes
+    
+    def test_text_through_file_objects(self, clipboard_with_mock):
+        source = io.BytesIO("skip|Hello 世界".encode("utf-8"))
+        source.seek(5)
+        clipboard_with_mock.set_text_from_file(source)
+        assert clipboard_with_mock.get_text() == "Hello 世界"
+        
+        destination = io.BytesIO()
+        assert clipboard_with_mock.get_text_to_file(destination)
+        assert destination.getvalue() == "Hello 世界".encode("utf-8")
+    
+    def test_missing_format_leaves_destination(self, clipboard_with_mock, tmp_path):
+        clipboard_with_mock.set_text("text")
+        destination = tmp_path / "out.png"
+        destination.write_bytes(b"previous")
+        assert not clipboard_with_mock.get_image_to_file(destination)
+        assert destination.read_bytes() == b"previous"
+        assert not clipboard_with_mock.get_image_to_file(tmp_path / "new.png")
+        assert not (tmp_path / "new.png").exists()
+    
+    def test_html_from_file(self, clipboard_with_mock, sample_html, tmp_path):
+        source = tmp_path / "page.html"
+        source.write_text(sample_html, encoding="utf-8")
+        clipboard_with_mock.set_from_file(ClipboardFormat.HTML, source)
+        assert clipboard_with_mock.get_html() == sample_html
+    
+    def test_unknown_format_rejected(self, clipboard_with_mock, tmp_path):
+        with pytest.raises(ClipboardFormatError):
+            clipboard_with_mock.get_to_file("png", tmp_path / "out.png")
+        with pytest.raises(ClipboardFormatError):
+            clipboard_with_mock.set_from_file("png", io.BytesIO(b""))
+
+
+class TestClipboardStreams:
+    """Tests for Clipboard.open() and bounded reads."""
+    
+    def test_open_binary(self, clipboard_with_mock, sample_png_bytes):
+        clipboard_with_mock.set_image(sample_png_bytes)
+        with clipboard_with_mock.open(ClipboardFormat.IMAGE) as stream:
+            assert stream.read(8) == sample_png_bytes[:8]
+            assert stream.read() == sample_png_bytes[8:]
+    
+    def test_open_text_keeps_line_endings(self, clipboard_with_mock):
+        clipboard_with_mock.set_text("line 1\r\nsmile 😀")
+        with clipboard_with_mock.open(ClipboardFormat.PLAIN_TEXT, "r") as stream:
+            assert stream.read(8) == "line 1\r\n"
+            assert stream.read() == "smile 😀"
+    
+    def test_open_missing_format(self, clipboard_with_mock):
+        assert clipboard_with_mock.open(ClipboardFormat.HTML) is None
+    
+    def test_open_rejects_bad_arguments(self, clipboard_with_mock):
+        with pytest.raises(ValueError):
+            clipboard_with_mock.open(ClipboardFormat.PLAIN_TEXT, "w")
+        with pytest.raises(ClipboardFormatError):
+            clipboard_with_mock.open(ClipboardFormat.IMAGE, "r")
+        with pytest.raises(ClipboardFormatError):
+            clipboard_with_mock.open("text")
+    
+    def test_bounded_getters(self, clipboard_with_mock, sample_png_bytes, sample_html):
+        clipboard_with_mock.set_text("ünïcode text")
+        assert clipboard_with_mock.get_text(max_chars=7) == "ünïcode"
+        assert clipboard_with_mock.get_text(max_chars=100) == "ünïcode text"
+        assert clipboard_with_mock.get_html(max_chars=5) is None
+        clipboard_with_mock.set_html(sample_html)
+        assert clipboard_with_mock.get_html(max_chars=5) == sample_html[:5]
+        clipboard_with_mock.set_image(sample_png_bytes)
+        assert clipboard_with_mock.get_image(max_bytes=8) == sample_png_bytes[:8]
+        with pytest.raises(ValueError):
+            clipboard_with_mock.get_image(max_bytes=-1)
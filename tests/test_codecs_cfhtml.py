@@ -0,0 +1,120 @@
+"""Tests for the CF_HTML codec."""
+
+import pytest
+
+from zclipboard.codecs.cfhtml import HEADER_LIMIT, decode, encode, encode_parts
+
+
+def header_field(payload, name):
+    for line in payload.split(b"\r\n"):
+        if line.startswith(name.encode() + b":"):
+            return line.split(b":", 1)[1]
+    return None
+
+
+class TestEncode:
+    """Tests for writing CF_HTML."""
+    
+    def test_header_and_markers(self):
+        payload = encode("<b>test</b>")
+        
+        assert payload.startswith(b"Version:0.9\r\n")
+        for name in ("StartHTML", "EndHTML", "StartFragment", "EndFragment"):
+            assert len(header_field(payload, name)) == 10
+        assert b"<!--StartFragment--><b>test</b><!--EndFragment-->" in payload
+        assert header_field(payload, "SourceURL") is None
+        assert header_field(payload, "StartSelection") is None
+    
+    def test_offsets_are_byte_offsets(self):
+        fragment = "<p>naïve → ✓</p>"
+        payload = encode(fragment)
+        
+        start, end = (int(header_field(payload, name)) for name in ("StartFragment", "EndFragment"))
+        assert payload[start:end].decode("utf-8") == fragment
+        start_html, end_html = (int(header_field(payload, name)) for name in ("StartHTML", "EndHTML"))
+        assert payload[start_html:].startswith(b"<!DOCTYPE html>")
+        assert end_html == len(payload)
+    
+    def test_source_url_and_selection(self):
+        payload = encode(b"<p>hello world</p>", source_url="https://example.com/a?b=c", selection=(3, 8))
+        
+        assert header_field(payload, "SourceURL") == b"https://example.com/a?b=c"
+        start, end = (int(header_field(payload, name)) for name in ("StartSelection", "EndSelection"))
+        assert payload[start:end] == b"hello"
+    
+    def test_parts_pass_buffers_through(self):
+        fragment = memoryview(b"<i>x</i>")
+        parts = encode_parts(fragment)
+        
+        assert any(part is fragment for part in parts)
+        assert b"".join(parts) == encode(b"<i>x</i>")
+    
+    def test_selection_outside_fragment_rejected(self):
+        with pytest.raises(ValueError):
+            encode("<b>x</b>", selection=(2, 100))
+        with pytest.raises(ValueError):
+            encode("<b>x</b>", selection=(4, 2))
+    
+    def test_source_url_with_line_break_rejected(self):
+        with pytest.raises(ValueError):
+            encode("<b>x</b>", source_url="https://example.com/\r\nStartHTML:0")
+
+
+class TestDecode:
+    """Tests for reading CF_HTML."""
+    
+    def test_round_trip(self):
+        fragment = "<p>naïve → ✓</p>"
+        parsed = decode(encode(fragment, source_url="file:///tmp/a.html", selection=(3, 9)) + b"\x00")
+        
+        assert str(parsed.fragment, "utf-8") == fragment
+        assert bytes(parsed.selection) == fragment.encode("utf-8")[3:9]
+        assert bytes(parsed.html).startswith(b"<!DOCTYPE html>")
+        assert bytes(parsed.html).endswith(b"</html>")
+        assert parsed.version == "0.9"
+        assert parsed.source_url == "file:///tmp/a.html"
+    
+    def test_slices_are_views(self):
+        data = bytearray(encode("<b>abc</b>"))
+        parsed = decode(data)
+        
+        data[data.index(b"abc")] = ord("x")
+        
+        assert bytes(parsed.fragment) == b"<b>xbc</b>"
+        assert parsed.selection is None
+    
+    def test_offsets_win_over_markers(self):
+        # Microsoft Word and browsers write fragments with extra markup around the markers.
+        body = b"<html><body><!--StartFragment--><b>a</b><!--EndFragment--></body></html>"
+        header = b"Version:1.0\r\nStartHTML:-1\r\nEndHTML:-1\r\nStartFragment:%010d\r\nEndFragment:%010d\r\n"
+        size = len(header % (0, 0))
+        start = size + body.index(b"<b>")
+        parsed = decode(header % (start, start + 3) + body)
+        
+        assert bytes(parsed.fragment) == b"<b>"
+        assert bytes(parsed.html) == body
+    
+    def test_invalid_offsets_fall_back_to_markers(self):
+        payload = b"Version:0.9\r\nStartFragment:99999\r\nEndFragment:abc\r\n<!--StartFragment-->ok<!--EndFragment-->"
+        
+        assert bytes(decode(payload).fragment) == b"ok"
+    
+    def test_parse_without_header(self):
+        result = decode(b"Header<!--StartFragment--><b>test</b><!--EndFragment-->Footer")
+        
+        assert bytes(result.fragment) == b"<b>test</b>"
+        assert result.version is None
+    
+    def test_parse_without_markers(self):
+        assert bytes(decode(b"<b>test</b>\x00\x00").fragment) == b"<b>test</b>"
+    
+    def test_html_tag_with_colon_ends_header(self):
+        payload = b'Version:0.9\r\n<html xmlns:o="urn:office">\r\n<b>x</b></html>'
+        parsed = decode(payload)
+        
+        assert bytes(parsed.html).startswith(b"<html xmlns:o")
+    
+    def test_header_beyond_limit_not_read(self):
+        payload = b"Version:0.9\r\nSourceURL:" + b"a" * HEADER_LIMIT + b"\r\n<b>x</b>"
+        
+        assert decode(payload).source_url is None
@@ -0,0 +1,251 @@
+"""Tests for the built-in PNG, BMP and DIB codec."""
+
+import struct
+import zlib
+from unittest.mock import patch
+
+import pytest
+
+from zclipboard.codecs import image as codec
+from zclipboard.codecs.image import (
+    FILTER_NONE,
+    FILTER_SUB,
+    FILTER_UP,
+    Bitmap,
+    decode_bmp,
+    decode_dib,
+    decode_image,
+    decode_png,
+    encode_bmp,
+    encode_dib,
+    encode_png,
+    transcode,
+)
+from zclipboard.exceptions import ClipboardFormatError
+
+
+@pytest.fixture(params=["numpy", "pure"])
+def vectorized(request):
+    """Run a test with NumPy, if installed, and again without it."""
+    if request.param == "numpy":
+        pytest.importorskip("numpy")
+        yield True
+    else:
+        with patch.object(codec, "_numpy", return_value=None):
+            yield False
+
+
+def paeth(left, up, corner):
+    estimate = left + up - corner
+    pa, pb, pc = abs(estimate - left), abs(estimate - up), abs(estimate - corner)
+    return left if pa <= pb and pa <= pc else up if pb <= pc else corner
+
+
+def png(rows, width, color_type=6, depth=8, kinds=(0,), chunks=b"", interlace=0):
+    """Build a PNG from unfiltered rows, filtering row y with kinds[y % len(kinds)]."""
+    bits = {0: 1, 2: 3, 3: 1, 4: 2, 6: 4}[color_type] * depth
+    bpp = max(1, bits // 8)
+    raw = b""
+    previous = bytes(len(rows[0]))
+    for y, row in enumerate(rows):
+        kind = kinds[y % len(kinds)]
+        filtered = bytearray([kind])
+        for index, value in enumerate(row):
+            left = row[index - bpp] if index >= bpp else 0
+            corner = previous[index - bpp] if index >= bpp else 0
+            up = previous[index]
+            predictors = [0, left, up, (left + up) // 2, paeth(left, up, corner)]
+            predictor = predictors[kind] if kind < len(predictors) else 0
+            filtered.append((value - predictor) & 0xFF)
+        raw += bytes(filtered)
+        previous = row
+    header = struct.pack(">IIBBBBB", width, len(rows), depth, color_type, 0, 0, interlace)
+    return b"".join(
+        [
+            codec.PNG_SIGNATURE,
+            codec._png_chunk(b"IHDR", header),
+            chunks,
+            codec._png_chunk(b"IDAT", zlib.compress(raw)),
+            codec._png_chunk(b"IEND", b""),
+        ]
+    )
+
+
+def dib(rows, width, bits=24, compression=0, masks=(), palette=b"", top_down=False, header_size=40):
+    """Build a DIB from rows of raw pixel bytes, top row first."""
+    stride = (width * bits + 31) // 32 * 4
+    stored = rows if top_down else rows[::-1]
+    pixels = b"".join(row.ljust(stride, b"\0") for row in stored)
+    height = -len(rows) if top_down else len(rows)
+    colors = len(palette) // 4
+    header = struct.pack("<IiiHHIIiiII", header_size, width, height, 1, bits, compression, len(pixels), 0, 0, colors, 0)
+    mask_bytes = struct.pack(f"<{len(masks)}I", *masks)
+    if header_size > 40:
+        header = (header + mask_bytes).ljust(header_size, b"\0")
+        mask_bytes = b""
+    return header + mask_bytes + palette + pixels
+
+
+class TestBitmap:
+    """Tests for Bitmap."""
+    
+    def test_rejects_wrong_length(self):
+        with pytest.raises(ValueError):
+            Bitmap(2, 2, "RGB", bytes(11))
+        with pytest.raises(ValueError):
+            Bitmap(1, 1, "CMYK", bytes(4))
+    
+    def test_convert(self):
+        gray = Bitmap(2, 1, "LA", b"\x10\x80\x20\xff")
+        assert gray.convert("RGBA").pixels == b"\x10\x10\x10\x80\x20\x20\x20\xff"
+        assert gray.convert("RGB").pixels == b"\x10\x10\x10\x20\x20\x20"
+        assert gray.convert("L").pixels == b"\x10\x20"
+        color = Bitmap(1, 1, "RGB", b"\x01\x02\x03")
+        assert color.convert("RGBA").pixels == b"\x01\x02\x03\xff"
+        with pytest.raises(ValueError):
+            color.convert("L")
+
+
+class TestPng:
+    """Tests for PNG decoding and encoding."""
+    
+    ROWS = [bytes((x * 37 + y * 91) % 256 for x in range(20)) for y in range(4)]
+    
+    @pytest.mark.parametrize("kinds", [(0,), (1,), (2,), (3,), (4,), (4, 3, 2, 1, 0)])
+    def test_decodes_every_filter(self, vectorized, kinds):
+        bitmap = decode_png(png(self.ROWS, 5, kinds=kinds))
+        assert (bitmap.width, bitmap.height, bitmap.mode) == (5, 4, "RGBA")
+        assert bitmap.pixels == b"".join(self.ROWS)
+    
+    def test_modes(self, vectorized):
+        assert decode_png(png([b"\x01\x02\x03"], 1, color_type=2)).mode == "RGB"
+        assert decode_png(png([b"\x01\x02"], 1, color_type=4)).mode == "LA"
+        assert decode_png(png([b"\x07"], 1, color_type=0)).pixels == b"\x07"
+    
+    def test_low_bit_depth_gray_is_scaled(self, vectorized):
+        bitmap = decode_png(png([b"\xa0", b"\x40"], 3, color_type=0, depth=1))
+        assert bitmap.pixels == b"\xff\x00\xff\x00\xff\x00"
+        assert decode_png(png([b"\x1f"], 2, color_type=0, depth=4)).pixels == b"\x11\xff"
+    
+    def test_sixteen_bit_keeps_high_bytes(self, vectorized):
+        bitmap = decode_png(png([b"\x12\x34\x56\x78\x9a\xbc"], 1, color_type=2, depth=16))
+        assert bitmap.pixels == b"\x12\x56\x9a"
+    
+    def test_palette_with_transparency(self, vectorized):
+        chunks = codec._png_chunk(b"PLTE", b"\x00\x00\x00\xff\x00\x00\x00\xff\x00") + codec._png_chunk(b"tRNS", b"\x00")
+        bitmap = decode_png(png([b"\x18"], 3, color_type=3, depth=2, chunks=chunks))
+        assert bitmap.mode == "RGBA"
+        assert bitmap.pixels == b"\x00\x00\x00\x00\xff\x00\x00\xff\x00\xff\x00\xff"
+    
+    def test_rejects_unsupported_and_corrupt_data(self):
+        with pytest.raises(ClipboardFormatError, match="Interlaced"):
+            decode_png(png([b"\x00\x00\x00"], 1, color_type=2, interlace=1))
+        with pytest.raises(ClipboardFormatError):
+            decode_png(png([b"\x00\x00\x00"], 1, color_type=2)[:40])
+        with pytest.raises(ClipboardFormatError):
+            decode_png(b"GIF89a")
+        with pytest.raises(ClipboardFormatError, match="filter type 7"):
+            decode_png(png([b"\x00\x00\x00"], 1, color_type=2, kinds=(7,)))
+    
+    @pytest.mark.parametrize("mode", ["L", "LA", "RGB", "RGBA"])
+    @pytest.mark.parametrize("filter_type", [None, FILTER_NONE, FILTER_SUB, FILTER_UP])
+    def test_round_trip(self, vectorized, mode, filter_type):
+        channels = codec.MODE_CHANNELS[mode]
+        bitmap = Bitmap(7, 5, mode, bytes((index * 29) % 256 for index in range(7 * 5 * channels)))
+        decoded = decode_png(encode_png(bitmap, filter_type=filter_type))
+        assert (decoded.width, decoded.height, decoded.mode) == (7, 5, mode)
+        assert decoded.pixels == bitmap.pixels
+    
+    def test_paths_encode_identically(self):
+        pytest.importorskip("numpy")
+        bitmap = Bitmap(16, 8, "RGB", bytes((index * index) % 251 for index in range(16 * 8 * 3)))
+        vectorized = encode_png(bitmap)
+        with patch.object(codec, "_numpy", return_value=None):
+            assert encode_png(bitmap) == vectorized
+    
+    def test_encode_rejects_bad_arguments(self):
+        with pytest.raises(ValueError):
+            encode_png(Bitmap(1, 1, "L", b"\0"), filter_type=4)
+        with pytest.raises(ValueError):
+            encode_png(Bitmap(0, 0, "L", b""))
+
+
+class TestBmp:
+    """Tests for BMP and DIB decoding and encoding."""
+    
+    def test_24_bit_bottom_up_with_padding(self, vectorized):
+        bitmap = decode_dib(dib([b"\x01\x02\x03\x04\x05\x06", b"\x07\x08\x09\x0a\x0b\x0c"], 2))
+        assert (bitmap.width, bitmap.height, bitmap.mode) == (2, 2, "RGB")
+        assert bitmap.pixels == b"\x03\x02\x01\x06\x05\x04\x09\x08\x07\x0c\x0b\x0a"
+    
+    def test_top_down(self, vectorized):
+        bitmap = decode_dib(dib([b"\x01\x02\x03", b"\x04\x05\x06"], 1, top_down=True))
+        assert bitmap.pixels == b"\x03\x02\x01\x06\x05\x04"
+    
+    def test_32_bit_without_alpha_mask_is_rgb(self, vectorized):
+        bitmap = decode_dib(dib([b"\x01\x02\x03\x80"], 1, bits=32))
+        assert (bitmap.mode, bitmap.pixels) == ("RGB", b"\x03\x02\x01")
+    
+    @pytest.mark.parametrize("header_size", [40, 124])
+    def test_bitfields_with_alpha(self, vectorized, header_size):
+        masks = (0xFF0000, 0xFF00, 0xFF, 0xFF000000)
+        compression = 6 if header_size == 40 else 3
+        data = dib([b"\x01\x02\x03\x80"], 1, bits=32, compression=compression, masks=masks, header_size=header_size)
+        assert decode_dib(data).pixels == b"\x03\x02\x01\x80"
+    
+    def test_unusual_bitfields(self, vectorized):
+        # RGBA byte order, and a 565 16-bit pixel of pure red plus half green.
+        data = dib([b"\x01\x02\x03\x04"], 1, bits=32, compression=3, masks=(0xFF, 0xFF00, 0xFF0000))
+        assert decode_dib(data).pixels == b"\x01\x02\x03"
+        data = dib([struct.pack("<H", 0xF800 | 32 << 5)], 1, bits=16, compression=3, masks=(0xF800, 0x7E0, 0x1F))
+        assert decode_dib(data).pixels == b"\xff\x81\x00"
+    
+    def test_16_bit_defaults_to_555(self, vectorized):
+        assert decode_dib(dib([struct.pack("<H", 0x7C1F)], 1, bits=16)).pixels == b"\xff\x00\xff"
+    
+    @pytest.mark.parametrize("bits, row", [(8, b"\x00\x01\x01"), (4, b"\x01\x10"), (1, b"\x60")])
+    def test_palette(self, vectorized, bits, row):
+        palette = b"\x00\x00\xff\x00" + b"\xff\x00\x00\x00"
+        bitmap = decode_dib(dib([row], 3, bits=bits, palette=palette))
+        assert bitmap.pixels == b"\xff\x00\x00" + b"\x00\x00\xff" * 2
+    
+    def test_bmp_file_uses_its_pixel_offset(self, vectorized):
+        data = dib([b"\x01\x02\x03"], 1)
+        bmp = b"BM" + struct.pack("<I4xI", 14 + len(data) + 8, 14 + 40 + 8) + data[:40] + bytes(8) + data[40:]
+        assert decode_bmp(bmp).pixels == b"\x03\x02\x01"
+    
+    def test_rejects_compressed_and_truncated(self):
+        with pytest.raises(ClipboardFormatError, match="Compressed"):
+            decode_dib(dib([b"\x01\x02\x03"], 1, bits=8, compression=1, palette=bytes(1024)))
+        with pytest.raises(ClipboardFormatError, match="Truncated"):
+            decode_dib(dib([b"\x01\x02\x03"] * 4, 1)[:-6])
+    
+    @pytest.mark.parametrize("mode", ["L", "LA", "RGB", "RGBA"])
+    def test_round_trip(self, vectorized, mode):
+        channels = codec.MODE_CHANNELS[mode]
+        bitmap = Bitmap(3, 2, mode, bytes(range(3 * 2 * channels)))
+        # 32-bit BI_RGB is read back without alpha, as Pillow also does.
+        expected = bitmap.convert("RGB")
+        assert decode_bmp(encode_bmp(bitmap)).pixels == expected.pixels
+        assert decode_dib(encode_dib(bitmap)).pixels == expected.pixels
+
+
+class TestTranscode:
+    """Tests for decode_image() and transcode()."""
+    
+    def test_decode_image_dispatches(self):
+        bitmap = Bitmap(1, 1, "RGB", b"\x01\x02\x03")
+        for data in (encode_png(bitmap), encode_bmp(bitmap), encode_dib(bitmap)):
+            assert decode_image(data).pixels == b"\x01\x02\x03"
+        with pytest.raises(ClipboardFormatError):
+            decode_image(b"\xff\xd8\xff\xe0jpeg")
+    
+    def test_transcode(self):
+        bitmap = Bitmap(2, 1, "RGB", b"\x01\x02\x03\x04\x05\x06")
+        png_data = transcode(encode_bmp(bitmap), "png", compress_level=9)
+        assert decode_png(png_data).pixels == bitmap.pixels
+        assert transcode(png_data, "DIB") == encode_dib(bitmap)
+        with pytest.raises(ValueError):
+            transcode(png_data, "JPEG")
+        with pytest.raises(ValueError):
+            transcode(png_data, "PNG", optimize=True)
@@ -0,0 +1,57 @@
+"""Tests for the conversion cache."""
+
+from unittest.mock import MagicMock
+
+import pytest
+
+from zclipboard.conversions import ConversionCache
+
+
+class TestConversionCache:
+    """Tests for ConversionCache."""
+    
+    def test_same_content_converted_once(self):
+        cache = ConversionCache()
+        converter = MagicMock(return_value=b"png")
+        assert cache.convert(b"jpeg", "image/jpeg", "PNG", converter) == b"png"
+        assert cache.convert(bytearray(b"jpeg"), "image/jpeg", "PNG", converter) == b"png"
+        converter.assert_called_once_with()
+        assert (cache.hits, cache.misses, cache.cached_bytes) == (1, 1, 3)
+    
+    def test_key_includes_type_target_and_options(self):
+        cache = ConversionCache()
+        converter = MagicMock(side_effect=lambda: b"out")
+        cache.convert(b"data", "image/jpeg", "PNG", converter)
+        cache.convert(b"data", "image/bmp", "PNG", converter)
+        cache.convert(b"data", "image/jpeg", "WEBP", converter)
+        cache.convert(b"data", "image/jpeg", "WEBP", converter, (("quality", 80),))
+        cache.convert(b"other", "image/jpeg", "PNG", converter)
+        assert converter.call_count == 5
+        assert len(cache) == 5
+    
+    def test_least_recently_used_evicted(self):
+        cache = ConversionCache(max_bytes=8)
+        cache.convert(b"a", "t", "X", lambda: b"1111")
+        cache.convert(b"b", "t", "X", lambda: b"2222")
+        cache.convert(b"a", "t", "X", lambda: b"unused")
+        cache.convert(b"c", "t", "X", lambda: b"3333")
+        assert cache.cached_bytes == 8
+        assert cache.convert(b"a", "t", "X", lambda: b"new") == b"1111"
+        assert cache.convert(b"b", "t", "X", lambda: b"new") == b"new"
+    
+    def test_oversized_failed_and_none_results_not_kept(self):
+        cache = ConversionCache(max_bytes=4)
+        cache.convert(b"a", "t", "X", lambda: b"too large")
+        cache.convert(b"b", "t", "X", lambda: None)
+        with pytest.raises(ValueError):
+            cache.convert(b"c", "t", "X", MagicMock(side_effect=ValueError))
+        assert len(cache) == 0
+    
+    def test_disabled_and_clear(self):
+        cache = ConversionCache(max_bytes=0)
+        cache.convert(b"a", "t", "X", lambda: b"1")
+        assert len(cache) == 0 and cache.misses == 0
+        cache.max_bytes = 10
+        cache.convert(b"a", "t", "X", lambda: b"1")
+        cache.clear()
+        assert (len(cache), cache.cached_bytes, cache.hits, cache.misses) == (0, 0, 0, 0)
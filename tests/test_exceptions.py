@@ -4,6 +4,7 @@ import pytest
 
 from zclipboard.exceptions import (
     ClipboardAccessError,
+    ClipboardChangedError,
     ClipboardError,
     ClipboardFormatError,
     ClipboardPlatformError,
@@ -23,6 +24,12 @@ class TestExceptions:
         with pytest.raises(ClipboardError):
             raise ClipboardAccessError("test")
     
+    def test_clipboard_changed_error_inherits_from_base(self):
+        assert issubclass(ClipboardChangedError, ClipboardError)
+        
+        with pytest.raises(ClipboardError):
+            raise ClipboardChangedError("test")
+    
     def test_clipboard_format_error_inherits_from_base(self):
         assert issubclass(ClipboardFormatError, ClipboardError)
         
@@ -0,0 +1,165 @@
+"""Tests for the SQLite clipboard history."""
+
+import sqlite3
+
+import pytest
+
+from zclipboard import ClipboardFormat
+from zclipboard.data_types import ClipboardData
+from zclipboard.exceptions import ClipboardFormatError
+from zclipboard.history import ClipboardHistory
+
+
+def text(value):
+    return ClipboardData(value, ClipboardFormat.PLAIN_TEXT)
+
+
+def image(value):
+    return ClipboardData(value, ClipboardFormat.IMAGE)
+
+
+@pytest.fixture
+def history():
+    with ClipboardHistory() as history:
+        yield history
+
+
+class TestRecording:
+    """Tests for adding entries."""
+    
+    def test_recent_is_newest_first(self, history):
+        history.add(text("one"))
+        history.add(ClipboardData("<b>two</b>", ClipboardFormat.HTML))
+        history.add(image(b"png"))
+        entries = history.recent()
+        assert [entry.format_type for entry in entries] == [
+            ClipboardFormat.IMAGE,
+            ClipboardFormat.HTML,
+            ClipboardFormat.PLAIN_TEXT,
+        ]
+        assert entries[1].data == "<b>two</b>"
+        assert history.recent(format_type=ClipboardFormat.PLAIN_TEXT)[0].data == "one"
+    
+    def test_consecutive_duplicates_skipped(self, history):
+        assert history.add(text("same"))
+        assert not history.add(text("same"))
+        assert history.add(ClipboardData("same", ClipboardFormat.HTML))
+        assert history.add(text("same"))
+        assert len(history) == 3
+    
+    def test_images_load_lazily_and_share_storage(self, history):
+        history.add(image(b"\x89PNG data"))
+        history.add(text("between"))
+        history.add(image(b"\x89PNG data"))
+        entries = history.recent(format_type=ClipboardFormat.IMAGE)
+        assert len(entries) == 2
+        assert entries[0]._data is None
+        assert entries[0].data == b"\x89PNG data"
+        assert entries[0].to_clipboard_data().format_type == ClipboardFormat.IMAGE
+        assert history._conn.execute("SELECT COUNT(*) FROM blobs").fetchone()[0] == 1
+    
+    def test_wrong_payload_type_rejected(self, history):
+        with pytest.raises(ClipboardFormatError):
+            history.add(text(b"bytes"))
+        with pytest.raises(ClipboardFormatError):
+            history.add(image("str"))
+    
+    def test_batches_writes(self, tmp_path):
+        path = str(tmp_path / "history.db")
+        with ClipboardHistory(path, batch_size=3) as history:
+            history.add(text("a"))
+            history.add(text("b"))
+            reader = sqlite3.connect(path)
+            assert reader.execute("SELECT COUNT(*) FROM entries").fetchone()[0] == 0
+            history.add(text("c"))
+            assert reader.execute("SELECT COUNT(*) FROM entries").fetchone()[0] == 3
+            assert reader.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+            reader.close()
+    
+    def test_persists_across_reopen(self, tmp_path):
+        path = str(tmp_path / "history.db")
+        with ClipboardHistory(path) as history:
+            history.add(text("kept"))
+        with ClipboardHistory(path) as history:
+            assert not history.add(text("kept"))
+            assert [entry.data for entry in history.recent()] == ["kept"]
+
+
+class TestSearch:
+    """Tests for text search."""
+    
+    @pytest.fixture
+    def filled(self, history):
+        for index, value in enumerate(["Hello world", "say hello", "goodbye", "100% done_now", "hi"]):
+            history.add(text(value), timestamp=1000 + index)
+        history.add(image(b"hello"), timestamp=2000)
+        return history
+    
+    def test_uses_index(self, filled):
+        assert filled.indexed
+    
+    def test_substring_ignores_case(self, filled):
+        assert [entry.data for entry in filled.search("HELLO")] == ["say hello", "Hello world"]
+    
+    def test_prefix(self, filled):
+        assert [entry.data for entry in filled.search("hello", prefix=True)] == ["Hello world"]
+    
+    def test_short_query(self, filled):
+        assert [entry.data for entry in filled.search("hi")] == ["hi"]
+    
+    def test_non_ascii_ignores_case(self, history):
+        history.add(text("Übersicht über Straße"), timestamp=1000)
+        history.add(text("ÉCOLE normale"), timestamp=1001)
+        
+        assert [entry.data for entry in history.search("übersicht")] == ["Übersicht über Straße"]
+        assert [entry.data for entry in history.search("übersicht", prefix=True)] == ["Übersicht über Straße"]
+        assert [entry.data for entry in history.search("éc")] == ["ÉCOLE normale"]
+        assert [entry.data for entry in history.search("éc", prefix=True)] == ["ÉCOLE normale"]
+        assert history.search("STRASSE", prefix=True) == []
+    
+    def test_wildcards_are_literal(self, filled):
+        assert [entry.data for entry in filled.search("0% d")] == ["100% done_now"]
+        assert filled.search("o_w") == []
+        assert filled.search("Hello_", prefix=True) == []
+        assert [entry.data for entry in filled.search("_")] == ["100% done_now"]
+    
+    def test_time_range_and_limit(self, filled):
+        assert [entry.data for entry in filled.search("o", since=1001, until=1003)] == ["goodbye", "say hello"]
+        assert len(filled.search("o", limit=1)) == 1
+
+
+class TestRetention:
+    """Tests for retention limits."""
+    
+    def test_max_entries(self):
+        with ClipboardHistory(max_entries=2, batch_size=1) as history:
+            for value in "abc":
+                history.add(text(value))
+            assert [entry.data for entry in history.recent()] == ["c", "b"]
+    
+    def test_max_age(self):
+        with ClipboardHistory(max_age=60) as history:
+            history.add(text("old"), timestamp=0)
+            history.add(text("new"))
+            assert [entry.data for entry in history.recent()] == ["new"]
+    
+    def test_max_bytes_drops_unreferenced_blobs(self):
+        with ClipboardHistory(max_bytes=10, batch_size=1) as history:
+            history.add(image(b"x" * 8))
+            history.add(text("12345"))
+            history.add(text("67890"))
+            assert [entry.data for entry in history.recent()] == ["67890", "12345"]
+            assert history.total_bytes == 10
+            assert history._conn.execute("SELECT COUNT(*) FROM blobs").fetchone()[0] == 0
+    
+    def test_search_index_follows_deletes(self):
+        with ClipboardHistory(max_entries=1, batch_size=1) as history:
+            history.add(text("findable"))
+            history.add(text("other"))
+            assert history.search("findable") == []
+    
+    def test_clear(self, history):
+        history.add(text("x"))
+        history.clear()
+        assert len(history) == 0
+        assert history.add(text("x"))
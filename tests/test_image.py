@@ -0,0 +1,154 @@
+"""Tests for lazily converted clipboard images."""
+
+import struct
+import threading
+import zlib
+from unittest.mock import MagicMock, call, patch
+
+import pytest
+
+from zclipboard.codecs.image import _png_chunk, decode_png
+from zclipboard.exceptions import ClipboardFormatError
+from zclipboard.image import ClipboardImage, cached_transcode, can_transcode, encode_png, set_transcoder
+
+try:
+    import PIL
+except ImportError:
+    PIL = None
+
+requires_no_pillow = pytest.mark.skipif(PIL is not None, reason="Pillow is installed")
+
+
+class TestClipboardImage:
+    """Tests for ClipboardImage."""
+    
+    def test_png_is_passed_through(self):
+        converter = MagicMock()
+        image = ClipboardImage(b"\x89PNG", "image/png", converter)
+        assert image.to_png() == b"\x89PNG"
+        assert image.to_format("png") == b"\x89PNG"
+        converter.assert_not_called()
+    
+    def test_conversion_runs_once(self):
+        converter = MagicMock(return_value=b"png")
+        image = ClipboardImage(b"BM", "image/bmp", converter)
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(image.to_png())) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert results == [b"png"] * 4
+        converter.assert_called_once_with(b"BM", "image/bmp")
+    
+    def test_native_format_returned_without_options(self):
+        image = ClipboardImage(b"\xff\xd8", "image/jpeg; q=1")
+        assert image.format_name == "JPEG"
+        assert image.to_format("jpeg") == b"\xff\xd8"
+        assert len(image) == 2
+    
+    def test_mislabelled_data_identified(self):
+        converter = MagicMock()
+        image = ClipboardImage(b"\x89PNG\r\n\x1a\n data", "image/bmp", converter)
+        assert image.mime_type == "image/png"
+        assert image.to_png() == image.data
+        converter.assert_not_called()
+    
+    def test_unknown_mime_type(self):
+        assert ClipboardImage(b"", "image/x-unknown").format_name is None
+    
+    @requires_no_pillow
+    def test_default_conversion_without_pillow_keeps_data(self):
+        assert ClipboardImage(b"BM", "image/bmp").to_png() == b"BM"
+    
+    def test_bmp_converted_without_pillow(self):
+        data = bmp([b"\x01\x02\x03"], 1, 1)
+        with patch("zclipboard.image.pillow_available", return_value=False), patch.dict("sys.modules", {"PIL": None}):
+            png = ClipboardImage(data, "image/bmp").to_png()
+            assert can_transcode("image/x-ms-bmp") and not can_transcode("image/jpeg")
+        assert decode_png(png).pixels == b"\x03\x02\x01"
+    
+    @requires_no_pillow
+    def test_pillow_features_raise_without_pillow(self):
+        image = ClipboardImage(b"BM", "image/bmp")
+        with pytest.raises(ClipboardFormatError):
+            image.to_format("JPEG")
+        with pytest.raises(ClipboardFormatError):
+            image.thumbnail(64)
+        with pytest.raises(ClipboardFormatError):
+            image.size
+    
+    def test_thumbnail_memoized_per_digest(self):
+        with patch("zclipboard.image.thumbnail", return_value=b"small") as make:
+            assert ClipboardImage(b"thumbnail test", "image/jpeg").thumbnail(64) == b"small"
+            assert ClipboardImage(b"thumbnail test", "image/jpeg").thumbnail(64) == b"small"
+            assert ClipboardImage(b"thumbnail test", "image/jpeg").thumbnail(32, "jpeg", quality=70) == b"small"
+        assert make.call_args_list == [
+            call(b"thumbnail test", 64, "PNG"),
+            call(b"thumbnail test", 32, "JPEG", quality=70),
+        ]
+        with pytest.raises(ValueError):
+            ClipboardImage(b"", "image/png").thumbnail(0)
+    
+    def test_set_transcoder(self):
+        transcoder = MagicMock(return_value=b"webp")
+        set_transcoder(transcoder)
+        try:
+            assert cached_transcode(b"set_transcoder test", "image/bmp", "webp", quality=80) == b"webp"
+        finally:
+            set_transcoder(None)
+        transcoder.assert_called_once_with(b"set_transcoder test", "WEBP", quality=80)
+
+
+def bmp(pixels_bgr, width, height, bits=24, masks=None):
+    """Build a bottom-up BMP file from rows of raw pixel bytes, top row first."""
+    stride = (width * bits + 31) // 32 * 4
+    rows = b"".join(row.ljust(stride, b"\0") for row in reversed(pixels_bgr))
+    header_size = 40 if masks is None else 56
+    compression = 0 if masks is None else 3
+    info = struct.pack("<IiiHHIIiiII", header_size, width, height, 1, bits, compression, len(rows), 0, 0, 0, 0)
+    if masks is not None:
+        info += struct.pack("<IIII", *masks)
+    offset = 14 + len(info)
+    return b"BM" + struct.pack("<I4xI", offset + len(rows), offset) + info + rows
+
+
+class TestImageArrays:
+    """Tests for NumPy array conversions."""
+    
+    @pytest.fixture(autouse=True)
+    def numpy(self):
+        return pytest.importorskip("numpy")
+    
+    def test_bmp_read_without_decoder(self, numpy):
+        data = bmp([b"\x01\x02\x03\x04\x05\x06", b"\x07\x08\x09\x0a\x0b\x0c"], 2, 2)
+        array = ClipboardImage(data, "image/bmp").to_array()
+        assert array.tolist() == [[[3, 2, 1], [6, 5, 4]], [[9, 8, 7], [12, 11, 10]]]
+    
+    def test_bmp_with_alpha_mask(self, numpy):
+        data = bmp([b"\x01\x02\x03\x80"], 1, 1, bits=32, masks=(0xFF0000, 0xFF00, 0xFF, 0xFF000000))
+        assert ClipboardImage(data, "image/bmp").to_array().tolist() == [[[3, 2, 1, 128]]]
+    
+    def test_png_read_without_pillow(self, numpy):
+        png = encode_png(numpy.arange(12, dtype=numpy.uint8).reshape(2, 2, 3))
+        with patch("zclipboard.image.pillow_available", return_value=False):
+            array = ClipboardImage(png, "image/png").to_array()
+        assert array.tolist() == numpy.arange(12).reshape(2, 2, 3).tolist()
+        array[0, 0, 0] = 1
+    
+    def test_encode_png(self, numpy):
+        array = numpy.arange(2 * 3 * 4, dtype=numpy.uint8).reshape(2, 3, 4)
+        png = encode_png(array)
+        assert png.startswith(b"\x89PNG\r\n\x1a\n")
+        width, height, depth, color_type = struct.unpack_from(">IIBB", png, 16)
+        assert (width, height, depth, color_type) == (3, 2, 8, 6)
+        idat_length = struct.unpack_from(">I", png, 33)[0]
+        rows = zlib.decompress(png[41 : 41 + idat_length])
+        assert rows == b"\0" + array[0].tobytes() + b"\0" + array[1].tobytes()
+        assert png.endswith(_png_chunk(b"IEND", b""))
+    
+    def test_encode_png_rejects_bad_arrays(self, numpy):
+        with pytest.raises(ValueError):
+            encode_png(numpy.zeros((2, 2), numpy.float32))
+        with pytest.raises(ValueError):
+            encode_png(numpy.zeros((2, 2, 2), numpy.uint8))
@@ -0,0 +1,100 @@
+"""Tests for header-only image inspection."""
+
+import io
+import struct
+import zlib
+
+from zclipboard import ClipboardFormat
+from zclipboard.imageinfo import PROBE_BYTES, parse_image_header, probe
+
+
+def png(width, height, color_type=6):
+    ihdr = struct.pack(">IIBBBBB", width, height, 8, color_type, 0, 0, 0)
+    return b"\x89PNG\r\n\x1a\n" + struct.pack(">I", 13) + b"IHDR" + ihdr + struct.pack(">I", zlib.crc32(b"IHDR" + ihdr))
+
+
+def jpeg(width, height, padding=0):
+    app1 = b"\xff\xe1" + struct.pack(">H", padding + 2) + bytes(padding)
+    sof = b"\xff\xc0" + struct.pack(">HBHHB", 17, 8, height, width, 3) + bytes(9)
+    return b"\xff\xd8" + app1 + sof + b"\xff\xda"
+
+
+def tiff(width, height):
+    entries = [(256, 4, width), (257, 4, height), (262, 3, 2), (277, 3, 3)]
+    ifd = struct.pack("<H", len(entries))
+    for tag, field_type, value in entries:
+        value_bytes = struct.pack("<I" if field_type == 4 else "<H2x", value)
+        ifd += struct.pack("<HHI", tag, field_type, 1) + value_bytes
+    return b"II*\x00" + struct.pack("<I", 8) + ifd + struct.pack("<I", 0)
+
+
+def header(data):
+    result = parse_image_header(data)
+    return (result.mime_type, result.width, result.height, result.mode)
+
+
+class TestParseImageHeader:
+    """Tests for parse_image_header()."""
+    
+    def test_png(self):
+        assert header(png(640, 480)) == ("image/png", 640, 480, "RGBA")
+        assert header(png(1, 2, color_type=0)) == ("image/png", 1, 2, "L")
+    
+    def test_jpeg_after_metadata(self):
+        assert header(jpeg(1920, 1080, padding=100)) == ("image/jpeg", 1920, 1080, "RGB")
+    
+    def test_bmp(self):
+        info = struct.pack("<IiiHHI", 40, 300, -200, 1, 24, 0) + bytes(20)
+        assert header(b"BM" + bytes(12) + info) == ("image/bmp", 300, 200, "RGB")
+    
+    def test_tiff(self):
+        assert header(tiff(4000, 3000)) == ("image/tiff", 4000, 3000, "RGB")
+    
+    def test_gif_and_webp(self):
+        assert header(b"GIF89a" + struct.pack("<HH", 16, 9) + bytes(3)) == ("image/gif", 16, 9, "P")
+        vp8x = b"RIFF" + bytes(4) + b"WEBPVP8X" + bytes(4) + b"\x10" + bytes(3)
+        vp8x += (99).to_bytes(3, "little") + (49).to_bytes(3, "little")
+        assert header(vp8x) == ("image/webp", 100, 50, "RGBA")
+    
+    def test_truncated_and_unknown(self):
+        assert parse_image_header(jpeg(10, 10, padding=100)[:50]).truncated
+        assert parse_image_header(png(1, 1)[:20]).truncated
+        assert parse_image_header(b"plain text") is None
+
+
+class TestProbe:
+    """Tests for probe()."""
+    
+    def test_reads_further_only_when_needed(self):
+        data = jpeg(800, 600, padding=4000) + bytes(1024 * 1024)
+        stream = io.BufferedReader(io.BytesIO(data))
+        stream.seekable = lambda: False
+        info = probe(ClipboardFormat.IMAGE, stream, "image/jpeg")
+        assert (info.mime_type, info.width, info.height, info.size) == ("image/jpeg", 800, 600, None)
+        assert stream.tell() < 64 * 1024
+    
+    def test_size_from_end_of_short_content(self):
+        info = probe(ClipboardFormat.HTML, io.BytesIO(b"<b>hi</b>"), "text/html;charset=utf-8")
+        assert (info.size, info.mime_type, info.width) == (9, "text/html;charset=utf-8", None)
+        info = probe(ClipboardFormat.PLAIN_TEXT, io.BytesIO(b"x" * 10), "UTF8_STRING")
+        assert info.mime_type == "text/plain"
+    
+    def test_size_from_seekable_stream(self):
+        stream = io.BytesIO(png(2, 2) + bytes(PROBE_BYTES * 4))
+        assert probe(ClipboardFormat.IMAGE, stream).size == len(stream.getvalue())
+    
+    def test_known_size_wins(self):
+        assert probe(ClipboardFormat.IMAGE, io.BytesIO(png(2, 2)), "image/png", size=10 ** 9).size == 10 ** 9
+
+
+class TestClipboardGetInfo:
+    """Tests for Clipboard.get_info()."""
+    
+    def test_get_info(self, clipboard_with_mock):
+        assert clipboard_with_mock.get_info() is None
+        clipboard_with_mock.set_image(png(32, 16))
+        info = clipboard_with_mock.get_info()
+        assert (info.mime_type, info.width, info.height, info.size) == ("image/png", 32, 16, len(png(32, 16)))
+        clipboard_with_mock.set_text("hello")
+        assert clipboard_with_mock.get_info(ClipboardFormat.PLAIN_TEXT).size == 5
+        assert clipboard_with_mock.get_info(ClipboardFormat.IMAGE) is None
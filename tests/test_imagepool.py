@@ -0,0 +1,104 @@
+"""Tests for the out-of-process image conversion pool."""
+
+import os
+import struct
+import time
+import zlib
+
+import pytest
+
+from zclipboard.codecs.image import Bitmap, decode_png, encode_bmp, encode_png
+from zclipboard.exceptions import ClipboardFormatError, ClipboardTimeoutError
+from zclipboard.imagepool import ConversionPool, resource
+
+try:
+    import PIL
+except ImportError:
+    PIL = None
+
+
+BITMAP = Bitmap(2, 2, "RGB", bytes(range(12)))
+
+
+def png_header(width, height):
+    """A PNG signature and IHDR chunk only: enough to read the size, nothing to decode."""
+    ihdr = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    return b"\x89PNG\r\n\x1a\n" + struct.pack(">I", 13) + b"IHDR" + ihdr + struct.pack(">I", zlib.crc32(b"IHDR" + ihdr))
+
+
+def run(pool, func, *args):
+    return pool._collect([pool._submit(func, *args)])[0]
+
+
+class TestConversionPool:
+    """Tests for conversions through ConversionPool."""
+    
+    def test_transcode(self):
+        with ConversionPool(max_workers=1) as pool:
+            png = pool.transcode(encode_bmp(BITMAP), "PNG")
+        assert decode_png(png).pixels == BITMAP.pixels
+    
+    def test_rejects_too_many_pixels_before_decoding(self):
+        with ConversionPool(max_workers=1) as pool:
+            with pytest.raises(ClipboardFormatError, match="30000x30000"):
+                pool.transcode(png_header(30000, 30000), "PNG")
+    
+    def test_pixel_limit_is_configurable(self):
+        with ConversionPool(max_workers=1, max_pixels=3) as pool:
+            with pytest.raises(ClipboardFormatError, match="exceeds the limit"):
+                pool.transcode(encode_bmp(BITMAP), "PNG")
+    
+    def test_transcode_many_reports_failures_as_none(self):
+        images = [encode_bmp(BITMAP), png_header(30000, 30000), encode_bmp(BITMAP)[:60]]
+        with ConversionPool(max_workers=2) as pool:
+            results = pool.transcode_many(images)
+        assert results[1:] == [None, None]
+        assert decode_png(results[0]).pixels == BITMAP.pixels
+    
+    @pytest.mark.skipif(PIL is None, reason="requires Pillow")
+    def test_transcode_many_with_pillow(self):
+        with ConversionPool(max_workers=2) as pool:
+            results = pool.transcode_many([encode_png(BITMAP), b"not an image"], "JPEG")
+        assert results[0].startswith(b"\xff\xd8")
+        assert results[1] is None
+    
+    @pytest.mark.skipif(PIL is not None, reason="Pillow is installed")
+    def test_missing_pillow_propagates(self):
+        with ConversionPool(max_workers=1) as pool:
+            with pytest.raises(ImportError):
+                pool.transcode(b"BM", "PNG")
+            with pytest.raises(ImportError):
+                pool.transcode_many([b"BM"])
+
+
+class TestWorkerFailures:
+    """
+    Tests for workers that crash, hang or run out of memory.
+    
+    No image reliably does any of these, so the jobs are submitted directly.
+    """
+    
+    def test_runs_in_worker(self):
+        with ConversionPool(max_workers=1) as pool:
+            assert run(pool, os.getpid) != os.getpid()
+    
+    def test_dead_worker_is_replaced(self):
+        with ConversionPool(max_workers=1) as pool:
+            with pytest.raises(ClipboardFormatError):
+                run(pool, os._exit, 1)
+            assert run(pool, abs, -2) == 2
+    
+    def test_job_timeout(self):
+        with ConversionPool(max_workers=1, timeout=0.2) as pool:
+            started = time.monotonic()
+            with pytest.raises(ClipboardTimeoutError):
+                run(pool, time.sleep, 5)
+            assert time.monotonic() - started < 2
+            assert run(pool, abs, -1) == 1
+    
+    @pytest.mark.skipif(resource is None, reason="requires resource limits")
+    def test_memory_limit(self):
+        with ConversionPool(max_workers=1, memory_limit=1024 ** 3) as pool:
+            with pytest.raises(ClipboardFormatError, match="memory limit"):
+                run(pool, bytearray, 4 * 1024 ** 3)
+            assert run(pool, len, b"ok") == 2
@@ -0,0 +1,207 @@
+"""Tests for the selection ownership manager."""
+
+import os
+import subprocess
+from unittest.mock import patch
+
+import pytest
+
+from zclipboard.backends import ownership
+from zclipboard.backends.ownership import (
+    FRAME_SET,
+    FileSlice,
+    SelectionOwnerManager,
+    decode_items,
+    encode_items,
+    item_parts,
+    read_frame,
+    write_frame,
+)
+from zclipboard.exceptions import ClipboardAccessError
+
+
+class TestFrameEncoding:
+    """Tests for the helper protocol payloads."""
+    
+    def test_items_round_trip(self):
+        items = {"text/html": b"<b>x</b>", "UTF8_STRING": b"x", "image/png": bytes(300)}
+        assert decode_items(encode_items(items)) == items
+    
+    def test_deferred_items_round_trip(self):
+        items = {"text/html": None, "UTF8_STRING": b"x"}
+        assert decode_items(encode_items(items)) == items
+    
+    def test_order_preserved(self):
+        items = {"b": b"2", "a": b"1"}
+        assert list(decode_items(encode_items(items))) == ["b", "a"]
+    
+    
+    def test_frame_written_from_parts(self):
+        items = {"text/html": None, "image/png": bytes(range(256)) * 64}
+        read_fd, write_fd = os.pipe()
+        with os.fdopen(write_fd, "wb") as stream, os.fdopen(read_fd, "rb") as source:
+            write_frame(stream, FRAME_SET, *item_parts(items))
+            stream.close()
+            assert read_frame(source.fileno(), timeout=5) == (FRAME_SET, encode_items(items))
+
+
+class TestSelectionOwnerManager:
+    """Tests for SelectionOwnerManager with a real helper process."""
+    
+    @pytest.fixture
+    def manager(self, fake_x_server, monkeypatch):
+        monkeypatch.setenv("DISPLAY", fake_x_server.display)
+        manager = SelectionOwnerManager()
+        yield manager
+        manager.close()
+    
+    @pytest.fixture
+    def reader(self, fake_x_server):
+        from zclipboard.backends.x11 import X11ClipboardBackend
+        
+        backend = X11ClipboardBackend(display=fake_x_server.display)
+        yield backend
+        backend.close()
+    
+    def test_one_owner_reused_across_writes(self, manager, reader):
+        for index in range(5):
+            manager.own({"UTF8_STRING": f"write {index}".encode()})
+        
+        assert reader.get_text() == "write 4"
+        assert manager.using_helper
+        assert manager.owners_started == 1
+        assert manager.live_owners == 1
+    
+    def test_file_slice_sent_from_file(self, manager, reader, tmp_path):
+        payload = bytes(range(256)) * 4096
+        path = tmp_path / "image.png"
+        path.write_bytes(b"skipped" + payload)
+        with open(path, "rb") as file:
+            file.seek(7)
+            manager.own({"image/png": FileSlice.of(file)})
+        
+        assert reader.get_image() == payload
+    
+    def test_all_targets_served_together(self, manager, reader):
+        manager.own({"text/html": b"<b>rich</b>", "UTF8_STRING": b"rich"})
+        
+        assert reader.get_html() == "<b>rich</b>"
+        assert reader.get_text() == "rich"
+    
+    def test_deferred_target_rendered_by_parent(self, manager, reader):
+        calls = []
+        
+        def render():
+            calls.append(1)
+            return b"<b>rendered</b>"
+        
+        manager.own({"text/html": render, "UTF8_STRING": b"plain"})
+        assert reader.get_text() == "plain"
+        assert calls == []
+        
+        assert reader.get_html() == "<b>rendered</b>"
+        assert reader.get_html() == "<b>rendered</b>"
+        assert calls == [1]
+    
+    def test_deferred_target_from_previous_write_not_served(self, manager, reader):
+        manager.own({"text/html": lambda: b"<b>old</b>"})
+        manager.own({"UTF8_STRING": b"new"})
+        
+        assert reader.get_html() is None
+        assert reader.get_text() == "new"
+    
+    def test_clear(self, manager, reader):
+        manager.own({"UTF8_STRING": b"soon gone"})
+        manager.clear()
+        
+        assert reader.get_available_formats() == []
+    
+    def test_helper_restarted_after_exit(self, manager, reader):
+        manager.own({"UTF8_STRING": b"first"})
+        manager._helper.kill()
+        manager._helper.wait()
+        manager.own({"UTF8_STRING": b"second"})
+        
+        assert reader.get_text() == "second"
+        assert manager.owners_started == 2
+        assert manager.owners_reaped == 1
+        assert manager.live_owners == 1
+    
+    def test_helper_finds_package_from_other_directory(self, manager, reader, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        monkeypatch.delenv("PYTHONPATH", raising=False)
+        
+        with patch("subprocess.Popen", wraps=subprocess.Popen) as popen:
+            manager.own({"UTF8_STRING": b"elsewhere"})
+        
+        assert manager.using_helper
+        assert reader.get_text() == "elsewhere"
+        assert "env" not in popen.call_args.kwargs
+    
+    def test_falls_back_to_xclip_without_x_server(self, monkeypatch):
+        monkeypatch.delenv("DISPLAY", raising=False)
+        manager = SelectionOwnerManager(xclip_path="/usr/bin/xclip")
+        
+        with patch.object(manager, "_spawn_xclip") as spawn:
+            manager.own({"text/html": b"<b>x</b>", "UTF8_STRING": b"x"})
+        
+        assert not manager.using_helper
+        spawn.assert_called_once_with("CLIPBOARD", "UTF8_STRING", b"x")
+    
+    def test_fallback_without_text_serves_first_target(self, monkeypatch):
+        monkeypatch.delenv("DISPLAY", raising=False)
+        manager = SelectionOwnerManager(xclip_path="/usr/bin/xclip")
+        
+        with patch.object(manager, "_spawn_xclip") as spawn:
+            manager.own({"image/png": b"png", "image/bmp": b"bmp"})
+        
+        spawn.assert_called_once_with("CLIPBOARD", "image/png", b"png")
+    
+    def test_fallback_does_not_restart_helper_every_write(self, monkeypatch):
+        monkeypatch.delenv("DISPLAY", raising=False)
+        manager = SelectionOwnerManager(xclip_path="/usr/bin/xclip")
+        
+        with patch.object(manager, "_spawn_xclip") as spawn:
+            for index in range(3):
+                manager.own({"UTF8_STRING": b"%d" % index})
+        
+        assert spawn.call_count == 3
+        assert manager.owners_started == 1
+    
+    def test_helper_retried_after_fallback(self, fake_x_server, reader, monkeypatch):
+        monkeypatch.delenv("DISPLAY", raising=False)
+        manager = SelectionOwnerManager(xclip_path="/usr/bin/xclip")
+        with patch.object(manager, "_spawn_xclip"):
+            manager.own({"UTF8_STRING": b"fallback"})
+        assert not manager.using_helper
+        
+        monkeypatch.setenv("DISPLAY", fake_x_server.display)
+        with patch.object(manager, "_spawn_xclip"):
+            manager.own({"UTF8_STRING": b"still fallback"})
+        assert not manager.using_helper
+        
+        monkeypatch.setattr(ownership, "HELPER_RETRY_INTERVAL", 0)
+        manager._start_failed()
+        try:
+            manager.own({"text/html": b"<b>x</b>", "UTF8_STRING": b"x"})
+            
+            assert manager.using_helper
+            assert (reader.get_html(), reader.get_text()) == ("<b>x</b>", "x")
+        finally:
+            manager.close()
+    
+    def test_fallback_renders_deferred_target(self, monkeypatch):
+        monkeypatch.delenv("DISPLAY", raising=False)
+        manager = SelectionOwnerManager(xclip_path="/usr/bin/xclip")
+        
+        with patch.object(manager, "_spawn_xclip") as spawn:
+            manager.own({"UTF8_STRING": lambda: b"late"})
+        
+        spawn.assert_called_once_with("CLIPBOARD", "UTF8_STRING", b"late")
+    
+    def test_no_owner_available(self, monkeypatch):
+        monkeypatch.delenv("DISPLAY", raising=False)
+        manager = SelectionOwnerManager()
+        
+        with pytest.raises(ClipboardAccessError):
+            manager.own({"UTF8_STRING": b"x"})
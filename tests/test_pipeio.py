@@ -0,0 +1,143 @@
+"""Tests for the pipe transfer helpers."""
+
+import io
+import os
+import subprocess
+import sys
+import threading
+
+import pytest
+
+from tests.conftest import skip_unless_linux
+from zclipboard.backends import pipeio
+
+PAYLOAD = bytes(range(256)) * 4096
+
+
+def feed(data):
+    """Return the read end of a pipe that a thread fills with data."""
+    read_fd, write_fd = os.pipe()
+    
+    def writer():
+        with os.fdopen(write_fd, "wb") as stream:
+            stream.write(data)
+    
+    threading.Thread(target=writer, daemon=True).start()
+    return read_fd
+
+
+class TestReadAll:
+    """Tests for read_all()."""
+    
+    @pytest.mark.parametrize("size_hint", [None, len(PAYLOAD), 10, len(PAYLOAD) * 2])
+    def test_reads_everything_whatever_the_hint(self, size_hint):
+        fd = feed(PAYLOAD)
+        try:
+            assert pipeio.read_all(fd, size_hint, timeout=5) == PAYLOAD
+        finally:
+            os.close(fd)
+    
+    def test_empty(self):
+        fd = feed(b"")
+        try:
+            assert pipeio.read_all(fd) == b""
+        finally:
+            os.close(fd)
+    
+    def test_timeout(self):
+        read_fd, write_fd = os.pipe()
+        try:
+            with pytest.raises(subprocess.TimeoutExpired):
+                pipeio.read_all(read_fd, timeout=0.05)
+        finally:
+            os.close(read_fd)
+            os.close(write_fd)
+
+
+class TestWriteAll:
+    """Tests for write_all()."""
+    
+    def test_buffers_arrive_in_order(self):
+        read_fd, write_fd = os.pipe()
+        parts = [b"head", memoryview(PAYLOAD), bytearray(b""), bytearray(b"tail")]
+        result = {}
+        reader = threading.Thread(target=lambda: result.update(data=pipeio.read_all(read_fd, timeout=5)))
+        reader.start()
+        try:
+            assert pipeio.write_all(write_fd, parts) == len(PAYLOAD) + 8
+        finally:
+            os.close(write_fd)
+        reader.join()
+        os.close(read_fd)
+        assert result["data"] == b"head" + PAYLOAD + b"tail"
+
+
+class TestRun:
+    """Tests for run()."""
+    
+    def test_captures_stdout(self):
+        code = "import sys; sys.stdout.buffer.write(bytes(range(256)) * 4096); sys.stderr.write('noise')"
+        result = pipeio.run([sys.executable, "-c", code], timeout=10)
+        assert result.returncode == 0
+        assert result.stdout == PAYLOAD
+    
+    def test_returncode(self):
+        assert pipeio.run([sys.executable, "-c", "raise SystemExit(3)"], timeout=10).returncode == 3
+    
+    def test_timeout_kills_process(self):
+        with pytest.raises(subprocess.TimeoutExpired):
+            pipeio.run([sys.executable, "-c", "import time; time.sleep(10)"], timeout=0.2)
+    
+    @skip_unless_linux
+    def test_enlarge_pipe(self):
+        read_fd, write_fd = os.pipe()
+        try:
+            assert pipeio.enlarge_pipe(read_fd) > 64 * 1024
+        finally:
+            os.close(read_fd)
+            os.close(write_fd)
+
+
+class TestFileTransfers:
+    """Tests for send_file() and copy()."""
+    
+    def test_send_file_range(self, tmp_path):
+        path = tmp_path / "data"
+        path.write_bytes(PAYLOAD)
+        read_fd, write_fd = os.pipe()
+        result = {}
+        reader = threading.Thread(target=lambda: result.update(data=pipeio.read_all(read_fd, timeout=5)))
+        reader.start()
+        with open(path, "rb") as source:
+            try:
+                assert pipeio.send_file(write_fd, source.fileno(), 100, len(PAYLOAD) - 200) == len(PAYLOAD) - 200
+                assert source.tell() == 0
+            finally:
+                os.close(write_fd)
+        reader.join()
+        os.close(read_fd)
+        assert result["data"] == PAYLOAD[100:-100]
+    
+    def test_send_file_stops_at_end_of_file(self, tmp_path):
+        path = tmp_path / "data"
+        path.write_bytes(b"short")
+        with open(path, "rb") as source, open(tmp_path / "copy", "wb") as target:
+            assert pipeio.send_file(target.fileno(), source.fileno(), 0, 100) == 5
+    
+    def test_copy_pipe_to_file(self, tmp_path):
+        fd = feed(PAYLOAD)
+        try:
+            with open(tmp_path / "copy", "wb") as target:
+                assert pipeio.copy(fd, target.fileno(), timeout=5) == len(PAYLOAD)
+        finally:
+            os.close(fd)
+        assert (tmp_path / "copy").read_bytes() == PAYLOAD
+    
+    def test_regular_fileno(self, tmp_path):
+        with open(tmp_path / "file", "wb") as file:
+            assert pipeio.regular_fileno(file) == file.fileno()
+        assert pipeio.regular_fileno(io.BytesIO()) is None
+        read_fd, write_fd = os.pipe()
+        with os.fdopen(read_fd, "rb") as pipe:
+            assert pipeio.regular_fileno(pipe) is None
+        os.close(write_fd)
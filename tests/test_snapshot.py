@@ -0,0 +1,129 @@
+"""Tests for consistent multi-format reads."""
+
+import threading
+import time
+
+import pytest
+
+from zclipboard import Clipboard, ClipboardFormat
+from zclipboard.backends import MemoryClipboardBackend
+from zclipboard.exceptions import ClipboardChangedError, ClipboardFormatError
+
+
+class SlowBackend(MemoryClipboardBackend):
+    """Memory backend whose reads take a while and may overlap."""
+    
+    def __init__(self, delay: float, concurrent: bool):
+        super().__init__()
+        self.delay = delay
+        self.concurrent = concurrent
+        self.threads = set()
+    
+    @property
+    def supports_concurrent_reads(self) -> bool:
+        return self.concurrent
+    
+    def _get(self, format_type):
+        self.threads.add(threading.current_thread().name)
+        time.sleep(self.delay)
+        return super()._get(format_type)
+
+
+class ChangingBackend(MemoryClipboardBackend):
+    """Memory backend that replaces its contents during the first few HTML reads."""
+    
+    def __init__(self, changes: int):
+        super().__init__()
+        self.changes = changes
+        self.html_reads = 0
+    
+    def get_html(self):
+        html = super().get_html()
+        self.html_reads += 1
+        if self.html_reads <= self.changes:
+            self.set_html(f"<b>{self.html_reads}</b>", str(self.html_reads))
+        return html
+
+
+@pytest.fixture
+def clipboard():
+    return Clipboard(backend=MemoryClipboardBackend())
+
+
+class TestSnapshot:
+    """Tests for Clipboard.snapshot()."""
+    
+    def test_reads_every_available_format(self, clipboard):
+        clipboard.set_html("<b>x</b>", "x")
+        snapshot = clipboard.snapshot()
+        assert snapshot.formats == [ClipboardFormat.HTML, ClipboardFormat.PLAIN_TEXT]
+        assert snapshot.loaded == {ClipboardFormat.HTML: "<b>x</b>", ClipboardFormat.PLAIN_TEXT: "x"}
+        assert snapshot.get().format_type == ClipboardFormat.HTML
+        assert ClipboardFormat.HTML in snapshot
+        assert snapshot.get_image() is None
+        assert not snapshot.stale
+    
+    def test_values_survive_clipboard_change(self, clipboard):
+        clipboard.set_text("kept")
+        snapshot = clipboard.snapshot()
+        clipboard.set_text("replaced")
+        assert snapshot.stale
+        assert snapshot.get_text() == "kept"
+    
+    def test_unrequested_formats_load_lazily(self, clipboard):
+        clipboard.set_html("<b>x</b>", "x")
+        snapshot = clipboard.snapshot([ClipboardFormat.PLAIN_TEXT])
+        assert list(snapshot.loaded) == [ClipboardFormat.PLAIN_TEXT]
+        assert snapshot.get_html() == "<b>x</b>"
+        assert ClipboardFormat.HTML in snapshot.loaded
+    
+    def test_lazy_load_after_change_raises(self, clipboard):
+        clipboard.set_html("<b>x</b>", "x")
+        snapshot = clipboard.snapshot([ClipboardFormat.PLAIN_TEXT])
+        clipboard.set_html("<b>y</b>", "y")
+        with pytest.raises(ClipboardChangedError):
+            snapshot.get_html()
+    
+    def test_retries_when_clipboard_changes_mid_read(self):
+        backend = ChangingBackend(changes=1)
+        backend.set_html("<b>0</b>", "0")
+        snapshot = Clipboard(backend).snapshot()
+        assert backend.html_reads == 2
+        assert snapshot.loaded == {ClipboardFormat.HTML: "<b>1</b>", ClipboardFormat.PLAIN_TEXT: "1"}
+    
+    def test_gives_up_after_retries(self):
+        backend = ChangingBackend(changes=10)
+        backend.set_html("<b>0</b>", "0")
+        with pytest.raises(ClipboardChangedError):
+            Clipboard(backend).snapshot(retries=2)
+        assert backend.html_reads == 3
+    
+    def test_parallel_reads(self):
+        backend = SlowBackend(0.2, concurrent=True)
+        backend.set_html("<b>x</b>", "x")
+        start = time.monotonic()
+        Clipboard(backend).snapshot()
+        assert time.monotonic() - start < 0.35
+        assert len(backend.threads) == 2
+    
+    def test_sequential_reads_without_concurrency(self):
+        backend = SlowBackend(0.01, concurrent=False)
+        backend.set_html("<b>x</b>", "x")
+        Clipboard(backend).snapshot()
+        assert backend.threads == {threading.current_thread().name}
+    
+    def test_invalid_format_rejected(self, clipboard):
+        with pytest.raises(ClipboardFormatError):
+            clipboard.snapshot(["html"])
+
+
+class TestGetMany:
+    """Tests for Clipboard.get_many()."""
+    
+    def test_returns_available_formats(self, clipboard):
+        clipboard.set_html("<b>x</b>", "x")
+        result = clipboard.get_many([ClipboardFormat.PLAIN_TEXT, ClipboardFormat.HTML, ClipboardFormat.IMAGE])
+        assert result == {ClipboardFormat.PLAIN_TEXT: "x", ClipboardFormat.HTML: "<b>x</b>"}
+    
+    def test_empty_clipboard(self, clipboard):
+        assert clipboard.get_many(list(ClipboardFormat)) == {}
@@ -0,0 +1,40 @@
+"""Tests for image type sniffing."""
+
+import struct
+
+import pytest
+
+from zclipboard.sniff import is_dib, sniff_image_type
+
+DIB = struct.pack("<IiiHHI", 40, 2, 2, 1, 24, 0) + bytes(20)
+
+
+class TestSniffImageType:
+    """Tests for sniff_image_type()."""
+    
+    @pytest.mark.parametrize(
+        "data, mime_type",
+        [
+            (b"\x89PNG\r\n\x1a\n" + bytes(8), "image/png"),
+            (b"\xff\xd8\xff\xe0" + bytes(8), "image/jpeg"),
+            (b"BM" + bytes(12) + DIB, "image/bmp"),
+            (b"II*\x00" + bytes(4), "image/tiff"),
+            (b"MM\x00*" + bytes(4), "image/tiff"),
+            (b"GIF89a" + bytes(4), "image/gif"),
+            (b"RIFF\x00\x00\x00\x00WEBPVP8 ", "image/webp"),
+        ],
+    )
+    def test_recognised(self, data, mime_type):
+        assert sniff_image_type(data) == mime_type
+        assert sniff_image_type(memoryview(data)) == mime_type
+    
+    def test_unrecognised(self):
+        assert sniff_image_type(b"BMW owners club") is None
+        assert sniff_image_type(b"RIFF\x00\x00\x00\x00WAVE") is None
+        assert sniff_image_type(b"") is None
+        assert sniff_image_type(DIB) is None
+    
+    def test_is_dib(self):
+        assert is_dib(DIB)
+        assert not is_dib(b"BM" + bytes(12) + DIB)
+        assert not is_dib(b"plain text, not a bitmap")
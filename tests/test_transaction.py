@@ -0,0 +1,185 @@
+"""Tests for multi-format clipboard transactions."""
+
+from unittest.mock import patch
+
+import pytest
+
+from zclipboard import Clipboard, ClipboardFormat
+from zclipboard.backends.memory import MemoryClipboardBackend
+from zclipboard.backends.win32api import FakeWin32Api
+from zclipboard.backends.windows import WindowsClipboardBackend
+from zclipboard.codecs.image import Bitmap, encode_png
+from zclipboard.exceptions import ClipboardError, ClipboardFormatError
+
+HTML = "<p>Sales <b>up</b></p>"
+RTF = r"{\rtf1\ansi Sales \b up\b0}"
+TEXT = "Sales up"
+
+
+@pytest.fixture
+def png():
+    return encode_png(Bitmap(2, 1, "RGBA", bytes(range(8))))
+
+
+def write_all(clipboard, png):
+    with clipboard.transaction() as tx:
+        tx.set_text(TEXT)
+        tx.set_html(HTML)
+        tx.set_rtf(RTF)
+        tx.set_image(png)
+    return tx
+
+
+class TestTransaction:
+    """Tests for collecting and committing formats."""
+    
+    def test_commits_every_format_at_once(self, png):
+        backend = MemoryClipboardBackend()
+        clipboard = Clipboard(backend=backend)
+        clipboard.set_text("old")
+        generation = backend.fingerprint()
+        
+        tx = write_all(clipboard, png)
+        
+        assert tx.committed
+        assert backend.fingerprint() == generation + 1
+        assert clipboard.get_available_formats() == list(ClipboardFormat)
+        assert (clipboard.get_text(), clipboard.get_html(), clipboard.get_rtf()) == (TEXT, HTML, RTF)
+        assert clipboard.get_image() == png
+    
+    def test_nothing_written_until_block_ends(self):
+        clipboard = Clipboard(backend=MemoryClipboardBackend())
+        clipboard.set_text("old")
+        
+        with clipboard.transaction() as tx:
+            tx.set_html(HTML)
+            assert clipboard.get_text() == "old"
+            assert tx.contents == {ClipboardFormat.HTML: HTML}
+        
+        assert clipboard.get_text() is None
+    
+    def test_discarded_when_block_raises(self):
+        clipboard = Clipboard(backend=MemoryClipboardBackend())
+        clipboard.set_text("old")
+        
+        with pytest.raises(RuntimeError):
+            with clipboard.transaction() as tx:
+                tx.set_text("new")
+                raise RuntimeError
+        
+        assert not tx.committed
+        assert clipboard.get_text() == "old"
+    
+    def test_setting_again_replaces(self):
+        clipboard = Clipboard(backend=MemoryClipboardBackend())
+        
+        with clipboard.transaction() as tx:
+            tx.set_text("first")
+            tx.set(ClipboardFormat.PLAIN_TEXT, "second")
+        
+        assert clipboard.get_text() == "second"
+    
+    def test_empty_transaction_rejected(self):
+        clipboard = Clipboard(backend=MemoryClipboardBackend())
+        
+        with pytest.raises(ClipboardFormatError):
+            with clipboard.transaction():
+                pass
+    
+    def test_invalid_content_rejected(self):
+        tx = Clipboard(backend=MemoryClipboardBackend()).transaction()
+        
+        with pytest.raises(ClipboardFormatError):
+            tx.set(ClipboardFormat.IMAGE, "not bytes")
+        with pytest.raises(ClipboardFormatError):
+            tx.set(ClipboardFormat.HTML, b"<b>bytes</b>")
+        with pytest.raises(ClipboardFormatError):
+            tx.set("html", "<b>x</b>")
+    
+    def test_no_changes_after_commit(self):
+        tx = Clipboard(backend=MemoryClipboardBackend()).transaction()
+        tx.set_text("x")
+        tx.commit()
+        
+        with pytest.raises(ClipboardError):
+            tx.set_text("y")
+        with pytest.raises(ClipboardError):
+            tx.commit()
+    
+    def test_image_array(self):
+        numpy = pytest.importorskip("numpy")
+        clipboard = Clipboard(backend=MemoryClipboardBackend())
+        array = numpy.arange(12, dtype=numpy.uint8).reshape(2, 2, 3)
+        
+        with clipboard.transaction() as tx:
+            tx.set_image_array(array)
+            tx.set_text("pixels")
+        
+        assert (clipboard.get_image_array() == array).all()
+        assert clipboard.get_text() == "pixels"
+
+
+class TestBackendSetMany:
+    """Tests for the single ownership change each backend commits a transaction with."""
+    
+    def test_windows_opens_and_empties_once(self, png):
+        api = FakeWin32Api()
+        clipboard = Clipboard(backend=WindowsClipboardBackend(api=api))
+        clipboard.set_text("old")
+        api.calls.clear()
+        
+        write_all(clipboard, png)
+        
+        assert api.calls["open_clipboard"] == 1
+        assert api.calls["empty_clipboard"] == 1
+        assert api.calls["set_clipboard_data"] == 5  # PNG and CF_DIB for the image
+        assert set(clipboard.get_available_formats()) == set(ClipboardFormat)
+        assert (clipboard.get_text(), clipboard.get_html(), clipboard.get_rtf()) == (TEXT, HTML, RTF)
+        assert clipboard.get_image() == png
+    
+    def test_xclip_serves_every_target_from_one_owner(self, png):
+        with patch("shutil.which", return_value="/usr/bin/xclip"):
+            from zclipboard.backends.linux import LinuxClipboardBackend
+            backend = LinuxClipboardBackend()
+        
+        with patch.object(backend.owners, "own") as mock_own:
+            write_all(Clipboard(backend=backend), png)
+        
+        mock_own.assert_called_once_with({
+            "UTF8_STRING": TEXT.encode(),
+            "text/html": HTML.encode(),
+            "text/rtf": RTF.encode(),
+            "image/png": png,
+        })
+    
+    def test_x11_takes_selection_once(self, fake_x_server, png):
+        from zclipboard.backends.x11 import X11ClipboardBackend
+        
+        writer = X11ClipboardBackend(display=fake_x_server.display)
+        reader = Clipboard(backend=X11ClipboardBackend(display=fake_x_server.display))
+        try:
+            owner_changes = fake_x_server.request_counts.get(22, 0)
+            write_all(Clipboard(backend=writer), png)
+            
+            assert fake_x_server.request_counts[22] == owner_changes + 1
+            assert set(reader.get_available_formats()) == set(ClipboardFormat)
+            assert (reader.get_text(), reader.get_html(), reader.get_rtf()) == (TEXT, HTML, RTF)
+            assert reader.get_image() == png
+        finally:
+            writer.close()
+            reader.backend.close()
+    
+    def test_default_combines_rich_format_with_text(self, clipboard_with_mock):
+        with clipboard_with_mock.transaction() as tx:
+            tx.set_rtf(RTF)
+            tx.set_text(TEXT)
+        
+        assert (clipboard_with_mock.get_rtf(), clipboard_with_mock.get_text()) == (RTF, TEXT)
+    
+    def test_default_rejects_what_it_cannot_offer_together(self, clipboard_with_mock, png):
+        clipboard_with_mock.set_text("old")
+        
+        with pytest.raises(ClipboardFormatError):
+            write_all(clipboard_with_mock, png)
+        
+        assert clipboard_with_mock.get_text() == "old"
@@ -0,0 +1,191 @@
+"""Tests for clipboard change notification."""
+
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+
+from zclipboard import Clipboard, ClipboardFormat
+from zclipboard.backends import MemoryClipboardBackend
+from zclipboard.exceptions import ClipboardTimeoutError
+from zclipboard.watch import (
+    ClipboardWatcher,
+    PollingChangeSource,
+    XFixesChangeSource,
+    content_tokens,
+    default_change_source,
+)
+
+
+@pytest.fixture
+def clipboard():
+    return Clipboard(backend=MemoryClipboardBackend())
+
+
+def polling(clipboard, **kwargs):
+    kwargs.setdefault("min_interval", 0.01)
+    kwargs.setdefault("max_interval", 0.05)
+    return PollingChangeSource(clipboard, **kwargs)
+
+
+def later(delay, func, *args):
+    timer = threading.Timer(delay, func, args)
+    timer.start()
+    return timer
+
+
+class TestPollingChangeSource:
+    """Tests for PollingChangeSource."""
+    
+    def test_reports_changed_formats(self, clipboard):
+        clipboard.set_html("<b>a</b>", "a")
+        source = polling(clipboard, signature=content_tokens)
+        clipboard.set_html("<b>b</b>", "a")
+        assert source.wait(1) == {ClipboardFormat.HTML}
+    
+    def test_default_signature_does_not_fetch_payloads(self, clipboard):
+        clipboard.set_image(b"large screenshot")
+        source = polling(clipboard)
+        with patch.object(clipboard.backend, "get_image", side_effect=AssertionError("payload fetched")):
+            clipboard.set_image(b"another screenshot")
+            assert ClipboardFormat.IMAGE in source.wait(1)
+            assert source.wait(0.05) is None
+    
+    def test_timeout_without_change(self, clipboard):
+        source = polling(clipboard)
+        start = time.monotonic()
+        assert source.wait(0.1) is None
+        assert time.monotonic() - start >= 0.1
+    
+    def test_interval_backs_off_and_resets(self, clipboard):
+        source = polling(clipboard, min_interval=0.01, max_interval=0.04, backoff=2)
+        source.wait(0.2)
+        assert source.interval == 0.04
+        
+        clipboard.set_text("new")
+        assert ClipboardFormat.PLAIN_TEXT in source.wait(1)
+        assert source.interval == 0.01
+    
+    def test_close_interrupts_wait(self, clipboard):
+        source = polling(clipboard, min_interval=5, max_interval=5)
+        later(0.05, source.close)
+        assert source.wait() is None
+        assert source.closed
+    
+    def test_invalid_intervals(self, clipboard):
+        with pytest.raises(ValueError):
+            PollingChangeSource(clipboard, min_interval=2, max_interval=1)
+
+
+class TestClipboardWatcher:
+    """Tests for ClipboardWatcher over a polling source."""
+    
+    def test_wait_for_change(self, clipboard):
+        clipboard.set_text("old")
+        with ClipboardWatcher(clipboard, source=polling(clipboard)) as watcher:
+            later(0.05, clipboard.set_image, b"png")
+            change = watcher.wait_for_change(timeout=2)
+        
+        assert change.formats == [ClipboardFormat.IMAGE]
+        assert change.changed == [ClipboardFormat.IMAGE]
+        assert change.removed == [ClipboardFormat.PLAIN_TEXT]
+    
+    def test_bursts_are_debounced(self, clipboard):
+        watcher = ClipboardWatcher(clipboard, source=polling(clipboard), debounce=0.2)
+        
+        def burst():
+            for index in range(5):
+                clipboard.set_text(f"burst {index}")
+                time.sleep(0.02)
+        
+        later(0.02, burst)
+        change = watcher.wait_for_change(timeout=2)
+        watcher.stop()
+        assert change.changed == [ClipboardFormat.PLAIN_TEXT]
+        assert watcher.wait_for_change(timeout=0.1) is None
+        assert clipboard.get_text() == "burst 4"
+    
+    def test_callback(self, clipboard):
+        changes = []
+        received = threading.Event()
+        
+        def on_change(change):
+            changes.append(change)
+            received.set()
+        
+        watcher = clipboard.watch(on_change, source=polling(clipboard))
+        clipboard.set_rtf("{\\rtf1 x}")
+        assert received.wait(2)
+        watcher.stop()
+        assert changes[0].changed == [ClipboardFormat.RTF]
+    
+    def test_callback_error_skips_change(self, clipboard):
+        changes = []
+        failed = threading.Event()
+        received = threading.Event()
+        
+        def on_change(change):
+            changes.append(change)
+            if not failed.is_set():
+                failed.set()
+                raise ClipboardTimeoutError("xclip timed out")
+            received.set()
+        
+        watcher = clipboard.watch(on_change, source=polling(clipboard))
+        clipboard.set_text("first")
+        assert failed.wait(2)
+        clipboard.set_rtf("{\\rtf1 x}")
+        assert received.wait(2)
+        watcher.stop()
+        assert changes[1].changed == [ClipboardFormat.RTF]
+    
+    def test_iteration_ends_on_stop(self, clipboard):
+        watcher = clipboard.watch(source=polling(clipboard))
+        later(0.05, clipboard.set_text, "x")
+        for change in watcher:
+            assert change.changed == [ClipboardFormat.PLAIN_TEXT]
+            watcher.stop()
+        assert watcher.source.closed
+    
+    def test_default_source_polls_without_x(self, clipboard):
+        assert isinstance(default_change_source(clipboard), PollingChangeSource)
+
+
+class TestXFixesWatch:
+    """Tests for event-driven watching against a fake X server."""
+    
+    @pytest.fixture
+    def x11_backends(self, fake_x_server):
+        from zclipboard.backends.x11 import X11ClipboardBackend
+        
+        writer = X11ClipboardBackend(display=fake_x_server.display)
+        reader = X11ClipboardBackend(display=fake_x_server.display)
+        yield writer, reader
+        writer.close()
+        reader.close()
+    
+    def test_source_signals_owner_change(self, x11_backends, fake_x_server):
+        writer, _ = x11_backends
+        source = XFixesChangeSource(fake_x_server.display)
+        try:
+            assert source.wait(0.05) is None
+            writer.set_text("changed")
+            assert source.wait(2)
+        finally:
+            source.close()
+        assert source.wait(0.05) is None
+    
+    def test_watcher_uses_xfixes_and_skips_payloads(self, x11_backends, fake_x_server):
+        writer, reader = x11_backends
+        watcher = Clipboard(backend=reader).watch()
+        try:
+            assert isinstance(watcher.source, XFixesChangeSource)
+            writer.set_html("<b>pushed</b>", "pushed")
+            change = watcher.wait_for_change(timeout=2)
+        finally:
+            watcher.stop()
+        
+        assert change.changed == [ClipboardFormat.HTML, ClipboardFormat.PLAIN_TEXT]
+        # A single TARGETS conversion for the new owner; no payload was fetched.
+        assert fake_x_server.request_counts[24] == 1
@@ -0,0 +1,54 @@
+"""Tests for X selection target negotiation."""
+
+from zclipboard import ClipboardFormat
+from zclipboard.backends.xtargets import TargetMap, classify_target, decode_text
+
+
+class TestClassifyTarget:
+    """Tests for mapping target names to formats."""
+    
+    def test_text_targets(self):
+        for target in ("UTF8_STRING", "STRING", "text/plain", "text/plain;charset=utf-8"):
+            assert classify_target(target) == ClipboardFormat.PLAIN_TEXT
+    
+    def test_rich_and_image_targets(self):
+        assert classify_target("text/html") == ClipboardFormat.HTML
+        assert classify_target("text/rtf") == ClipboardFormat.RTF
+        assert classify_target("image/jpeg") == ClipboardFormat.IMAGE
+    
+    def test_unknown_targets(self):
+        assert classify_target("TARGETS") is None
+        assert classify_target("text/plain;charset=no-such-codec") is None
+        assert classify_target("application/x-moz-nativehtml") is None
+    
+    def test_non_raster_images_ignored(self):
+        for target in ("image/svg+xml", "image/x-icon", "image/avif"):
+            assert classify_target(target) is None
+        assert TargetMap(["image/svg+xml"]).formats == []
+
+
+class TestTargetMap:
+    """Tests for the precomputed target map."""
+    
+    def test_formats_in_offer_order(self):
+        target_map = TargetMap(["TARGETS", "text/html", "UTF8_STRING", "STRING", "image/png"])
+        assert target_map.formats == [ClipboardFormat.HTML, ClipboardFormat.PLAIN_TEXT, ClipboardFormat.IMAGE]
+    
+    def test_best_target_follows_preference(self):
+        target_map = TargetMap(["STRING", "text/plain", "UTF8_STRING", "image/tiff", "image/png"])
+        assert target_map.best(ClipboardFormat.PLAIN_TEXT) == "UTF8_STRING"
+        assert target_map.best(ClipboardFormat.IMAGE) == "image/png"
+        assert target_map.best(ClipboardFormat.HTML) is None
+
+
+class TestDecodeText:
+    """Tests for charset-aware decoding."""
+    
+    def test_string_is_latin1(self):
+        assert decode_text("caf\xe9".encode("latin-1"), "STRING") == "caf\xe9"
+    
+    def test_charset_parameter(self):
+        assert decode_text("hi".encode("utf-16-le"), "text/plain;charset=UTF-16LE") == "hi"
+    
+    def test_utf16_bom_detected(self):
+        assert decode_text("<b>x</b>".encode("utf-16"), "text/html") == "<b>x</b>"
@@ -5,8 +5,9 @@ Supports Windows (Win32), MacOS (Cocoa), and Linux (XClip).
 Handles multiple clipboard representations: plain text, rich text, image, etc.
 """
 
+from zclipboard.async_clipboard import AsyncClipboard
 from zclipboard.clipboard import Clipboard
 from zclipboard.data_types import ClipboardFormat
 
 __version__ = "1.0.1"
-__all__ = ["Clipboard", "ClipboardFormat"]
+__all__ = ["AsyncClipboard", "Clipboard", "ClipboardFormat"]
@@ -0,0 +1,251 @@
+"""Asyncio clipboard interface."""
+
+import asyncio
+import functools
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterable, List, Optional
+
+from zclipboard.backends.base import ClipboardBackend, ContentProvider
+from zclipboard.clipboard import Clipboard
+from zclipboard.data_types import ClipboardData, ClipboardFormat, ClipboardInfo
+from zclipboard.exceptions import ClipboardFormatError, ClipboardTimeoutError
+from zclipboard.image import ClipboardImage
+from zclipboard.snapshot import DEFAULT_RETRIES, ClipboardSnapshot
+
+
+class AsyncClipboard:
+    """
+    Asyncio counterpart of Clipboard.
+    
+    Reads on backends that support it (the xclip-based Linux backend) run as
+    asyncio subprocesses, which are killed when the call is cancelled or
+    times out. Every other operation runs on a single worker thread, so
+    blocking backends never hold up the event loop and are never entered
+    concurrently. A cancelled or timed-out call on the worker thread still
+    runs to completion there before the next one starts.
+    """
+    
+    def __init__(
+        self,
+        backend: Optional[ClipboardBackend] = None,
+        timeout: Optional[float] = None,
+        executor: Optional[Executor] = None,
+    ):
+        """
+        Initialize the async clipboard.
+        
+        Args:
+            backend: Custom backend instance. If None, auto-detects platform.
+            timeout: Default per-call timeout in seconds. None means only
+                the backend's own timeouts apply.
+            executor: Executor for blocking operations. Defaults to a
+                private single-thread executor.
+        """
+        self._clipboard = Clipboard(backend)
+        self._owns_executor = executor is None
+        self._executor = executor or ThreadPoolExecutor(max_workers=1, thread_name_prefix="zclipboard")
+        self._timeout = timeout
+    
+    async def __aenter__(self) -> "AsyncClipboard":
+        return self
+    
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+    
+    @property
+    def backend(self) -> ClipboardBackend:
+        """Get the current clipboard backend."""
+        return self._clipboard.backend
+    
+    @property
+    def clipboard(self) -> Clipboard:
+        """The blocking Clipboard sharing this backend."""
+        return self._clipboard
+    
+    async def aclose(self) -> None:
+        """Shut down the private executor, if one was created."""
+        if self._owns_executor:
+            self._executor.shutdown(wait=False)
+    
+    async def _bounded(self, awaitable: Awaitable[Any], timeout: Optional[float]) -> Any:
+        """Await with the per-call or default timeout."""
+        if timeout is None:
+            timeout = self._timeout
+        if timeout is None:
+            return await awaitable
+        try:
+            return await asyncio.wait_for(awaitable, timeout)
+        except asyncio.TimeoutError:
+            raise ClipboardTimeoutError(f"Clipboard operation timed out after {timeout} seconds")
+    
+    async def _run(self, func: Callable[..., Any], *args: Any, timeout: Optional[float] = None) -> Any:
+        """Run a blocking call on the executor."""
+        loop = asyncio.get_running_loop()
+        return await self._bounded(loop.run_in_executor(self._executor, functools.partial(func, *args)), timeout)
+    
+    async def _read(self, format_type: ClipboardFormat, timeout: Optional[float]) -> Any:
+        backend = self.backend
+        if getattr(backend, "supports_async_reads", False):
+            return await self._bounded(backend.read_format_async(format_type, self._executor), timeout)
+        getters = {
+            ClipboardFormat.HTML: backend.get_html,
+            ClipboardFormat.IMAGE: backend.get_image,
+            ClipboardFormat.PLAIN_TEXT: backend.get_text,
+            ClipboardFormat.RTF: backend.get_rtf,
+        }
+        if format_type not in getters:
+            raise ClipboardFormatError(f"Unsupported format: {format_type}")
+        return await self._run(getters[format_type], timeout=timeout)
+    
+    async def clear(self, *, timeout: Optional[float] = None) -> None:
+        """Clear all clipboard contents."""
+        await self._run(self._clipboard.clear, timeout=timeout)
+    
+    async def fingerprint(self, *, timeout: Optional[float] = None) -> Hashable:
+        """Return an opaque token that changes whenever the clipboard contents change."""
+        return await self._run(self.backend.fingerprint, timeout=timeout)
+    
+    async def get(
+        self, format_type: Optional[ClipboardFormat] = None, *, timeout: Optional[float] = None
+    ) -> Optional[ClipboardData]:
+        """
+        Get clipboard content in the specified format.
+        
+        Args:
+            format_type: Desired format. If None, returns first available format.
+            timeout: Seconds to wait for each backend call.
+        
+        Returns:
+            ClipboardData object or None if clipboard is empty.
+        """
+        if format_type is None:
+            available = await self.get_available_formats(timeout=timeout)
+            if not available:
+                return None
+            format_type = available[0]
+        
+        data = await self._read(format_type, timeout)
+        if data is not None:
+            return ClipboardData(data, format_type)
+        return None
+    
+    async def get_available_formats(self, *, timeout: Optional[float] = None) -> List[ClipboardFormat]:
+        """Get list of available formats currently on clipboard."""
+        backend = self.backend
+        if getattr(backend, "supports_async_reads", False):
+            return await self._bounded(backend.get_available_formats_async(), timeout)
+        return await self._run(backend.get_available_formats, timeout=timeout)
+    
+    async def get_many(
+        self,
+        formats: Iterable[ClipboardFormat],
+        retries: int = DEFAULT_RETRIES,
+        *,
+        timeout: Optional[float] = None,
+    ) -> Dict[ClipboardFormat, Any]:
+        """Get several formats, all from the same clipboard contents. See Clipboard.get_many()."""
+        return await self._run(self._clipboard.get_many, list(formats), retries, timeout=timeout)
+    
+    async def get_html(self, *, max_chars: Optional[int] = None, timeout: Optional[float] = None) -> Optional[str]:
+        """Get HTML content from clipboard, optionally only the first max_chars characters."""
+        if max_chars is not None:
+            return await self._run(self._clipboard.get_html, max_chars, timeout=timeout)
+        return await self._read(ClipboardFormat.HTML, timeout)
+    
+    async def get_info(
+        self, format_type: ClipboardFormat = ClipboardFormat.IMAGE, *, timeout: Optional[float] = None
+    ) -> Optional[ClipboardInfo]:
+        """Describe clipboard content from its first bytes; see Clipboard.get_info()."""
+        return await self._run(self._clipboard.get_info, format_type, timeout=timeout)
+    
+    async def get_image(self, *, max_bytes: Optional[int] = None, timeout: Optional[float] = None) -> Optional[bytes]:
+        """Get image data from clipboard as PNG bytes, optionally only the first max_bytes."""
+        if max_bytes is not None:
+            return await self._run(self._clipboard.get_image, max_bytes, timeout=timeout)
+        return await self._read(ClipboardFormat.IMAGE, timeout)
+    
+    async def get_image_object(self, *, timeout: Optional[float] = None) -> Optional[ClipboardImage]:
+        """Get the clipboard image in its native encoding; see Clipboard.get_image_object()."""
+        return await self._run(self._clipboard.get_image_object, timeout=timeout)
+    
+    async def get_image_array(self, *, timeout: Optional[float] = None) -> Any:
+        """Get the clipboard image as a NumPy array; see Clipboard.get_image_array()."""
+        return await self._run(self._clipboard.get_image_array, timeout=timeout)
+    
+    async def get_image_thumbnail(
+        self, max_size: int = 256, format_name: str = "PNG", *, timeout: Optional[float] = None
+    ) -> Optional[bytes]:
+        """Get a scaled-down copy of the clipboard image; see Clipboard.get_image_thumbnail()."""
+        return await self._run(self._clipboard.get_image_thumbnail, max_size, format_name, timeout=timeout)
+    
+    async def get_rtf(self, *, max_chars: Optional[int] = None, timeout: Optional[float] = None) -> Optional[str]:
+        """Get RTF content from clipboard, optionally only the first max_chars characters."""
+        if max_chars is not None:
+            return await self._run(self._clipboard.get_rtf, max_chars, timeout=timeout)
+        return await self._read(ClipboardFormat.RTF, timeout)
+    
+    async def get_text(self, *, max_chars: Optional[int] = None, timeout: Optional[float] = None) -> Optional[str]:
+        """Get plain text from clipboard, optionally only the first max_chars characters."""
+        if max_chars is not None:
+            return await self._run(self._clipboard.get_text, max_chars, timeout=timeout)
+        return await self._read(ClipboardFormat.PLAIN_TEXT, timeout)
+    
+    async def has_format(self, format_type: ClipboardFormat, *, timeout: Optional[float] = None) -> bool:
+        """Check if clipboard contains data in the specified format."""
+        return format_type in await self.get_available_formats(timeout=timeout)
+    
+    async def is_empty(self, *, timeout: Optional[float] = None) -> bool:
+        """Check if clipboard is empty."""
+        return len(await self.get_available_formats(timeout=timeout)) == 0
+    
+    async def snapshot(
+        self,
+        formats: Optional[Iterable[ClipboardFormat]] = None,
+        retries: int = DEFAULT_RETRIES,
+        *,
+        timeout: Optional[float] = None,
+    ) -> ClipboardSnapshot:
+        """
+        Capture a consistent view of the clipboard. See Clipboard.snapshot().
+        
+        Formats not read up front are fetched by the returned snapshot's
+        blocking methods.
+        """
+        formats = list(formats) if formats is not None else None
+        return await self._run(self._clipboard.snapshot, formats, retries, timeout=timeout)
+    
+    async def set(
+        self, data: ClipboardData, plain_text_fallback: Optional[str] = None, *, timeout: Optional[float] = None
+    ) -> None:
+        """Set clipboard content from ClipboardData object."""
+        await self._run(self._clipboard.set, data, plain_text_fallback, timeout=timeout)
+    
+    async def set_html(
+        self, html_content: str, plain_text_fallback: Optional[str] = None, *, timeout: Optional[float] = None
+    ) -> None:
+        """Set HTML content to clipboard."""
+        await self._run(self._clipboard.set_html, html_content, plain_text_fallback, timeout=timeout)
+    
+    async def set_image(self, image_data: bytes, *, timeout: Optional[float] = None) -> None:
+        """Set image data to clipboard."""
+        await self._run(self._clipboard.set_image, image_data, timeout=timeout)
+    
+    async def set_image_array(self, array: Any, compress_level: int = 1, *, timeout: Optional[float] = None) -> None:
+        """Set an image array to the clipboard; see Clipboard.set_image_array()."""
+        await self._run(self._clipboard.set_image_array, array, compress_level, timeout=timeout)
+    
+    async def set_lazy(
+        self, providers: Dict[ClipboardFormat, ContentProvider], *, timeout: Optional[float] = None
+    ) -> None:
+        """Offer content that is only produced when someone pastes it. See Clipboard.set_lazy()."""
+        await self._run(self._clipboard.set_lazy, providers, timeout=timeout)
+    
+    async def set_rtf(
+        self, rtf_content: str, plain_text_fallback: Optional[str] = None, *, timeout: Optional[float] = None
+    ) -> None:
+        """Set RTF content to clipboard."""
+        await self._run(self._clipboard.set_rtf, rtf_content, plain_text_fallback, timeout=timeout)
+    
+    async def set_text(self, text: str, *, timeout: Optional[float] = None) -> None:
+        """Set plain text to clipboard."""
+        await self._run(self._clipboard.set_text, text, timeout=timeout)
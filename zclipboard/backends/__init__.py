@@ -1,5 +1,6 @@
 """Platform-specific clipboard backends."""
 
 from zclipboard.backends.base import ClipboardBackend
+from zclipboard.backends.memory import MemoryClipboardBackend
 
-__all__ = ["ClipboardBackend"]
+__all__ = ["ClipboardBackend", "MemoryClipboardBackend"]
@@ -1,9 +1,18 @@
 """Abstract base class for clipboard backends."""
 
+import contextlib
+import hashlib
+import io
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from typing import Any, BinaryIO, Callable, ContextManager, Dict, Hashable, List, Optional
 
-from zclipboard.data_types import ClipboardFormat
+from zclipboard.data_types import ClipboardFormat, ClipboardInfo
+from zclipboard.exceptions import ClipboardFormatError
+from zclipboard.image import ClipboardImage
+from zclipboard.imageinfo import probe
+
+# Callable producing the content of one format on demand.
+ContentProvider = Callable[[], Any]
 
 
 class ClipboardBackend(ABC):
@@ -14,6 +23,35 @@ class ClipboardBackend(ABC):
         """Clear all clipboard contents."""
         pass
     
+    def fingerprint(self) -> Hashable:
+        """
+        Return an opaque token that changes whenever the clipboard contents change.
+        
+        Equal tokens mean the contents are unchanged. This default fetches
+        and hashes every available format; backends with a cheap change
+        counter or owner identity override it.
+        """
+        getters = {
+            ClipboardFormat.HTML: self.get_html,
+            ClipboardFormat.IMAGE: self.get_image,
+            ClipboardFormat.PLAIN_TEXT: self.get_text,
+            ClipboardFormat.RTF: self.get_rtf,
+        }
+        digest = hashlib.blake2b(digest_size=16)
+        for format_type in self.get_available_formats():
+            content = getters[format_type]()
+            if isinstance(content, str):
+                content = content.encode("utf-8", errors="surrogatepass")
+            content = content or b""
+            digest.update(f"{format_type.name}:{len(content)}:".encode("ascii"))
+            digest.update(content)
+        return digest.digest()
+    
+    @property
+    def supports_concurrent_reads(self) -> bool:
+        """True if get_* calls from several threads run in parallel rather than one at a time."""
+        return False
+    
     @abstractmethod
     def get_available_formats(self) -> List[ClipboardFormat]:
         """Return list of available formats currently on clipboard."""
@@ -29,6 +67,17 @@ class ClipboardBackend(ABC):
         """Get image data from clipboard as PNG bytes."""
         pass
     
+    def get_image_object(self) -> Optional[ClipboardImage]:
+        """
+        Get the clipboard image in the encoding its owner offered.
+        
+        Conversion to PNG is deferred to ClipboardImage.to_png(). This
+        default wraps get_image(); backends that receive other encodings
+        override it and implement get_image() on top of it.
+        """
+        data = self.get_image()
+        return ClipboardImage(data, "image/png") if data is not None else None
+    
     @abstractmethod
     def get_rtf(self) -> Optional[str]:
         """Get RTF content from clipboard."""
@@ -39,6 +88,92 @@ class ClipboardBackend(ABC):
         """Get plain text from clipboard."""
         pass
     
+    def read_into(self, format_type: ClipboardFormat, write: Callable[[bytes], Any]) -> bool:
+        """
+        Pass the content of format_type to write, in one or more chunks.
+        
+        Text formats are written as UTF-8 and IMAGE as PNG. This default
+        reads the whole payload first; backends that can stream override it.
+        
+        Returns:
+            False if the format is not available.
+        """
+        getters = {
+            ClipboardFormat.HTML: self.get_html,
+            ClipboardFormat.IMAGE: self.get_image,
+            ClipboardFormat.PLAIN_TEXT: self.get_text,
+            ClipboardFormat.RTF: self.get_rtf,
+        }
+        if format_type not in getters:
+            raise ClipboardFormatError(f"Unsupported format: {format_type}")
+        content = getters[format_type]()
+        if content is None:
+            return False
+        if isinstance(content, str):
+            content = content.encode("utf-8", errors="surrogatepass")
+        write(content)
+        return True
+    
+    def get_info(self, format_type: ClipboardFormat) -> Optional[ClipboardInfo]:
+        """
+        Describe the content of format_type from its first bytes.
+        
+        This default fetches images in their native encoding and text
+        through open_stream(); backends that can read a prefix or know the
+        size up front override it.
+        
+        Returns:
+            The description, or None if the format is not available.
+        """
+        if format_type == ClipboardFormat.IMAGE:
+            image = self.get_image_object()
+            if image is None:
+                return None
+            return probe(format_type, io.BytesIO(image.data), image.mime_type, len(image.data))
+        stream = self.open_stream(format_type)
+        if stream is None:
+            return None
+        with stream:
+            return probe(format_type, stream)
+    
+    def open_stream(self, format_type: ClipboardFormat) -> Optional[BinaryIO]:
+        """
+        Open the content of format_type as a readable binary stream.
+        
+        Text formats read as UTF-8 and IMAGE as PNG. Closing the stream
+        early abandons the transfer. This default reads the whole payload
+        into memory; backends that can stream override it.
+        
+        Returns:
+            The stream, or None if the format is not available.
+        """
+        chunks: List[bytes] = []
+        if not self.read_into(format_type, chunks.append):
+            return None
+        return io.BytesIO(b"".join(chunks))
+    
+    def read_to_file(self, format_type: ClipboardFormat, file: BinaryIO) -> bool:
+        """
+        Write the content of format_type to a binary file, as read_into() does.
+        
+        Backends that can move the data without passing it through Python
+        override this.
+        
+        Returns:
+            False if the format is not available.
+        """
+        return self.read_into(format_type, file.write)
+    
+    def session(self) -> ContextManager[None]:
+        """
+        Return a context manager that holds the clipboard for a batch of calls.
+        
+        Backends that open the clipboard for each call keep it open until
+        the block ends, and calls from other threads wait for it. This
+        default does nothing.
+        """
+        return contextlib.nullcontext()
+    
     @abstractmethod
     def set_html(self, html_content: str, plain_text_fallback: Optional[str] = None) -> None:
         """Set HTML content to clipboard with optional plain text fallback."""
@@ -49,6 +184,76 @@ class ClipboardBackend(ABC):
         """Set image data to clipboard (expects PNG format)."""
         pass
     
+    def set_from_file(self, format_type: ClipboardFormat, file: BinaryIO) -> None:
+        """
+        Set the clipboard to the rest of a binary file.
+        
+        The file holds UTF-8 for text formats and PNG for IMAGE. This
+        default reads it whole; backends that can serve it without loading
+        it into Python override this.
+        """
+        content = file.read()
+        if format_type == ClipboardFormat.IMAGE:
+            self.set_image(content)
+            return
+        setters = {
+            ClipboardFormat.HTML: self.set_html,
+            ClipboardFormat.PLAIN_TEXT: self.set_text,
+            ClipboardFormat.RTF: self.set_rtf,
+        }
+        if format_type not in setters:
+            raise ClipboardFormatError(f"Unsupported format: {format_type}")
+        setters[format_type](content.decode("utf-8", errors="replace"))
+    
+    def set_lazy(self, providers: Dict[ClipboardFormat, ContentProvider]) -> None:
+        """
+        Offer formats whose content is produced only when requested.
+        
+        Backends that cannot defer rendering call every provider up front
+        and write the results together with set_many().
+        
+        Args:
+            providers: Mapping of format to a callable returning its content
+                (str for text formats, PNG bytes for IMAGE).
+        
+        Raises:
+            ClipboardFormatError: The backend cannot offer these formats together.
+        """
+        self.set_many({format_type: provider() for format_type, provider in providers.items()})
+    
+    def set_many(self, contents: Dict[ClipboardFormat, Any]) -> None:
+        """
+        Replace the clipboard contents with several formats in one change.
+        
+        Readers never see some of the formats without the others. This
+        default can only combine what set_html() and set_rtf() offer
+        together; backends that can offer any formats at once override it.
+        
+        Args:
+            contents: Mapping of format to content: str for text formats,
+                encoded image bytes for IMAGE. None values are skipped; an
+                empty mapping clears the clipboard.
+        
+        Raises:
+            ClipboardFormatError: The backend cannot offer these formats together.
+        """
+        contents = {format_type: value for format_type, value in contents.items() if value is not None}
+        names = ", ".join(format_type.name for format_type in contents)
+        text = contents.pop(ClipboardFormat.PLAIN_TEXT, None)
+        if not contents:
+            if text is not None:
+                self.set_text(text)
+            else:
+                self.clear()
+        elif list(contents) == [ClipboardFormat.HTML]:
+            self.set_html(contents[ClipboardFormat.HTML], text)
+        elif list(contents) == [ClipboardFormat.RTF]:
+            self.set_rtf(contents[ClipboardFormat.RTF], text)
+        elif list(contents) == [ClipboardFormat.IMAGE] and text is None:
+            self.set_image(contents[ClipboardFormat.IMAGE])
+        else:
+            raise ClipboardFormatError(f"{type(self).__name__} cannot offer {names} together")
+    
     @abstractmethod
     def set_rtf(self, rtf_content: str, plain_text_fallback: Optional[str] = None) -> None:
         """Set RTF content to clipboard with optional plain text fallback."""
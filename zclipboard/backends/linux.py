@@ -1,17 +1,86 @@
 """Linux (XClip) clipboard backend implementation."""
 
+import asyncio
+import codecs
+import contextlib
+import io
+import os
+import select
 import shutil
 import subprocess
-from io import BytesIO
-from typing import List, Optional
+from concurrent.futures import Executor
+from typing import Any, BinaryIO, Callable, Dict, Hashable, Iterator, List, Optional, Tuple
 
-from zclipboard.backends.base import ClipboardBackend
-from zclipboard.data_types import ClipboardFormat
-from zclipboard.exceptions import ClipboardAccessError, ClipboardTimeoutError
+from zclipboard.backends import pipeio
+from zclipboard.backends.base import ClipboardBackend, ContentProvider
+from zclipboard.backends.ownership import FileSlice, ItemData, SelectionOwnerManager
+from zclipboard.backends.xtargets import TargetMap, decode_text, utf8_encoded
+from zclipboard.data_types import ClipboardFormat, ClipboardInfo
+from zclipboard.exceptions import ClipboardAccessError, ClipboardFormatError, ClipboardTimeoutError
+from zclipboard.image import ClipboardImage, cached_transcode, can_transcode, convert_to_png
+from zclipboard.imageinfo import probe
+from zclipboard.sniff import SNIFF_BYTES, sniff_image_type
 
+STREAM_BUFFER_SIZE = 64 * 1024
+STREAM_CHUNK_SIZE = 1024 * 1024
 XCLIP_TIMEOUT = 5
 
 
+class _XclipReader(io.RawIOBase):
+    """Standard output of an xclip process; closing it stops the process."""
+    
+    def __init__(self, process: subprocess.Popen):
+        self._fd = process.stdout.fileno()
+        self._process = process
+    
+    def readable(self) -> bool:
+        return True
+    
+    def readinto(self, buffer) -> int:
+        if not select.select([self._fd], [], [], XCLIP_TIMEOUT)[0]:
+            raise ClipboardTimeoutError("Clipboard operation timed out")
+        return os.readv(self._fd, [buffer])
+    
+    def close(self) -> None:
+        if not self.closed:
+            if self._process.poll() is None:
+                self._process.kill()
+            self._process.wait()
+            self._process.stdout.close()
+        super().close()
+
+
+class _Utf8Sink:
+    """Forward text data as UTF-8, transcoding only if it carries a UTF-16 byte order mark."""
+    
+    def __init__(self, write: Callable[[bytes], Any], target: str):
+        self._buffered: Optional[List[bytes]] = None
+        self._head = b""
+        self._passthrough = utf8_encoded(target)
+        self._target = target
+        self._write = write
+    
+    def write(self, chunk: bytes) -> None:
+        if self._passthrough is None:
+            self._head += chunk
+            if len(self._head) < 2:
+                return
+            chunk, self._head = self._head, b""
+            self._passthrough = not chunk.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE))
+            if not self._passthrough:
+                self._buffered = []
+        if self._passthrough:
+            self._write(chunk)
+        else:
+            self._buffered.append(chunk)
+    
+    def close(self) -> None:
+        if self._head:
+            self._write(self._head)
+        if self._buffered is not None:
+            self._write(decode_text(b"".join(self._buffered), self._target).encode("utf-8"))
+
+
 class LinuxClipboardBackend(ClipboardBackend):
     """Linux clipboard backend using xclip command-line tool."""
     
@@ -29,14 +98,27 @@ class LinuxClipboardBackend(ClipboardBackend):
                 "Install it with: sudo apt-get install xclip (Debian/Ubuntu) "
                 "or sudo dnf install xclip (Fedora)"
             )
+        self._owners = SelectionOwnerManager("CLIPBOARD", self._xclip_path)
+        self._targets: Optional[TargetMap] = None
+        self._targets_owner: Optional[int] = None
+    
+    @property
+    def owners(self) -> Optional[SelectionOwnerManager]:
+        """Manager of the owner processes serving data set through this backend."""
+        return self._owners
     
     def _get_clipboard_data(self, target: str) -> Optional[bytes]:
-        """Get clipboard data for a specific target/mime type."""
+        """
+        Get clipboard data for a specific target/mime type.
+        
+        The data is returned in the bytearray it was read into, to avoid
+        copying large payloads again.
+        """
         try:
-            result = subprocess.run(
+            result = pipeio.run(
                 [self._xclip_path, "-selection", "clipboard", "-target", target, "-o"],
-                capture_output=True,
                 timeout=XCLIP_TIMEOUT,
+                size_hint=self._size_hint(target),
             )
             if result.returncode == 0 and result.stdout:
                 return result.stdout
@@ -46,125 +128,511 @@ class LinuxClipboardBackend(ClipboardBackend):
         except Exception:
             return None
     
+    @contextlib.contextmanager
+    def _xclip_output(self, target: str) -> Iterator[Optional[int]]:
+        """
+        Run xclip for target and yield its stdout descriptor, or None if it
+        cannot be started. The caller reads it to EOF.
+        """
+        try:
+            process = subprocess.Popen(
+                [self._xclip_path, "-selection", "clipboard", "-target", target, "-o"],
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+            )
+        except OSError:
+            yield None
+            return
+        try:
+            fd = process.stdout.fileno()
+            pipeio.enlarge_pipe(fd)
+            yield fd
+            process.wait(XCLIP_TIMEOUT)
+        except subprocess.TimeoutExpired:
+            raise ClipboardTimeoutError("Clipboard operation timed out")
+        finally:
+            if process.returncode is None:
+                process.kill()
+                process.wait()
+            process.stdout.close()
+    
+    def _stream_target(self, target: str, write: Callable[[bytes], Any]) -> bool:
+        """
+        Pass the owner's data for target to write as it arrives.
+        
+        Returns:
+            False if the owner sent nothing.
+        """
+        received = 0
+        with self._xclip_output(target) as fd:
+            if fd is None:
+                return False
+            while True:
+                if not select.select([fd], [], [], XCLIP_TIMEOUT)[0]:
+                    raise ClipboardTimeoutError("Clipboard operation timed out")
+                chunk = os.read(fd, STREAM_CHUNK_SIZE)
+                if not chunk:
+                    break
+                write(chunk)
+                received += len(chunk)
+        return received > 0
+    
+    def _open_target(self, target: str) -> Optional[BinaryIO]:
+        """
+        Open the owner's data for target as a stream read from xclip as it
+        is consumed. Closing the stream kills xclip.
+        
+        Returns:
+            None if the owner sends nothing.
+        """
+        try:
+            process = subprocess.Popen(
+                [self._xclip_path, "-selection", "clipboard", "-target", target, "-o"],
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+            )
+        except OSError:
+            return None
+        stream = io.BufferedReader(_XclipReader(process), STREAM_BUFFER_SIZE)
+        try:
+            if stream.peek(1):
+                return stream
+        except BaseException:
+            stream.close()
+            raise
+        stream.close()
+        return None
+    
+    def _copy_target(self, target: str, fd: int) -> bool:
+        """
+        Copy the owner's data for target to fd without it passing through Python.
+        
+        Returns:
+            False if the owner sent nothing.
+        """
+        with self._xclip_output(target) as source:
+            if source is None:
+                return False
+            try:
+                return pipeio.copy(source, fd, XCLIP_TIMEOUT) > 0
+            except subprocess.TimeoutExpired:
+                raise ClipboardTimeoutError("Clipboard operation timed out")
+    
     def _get_available_targets(self) -> List[str]:
         """Get list of available clipboard targets."""
         try:
-            result = subprocess.run(
+            result = pipeio.run(
                 [self._xclip_path, "-selection", "clipboard", "-target", "TARGETS", "-o"],
-                capture_output=True,
-                text=True,
                 timeout=XCLIP_TIMEOUT,
             )
             if result.returncode == 0:
-                return result.stdout.strip().split("\n")
+                return result.stdout.decode("utf-8", errors="replace").strip().split("\n")
             return []
+        except subprocess.TimeoutExpired:
+            raise ClipboardTimeoutError("Clipboard operation timed out")
         except Exception:
             return []
     
-    def _set_clipboard_data(self, target: str, data: bytes) -> None:
-        """Set clipboard data for a specific target/mime type."""
-        try:
-            process = subprocess.Popen(
-                [self._xclip_path, "-selection", "clipboard", "-target", target, "-i"],
-                stdin=subprocess.PIPE,
-            )
-            process.communicate(input=data, timeout=XCLIP_TIMEOUT)
-            if process.returncode != 0:
-                raise ClipboardAccessError(f"Failed to set clipboard data for target: {target}")
-        except subprocess.TimeoutExpired:
-            process.kill()
-            raise ClipboardTimeoutError("Clipboard operation timed out")
+    @property
+    def supports_async_reads(self) -> bool:
+        """True if reads can run as asyncio subprocesses (see read_format_async())."""
+        return self._xclip_path is not None
     
-    def clear(self) -> None:
+    @property
+    def supports_concurrent_reads(self) -> bool:
+        """True if reads may overlap; each one is a separate xclip process."""
+        return self._xclip_path is not None
+    
+    async def _xclip_output_async(self, target: str) -> Optional[bytes]:
+        """Run ``xclip -o`` for target without blocking the event loop; killed on cancellation."""
         try:
-            process = subprocess.Popen(
-                [self._xclip_path, "-selection", "clipboard", "-i"],
-                stdin=subprocess.PIPE,
+            process = await asyncio.create_subprocess_exec(
+                self._xclip_path, "-selection", "clipboard", "-target", target, "-o",
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.DEVNULL,
             )
-            process.communicate(input=b"", timeout=XCLIP_TIMEOUT)
-        except subprocess.TimeoutExpired:
-            process.kill()
+        except OSError:
+            return None
+        try:
+            stdout, _ = await asyncio.wait_for(process.communicate(), XCLIP_TIMEOUT)
+        except asyncio.TimeoutError:
             raise ClipboardTimeoutError("Clipboard operation timed out")
+        finally:
+            if process.returncode is None:
+                process.kill()
+                await process.wait()
+        if process.returncode == 0 and stdout:
+            return stdout
+        return None
     
-    def get_available_formats(self) -> List[ClipboardFormat]:
-        formats = []
-        targets = self._get_available_targets()
-        
-        for target in targets:
-            target_lower = target.lower()
-            if "text/plain" in target_lower or "utf8_string" in target_lower or "string" == target_lower:
-                if ClipboardFormat.PLAIN_TEXT not in formats:
-                    formats.append(ClipboardFormat.PLAIN_TEXT)
-            elif "text/html" in target_lower:
-                if ClipboardFormat.HTML not in formats:
-                    formats.append(ClipboardFormat.HTML)
-            elif "text/rtf" in target_lower or "richtext" in target_lower:
-                if ClipboardFormat.RTF not in formats:
-                    formats.append(ClipboardFormat.RTF)
-            elif "image/png" in target_lower or "image/jpeg" in target_lower or "image/bmp" in target_lower:
-                if ClipboardFormat.IMAGE not in formats:
-                    formats.append(ClipboardFormat.IMAGE)
-        
-        return formats
+    async def _lookup_targets_async(self, force: bool = False, trust_cache: bool = True) -> Tuple[TargetMap, bool]:
+        """Asynchronous counterpart of _lookup_targets()."""
+        owner = self._selection_owner()
+        cached = self._cached_targets(owner, force, trust_cache)
+        if cached is not None:
+            return cached
+        output = await self._xclip_output_async("TARGETS")
+        targets = output.decode("utf-8", errors="replace").strip().split("\n") if output else []
+        return self._store_targets(owner, targets), True
     
-    def get_html(self) -> Optional[str]:
-        data = self._get_clipboard_data(self.MIME_HTML)
-        if data:
-            return data.decode("utf-8", errors="ignore")
-        return None
+    async def _fetch_format_async(self, format_type: ClipboardFormat) -> Optional[Tuple[str, bytes]]:
+        """Asynchronous counterpart of _fetch_format()."""
+        target_map, verified = await self._lookup_targets_async()
+        tried = target_map.best(format_type)
+        if tried is not None:
+            data = await self._xclip_output_async(tried)
+            if data:
+                return tried, data
+        if verified:
+            return None
+        
+        target = (await self._lookup_targets_async(force=True))[0].best(format_type)
+        if target is None or target == tried:
+            return None
+        data = await self._xclip_output_async(target)
+        return (target, data) if data else None
     
-    def get_image(self) -> Optional[bytes]:
-        png_data = self._get_clipboard_data(self.MIME_IMAGE_PNG)
-        if png_data:
-            return png_data
+    async def get_available_formats_async(self) -> List[ClipboardFormat]:
+        """Like get_available_formats(), without blocking the event loop."""
+        target_map, _ = await self._lookup_targets_async(trust_cache=False)
+        return list(target_map.formats)
+    
+    async def read_format_async(self, format_type: ClipboardFormat, executor: Optional[Executor] = None):
+        """
+        Read one format without blocking the event loop.
+        
+        Only the xclip subprocesses run on the loop; decoding the result,
+        which for images can mean transcoding to PNG, runs on the executor.
+        
+        Args:
+            format_type: Format to read.
+            executor: Executor for decoding; None uses the loop's default.
         
-        for mime_type in ["image/jpeg", "image/bmp", "image/tiff"]:
-            image_data = self._get_clipboard_data(mime_type)
-            if image_data:
-                return self._convert_image_to_png(image_data, mime_type)
+        Returns:
+            The same value as the matching get_* method.
+        """
+        fetched = await self._fetch_format_async(format_type)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(executor, self._decode, format_type, fetched)
+    
+    def _selection_owner(self) -> Optional[int]:
+        """
+        Identify the current selection owner.
         
+        Returns:
+            An owner ID (0 if the selection has no owner), or None if the
+            owner cannot be determined cheaply. xclip cannot report it.
+        """
         return None
     
-    def get_rtf(self) -> Optional[str]:
-        data = self._get_clipboard_data(self.MIME_RTF)
-        if data:
-            return data.decode("utf-8", errors="ignore")
+    def _cached_targets(
+        self, owner: Optional[int], force: bool, trust_cache: bool
+    ) -> Optional[Tuple[TargetMap, bool]]:
+        """Return (target_map, verified) if TARGETS need not be fetched for owner."""
+        if owner == 0:
+            self._targets, self._targets_owner = TargetMap([]), owner
+            return self._targets, True
+        if not force and self._targets is not None:
+            if owner is not None and owner == self._targets_owner:
+                return self._targets, True
+            if owner is None and trust_cache:
+                return self._targets, False
         return None
     
-    def get_text(self) -> Optional[str]:
-        data = self._get_clipboard_data(self.MIME_UTF8)
-        if data:
-            return data.decode("utf-8", errors="ignore")
-        
-        data = self._get_clipboard_data(self.MIME_TEXT)
-        if data:
-            return data.decode("utf-8", errors="ignore")
+    def _size_hint(self, target: str) -> Optional[int]:
+        """
+        Ask the owner for the size of an image target, if it advertises LENGTH.
         
+        Only images are large enough for preallocation to outweigh the extra
+        request. Owners report LENGTH as a 32- or 64-bit INTEGER, which
+        xclip passes through raw, or occasionally as decimal text.
+        """
+        if not target.startswith("image/") or self._targets is None or "LENGTH" not in self._targets.targets:
+            return None
+        length = self._get_clipboard_data("LENGTH")
+        if not length:
+            return None
+        if length.strip().isdigit():
+            return int(length)
+        if len(length) in (4, 8):
+            return int.from_bytes(length, "little") or None
         return None
     
+    def _store_targets(self, owner: Optional[int], targets: List[str]) -> TargetMap:
+        self._targets = TargetMap(targets)
+        self._targets_owner = owner
+        return self._targets
+    
+    def _lookup_targets(self, force: bool = False, trust_cache: bool = True) -> Tuple[TargetMap, bool]:
+        """
+        Return the target map for the current owner, fetching TARGETS only
+        when the owner changed.
+        
+        Args:
+            force: Always fetch TARGETS.
+            trust_cache: Reuse the cached map when the owner is unknown.
+        
+        Returns:
+            Tuple of (target_map, verified). verified is False when a cached
+            map was reused without being able to confirm the owner.
+        """
+        owner = self._selection_owner()
+        cached = self._cached_targets(owner, force, trust_cache)
+        if cached is not None:
+            return cached
+        return self._store_targets(owner, self._get_available_targets()), True
+    
+    def _fetch_format(self, format_type: ClipboardFormat) -> Optional[Tuple[str, bytes]]:
+        """
+        Fetch format_type using the best target the owner offers.
+        
+        A target map that could not be verified against the owner is trusted
+        optimistically; if its best target yields nothing, TARGETS is fetched
+        again and the fetch retried once.
+        
+        Returns:
+            Tuple of (target, data), or None if the format is not available.
+        """
+        target_map, verified = self._lookup_targets()
+        tried = target_map.best(format_type)
+        if tried is not None:
+            data = self._get_clipboard_data(tried)
+            if data:
+                return tried, data
+        if verified:
+            return None
+        
+        target = self._lookup_targets(force=True)[0].best(format_type)
+        if target is None or target == tried:
+            return None
+        data = self._get_clipboard_data(target)
+        return (target, data) if data else None
+    
+    def _decode(self, format_type: ClipboardFormat, fetched: Optional[Tuple[str, bytes]]):
+        """Turn a fetched (target, data) pair into the value returned for format_type."""
+        if not fetched:
+            return None
+        target, data = fetched
+        if format_type != ClipboardFormat.IMAGE:
+            return decode_text(data, target)
+        return self._image(fetched).to_png()
+    
+    def _image(self, fetched: Tuple[str, bytes]) -> ClipboardImage:
+        target, data = fetched
+        return ClipboardImage(bytes(data), target, self._convert_image_to_png)
+    
+    def _remember_targets(self, targets: List[str]) -> None:
+        """Prime the target cache after this backend changed the selection."""
+        self._targets = TargetMap(targets)
+        self._targets_owner = None
+    
+    def _set_clipboard_data(self, target: str, data: bytes) -> None:
+        """Set clipboard data for a specific target/mime type."""
+        self._set_targets({target: data})
+    
+    def _set_targets(self, items: Dict[str, ItemData]) -> None:
+        """Take the selection once, serving every given target together."""
+        self._owners.own(items)
+        self._remember_targets(["TARGETS", "TIMESTAMP"] + list(items))
+    
+    def clear(self) -> None:
+        self._owners.clear()
+        self._remember_targets([])
+    
+    def fingerprint(self) -> Hashable:
+        """
+        Identify the current selection ownership by its TIMESTAMP target.
+        
+        Owners that do not report an acquisition time fall back to hashing
+        the contents.
+        """
+        timestamp = self._get_clipboard_data("TIMESTAMP")
+        if timestamp and any(timestamp):
+            return ("TIMESTAMP", bytes(timestamp))
+        return super().fingerprint()
+    
+    def get_available_formats(self) -> List[ClipboardFormat]:
+        target_map, _ = self._lookup_targets(trust_cache=False)
+        return list(target_map.formats)
+    
+    def get_html(self) -> Optional[str]:
+        return self._decode(ClipboardFormat.HTML, self._fetch_format(ClipboardFormat.HTML))
+    
+    def get_image(self) -> Optional[bytes]:
+        image = self.get_image_object()
+        return image.to_png() if image is not None else None
+    
+    def get_image_object(self) -> Optional[ClipboardImage]:
+        fetched = self._fetch_format(ClipboardFormat.IMAGE)
+        return self._image(fetched) if fetched else None
+    
+    def get_rtf(self) -> Optional[str]:
+        return self._decode(ClipboardFormat.RTF, self._fetch_format(ClipboardFormat.RTF))
+    
+    def get_text(self) -> Optional[str]:
+        return self._decode(ClipboardFormat.PLAIN_TEXT, self._fetch_format(ClipboardFormat.PLAIN_TEXT))
+    
+    def read_into(self, format_type: ClipboardFormat, write: Callable[[bytes], Any]) -> bool:
+        """Stream the owner's data when its best target needs no conversion; see ClipboardBackend."""
+        target = self._lookup_targets()[0].best(format_type)
+        if target is not None:
+            if format_type == ClipboardFormat.IMAGE:
+                if target == self.MIME_IMAGE_PNG and self._stream_target(target, write):
+                    return True
+            elif utf8_encoded(target) is not False:
+                sink = _Utf8Sink(write, target)
+                if self._stream_target(target, sink.write):
+                    sink.close()
+                    return True
+        return super().read_into(format_type, write)
+    
+    def get_info(self, format_type: ClipboardFormat) -> Optional[ClipboardInfo]:
+        """
+        Read only the start of the owner's data for the best target; the
+        size comes from where it ended or the owner's LENGTH, if offered.
+        See ClipboardBackend.
+        """
+        target = self._lookup_targets()[0].best(format_type)
+        stream = self._open_target(target) if target is not None else None
+        if stream is None:
+            return None
+        with stream:
+            info = probe(format_type, stream, target)
+        if info.size is None:
+            info.size = self._size_hint(target)
+        return info
+    
+    def open_stream(self, format_type: ClipboardFormat) -> Optional[BinaryIO]:
+        """Read the owner's data lazily when its best target needs no conversion; see ClipboardBackend."""
+        target = self._lookup_targets()[0].best(format_type)
+        if target is not None:
+            if format_type == ClipboardFormat.IMAGE:
+                passthrough = target == self.MIME_IMAGE_PNG
+            else:
+                passthrough = utf8_encoded(target) is not False
+            stream = self._open_target(target) if passthrough else None
+            if stream is not None:
+                if format_type == ClipboardFormat.IMAGE or utf8_encoded(target):
+                    return stream
+                if stream.peek(2)[:2] not in (codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE):
+                    return stream
+                stream.close()
+        return super().open_stream(format_type)
+    
+    def read_to_file(self, format_type: ClipboardFormat, file: BinaryIO) -> bool:
+        """
+        Splice the owner's data straight into a regular file when its best
+        target needs no conversion; see ClipboardBackend.
+        """
+        target = self._lookup_targets()[0].best(format_type)
+        fd = pipeio.regular_fileno(file)
+        if target is not None and fd is not None and self._passes_through(format_type, target):
+            file.flush()
+            if self._copy_target(target, fd):
+                return True
+        return super().read_to_file(format_type, file)
+    
+    def _passes_through(self, format_type: ClipboardFormat, target: str) -> bool:
+        """True if the owner's data for target is already PNG or UTF-8, as returned for format_type."""
+        if format_type == ClipboardFormat.IMAGE:
+            return target == self.MIME_IMAGE_PNG
+        return utf8_encoded(target) is True
+    
     def set_html(self, html_content: str, plain_text_fallback: Optional[str] = None) -> None:
-        self._set_clipboard_data(self.MIME_HTML, html_content.encode("utf-8"))
+        items = {self.MIME_HTML: html_content.encode("utf-8")}
         if plain_text_fallback:
-            self._set_clipboard_data(self.MIME_UTF8, plain_text_fallback.encode("utf-8"))
+            items[self.MIME_UTF8] = plain_text_fallback.encode("utf-8")
+        self._set_targets(items)
     
     def set_image(self, image_data: bytes) -> None:
-        self._set_clipboard_data(self.MIME_IMAGE_PNG, image_data)
+        """
+        Serve image data under the target its first bytes identify.
+        
+        PNG, and anything not recognised as an image, is served as
+        image/png. Other images are served unchanged under their own type,
+        plus image/png converted only when a client asks for it, if they
+        can be converted: BMP always, other formats with Pillow.
+        """
+        self._set_targets(self._image_targets(image_data, image_data))
+    
+    def _image_targets(self, head: bytes, data: ItemData) -> Dict[str, ItemData]:
+        mime_type = sniff_image_type(head)
+        if mime_type is None or mime_type == self.MIME_IMAGE_PNG:
+            return {self.MIME_IMAGE_PNG: data}
+        items = {mime_type: data}
+        if can_transcode(mime_type):
+            def render() -> bytes:
+                source = data.read() if isinstance(data, FileSlice) else data
+                return cached_transcode(source, mime_type, "PNG")
+            items[self.MIME_IMAGE_PNG] = render
+        return items
+    
+    def set_from_file(self, format_type: ClipboardFormat, file: BinaryIO) -> None:
+        """
+        Serve a regular file's contents without loading them into this
+        process: they are sent to the owner process with sendfile().
+        """
+        target = self._format_targets().get(format_type)
+        data = FileSlice.of(file)
+        if target is None or data is None:
+            super().set_from_file(format_type, file)
+            return
+        if format_type == ClipboardFormat.IMAGE:
+            self._set_targets(self._image_targets(os.pread(data.fd, SNIFF_BYTES, data.offset), data))
+            return
+        self._set_targets({target: data})
+    
+    def _format_targets(self) -> Dict[ClipboardFormat, str]:
+        """The target this backend serves each format under."""
+        return {
+            ClipboardFormat.HTML: self.MIME_HTML,
+            ClipboardFormat.IMAGE: self.MIME_IMAGE_PNG,
+            ClipboardFormat.PLAIN_TEXT: self.MIME_UTF8,
+            ClipboardFormat.RTF: self.MIME_RTF,
+        }
+    
+    def set_lazy(self, providers: Dict[ClipboardFormat, ContentProvider]) -> None:
+        targets = self._format_targets()
+        items = {targets[format_type]: self._encoded(provider) for format_type, provider in providers.items()}
+        self._set_targets(items)
+    
+    @staticmethod
+    def _encoded(provider: ContentProvider) -> Callable[[], Optional[bytes]]:
+        """Wrap a content provider so it returns the bytes served for its target."""
+        def render() -> Optional[bytes]:
+            content = provider()
+            if isinstance(content, str):
+                return content.encode("utf-8")
+            return content
+        return render
+    
+    def set_many(self, contents: Dict[ClipboardFormat, Any]) -> None:
+        """Serve every format from one selection owner; see ClipboardBackend."""
+        targets = self._format_targets()
+        items: Dict[str, ItemData] = {}
+        for format_type, content in contents.items():
+            if content is None:
+                continue
+            if format_type not in targets:
+                raise ClipboardFormatError(f"Unsupported format: {format_type}")
+            if format_type == ClipboardFormat.IMAGE:
+                items.update(self._image_targets(content, content))
+            else:
+                items[targets[format_type]] = content.encode("utf-8")
+        if items:
+            self._set_targets(items)
+        else:
+            self.clear()
     
     def set_rtf(self, rtf_content: str, plain_text_fallback: Optional[str] = None) -> None:
-        self._set_clipboard_data(self.MIME_RTF, rtf_content.encode("utf-8"))
+        items = {self.MIME_RTF: rtf_content.encode("utf-8")}
         if plain_text_fallback:
-            self._set_clipboard_data(self.MIME_UTF8, plain_text_fallback.encode("utf-8"))
+            items[self.MIME_UTF8] = plain_text_fallback.encode("utf-8")
+        self._set_targets(items)
     
     def set_text(self, text: str) -> None:
         self._set_clipboard_data(self.MIME_UTF8, text.encode("utf-8"))
     
     def _convert_image_to_png(self, image_data: bytes, mime_type: str) -> Optional[bytes]:
         """Convert image data to PNG format."""
-        try:
-            from PIL import Image
-            img = Image.open(BytesIO(image_data))
-            output = BytesIO()
-            img.save(output, format="PNG")
-            return output.getvalue()
-        except ImportError:
-            return image_data
+        return convert_to_png(image_data, mime_type)
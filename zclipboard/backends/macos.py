@@ -1,11 +1,12 @@
 """MacOS (Cocoa) clipboard backend implementation."""
 
-from io import BytesIO
-from typing import List, Optional
+from typing import Any, Dict, Hashable, List, Optional, Tuple
 
 from zclipboard.backends.base import ClipboardBackend
 from zclipboard.data_types import ClipboardFormat
-from zclipboard.exceptions import ClipboardAccessError
+from zclipboard.exceptions import ClipboardAccessError, ClipboardFormatError
+from zclipboard.image import ClipboardImage, cached_transcode, can_transcode, convert_to_png
+from zclipboard.sniff import sniff_image_type
 
 try:
     import objc
@@ -38,6 +39,9 @@ class MacOSClipboardBackend(ClipboardBackend):
     def clear(self) -> None:
         self._pasteboard.clearContents()
     
+    def fingerprint(self) -> Hashable:
+        return self._pasteboard.changeCount()
+    
     def get_available_formats(self) -> List[ClipboardFormat]:
         formats = []
         types = self._pasteboard.types()
@@ -63,13 +67,17 @@ class MacOSClipboardBackend(ClipboardBackend):
         return None
     
     def get_image(self) -> Optional[bytes]:
+        image = self.get_image_object()
+        return image.to_png() if image is not None else None
+    
+    def get_image_object(self) -> Optional[ClipboardImage]:
         png_data = self._pasteboard.dataForType_(NSPasteboardTypePNG)
         if png_data:
-            return bytes(png_data)
+            return ClipboardImage(bytes(png_data), "image/png")
         
         tiff_data = self._pasteboard.dataForType_(NSPasteboardTypeTIFF)
         if tiff_data:
-            return self._convert_tiff_to_png(bytes(tiff_data))
+            return ClipboardImage(bytes(tiff_data), "image/tiff", lambda data, _: self._convert_tiff_to_png(data))
         
         return None
     
@@ -83,54 +91,54 @@ class MacOSClipboardBackend(ClipboardBackend):
         return self._pasteboard.stringForType_(NSPasteboardTypeString)
     
     def set_html(self, html_content: str, plain_text_fallback: Optional[str] = None) -> None:
-        self._pasteboard.clearContents()
-        
-        types_to_declare = [NSPasteboardTypeHTML]
-        if plain_text_fallback:
-            types_to_declare.append(NSPasteboardTypeString)
-        
-        self._pasteboard.declareTypes_owner_(types_to_declare, None)
-        self._pasteboard.setData_forType_(
-            html_content.encode("utf-8"),
-            NSPasteboardTypeHTML
-        )
-        
-        if plain_text_fallback:
-            self._pasteboard.setString_forType_(plain_text_fallback, NSPasteboardTypeString)
+        self.set_many({ClipboardFormat.HTML: html_content, ClipboardFormat.PLAIN_TEXT: plain_text_fallback or None})
     
     def set_image(self, image_data: bytes) -> None:
+        """Set PNG or TIFF data as is; other recognised images are converted to PNG if can_transcode() allows."""
+        self.set_many({ClipboardFormat.IMAGE: image_data})
+    
+    def _image_item(self, image_data: bytes) -> Tuple[str, bytes]:
+        pasteboard_type = NSPasteboardTypePNG
+        mime_type = sniff_image_type(image_data)
+        if mime_type == "image/tiff":
+            pasteboard_type = NSPasteboardTypeTIFF
+        elif mime_type not in (None, "image/png") and can_transcode(mime_type):
+            image_data = cached_transcode(image_data, mime_type, "PNG")
+        return pasteboard_type, image_data
+    
+    def set_many(self, contents: Dict[ClipboardFormat, Any]) -> None:
+        """Declare every format with one declareTypes_owner_ call, then fill them in; see ClipboardBackend."""
+        items: Dict[str, Any] = {}
+        for format_type, content in contents.items():
+            if content is None:
+                continue
+            if format_type == ClipboardFormat.HTML:
+                items[NSPasteboardTypeHTML] = content.encode("utf-8")
+            elif format_type == ClipboardFormat.IMAGE:
+                pasteboard_type, data = self._image_item(content)
+                items[pasteboard_type] = data
+            elif format_type == ClipboardFormat.PLAIN_TEXT:
+                items[NSPasteboardTypeString] = content
+            elif format_type == ClipboardFormat.RTF:
+                items[NSPasteboardTypeRTF] = content.encode("utf-8")
+            else:
+                raise ClipboardFormatError(f"Unsupported format: {format_type}")
         self._pasteboard.clearContents()
-        self._pasteboard.declareTypes_owner_([NSPasteboardTypePNG], None)
-        self._pasteboard.setData_forType_(image_data, NSPasteboardTypePNG)
+        if not items:
+            return
+        self._pasteboard.declareTypes_owner_(list(items), None)
+        for pasteboard_type, data in items.items():
+            if isinstance(data, str):
+                self._pasteboard.setString_forType_(data, pasteboard_type)
+            else:
+                self._pasteboard.setData_forType_(data, pasteboard_type)
     
     def set_rtf(self, rtf_content: str, plain_text_fallback: Optional[str] = None) -> None:
-        self._pasteboard.clearContents()
-        
-        types_to_declare = [NSPasteboardTypeRTF]
-        if plain_text_fallback:
-            types_to_declare.append(NSPasteboardTypeString)
-        
-        self._pasteboard.declareTypes_owner_(types_to_declare, None)
-        self._pasteboard.setData_forType_(
-            rtf_content.encode("utf-8"),
-            NSPasteboardTypeRTF
-        )
-        
-        if plain_text_fallback:
-            self._pasteboard.setString_forType_(plain_text_fallback, NSPasteboardTypeString)
+        self.set_many({ClipboardFormat.RTF: rtf_content, ClipboardFormat.PLAIN_TEXT: plain_text_fallback or None})
     
     def set_text(self, text: str) -> None:
-        self._pasteboard.clearContents()
-        self._pasteboard.declareTypes_owner_([NSPasteboardTypeString], None)
-        self._pasteboard.setString_forType_(text, NSPasteboardTypeString)
+        self.set_many({ClipboardFormat.PLAIN_TEXT: text})
     
     def _convert_tiff_to_png(self, tiff_data: bytes) -> Optional[bytes]:
         """Convert TIFF data to PNG format."""
-        try:
-            from PIL import Image
-            img = Image.open(BytesIO(tiff_data))
-            output = BytesIO()
-            img.save(output, format="PNG")
-            return output.getvalue()
-        except ImportError:
-            return tiff_data
+        return convert_to_png(tiff_data, "image/tiff")
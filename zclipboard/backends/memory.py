@@ -0,0 +1,88 @@
+"""In-process clipboard backend, used as a reference and for tests."""
+
+import threading
+from typing import Any, Dict, Hashable, List, Optional
+
+from zclipboard.backends.base import ClipboardBackend, ContentProvider
+from zclipboard.data_types import ClipboardFormat
+
+
+class MemoryClipboardBackend(ClipboardBackend):
+    """
+    Clipboard backend holding its contents in memory.
+    
+    Nothing is shared with other processes. Deferred content set with
+    set_lazy() is produced on the first read of its format and kept until
+    the clipboard next changes.
+    """
+    
+    def __init__(self):
+        self._contents: Dict[ClipboardFormat, Any] = {}
+        self._generation = 0
+        self._lock = threading.RLock()
+        self._providers: Dict[ClipboardFormat, ContentProvider] = {}
+    
+    def _get(self, format_type: ClipboardFormat) -> Any:
+        with self._lock:
+            if format_type in self._contents:
+                return self._contents[format_type]
+            provider = self._providers.get(format_type)
+            if provider is None:
+                return None
+            content = provider()
+            if content is not None and self._providers.get(format_type) is provider:
+                del self._providers[format_type]
+                self._contents[format_type] = content
+            return content
+    
+    def _replace(self, contents: Dict[ClipboardFormat, Any]) -> None:
+        with self._lock:
+            self._contents = {format_type: value for format_type, value in contents.items() if value is not None}
+            self._generation += 1
+            self._providers = {}
+    
+    def clear(self) -> None:
+        self._replace({})
+    
+    def fingerprint(self) -> Hashable:
+        return self._generation
+    
+    def get_available_formats(self) -> List[ClipboardFormat]:
+        with self._lock:
+            return [
+                format_type for format_type in ClipboardFormat
+                if format_type in self._contents or format_type in self._providers
+            ]
+    
+    def get_html(self) -> Optional[str]:
+        return self._get(ClipboardFormat.HTML)
+    
+    def get_image(self) -> Optional[bytes]:
+        return self._get(ClipboardFormat.IMAGE)
+    
+    def get_rtf(self) -> Optional[str]:
+        return self._get(ClipboardFormat.RTF)
+    
+    def get_text(self) -> Optional[str]:
+        return self._get(ClipboardFormat.PLAIN_TEXT)
+    
+    def set_html(self, html_content: str, plain_text_fallback: Optional[str] = None) -> None:
+        self._replace({ClipboardFormat.HTML: html_content, ClipboardFormat.PLAIN_TEXT: plain_text_fallback or None})
+    
+    def set_image(self, image_data: bytes) -> None:
+        self._replace({ClipboardFormat.IMAGE: image_data})
+    
+    def set_lazy(self, providers: Dict[ClipboardFormat, ContentProvider]) -> None:
+        with self._lock:
+            self._contents = {}
+            self._generation += 1
+            self._providers = dict(providers)
+    
+    def set_many(self, contents: Dict[ClipboardFormat, Any]) -> None:
+        self._replace(dict(contents))
+    
+    def set_rtf(self, rtf_content: str, plain_text_fallback: Optional[str] = None) -> None:
+        self._replace({ClipboardFormat.RTF: rtf_content, ClipboardFormat.PLAIN_TEXT: plain_text_fallback or None})
+    
+    def set_text(self, text: str) -> None:
+        self._replace({ClipboardFormat.PLAIN_TEXT: text})
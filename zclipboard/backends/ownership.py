@@ -0,0 +1,570 @@
+"""Selection ownership management for the subprocess-based Linux backend.
+
+An X selection is only available while some client owns it, so the xclip
+backend needs a process that outlives each write. Rather than leaving one
+forked ``xclip -i`` behind per write, SelectionOwnerManager keeps a single
+helper process per backend. The helper owns the selection through the
+in-process X11 protocol client, serves every target of a write together
+and is updated in place on the next write. If the helper cannot reach the
+X server, the manager falls back to foreground ``xclip -quiet`` owners,
+which are tracked and reaped explicitly. An xclip owner serves a single
+target, so a fallback write offers only its text target, or its first
+target if it has no text. The helper is tried again on the first write
+HELPER_RETRY_INTERVAL seconds after it last failed to start.
+
+Targets may be deferred: the helper then asks the parent for their data
+the first time another client requests them, and keeps the answer for the
+rest of the ownership. Deferred targets stop being served once the parent
+detaches from the helper.
+
+Running this module starts the helper:
+    
+    python -m zclipboard.backends.ownership [SELECTION]
+"""
+
+import os
+import queue
+import select
+import struct
+import subprocess
+import sys
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+from zclipboard.backends import pipeio
+from zclipboard.exceptions import ClipboardAccessError, ClipboardError, ClipboardTimeoutError
+
+OWNER_TIMEOUT = 5
+
+# Seconds to serve writes from xclip owners before starting the helper again
+HELPER_RETRY_INTERVAL = 30.0
+
+# Runs the helper, adding the package to the end of sys.path only when the
+# interpreter cannot already import it, so nothing shadows the stdlib.
+_HELPER_BOOTSTRAP = """\
+import importlib.util, sys
+root = sys.argv.pop(1)
+if importlib.util.find_spec("zclipboard") is None:
+    sys.path.append(root)
+from zclipboard.backends.ownership import main
+sys.exit(main())
+"""
+
+# Frame kinds exchanged with the helper process
+FRAME_ACK = b"K"
+FRAME_CLEAR = b"C"
+FRAME_DATA = b"D"
+FRAME_ERROR = b"E"
+FRAME_MISSING = b"M"
+FRAME_RENDER = b"R"
+FRAME_SET = b"S"
+
+_FRAME_HEADER = struct.Struct("<cQ")
+_ITEM_HEADER = struct.Struct("<BHQ")
+# (generation, request id) prefix of FRAME_RENDER, FRAME_DATA and FRAME_MISSING payloads
+_RENDER_HEADER = struct.Struct("<II")
+
+ITEM_DEFERRED = 1
+
+# Targets a fallback xclip owner prefers to serve, best first
+FALLBACK_TEXT_TARGETS = ("UTF8_STRING", "text/plain;charset=utf-8", "text/plain", "STRING", "TEXT")
+
+
+class FileSlice:
+    """Data to serve that is read from a regular file when it is sent."""
+    
+    def __init__(self, fd: int, offset: int, size: int):
+        self.fd = fd
+        self.offset = offset
+        self.size = size
+    
+    def __len__(self) -> int:
+        return self.size
+    
+    def __repr__(self) -> str:
+        return f"FileSlice(fd={self.fd}, offset={self.offset}, size={self.size})"
+    
+    @classmethod
+    def of(cls, file) -> Optional["FileSlice"]:
+        """The rest of a file object from its current position, or None if it is not a regular file."""
+        fd = pipeio.regular_fileno(file)
+        if fd is None:
+            return None
+        offset = file.tell()
+        return cls(fd, offset, max(0, os.fstat(fd).st_size - offset))
+    
+    def read(self) -> bytes:
+        return os.pread(self.fd, self.size, self.offset)
+    
+    def send(self, fd: int) -> None:
+        """Write the slice to fd without reading it into memory."""
+        if pipeio.send_file(fd, self.fd, self.offset, self.size) != self.size:
+            raise ClipboardAccessError("File shrank while it was being sent")
+
+
+# Bytes to serve, a file slice to send them from, or a callable rendering
+# them on first request.
+ItemData = Union[bytes, FileSlice, Callable[[], Optional[bytes]]]
+FramePart = Union[pipeio.Buffer, FileSlice]
+
+
+def item_parts(items: Dict[str, Optional[Union[bytes, FileSlice]]]) -> List[FramePart]:
+    """
+    Serialise a target -> data mapping for a FRAME_SET payload, as a list
+    of parts that concatenate to the payload. None marks a deferred target.
+    
+    The data is included as given, so write_frame() can send buffers
+    without copying and file slices without reading them.
+    """
+    parts = [struct.pack("<H", len(items))]
+    for target, data in items.items():
+        name = target.encode("latin-1")
+        flags = ITEM_DEFERRED if data is None else 0
+        parts.append(_ITEM_HEADER.pack(flags, len(name), len(data or b"")))
+        parts.append(name)
+        if data:
+            parts.append(data)
+    return parts
+
+
+def encode_items(items: Dict[str, Optional[bytes]]) -> bytes:
+    """Serialise a target -> data mapping for a FRAME_SET payload. None marks a deferred target."""
+    return b"".join(item_parts(items))
+
+
+def decode_items(payload: bytes) -> Dict[str, Optional[bytes]]:
+    """Inverse of encode_items()."""
+    view = memoryview(payload)
+    count = struct.unpack_from("<H", view, 0)[0]
+    offset = 2
+    items = {}
+    for _ in range(count):
+        flags, name_length, data_length = _ITEM_HEADER.unpack_from(view, offset)
+        offset += _ITEM_HEADER.size
+        name = bytes(view[offset:offset + name_length]).decode("latin-1")
+        offset += name_length
+        items[name] = None if flags & ITEM_DEFERRED else bytes(view[offset:offset + data_length])
+        offset += data_length
+    return items
+
+
+def _read_exact(fd: int, size: int, deadline: Optional[float]) -> Optional[bytearray]:
+    """Read size bytes from fd into one buffer, or None on EOF. Raises on deadline."""
+    buffer = bytearray(size)
+    received = 0
+    with memoryview(buffer) as view:
+        while received < size:
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not select.select([fd], [], [], remaining)[0]:
+                    raise ClipboardTimeoutError("Clipboard owner process did not respond")
+            count = os.readv(fd, [view[received:]])
+            if not count:
+                return None
+            received += count
+    return buffer
+
+
+def read_frame(fd: int, timeout: Optional[float] = None) -> Optional[Tuple[bytes, bytearray]]:
+    """Read one (kind, payload) frame from fd, or None on EOF."""
+    deadline = time.monotonic() + timeout if timeout is not None else None
+    header = _read_exact(fd, _FRAME_HEADER.size, deadline)
+    if header is None:
+        return None
+    kind, length = _FRAME_HEADER.unpack(header)
+    payload = _read_exact(fd, length, deadline) if length else bytearray()
+    if payload is None:
+        return None
+    return kind, payload
+
+
+def write_frame(stream, kind: bytes, *parts: FramePart) -> None:
+    """
+    Write one frame to a binary stream and flush it.
+    
+    The payload is the concatenation of parts; buffers are written with one
+    gathering write per pipe buffer rather than joined first, and file
+    slices are sent by the kernel.
+    """
+    stream.flush()
+    fd = stream.fileno()
+    buffers: List[pipeio.Buffer] = [_FRAME_HEADER.pack(kind, sum(len(part) for part in parts))]
+    for part in parts:
+        if isinstance(part, FileSlice):
+            pipeio.write_all(fd, buffers)
+            buffers = []
+            part.send(fd)
+        else:
+            buffers.append(part)
+    pipeio.write_all(fd, buffers)
+
+
+class SelectionOwnerManager:
+    """Keeps one owner process per backend and tracks every process it starts."""
+    
+    def __init__(self, selection: str = "CLIPBOARD", xclip_path: Optional[str] = None):
+        """
+        Args:
+            selection: X selection to own.
+            xclip_path: xclip binary used when the helper cannot be started.
+        """
+        self.selection = selection
+        self.owners_reaped = 0
+        self.owners_started = 0
+        self._deferred: Dict[str, Callable[[], Optional[bytes]]] = {}
+        self._fallback = False
+        self._generation = 0
+        self._helper: Optional[subprocess.Popen] = None
+        self._lock = threading.Lock()
+        self._processes: List[subprocess.Popen] = []
+        self._replies: "queue.Queue[Optional[Tuple[bytes, bytes]]]" = queue.Queue()
+        self._retry_at = 0.0
+        self._write_lock = threading.Lock()
+        self._xclip_path = xclip_path
+    
+    @property
+    def live_owners(self) -> int:
+        """Number of owner processes started by this manager that are still running."""
+        with self._lock:
+            self._reap()
+            return len(self._processes)
+    
+    @property
+    def using_helper(self) -> bool:
+        """False if the last write fell back to an xclip owner."""
+        return not self._fallback
+    
+    def clear(self) -> None:
+        """Make the selection ownerless."""
+        with self._lock:
+            self._reap()
+            if self._request(FRAME_CLEAR):
+                self._deferred = {}
+                return
+            self._spawn_xclip(self.selection, "UTF8_STRING", b"")
+    
+    def close(self) -> None:
+        """
+        Detach from the helper.
+        
+        The helper keeps serving the selection until another client takes
+        it, then exits; it exits immediately if it does not own it.
+        """
+        with self._lock:
+            if self._helper is not None and self._helper.stdin:
+                try:
+                    with self._write_lock:
+                        self._helper.stdin.close()
+                except OSError:
+                    pass
+            self._helper = None
+            self._deferred = {}
+    
+    def own(self, items: Dict[str, ItemData]) -> None:
+        """
+        Take the selection, serving all given targets from one owner.
+        
+        If the helper cannot be started, an xclip owner serves only the
+        text target (see FALLBACK_TEXT_TARGETS), or the first target if
+        there is none.
+        
+        Args:
+            items: Mapping of target name to data, in preference order.
+                A callable value is deferred: it is called the first time
+                another client requests that target. A FileSlice is sent
+                from its file; it must stay open until own() returns.
+        """
+        if not items:
+            raise ValueError("At least one target is required")
+        deferred = {target: data for target, data in items.items() if callable(data)}
+        parts = item_parts({target: None if callable(data) else data for target, data in items.items()})
+        with self._lock:
+            self._reap()
+            if self._request(FRAME_SET, parts, deferred):
+                return
+            target = next((t for t in FALLBACK_TEXT_TARGETS if t in items), next(iter(items)))
+            data = items[target]
+            if callable(data):
+                data = data() or b""
+            self._spawn_xclip(self.selection, target, data)
+    
+    def _ensure_helper(self) -> bool:
+        """Start the helper if needed. Returns False while falling back to xclip."""
+        if self._helper is not None and self._helper.poll() is None:
+            return True
+        self._helper = None
+        if time.monotonic() < self._retry_at:
+            return False
+        
+        package_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        try:
+            process = subprocess.Popen(
+                [sys.executable, "-c", _HELPER_BOOTSTRAP, package_root, self.selection],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+            )
+        except OSError:
+            self._start_failed()
+            return False
+        self.owners_started += 1
+        self._processes.append(process)
+        pipeio.enlarge_pipe(process.stdin.fileno())
+        
+        try:
+            frame = read_frame(process.stdout.fileno(), OWNER_TIMEOUT)
+        except ClipboardTimeoutError:
+            frame = None
+        if frame is None or frame[0] != FRAME_ACK:
+            process.kill()
+            process.stdout.close()
+            self._start_failed()
+            return False
+        self._fallback = False
+        self._helper = process
+        self._generation = 0
+        self._replies = queue.Queue()
+        threading.Thread(
+            target=self._listen, args=(process, self._replies), name="zclipboard-owner-listener", daemon=True
+        ).start()
+        return True
+    
+    def _start_failed(self) -> None:
+        """Serve writes from xclip owners until the next retry is due."""
+        self._fallback = True
+        self._retry_at = time.monotonic() + HELPER_RETRY_INTERVAL
+    
+    def _listen(self, process: subprocess.Popen, replies: "queue.Queue[Optional[Tuple[bytes, bytes]]]") -> None:
+        """Route frames from one helper: render requests are answered, the rest are replies."""
+        try:
+            while True:
+                try:
+                    frame = read_frame(process.stdout.fileno())
+                except (OSError, ValueError):
+                    frame = None
+                if frame is None:
+                    break
+                if frame[0] == FRAME_RENDER:
+                    threading.Thread(target=self._render, args=(process, frame[1]), daemon=True).start()
+                else:
+                    replies.put(frame)
+        finally:
+            replies.put(None)
+            process.stdout.close()
+    
+    def _render(self, process: subprocess.Popen, payload: bytes) -> None:
+        """Call the provider of a deferred target and send its data to the helper."""
+        generation, request_id = _RENDER_HEADER.unpack_from(payload, 0)
+        target = payload[_RENDER_HEADER.size:].decode("latin-1")
+        provider = self._deferred.get(target) if generation == self._generation else None
+        data = None
+        if provider is not None:
+            try:
+                data = provider()
+            except Exception:
+                data = None
+        kind = FRAME_MISSING if data is None else FRAME_DATA
+        try:
+            with self._write_lock:
+                write_frame(process.stdin, kind, _RENDER_HEADER.pack(generation, request_id), data or b"")
+        except (OSError, ValueError):
+            pass
+    
+    def _reap(self) -> None:
+        """Collect owner processes that have exited."""
+        running = []
+        for process in self._processes:
+            if process.poll() is None:
+                running.append(process)
+                continue
+            self.owners_reaped += 1
+            if process.stdin is not None:
+                try:
+                    with self._write_lock:
+                        process.stdin.close()
+                except OSError:
+                    pass
+        self._processes = running
+    
+    def _request(
+        self,
+        kind: bytes,
+        parts: Sequence[FramePart] = (),
+        deferred: Optional[Dict[str, Callable[[], Optional[bytes]]]] = None,
+    ) -> bool:
+        """
+        Send a request to the helper, restarting it once if it died.
+        
+        Args:
+            parts: Buffers making up the payload.
+            deferred: Providers of the deferred targets in a FRAME_SET payload.
+        
+        Returns:
+            False if the helper could not be started, so the caller
+            must fall back to an xclip owner.
+        """
+        for _ in range(2):
+            if not self._ensure_helper():
+                return False
+            if kind == FRAME_SET:
+                self._deferred = deferred or {}
+                self._generation += 1
+            if self._send(kind, parts):
+                return True
+        raise ClipboardAccessError("Clipboard owner process exited unexpectedly")
+    
+    def _send(self, kind: bytes, parts: Sequence[FramePart]) -> bool:
+        """Send one request and wait for the acknowledgement. False if the helper died."""
+        helper = self._helper
+        try:
+            with self._write_lock:
+                write_frame(helper.stdin, kind, *parts)
+            frame = self._replies.get(timeout=OWNER_TIMEOUT)
+        except OSError:
+            frame = None
+        except ClipboardAccessError:
+            # A short file slice leaves the frame incomplete; the helper cannot recover.
+            helper.kill()
+            self._helper = None
+            raise
+        except queue.Empty:
+            helper.kill()
+            self._helper = None
+            raise ClipboardTimeoutError("Clipboard owner process did not respond")
+        if frame is None:
+            self._helper = None
+            return False
+        if frame[0] == FRAME_ERROR:
+            raise ClipboardAccessError(frame[1].decode("utf-8", errors="replace"))
+        return True
+    
+    def _spawn_xclip(self, selection: str, target: str, data: Union[bytes, FileSlice]) -> None:
+        """Fallback: own the selection with a foreground xclip process."""
+        if not self._xclip_path:
+            raise ClipboardAccessError("No clipboard owner available: X server unreachable and xclip missing")
+        process = subprocess.Popen(
+            [self._xclip_path, "-selection", selection.lower(), "-target", target, "-i", "-quiet"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        self.owners_started += 1
+        self._processes.append(process)
+        pipeio.enlarge_pipe(process.stdin.fileno())
+        try:
+            if isinstance(data, FileSlice):
+                data.send(process.stdin.fileno())
+            else:
+                process.stdin.write(data)
+            process.stdin.close()
+        except BrokenPipeError:
+            raise ClipboardAccessError(f"Failed to set clipboard data for target: {target}")
+
+
+class _RenderClient:
+    """Helper side of deferred targets: asks the parent for their data."""
+    
+    def __init__(self, stdout):
+        self._lock = threading.Lock()
+        self._next_id = 0
+        self._pending: Dict[int, "queue.Queue[Optional[bytes]]"] = {}
+        self._stdout = stdout
+        self.closed = False
+        self.generation = 0
+    
+    def write(self, kind: bytes, payload: bytes = b"") -> None:
+        with self._lock:
+            write_frame(self._stdout, kind, payload)
+    
+    def provider(self, target: str) -> Callable[[], Optional[bytes]]:
+        """Return a callable fetching target from the parent for the current generation."""
+        generation = self.generation
+        return lambda: self._render(generation, target)
+    
+    def answer(self, kind: bytes, payload: bytes) -> None:
+        """Deliver a FRAME_DATA or FRAME_MISSING reply to the waiting request."""
+        request_id = _RENDER_HEADER.unpack_from(payload, 0)[1]
+        with self._lock:
+            reply = self._pending.pop(request_id, None)
+        if reply is not None:
+            reply.put(bytes(memoryview(payload)[_RENDER_HEADER.size:]) if kind == FRAME_DATA else None)
+    
+    def close(self) -> None:
+        """Fail every pending and future request: the parent is gone."""
+        with self._lock:
+            self.closed = True
+            pending, self._pending = self._pending, {}
+        for reply in pending.values():
+            reply.put(None)
+    
+    def _render(self, generation: int, target: str) -> Optional[bytes]:
+        reply: "queue.Queue[Optional[bytes]]" = queue.Queue(1)
+        with self._lock:
+            if self.closed:
+                return None
+            self._next_id += 1
+            request_id = self._next_id
+            self._pending[request_id] = reply
+            header = _RENDER_HEADER.pack(generation, request_id)
+            try:
+                write_frame(self._stdout, FRAME_RENDER, header + target.encode("latin-1"))
+            except OSError:
+                del self._pending[request_id]
+                return None
+        try:
+            return reply.get(timeout=OWNER_TIMEOUT)
+        except queue.Empty:
+            with self._lock:
+                self._pending.pop(request_id, None)
+            return None
+
+
+def main() -> int:
+    """Entry point of the helper process."""
+    from zclipboard.backends.x11 import SelectionOwner
+    from zclipboard.backends.xproto import XConnection
+    
+    selection = sys.argv[1] if len(sys.argv) > 1 else "CLIPBOARD"
+    stdin_fd = sys.stdin.buffer.fileno()
+    parent = _RenderClient(sys.stdout.buffer)
+    try:
+        conn = XConnection()
+        owner = SelectionOwner(conn, conn.intern_atom(selection))
+    except ClipboardError as e:
+        parent.write(FRAME_ERROR, str(e).encode("utf-8"))
+        return 1
+    parent.write(FRAME_ACK)
+    
+    while True:
+        frame = read_frame(stdin_fd)
+        if frame is None:
+            break
+        kind, payload = frame
+        if kind in (FRAME_DATA, FRAME_MISSING):
+            parent.answer(kind, payload)
+            continue
+        try:
+            if kind == FRAME_SET:
+                parent.generation += 1
+                items = {
+                    target: parent.provider(target) if data is None else data
+                    for target, data in decode_items(payload).items()
+                }
+                owner.own(items)
+            elif kind == FRAME_CLEAR:
+                owner.clear()
+            parent.write(FRAME_ACK)
+        except ClipboardError as e:
+            parent.write(FRAME_ERROR, str(e).encode("utf-8"))
+    parent.close()
+    
+    # The parent is gone: keep serving until another client takes over.
+    while not owner.wait_released(1.0) and not conn.closed:
+        pass
+    conn.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,232 @@
+"""Bulk pipe transfers for the subprocess-based Linux backend.
+
+Pipes default to a 64 KiB kernel buffer, so a large transfer costs a
+context switch per 64 KiB. enlarge_pipe() raises that to PIPE_SIZE where
+the kernel allows it (F_SETPIPE_SZ, Linux only). read_all() reads into a
+single bytearray, straight into place when the size is known up front,
+instead of collecting chunks and joining them. write_all() sends a
+sequence of buffers with writev() so payloads are never concatenated
+first. send_file() and copy() move data between a file and a pipe inside
+the kernel with sendfile() and splice(), so it never passes through
+Python at all.
+"""
+
+import errno
+import os
+import select
+import stat
+import subprocess
+import time
+from typing import Any, List, Optional, Sequence, Union
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not available on Windows
+    fcntl = None
+
+F_GETPIPE_SZ = getattr(fcntl, "F_GETPIPE_SZ", 1032)
+F_SETPIPE_SZ = getattr(fcntl, "F_SETPIPE_SZ", 1031)
+
+PIPE_SIZE = 1024 * 1024
+
+Buffer = Union[bytes, bytearray, memoryview]
+
+# sendfile()/splice() refuse these file combinations; fall back to copying.
+_UNSUPPORTED = (errno.EINVAL, errno.ENOSYS, errno.EOPNOTSUPP, errno.EXDEV, errno.EBADF)
+
+
+def enlarge_pipe(fd: int, size: int = PIPE_SIZE) -> int:
+    """
+    Grow the kernel buffer of a pipe.
+    
+    Unprivileged processes are capped by /proc/sys/fs/pipe-max-size; the
+    pipe keeps its current size if the request is refused.
+    
+    Returns:
+        The resulting buffer size, or 0 if it cannot be determined.
+    """
+    if fcntl is None:
+        return 0
+    try:
+        return fcntl.fcntl(fd, F_SETPIPE_SZ, size)
+    except OSError:
+        pass
+    try:
+        return fcntl.fcntl(fd, F_GETPIPE_SZ)
+    except OSError:
+        return 0
+
+
+def _wait_readable(fd: int, deadline: Optional[float], timeout: Optional[float]) -> None:
+    if deadline is None:
+        return
+    remaining = deadline - time.monotonic()
+    if remaining <= 0 or not select.select([fd], [], [], remaining)[0]:
+        raise subprocess.TimeoutExpired("pipe read", timeout)
+
+
+def read_all(fd: int, size_hint: Optional[int] = None, timeout: Optional[float] = None) -> bytearray:
+    """
+    Read fd until EOF into one buffer.
+    
+    Args:
+        fd: File descriptor to read.
+        size_hint: Expected number of bytes. The data is read directly into
+            a buffer of that size; anything beyond it is appended. Without
+            a hint, the buffer grows as data arrives.
+        timeout: Seconds allowed for the whole read.
+    
+    Raises:
+        subprocess.TimeoutExpired: EOF was not reached in time.
+    """
+    deadline = time.monotonic() + timeout if timeout is not None else None
+    # One spare byte lets an exact hint see EOF without leaving the buffer.
+    buffer = bytearray(size_hint + 1 if size_hint else 0)
+    length = 0
+    with memoryview(buffer) as view:
+        while length < len(buffer):
+            _wait_readable(fd, deadline, timeout)
+            count = os.readv(fd, [view[length:]])
+            if not count:
+                break
+            length += count
+    del buffer[length:]
+    if size_hint and length <= size_hint:
+        return buffer
+    while True:
+        _wait_readable(fd, deadline, timeout)
+        chunk = os.read(fd, PIPE_SIZE)
+        if not chunk:
+            return buffer
+        buffer += chunk
+
+
+def write_all(fd: int, buffers: Sequence[Buffer]) -> int:
+    """
+    Write every buffer to fd in order without concatenating them.
+    
+    Returns:
+        The number of bytes written.
+    """
+    pending: List[memoryview] = [memoryview(buffer).cast("B") for buffer in buffers if len(buffer)]
+    total = 0
+    while pending:
+        written = os.writev(fd, pending)
+        total += written
+        while pending and written >= len(pending[0]):
+            written -= len(pending[0])
+            pending.pop(0)
+        if written:
+            pending[0] = pending[0][written:]
+    return total
+
+
+def run(
+    args: Sequence[str], timeout: Optional[float] = None, size_hint: Optional[int] = None
+) -> subprocess.CompletedProcess:
+    """
+    Run a command and capture its stdout, like subprocess.run(capture_output=True).
+    
+    stderr is discarded and stdout is returned as a bytearray.
+    
+    Raises:
+        subprocess.TimeoutExpired: The command did not finish in time; it is killed.
+    """
+    deadline = time.monotonic() + timeout if timeout is not None else None
+    process = subprocess.Popen(args, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    try:
+        fd = process.stdout.fileno()
+        enlarge_pipe(fd)
+        stdout = read_all(fd, size_hint, timeout)
+        process.wait(None if deadline is None else max(0.0, deadline - time.monotonic()))
+    finally:
+        if process.returncode is None:
+            process.kill()
+            process.wait()
+        process.stdout.close()
+    return subprocess.CompletedProcess(args, process.returncode, stdout, None)
+
+
+def regular_fileno(file: Any) -> Optional[int]:
+    """Return the descriptor behind a file object if it is a regular file, else None."""
+    try:
+        fd = file.fileno()
+        return fd if stat.S_ISREG(os.fstat(fd).st_mode) else None
+    except (AttributeError, OSError, ValueError):
+        return None
+
+
+def send_file(out_fd: int, in_fd: int, offset: int, count: int) -> int:
+    """
+    Write count bytes of the file in_fd, starting at offset, to out_fd.
+    
+    Uses sendfile() where the kernel supports it for the pair, and bounded
+    chunked copies otherwise. The offset of in_fd is left unchanged.
+    
+    Returns:
+        The number of bytes written; less than count if the file is shorter.
+    """
+    sent = 0
+    sendfile = getattr(os, "sendfile", None)
+    while sent < count and sendfile is not None:
+        try:
+            written = sendfile(out_fd, in_fd, offset + sent, count - sent)
+        except OSError as e:
+            if e.errno not in _UNSUPPORTED or sent:
+                raise
+            sendfile = None
+            break
+        if not written:
+            return sent
+        sent += written
+    while sent < count:
+        chunk = os.pread(in_fd, min(PIPE_SIZE, count - sent), offset + sent)
+        if not chunk:
+            break
+        write_all(out_fd, [chunk])
+        sent += len(chunk)
+    return sent
+
+
+def copy(in_fd: int, out_fd: int, timeout: Optional[float] = None) -> int:
+    """
+    Copy everything readable from the pipe in_fd to out_fd until EOF.
+    
+    Uses splice() where available (Linux, Python 3.10+), and a single
+    reused buffer otherwise.
+    
+    Args:
+        timeout: Seconds to wait for each chunk.
+    
+    Raises:
+        subprocess.TimeoutExpired: No data arrived within timeout.
+    
+    Returns:
+        The number of bytes copied.
+    """
+    copied = 0
+    splice = getattr(os, "splice", None)
+    while splice is not None:
+        _wait_readable(fd=in_fd, deadline=_deadline(timeout), timeout=timeout)
+        try:
+            count = splice(in_fd, out_fd, PIPE_SIZE)
+        except OSError as e:
+            if e.errno not in _UNSUPPORTED or copied:
+                raise
+            break
+        if not count:
+            return copied
+        copied += count
+    buffer = bytearray(PIPE_SIZE)
+    with memoryview(buffer) as view:
+        while True:
+            _wait_readable(fd=in_fd, deadline=_deadline(timeout), timeout=timeout)
+            count = os.readv(in_fd, [view])
+            if not count:
+                return copied
+            write_all(out_fd, [view[:count]])
+            copied += count
+
+
+def _deadline(timeout: Optional[float]) -> Optional[float]:
+    return time.monotonic() + timeout if timeout is not None else None
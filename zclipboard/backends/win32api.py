@@ -0,0 +1,277 @@
+"""The Win32 clipboard calls the Windows backend makes, behind a replaceable interface.
+
+CtypesWin32Api makes the real calls through ctypes and can only be
+created on Windows. FakeWin32Api keeps the clipboard in memory and
+follows the same rules, so the backend can be tested and benchmarked on
+any platform:
+    
+    backend = WindowsClipboardBackend(api=FakeWin32Api())
+"""
+
+import ctypes
+import threading
+from abc import ABC, abstractmethod
+from collections import Counter
+from typing import Dict, Optional, Sequence
+
+from zclipboard.exceptions import ClipboardAccessError, ClipboardPlatformError
+
+GMEM_MOVEABLE = 0x0002
+
+# Registered formats are numbered from here up.
+FIRST_REGISTERED_FORMAT = 0xC000
+
+
+class Win32Api(ABC):
+    """
+    Base class for the clipboard functions of user32 and kernel32.
+    
+    Methods follow the Win32 function of the same name. Clipboard data is
+    passed as bytes; global memory handles stay inside the implementation.
+    """
+    
+    @abstractmethod
+    def close_clipboard(self) -> None:
+        """Close the clipboard opened with open_clipboard()."""
+        pass
+    
+    @abstractmethod
+    def empty_clipboard(self) -> bool:
+        """Remove all formats from the open clipboard, returning False on failure."""
+        pass
+    
+    @abstractmethod
+    def enum_clipboard_formats(self, format_id: int) -> int:
+        """Return the format after format_id on the open clipboard, the first for 0, or 0 after the last."""
+        pass
+    
+    @abstractmethod
+    def get_clipboard_data(self, format_id: int, limit: Optional[int] = None) -> Optional[bytes]:
+        """
+        Copy the data of one format from the open clipboard.
+        
+        Args:
+            format_id: Format to read.
+            limit: Copy at most this many leading bytes.
+        
+        Returns:
+            The data, or None if the format is not available.
+        """
+        pass
+    
+    @abstractmethod
+    def get_clipboard_data_size(self, format_id: int) -> Optional[int]:
+        """Return the size in bytes of one format on the open clipboard, or None if it is not available."""
+        pass
+    
+    @abstractmethod
+    def get_clipboard_sequence_number(self) -> int:
+        """Return the counter that changes whenever the clipboard contents do; needs no open."""
+        pass
+    
+    @abstractmethod
+    def open_clipboard(self) -> bool:
+        """Open the clipboard, returning False if another program has it open."""
+        pass
+    
+    @abstractmethod
+    def register_clipboard_format(self, name: str) -> int:
+        """Return the ID of a named format, registering it the first time."""
+        pass
+    
+    @abstractmethod
+    def set_clipboard_data(self, format_id: int, parts: Sequence[bytes]) -> None:
+        """
+        Put the concatenated parts on the open clipboard as format_id.
+        
+        Raises:
+            ClipboardAccessError: The memory could not be allocated or the
+                clipboard refused the data.
+        """
+        pass
+
+
+class CtypesWin32Api(Win32Api):
+    """The real Win32 clipboard, called through ctypes."""
+    
+    def __init__(self):
+        try:
+            kernel32 = ctypes.windll.kernel32
+            user32 = ctypes.windll.user32
+        except AttributeError:
+            raise ClipboardPlatformError("The Win32 clipboard API is only available on Windows") from None
+        from ctypes import wintypes
+        
+        self._close_clipboard = user32.CloseClipboard
+        self._empty_clipboard = user32.EmptyClipboard
+        self._enum_clipboard_formats = user32.EnumClipboardFormats
+        self._enum_clipboard_formats.argtypes = [ctypes.c_uint]
+        self._enum_clipboard_formats.restype = ctypes.c_uint
+        self._get_clipboard_data = user32.GetClipboardData
+        self._get_clipboard_data.argtypes = [ctypes.c_uint]
+        self._get_clipboard_data.restype = ctypes.c_void_p
+        self._get_clipboard_sequence_number = user32.GetClipboardSequenceNumber
+        self._get_clipboard_sequence_number.restype = wintypes.DWORD
+        self._global_alloc = kernel32.GlobalAlloc
+        self._global_alloc.argtypes = [ctypes.c_uint, ctypes.c_size_t]
+        self._global_alloc.restype = ctypes.c_void_p
+        self._global_free = kernel32.GlobalFree
+        self._global_free.argtypes = [ctypes.c_void_p]
+        self._global_lock = kernel32.GlobalLock
+        self._global_lock.argtypes = [ctypes.c_void_p]
+        self._global_lock.restype = ctypes.c_void_p
+        self._global_size = kernel32.GlobalSize
+        self._global_size.argtypes = [ctypes.c_void_p]
+        self._global_size.restype = ctypes.c_size_t
+        self._global_unlock = kernel32.GlobalUnlock
+        self._global_unlock.argtypes = [ctypes.c_void_p]
+        self._open_clipboard = user32.OpenClipboard
+        self._open_clipboard.argtypes = [wintypes.HWND]
+        self._register_clipboard_format = user32.RegisterClipboardFormatW
+        self._register_clipboard_format.argtypes = [wintypes.LPCWSTR]
+        self._register_clipboard_format.restype = ctypes.c_uint
+        self._set_clipboard_data = user32.SetClipboardData
+        self._set_clipboard_data.argtypes = [ctypes.c_uint, ctypes.c_void_p]
+        self._set_clipboard_data.restype = ctypes.c_void_p
+    
+    def close_clipboard(self) -> None:
+        self._close_clipboard()
+    
+    def empty_clipboard(self) -> bool:
+        return bool(self._empty_clipboard())
+    
+    def enum_clipboard_formats(self, format_id: int) -> int:
+        return self._enum_clipboard_formats(format_id)
+    
+    def get_clipboard_data(self, format_id: int, limit: Optional[int] = None) -> Optional[bytes]:
+        handle = self._get_clipboard_data(format_id)
+        if not handle:
+            return None
+        ptr = self._global_lock(handle)
+        if not ptr:
+            return None
+        try:
+            size = self._global_size(handle)
+            return ctypes.string_at(ptr, size if limit is None else min(size, limit))
+        finally:
+            self._global_unlock(handle)
+    
+    def get_clipboard_data_size(self, format_id: int) -> Optional[int]:
+        handle = self._get_clipboard_data(format_id)
+        return self._global_size(handle) if handle else None
+    
+    def get_clipboard_sequence_number(self) -> int:
+        return self._get_clipboard_sequence_number()
+    
+    def open_clipboard(self) -> bool:
+        return bool(self._open_clipboard(None))
+    
+    def register_clipboard_format(self, name: str) -> int:
+        return self._register_clipboard_format(name)
+    
+    def set_clipboard_data(self, format_id: int, parts: Sequence[bytes]) -> None:
+        handle = self._global_alloc(GMEM_MOVEABLE, sum(len(part) for part in parts))
+        if not handle:
+            raise ClipboardAccessError("Failed to allocate global memory")
+        ptr = self._global_lock(handle)
+        if not ptr:
+            self._global_free(handle)
+            raise ClipboardAccessError("Failed to lock global memory")
+        try:
+            for part in parts:
+                ctypes.memmove(ptr, part, len(part))
+                ptr += len(part)
+        finally:
+            self._global_unlock(handle)
+        # On success the clipboard owns the memory; otherwise it is still ours to free.
+        if not self._set_clipboard_data(format_id, handle):
+            self._global_free(handle)
+            raise ClipboardAccessError("Failed to set clipboard data")
+
+
+class FakeWin32Api(Win32Api):
+    """
+    An in-memory Win32 clipboard, for tests and benchmarks off Windows.
+    
+    Reads, writes and EmptyClipboard fail unless the clipboard is open,
+    and it can only be open once at a time, as on Windows. Formats Windows
+    synthesizes from others (CF_TEXT from CF_UNICODETEXT, CF_DIBV5 from
+    CF_DIB) are not. Every call is counted in calls, by method name.
+    """
+    
+    def __init__(self):
+        self.busy_opens = 0
+        self.calls: Counter = Counter()
+        self.formats: Dict[int, bytes] = {}
+        self.is_open = False
+        self.sequence_number = 1
+        self._lock = threading.Lock()
+        self._registered: Dict[str, int] = {}
+    
+    def close_clipboard(self) -> None:
+        with self._lock:
+            self.calls["close_clipboard"] += 1
+            self.is_open = False
+    
+    def empty_clipboard(self) -> bool:
+        with self._lock:
+            self.calls["empty_clipboard"] += 1
+            if not self.is_open:
+                return False
+            self.formats = {}
+            self.sequence_number += 1
+            return True
+    
+    def enum_clipboard_formats(self, format_id: int) -> int:
+        with self._lock:
+            self.calls["enum_clipboard_formats"] += 1
+            if not self.is_open:
+                return 0
+            format_ids = list(self.formats)
+            if format_id == 0:
+                return format_ids[0] if format_ids else 0
+            if format_id not in self.formats or format_ids[-1] == format_id:
+                return 0
+            return format_ids[format_ids.index(format_id) + 1]
+    
+    def get_clipboard_data(self, format_id: int, limit: Optional[int] = None) -> Optional[bytes]:
+        with self._lock:
+            self.calls["get_clipboard_data"] += 1
+            data = self.formats.get(format_id) if self.is_open else None
+            return data if data is None or limit is None else data[:limit]
+    
+    def get_clipboard_data_size(self, format_id: int) -> Optional[int]:
+        with self._lock:
+            self.calls["get_clipboard_data_size"] += 1
+            data = self.formats.get(format_id) if self.is_open else None
+            return len(data) if data is not None else None
+    
+    def get_clipboard_sequence_number(self) -> int:
+        with self._lock:
+            self.calls["get_clipboard_sequence_number"] += 1
+            return self.sequence_number
+    
+    def open_clipboard(self) -> bool:
+        """Fail while already open, and for the next busy_opens calls, as if another program held it."""
+        with self._lock:
+            self.calls["open_clipboard"] += 1
+            if self.busy_opens:
+                self.busy_opens -= 1
+                return False
+            if self.is_open:
+                return False
+            self.is_open = True
+            return True
+    
+    def register_clipboard_format(self, name: str) -> int:
+        with self._lock:
+            self.calls["register_clipboard_format"] += 1
+            return self._registered.setdefault(name.lower(), FIRST_REGISTERED_FORMAT + len(self._registered))
+    
+    def set_clipboard_data(self, format_id: int, parts: Sequence[bytes]) -> None:
+        with self._lock:
+            self.calls["set_clipboard_data"] += 1
+            if not self.is_open:
+                raise ClipboardAccessError("Failed to set clipboard data")
+            self.formats[format_id] = b"".join(parts)
+            self.sequence_number += 1
@@ -1,13 +1,21 @@
 """Windows (Win32) clipboard backend implementation."""
 
-import ctypes
-from ctypes import wintypes
+import contextlib
+import struct
+import threading
+import time
 from io import BytesIO
-from typing import List, Optional
+from typing import Any, Dict, Hashable, Iterator, List, Optional, Sequence, Tuple
 
 from zclipboard.backends.base import ClipboardBackend
-from zclipboard.data_types import ClipboardFormat
-from zclipboard.exceptions import ClipboardAccessError
+from zclipboard.backends.win32api import CtypesWin32Api, Win32Api
+from zclipboard.codecs import cfhtml
+from zclipboard.codecs.image import decode_png, encode_dib
+from zclipboard.data_types import ClipboardFormat, ClipboardInfo
+from zclipboard.exceptions import ClipboardAccessError, ClipboardFormatError
+from zclipboard.image import ClipboardImage, cached_transcode, can_transcode
+from zclipboard.imageinfo import MAX_HEADER_BYTES, probe
+from zclipboard.sniff import is_dib, sniff_image_type
 
 # Win32 Constants
 CF_BITMAP = 2
@@ -15,100 +23,88 @@ CF_DIB = 8
 CF_DIBV5 = 17
 CF_TEXT = 1
 CF_UNICODETEXT = 13
-GHND = 0x0042
-GMEM_MOVEABLE = 0x0002
 
-# Win32 API Functions
-kernel32 = ctypes.windll.kernel32
-user32 = ctypes.windll.user32
-
-CloseClipboard = user32.CloseClipboard
-EmptyClipboard = user32.EmptyClipboard
-EnumClipboardFormats = user32.EnumClipboardFormats
-GetClipboardData = user32.GetClipboardData
-GetClipboardData.restype = ctypes.c_void_p
-GlobalAlloc = kernel32.GlobalAlloc
-GlobalAlloc.restype = ctypes.c_void_p
-GlobalLock = kernel32.GlobalLock
-GlobalLock.argtypes = [ctypes.c_void_p]
-GlobalLock.restype = ctypes.c_void_p
-GlobalSize = kernel32.GlobalSize
-GlobalSize.argtypes = [ctypes.c_void_p]
-GlobalSize.restype = ctypes.c_size_t
-GlobalUnlock = kernel32.GlobalUnlock
-GlobalUnlock.argtypes = [ctypes.c_void_p]
-OpenClipboard = user32.OpenClipboard
-OpenClipboard.argtypes = [wintypes.HWND]
-RegisterClipboardFormatW = user32.RegisterClipboardFormatW
-RegisterClipboardFormatW.argtypes = [wintypes.LPCWSTR]
-RegisterClipboardFormatW.restype = ctypes.c_uint
-SetClipboardData = user32.SetClipboardData
-SetClipboardData.argtypes = [ctypes.c_uint, ctypes.c_void_p]
+# OpenClipboard fails while another program has the clipboard open.
+OPEN_ATTEMPTS = 10
+OPEN_RETRY_DELAY = 0.01
 
 
 class WindowsClipboardBackend(ClipboardBackend):
-    """Windows clipboard backend using Win32 API."""
-    
-    def __init__(self):
-        self._cf_html = RegisterClipboardFormatW("HTML Format")
-        self._cf_rtf = RegisterClipboardFormatW("Rich Text Format")
-        self._cf_png = RegisterClipboardFormatW("PNG")
+    """
+    Windows clipboard backend using Win32 API.
     
-    def _close_clipboard(self) -> None:
-        CloseClipboard()
+    Each call opens and closes the clipboard, unless it is made inside
+    session(), which keeps one open for all of them.
+    """
     
-    def _get_clipboard_data(self, format_id: int) -> Optional[bytes]:
-        handle = GetClipboardData(format_id)
-        if not handle:
-            return None
-        
-        ptr = GlobalLock(handle)
-        if not ptr:
-            return None
+    def __init__(self, api: Optional[Win32Api] = None):
+        """
+        Args:
+            api: The Win32 functions to call. Defaults to the real ones;
+                pass a FakeWin32Api to run without Windows.
         
-        try:
-            size = GlobalSize(handle)
-            data = ctypes.string_at(ptr, size)
-            return data
-        finally:
-            GlobalUnlock(handle)
+        Raises:
+            ClipboardPlatformError: api is not given and this is not Windows.
+        """
+        self._api = api if api is not None else CtypesWin32Api()
+        self._depth = 0
+        self._lock = threading.RLock()
+        self._cf_html = self._api.register_clipboard_format("HTML Format")
+        self._cf_rtf = self._api.register_clipboard_format("Rich Text Format")
+        self._cf_png = self._api.register_clipboard_format("PNG")
+    
+    @property
+    def api(self) -> Win32Api:
+        """The Win32 functions this backend calls."""
+        return self._api
     
     def _open_clipboard(self) -> None:
-        for _ in range(10):
-            if OpenClipboard(None):
+        for attempt in range(OPEN_ATTEMPTS):
+            if self._api.open_clipboard():
                 return
-            ctypes.windll.kernel32.Sleep(10)
+            if attempt + 1 < OPEN_ATTEMPTS:
+                time.sleep(OPEN_RETRY_DELAY)
         raise ClipboardAccessError("Failed to open clipboard")
     
-    def _set_clipboard_data(self, format_id: int, data: bytes) -> None:
-        handle = GlobalAlloc(GMEM_MOVEABLE, len(data))
-        if not handle:
-            raise ClipboardAccessError("Failed to allocate global memory")
-        
-        ptr = GlobalLock(handle)
-        if not ptr:
-            raise ClipboardAccessError("Failed to lock global memory")
+    @contextlib.contextmanager
+    def session(self) -> Iterator[None]:
+        """
+        Hold the clipboard open until the block ends. See ClipboardBackend.
         
-        try:
-            ctypes.memmove(ptr, data, len(data))
-        finally:
-            GlobalUnlock(handle)
-        
-        if not SetClipboardData(format_id, handle):
-            raise ClipboardAccessError("Failed to set clipboard data")
+        Calls from this thread inside the block share the one
+        OpenClipboard; calls from other threads wait for the block to end,
+        as other programs cannot open the clipboard meanwhile either.
+        Sessions nest.
+        """
+        with self._lock:
+            if self._depth == 0:
+                self._open_clipboard()
+            self._depth += 1
+            try:
+                yield
+            finally:
+                self._depth -= 1
+                if self._depth == 0:
+                    self._api.close_clipboard()
+    
+    def _get_clipboard_data(self, format_id: int) -> Optional[bytes]:
+        return self._api.get_clipboard_data(format_id)
+    
+    def _replace_contents(self) -> None:
+        if not self._api.empty_clipboard():
+            raise ClipboardAccessError("Failed to empty clipboard")
     
     def clear(self) -> None:
-        try:
-            self._open_clipboard()
-            EmptyClipboard()
-        finally:
-            self._close_clipboard()
+        with self.session():
+            self._replace_contents()
+    
+    def fingerprint(self) -> Hashable:
+        return self._api.get_clipboard_sequence_number()
     
     def get_available_formats(self) -> List[ClipboardFormat]:
         formats = []
-        try:
-            self._open_clipboard()
-            format_id = EnumClipboardFormats(0)
+        with self.session():
+            format_id = self._api.enum_clipboard_formats(0)
             while format_id:
                 if format_id == CF_UNICODETEXT:
                     formats.append(ClipboardFormat.PLAIN_TEXT)
@@ -119,159 +115,159 @@ class WindowsClipboardBackend(ClipboardBackend):
                 elif format_id in (CF_DIB, CF_DIBV5, self._cf_png):
                     if ClipboardFormat.IMAGE not in formats:
                         formats.append(ClipboardFormat.IMAGE)
-                format_id = EnumClipboardFormats(format_id)
-        finally:
-            self._close_clipboard()
+                format_id = self._api.enum_clipboard_formats(format_id)
         return formats
     
     def get_html(self) -> Optional[str]:
-        try:
-            self._open_clipboard()
+        with self.session():
             data = self._get_clipboard_data(self._cf_html)
             if data:
-                return self._parse_html_format(data.decode("utf-8", errors="ignore"))
+                return str(cfhtml.decode(data).fragment, "utf-8", errors="ignore")
+            return None
+    
+    def get_info(self, format_type: ClipboardFormat) -> Optional[ClipboardInfo]:
+        """Copy only the start of the clipboard data; its size comes from GlobalSize. See ClipboardBackend."""
+        candidates = {
+            ClipboardFormat.HTML: [(self._cf_html, "text/html")],
+            ClipboardFormat.IMAGE: [(self._cf_png, "image/png"), (CF_DIBV5, "image/bmp"), (CF_DIB, "image/bmp")],
+            ClipboardFormat.PLAIN_TEXT: [(CF_UNICODETEXT, "text/plain;charset=utf-16le")],
+            ClipboardFormat.RTF: [(self._cf_rtf, "text/rtf")],
+        }
+        with self.session():
+            for format_id, mime_type in candidates.get(format_type, []):
+                size = self._api.get_clipboard_data_size(format_id)
+                if size is None:
+                    continue
+                data = self._api.get_clipboard_data(format_id, MAX_HEADER_BYTES) or b""
+                if format_id in (CF_DIB, CF_DIBV5):
+                    data = self._dib_to_bmp(data)
+                return probe(format_type, BytesIO(data), mime_type, size)
             return None
-        finally:
-            self._close_clipboard()
     
     def get_image(self) -> Optional[bytes]:
-        try:
-            self._open_clipboard()
+        image = self.get_image_object()
+        return image.to_png() if image is not None else None
+    
+    def get_image_object(self) -> Optional[ClipboardImage]:
+        with self.session():
             png_data = self._get_clipboard_data(self._cf_png)
             if png_data:
-                return png_data
+                return ClipboardImage(png_data, "image/png")
             dib_data = self._get_clipboard_data(CF_DIBV5) or self._get_clipboard_data(CF_DIB)
             if dib_data:
-                return self._convert_dib_to_png(dib_data)
+                return ClipboardImage(
+                    self._dib_to_bmp(dib_data), "image/bmp", lambda data, _: self._convert_dib_to_png(dib_data)
+                )
             return None
-        finally:
-            self._close_clipboard()
     
     def get_rtf(self) -> Optional[str]:
-        try:
-            self._open_clipboard()
+        with self.session():
             data = self._get_clipboard_data(self._cf_rtf)
             if data:
                 return data.decode("utf-8", errors="ignore").rstrip("\x00")
             return None
-        finally:
-            self._close_clipboard()
     
     def get_text(self) -> Optional[str]:
-        try:
-            self._open_clipboard()
+        with self.session():
             data = self._get_clipboard_data(CF_UNICODETEXT)
             if data:
                 return data.decode("utf-16-le", errors="ignore").rstrip("\x00")
             return None
-        finally:
-            self._close_clipboard()
     
     def set_html(self, html_content: str, plain_text_fallback: Optional[str] = None) -> None:
-        html_format = self._create_html_format(html_content)
-        try:
-            self._open_clipboard()
-            EmptyClipboard()
-            self._set_clipboard_data(self._cf_html, html_format.encode("utf-8") + b"\x00")
-            if plain_text_fallback:
-                self._set_clipboard_data(CF_UNICODETEXT, (plain_text_fallback + "\x00").encode("utf-16-le"))
-        finally:
-            self._close_clipboard()
+        self.set_many({ClipboardFormat.HTML: html_content, ClipboardFormat.PLAIN_TEXT: plain_text_fallback or None})
     
     def set_image(self, image_data: bytes) -> None:
-        try:
-            self._open_clipboard()
-            EmptyClipboard()
-            self._set_clipboard_data(self._cf_png, image_data)
-            dib_data = self._convert_png_to_dib(image_data)
-            if dib_data:
-                self._set_clipboard_data(CF_DIB, dib_data)
-        finally:
-            self._close_clipboard()
+        """
+        Set PNG, BMP or DIB data natively; other recognised images are converted to PNG first.
+        
+        A BMP or DIB is set as CF_DIB without decoding it, plus PNG; a PNG
+        is set as is, plus CF_DIB. Other formats need Pillow to convert.
+        """
+        self.set_many({ClipboardFormat.IMAGE: image_data})
+    
+    def _image_items(self, image_data: bytes) -> List[Tuple[int, Sequence[bytes]]]:
+        mime_type = sniff_image_type(image_data)
+        dib_data = None
+        if mime_type == "image/bmp":
+            dib_data = image_data[14:]
+        elif mime_type is None and is_dib(image_data):
+            dib_data = image_data
+        png_data: Optional[bytes] = image_data
+        if dib_data is not None:
+            png_data = self._convert_dib_to_png(dib_data)
+        elif mime_type not in (None, "image/png") and can_transcode(mime_type):
+            png_data = cached_transcode(image_data, mime_type, "PNG")
+        if dib_data is None and png_data:
+            dib_data = self._convert_png_to_dib(png_data)
+        items: List[Tuple[int, Sequence[bytes]]] = []
+        if png_data:
+            items.append((self._cf_png, [png_data]))
+        if dib_data:
+            items.append((CF_DIB, [dib_data]))
+        return items
+    
+    def set_many(self, contents: Dict[ClipboardFormat, Any]) -> None:
+        """Encode every format, then set them all under one OpenClipboard and EmptyClipboard; see ClipboardBackend."""
+        items: List[Tuple[int, Sequence[bytes]]] = []
+        for format_type, content in contents.items():
+            if content is None:
+                continue
+            if format_type == ClipboardFormat.HTML:
+                items.append((self._cf_html, [*cfhtml.encode_parts(content), b"\x00"]))
+            elif format_type == ClipboardFormat.IMAGE:
+                items.extend(self._image_items(content))
+            elif format_type == ClipboardFormat.PLAIN_TEXT:
+                items.append((CF_UNICODETEXT, [(content + "\x00").encode("utf-16-le")]))
+            elif format_type == ClipboardFormat.RTF:
+                items.append((self._cf_rtf, [content.encode("utf-8"), b"\x00"]))
+            else:
+                raise ClipboardFormatError(f"Unsupported format: {format_type}")
+        with self.session():
+            self._replace_contents()
+            for format_id, parts in items:
+                self._api.set_clipboard_data(format_id, parts)
     
     def set_rtf(self, rtf_content: str, plain_text_fallback: Optional[str] = None) -> None:
-        try:
-            self._open_clipboard()
-            EmptyClipboard()
-            self._set_clipboard_data(self._cf_rtf, rtf_content.encode("utf-8") + b"\x00")
-            if plain_text_fallback:
-                self._set_clipboard_data(CF_UNICODETEXT, (plain_text_fallback + "\x00").encode("utf-16-le"))
-        finally:
-            self._close_clipboard()
+        self.set_many({ClipboardFormat.RTF: rtf_content, ClipboardFormat.PLAIN_TEXT: plain_text_fallback or None})
     
     def set_text(self, text: str) -> None:
-        try:
-            self._open_clipboard()
-            EmptyClipboard()
-            self._set_clipboard_data(CF_UNICODETEXT, (text + "\x00").encode("utf-16-le"))
-        finally:
-            self._close_clipboard()
+        self.set_many({ClipboardFormat.PLAIN_TEXT: text})
     
     def _convert_dib_to_png(self, dib_data: bytes) -> Optional[bytes]:
-        """Convert DIB data to PNG format."""
+        """Convert DIB data to PNG format, or return None if only Pillow could and it is not installed."""
         try:
-            from PIL import Image
-            bmp_header = b"BM" + len(dib_data).to_bytes(4, "little") + b"\x00\x00\x00\x00" + b"\x36\x00\x00\x00"
-            bmp_data = bmp_header + dib_data
-            img = Image.open(BytesIO(bmp_data))
-            output = BytesIO()
-            img.save(output, format="PNG")
-            return output.getvalue()
-        except ImportError:
-            return dib_data
+            return cached_transcode(self._dib_to_bmp(dib_data), "image/bmp", "PNG")
+        except ClipboardFormatError:
+            return None
+    
+    def _dib_to_bmp(self, dib_data: bytes) -> bytes:
+        """Prefix DIB data with a BMP file header pointing past its header, masks and palette."""
+        offset = 14
+        if len(dib_data) >= 40:
+            header_size, bits, compression, colors_used = struct.unpack_from("<I 10x H I 12x I", dib_data)
+            offset += header_size
+            if header_size == 40 and compression in (3, 6):
+                # BI_BITFIELDS / BI_ALPHABITFIELDS masks follow a BITMAPINFOHEADER.
+                offset += 12 if compression == 3 else 16
+            if bits <= 8:
+                offset += 4 * (colors_used or 1 << bits)
+        bmp_header = b"BM" + struct.pack("<I 4x I", 14 + len(dib_data), offset)
+        return bmp_header + dib_data
     
     def _convert_png_to_dib(self, png_data: bytes) -> Optional[bytes]:
-        """Convert PNG data to DIB format."""
+        """Convert PNG data to DIB format, with the built-in codec if Pillow is not installed."""
         try:
             from PIL import Image
-            img = Image.open(BytesIO(png_data))
-            if img.mode != "RGBA":
-                img = img.convert("RGBA")
-            output = BytesIO()
-            img.save(output, format="BMP")
-            bmp_data = output.getvalue()
-            return bmp_data[14:]
         except ImportError:
-            return None
-    
-    def _create_html_format(self, html_content: str) -> str:
-        """Create Windows HTML clipboard format."""
-        header_template = (
-            "Version:0.9\r\n"
-            "StartHTML:{start_html:010d}\r\n"
-            "EndHTML:{end_html:010d}\r\n"
-            "StartFragment:{start_fragment:010d}\r\n"
-            "EndFragment:{end_fragment:010d}\r\n"
-        )
-        prefix = "<!DOCTYPE html><html><body><!--StartFragment-->"
-        suffix = "<!--EndFragment--></body></html>"
-        
-        header_length = len(header_template.format(
-            start_html=0, end_html=0, start_fragment=0, end_fragment=0
-        ))
-        
-        start_html = header_length
-        start_fragment = start_html + len(prefix)
-        end_fragment = start_fragment + len(html_content.encode("utf-8"))
-        end_html = end_fragment + len(suffix)
-        
-        header = header_template.format(
-            start_html=start_html,
-            end_html=end_html,
-            start_fragment=start_fragment,
-            end_fragment=end_fragment,
-        )
-        
-        return header + prefix + html_content + suffix
-    
-    def _parse_html_format(self, html_format: str) -> str:
-        """Parse Windows HTML clipboard format and extract the HTML fragment."""
-        start_marker = "<!--StartFragment-->"
-        end_marker = "<!--EndFragment-->"
-        
-        start_idx = html_format.find(start_marker)
-        end_idx = html_format.find(end_marker)
-        
-        if start_idx != -1 and end_idx != -1:
-            return html_format[start_idx + len(start_marker):end_idx]
-        return html_format
+            try:
+                return encode_dib(decode_png(png_data).convert("RGBA"))
+            except ClipboardFormatError:
+                return None
+        img = Image.open(BytesIO(png_data))
+        if img.mode != "RGBA":
+            img = img.convert("RGBA")
+        output = BytesIO()
+        img.save(output, format="BMP")
+        bmp_data = output.getvalue()
+        return bmp_data[14:]
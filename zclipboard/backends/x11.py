@@ -0,0 +1,471 @@
+"""Linux (X11) clipboard backend speaking the X protocol in-process."""
+
+import io
+import queue
+import struct
+import threading
+import time
+from typing import Any, BinaryIO, Callable, Dict, Hashable, List, Optional, Tuple
+
+from zclipboard.backends import pipeio
+from zclipboard.backends.base import ClipboardBackend
+from zclipboard.backends.linux import LinuxClipboardBackend
+from zclipboard.backends.ownership import FileSlice, ItemData
+from zclipboard.backends.xproto import (
+    CURRENT_TIME,
+    NONE,
+    PROP_MODE_APPEND,
+    PROPERTY_CHANGE_MASK,
+    PROPERTY_DELETE,
+    PROPERTY_NOTIFY,
+    PROPERTY_NEW_VALUE,
+    SELECTION_CLEAR,
+    SELECTION_NOTIFY,
+    SELECTION_REQUEST,
+    XFIXES_SELECTION_NOTIFY,
+    XA_ATOM,
+    XA_INTEGER,
+    XConnection,
+)
+from zclipboard.exceptions import ClipboardAccessError, ClipboardTimeoutError
+
+
+def _wait_for_event(events: "queue.Queue[bytes]", deadline: float, match) -> bytes:
+    """Pop events until one satisfies match, or raise on deadline."""
+    while True:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise ClipboardTimeoutError("Clipboard operation timed out")
+        try:
+            event = events.get(timeout=remaining)
+        except queue.Empty:
+            continue
+        if match(event):
+            return event
+
+
+class SelectionOwner:
+    """Owns an X selection on its own window and serves conversion requests."""
+    
+    def __init__(self, conn: XConnection, selection: int):
+        self._conn = conn
+        self._selection = selection
+        self._window = conn.create_window()
+        self._events = conn.subscribe(lambda event: event[0] & 0x7F in (PROPERTY_NOTIFY, SELECTION_REQUEST))
+        self._atom_incr = conn.intern_atom("INCR")
+        self._atom_multiple = conn.intern_atom("MULTIPLE")
+        self._atom_targets = conn.intern_atom("TARGETS")
+        self._atom_timestamp = conn.intern_atom("TIMESTAMP")
+        self._atom_time_probe = conn.intern_atom("ZCLIPBOARD_TIMESTAMP")
+        self._chunk_size = min(conn.max_request_bytes - 64, 1 << 20) & ~3
+        self._items: Dict[int, ItemData] = {}
+        self._lock = threading.Lock()
+        self._owned_time: Optional[int] = None
+        self._released = threading.Event()
+        self._released.set()
+        self._render_lock = threading.Lock()
+        self._time_events: "queue.Queue[int]" = queue.Queue()
+        self._transfers: Dict[Tuple[int, int], Tuple[int, memoryview]] = {}
+        # Handled on the connection's reader thread, so ownership is up to
+        # date as soon as any later round trip completes.
+        conn.add_handler(self._on_selection_clear)
+        self._thread = threading.Thread(target=self._serve, name="zclipboard-x11-owner", daemon=True)
+        self._thread.start()
+    
+    @property
+    def owns(self) -> bool:
+        """True while this owner holds the selection."""
+        return self._owned_time is not None
+    
+    @property
+    def timestamp(self) -> Optional[int]:
+        """Server time at which the selection was acquired, while owned."""
+        return self._owned_time
+    
+    @property
+    def window(self) -> int:
+        """The window used to own the selection."""
+        return self._window
+    
+    def close(self) -> None:
+        """Release the selection and stop serving requests."""
+        self.release()
+        self._conn.remove_handler(self._on_selection_clear)
+        self._conn.unsubscribe(self._events)
+        self._events.put(b"")
+        if not self._conn.closed:
+            self._conn.destroy_window(self._window)
+    
+    def data_for(self, target: str) -> Optional[bytes]:
+        """Return the data held for target, if still owned."""
+        return self._resolve(self._conn.intern_atom(target))
+    
+    def target_names(self) -> List[str]:
+        """Return the targets served while owned, including TARGETS and TIMESTAMP."""
+        with self._lock:
+            if self._owned_time is None:
+                return []
+            atoms = [self._atom_targets, self._atom_timestamp] + list(self._items)
+        return self._conn.atom_names(atoms)
+    
+    def own(self, items: Dict[str, ItemData]) -> None:
+        """
+        Take ownership of the selection, serving the given targets.
+        
+        Args:
+            items: Mapping of target name to the bytes served for it, or to
+                a callable invoked on the first request for that target.
+                Its result is kept for the rest of the ownership.
+        """
+        atoms = {self._conn.intern_atom(target): data for target, data in items.items()}
+        timestamp = self.server_time()
+        with self._lock:
+            self._items = atoms
+            self._owned_time = timestamp
+            self._released.clear()
+        self._conn.set_selection_owner(self._window, self._selection, timestamp)
+        if self._conn.get_selection_owner(self._selection) != self._window:
+            self._disown()
+            raise ClipboardAccessError("Failed to acquire clipboard selection ownership")
+    
+    def release(self) -> None:
+        """Give up the selection if this owner still holds it."""
+        timestamp = self._disown()
+        if timestamp is not None and not self._conn.closed:
+            self._conn.set_selection_owner(NONE, self._selection, timestamp)
+    
+    def clear(self) -> None:
+        """Make the selection ownerless, whoever currently owns it."""
+        self._disown()
+        self._conn.set_selection_owner(NONE, self._selection, self.server_time())
+        self._conn.sync()
+    
+    def server_time(self) -> int:
+        """Obtain a current server timestamp via a zero-length property append."""
+        while not self._time_events.empty():
+            self._time_events.get_nowait()
+        self._conn.change_property(
+            self._window, self._atom_time_probe, XA_INTEGER, 32, b"", PROP_MODE_APPEND
+        )
+        try:
+            return self._time_events.get(timeout=self._conn.timeout)
+        except queue.Empty:
+            raise ClipboardTimeoutError("X server did not report a timestamp")
+    
+    def _serve(self) -> None:
+        """Event loop handling requests from other clients."""
+        while True:
+            event = self._events.get()
+            if not event:
+                return
+            code = event[0] & 0x7F
+            try:
+                if code == SELECTION_REQUEST:
+                    self._handle_request(event)
+                elif code == PROPERTY_NOTIFY:
+                    self._handle_property_notify(event)
+            except ClipboardAccessError:
+                if self._conn.closed:
+                    return
+    
+    def _on_selection_clear(self, event: bytes) -> None:
+        if event[0] & 0x7F != SELECTION_CLEAR:
+            return
+        _, owner, selection = struct.unpack_from("<III", event, 4)
+        if owner == self._window and selection == self._selection:
+            self._disown()
+    
+    def wait_released(self, timeout: Optional[float] = None) -> bool:
+        """Block until the selection is no longer owned. Returns False on timeout."""
+        return self._released.wait(timeout)
+    
+    def _disown(self) -> Optional[int]:
+        """Forget the served items; returns the ownership timestamp, if any."""
+        with self._lock:
+            timestamp = self._owned_time
+            self._items = {}
+            self._owned_time = None
+            self._released.set()
+        return timestamp
+    
+    def _resolve(self, atom: int) -> Optional[bytes]:
+        """Return the bytes for a target, rendering and memoizing deferred data."""
+        with self._render_lock:
+            with self._lock:
+                value = self._items.get(atom) if self._owned_time is not None else None
+            if not callable(value):
+                return value
+            try:
+                data = value()
+            except Exception:
+                return None
+            with self._lock:
+                if data is not None and self._items.get(atom) is value:
+                    self._items[atom] = data
+        return data
+    
+    def _handle_property_notify(self, event: bytes) -> None:
+        window, atom, timestamp = struct.unpack_from("<III", event, 4)
+        state = event[16]
+        if window == self._window and atom == self._atom_time_probe:
+            self._time_events.put(timestamp)
+            return
+        if state != PROPERTY_DELETE or (window, atom) not in self._transfers:
+            return
+        
+        prop_type, remaining = self._transfers[(window, atom)]
+        chunk = remaining[:self._chunk_size]
+        self._conn.change_property(window, atom, prop_type, 8, chunk.tobytes())
+        if chunk:
+            self._transfers[(window, atom)] = (prop_type, remaining[len(chunk):])
+        else:
+            del self._transfers[(window, atom)]
+            if not any(key[0] == window for key in self._transfers):
+                self._conn.change_window_event_mask(window, 0)
+    
+    def _handle_request(self, event: bytes) -> None:
+        request_time, owner, requestor, selection, target, prop = struct.unpack_from("<IIIIII", event, 4)
+        if prop == NONE:
+            prop = target
+        
+        with self._lock:
+            owned_time = self._owned_time
+            targets = list(self._items)
+        
+        refused = (
+            owner != self._window
+            or selection != self._selection
+            or owned_time is None
+            or (request_time != CURRENT_TIME and request_time < owned_time)
+        )
+        data = None
+        if not refused and target not in (self._atom_targets, self._atom_timestamp, self._atom_multiple):
+            data = self._resolve(target)
+        if refused:
+            prop = NONE
+        elif target == self._atom_targets:
+            atoms = [self._atom_targets, self._atom_timestamp] + targets
+            self._conn.change_property(requestor, prop, XA_ATOM, 32, struct.pack(f"<{len(atoms)}I", *atoms))
+        elif target == self._atom_timestamp:
+            self._conn.change_property(requestor, prop, XA_INTEGER, 32, struct.pack("<I", owned_time))
+        elif data is None or target == self._atom_multiple:
+            prop = NONE
+        elif len(data) > self._chunk_size:
+            self._conn.change_window_event_mask(requestor, PROPERTY_CHANGE_MASK)
+            self._transfers[(requestor, prop)] = (target, memoryview(data))
+            self._conn.change_property(requestor, prop, self._atom_incr, 32, struct.pack("<I", len(data)))
+        else:
+            self._conn.change_property(requestor, prop, target, 8, data)
+        
+        notify = struct.pack(
+            "<BxxxIIIII", SELECTION_NOTIFY, request_time, requestor, selection, target, prop
+        )
+        self._conn.send_event(requestor, notify)
+
+
+class X11ClipboardBackend(LinuxClipboardBackend):
+    """
+    Linux clipboard backend holding one connection to the X server.
+    
+    Selections are converted, listed and owned in-process, so no helper
+    process is spawned per call. Data set through this backend is served
+    for as long as the backend (and the process) is alive.
+    """
+    
+    PROPERTY_NAME = "ZCLIPBOARD_SELECTION"
+    
+    def __init__(self, display: Optional[str] = None, selection: str = "CLIPBOARD"):
+        """
+        Connect to the X server.
+        
+        Args:
+            display: DISPLAY string. Defaults to the DISPLAY environment variable.
+            selection: Selection to operate on ("CLIPBOARD" or "PRIMARY").
+        """
+        self._xclip_path = None
+        self._owners = None
+        self._targets = None
+        self._targets_owner = None
+        self._conn = XConnection(display)
+        try:
+            self._selection = self._conn.intern_atom(selection)
+            self._property = self._conn.intern_atom(self.PROPERTY_NAME)
+            self._atom_incr = self._conn.intern_atom("INCR")
+            self._window = self._conn.create_window()
+            self._events = self._conn.subscribe(self._is_own_event)
+            self._owner = SelectionOwner(self._conn, self._selection)
+            self._track_ownership()
+        except Exception:
+            self._conn.close()
+            raise
+        self._convert_lock = threading.Lock()
+    
+    @property
+    def display(self) -> str:
+        """The DISPLAY this backend is connected to."""
+        return self._conn.display
+    
+    def _is_own_event(self, event: bytes) -> bool:
+        """Whether an event concerns this backend's requestor window."""
+        code = event[0] & 0x7F
+        if code == SELECTION_NOTIFY:
+            return struct.unpack_from("<I", event, 8)[0] == self._window
+        if code == PROPERTY_NOTIFY:
+            return struct.unpack_from("<I", event, 4)[0] == self._window
+        return False
+    
+    def _track_ownership(self) -> None:
+        """
+        Follow selection ownership changes through XFIXES, when available.
+        
+        Every change bumps an epoch, so cached TARGETS are invalidated even
+        when the same window re-acquires the selection.
+        """
+        self._epoch = 1
+        self._has_owner = True
+        self._xfixes_event: Optional[int] = None
+        xfixes = self._conn.xfixes()
+        if xfixes is None or not self._conn.select_selection_input(self._window, self._selection):
+            return
+        self._xfixes_event = xfixes[1] + XFIXES_SELECTION_NOTIFY
+        self._conn.add_handler(self._on_ownership_event)
+        self._has_owner = self._conn.get_selection_owner(self._selection) != NONE
+    
+    def _on_ownership_event(self, event: bytes) -> None:
+        if event[0] & 0x7F != self._xfixes_event:
+            return
+        owner, selection = struct.unpack_from("<II", event, 8)
+        if selection == self._selection:
+            self._has_owner = owner != NONE
+            self._epoch += 1
+    
+    def close(self) -> None:
+        """Release the selection and close the X connection."""
+        if self._conn.closed:
+            return
+        self._owner.close()
+        self._conn.remove_handler(self._on_ownership_event)
+        self._conn.unsubscribe(self._events)
+        self._conn.destroy_window(self._window)
+        try:
+            self._conn.sync()
+        except ClipboardAccessError:
+            pass
+        self._conn.close()
+    
+    def _convert(self, target: str) -> Tuple[int, bytes]:
+        """Convert the selection to target; returns (type atom, data)."""
+        chunks: List[bytes] = []
+        prop_type = self._convert_into(target, chunks.append)
+        return prop_type, b"".join(chunks)
+    
+    def _convert_into(self, target: str, write: Callable[[bytes], Any]) -> int:
+        """Convert the selection to target, passing the data to write as it arrives; returns the type atom."""
+        target_atom = self._conn.intern_atom(target)
+        deadline = time.monotonic() + self._conn.timeout
+        with self._convert_lock:
+            while not self._events.empty():
+                self._events.get_nowait()
+            self._conn.convert_selection(
+                self._window, self._selection, target_atom, self._property, CURRENT_TIME
+            )
+            
+            def is_notify(event: bytes) -> bool:
+                if event[0] & 0x7F != SELECTION_NOTIFY:
+                    return False
+                requestor, selection, notified_target = struct.unpack_from("<III", event, 8)
+                return requestor == self._window and notified_target == target_atom
+            
+            notify = _wait_for_event(self._events, deadline, is_notify)
+            if struct.unpack_from("<I", notify, 20)[0] == NONE:
+                return NONE
+            
+            prop_type, _, data = self._conn.get_property(self._window, self._property, delete=True)
+            if prop_type != self._atom_incr:
+                if data:
+                    write(data)
+                return prop_type
+            
+            def is_new_value(event: bytes) -> bool:
+                if event[0] & 0x7F != PROPERTY_NOTIFY:
+                    return False
+                window, atom = struct.unpack_from("<II", event, 4)
+                return window == self._window and atom == self._property and event[16] == PROPERTY_NEW_VALUE
+            
+            while True:
+                _wait_for_event(self._events, time.monotonic() + self._conn.timeout, is_new_value)
+                prop_type, _, chunk = self._conn.get_property(self._window, self._property, delete=True)
+                if not chunk:
+                    return prop_type
+                write(chunk)
+    
+    def fingerprint(self) -> Hashable:
+        """Identify the selection ownership by owner window and acquisition time."""
+        owner = self._conn.get_selection_owner(self._selection)
+        if owner == NONE:
+            return (NONE, 0)
+        timestamp = self._owner.timestamp if owner == self._owner.window else None
+        if timestamp is None:
+            prop_type, data = self._convert("TIMESTAMP")
+            if prop_type == XA_INTEGER and len(data) >= 4:
+                timestamp = struct.unpack_from("<I", data)[0]
+        if not timestamp:
+            return (owner, ClipboardBackend.fingerprint(self))
+        return (owner, timestamp)
+    
+    def _get_clipboard_data(self, target: str) -> Optional[bytes]:
+        if self._owner.owns:
+            return self._owner.data_for(target) or None
+        return self._convert(target)[1] or None
+    
+    def _stream_target(self, target: str, write: Callable[[bytes], Any]) -> bool:
+        if self._owner.owns:
+            data = self._owner.data_for(target)
+            if data:
+                write(data)
+            return bool(data)
+        received = 0
+        
+        def counted(chunk: bytes) -> None:
+            nonlocal received
+            received += len(chunk)
+            write(chunk)
+        
+        self._convert_into(target, counted)
+        return received > 0
+    
+    def _open_target(self, target: str) -> Optional[BinaryIO]:
+        chunks: List[bytes] = []
+        if not self._stream_target(target, chunks.append):
+            return None
+        return io.BytesIO(b"".join(chunks))
+    
+    def _copy_target(self, target: str, fd: int) -> bool:
+        return self._stream_target(target, lambda chunk: pipeio.write_all(fd, [chunk]))
+    
+    def _get_available_targets(self) -> List[str]:
+        if self._owner.owns:
+            return self._owner.target_names()
+        prop_type, data = self._convert("TARGETS")
+        if prop_type != XA_ATOM or not data:
+            return []
+        atoms = struct.unpack(f"<{len(data) // 4}I", data)
+        return self._conn.atom_names(list(atoms))
+    
+    def _selection_owner(self) -> Optional[int]:
+        if self._xfixes_event is not None:
+            # The round trip guarantees every ownership change made before
+            # this call has been delivered and counted.
+            self._conn.sync()
+            return self._epoch if self._has_owner else 0
+        return self._conn.get_selection_owner(self._selection)
+    
+    def _set_targets(self, items: Dict[str, ItemData]) -> None:
+        self._targets = None
+        # Served from this process, so file contents have to be loaded.
+        loaded = {target: data.read() if isinstance(data, FileSlice) else data for target, data in items.items()}
+        self._owner.own(loaded)
+    
+    def clear(self) -> None:
+        self._targets = None
+        self._owner.clear()
@@ -0,0 +1,563 @@
+"""Minimal X11 wire protocol client used by the in-process Linux backends.
+
+Only the handful of core requests needed for selection handling are
+implemented. A single connection is shared by all callers: requests are
+written under a lock and a background reader thread routes replies to the
+waiting caller and events to subscribed queues.
+"""
+
+import os
+import queue
+import socket
+import struct
+import threading
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Callable, Dict, List, Optional, Tuple
+
+from zclipboard.exceptions import ClipboardAccessError, ClipboardTimeoutError
+
+X11_TIMEOUT = 5
+
+# Core request opcodes
+OP_CREATE_WINDOW = 1
+OP_CHANGE_WINDOW_ATTRIBUTES = 2
+OP_DESTROY_WINDOW = 4
+OP_INTERN_ATOM = 16
+OP_GET_ATOM_NAME = 17
+OP_CHANGE_PROPERTY = 18
+OP_DELETE_PROPERTY = 19
+OP_GET_PROPERTY = 20
+OP_SET_SELECTION_OWNER = 22
+OP_GET_SELECTION_OWNER = 23
+OP_CONVERT_SELECTION = 24
+OP_SEND_EVENT = 25
+OP_GET_INPUT_FOCUS = 43
+OP_QUERY_EXTENSION = 98
+
+# Event codes
+PROPERTY_NOTIFY = 28
+SELECTION_CLEAR = 29
+SELECTION_REQUEST = 30
+SELECTION_NOTIFY = 31
+GENERIC_EVENT = 35
+
+# Protocol constants
+ANY_PROPERTY_TYPE = 0
+CURRENT_TIME = 0
+CW_EVENT_MASK = 0x00000800
+NONE = 0
+PROP_MODE_APPEND = 2
+PROP_MODE_REPLACE = 0
+PROPERTY_CHANGE_MASK = 0x00400000
+PROPERTY_DELETE = 1
+PROPERTY_NEW_VALUE = 0
+WINDOW_CLASS_INPUT_ONLY = 2
+
+# Predefined atoms
+XA_ATOM = 4
+XA_INTEGER = 19
+XA_PRIMARY = 1
+XA_STRING = 31
+
+# XFIXES extension
+XFIXES_QUERY_VERSION = 0
+XFIXES_SELECT_SELECTION_INPUT = 2
+XFIXES_SELECTION_NOTIFY = 0
+XFIXES_SELECTION_CLIENT_CLOSE_MASK = 4
+XFIXES_SELECTION_WINDOW_DESTROY_MASK = 2
+XFIXES_SET_SELECTION_OWNER_MASK = 1
+XFIXES_ALL_SELECTION_EVENTS = (
+    XFIXES_SET_SELECTION_OWNER_MASK | XFIXES_SELECTION_WINDOW_DESTROY_MASK | XFIXES_SELECTION_CLIENT_CLOSE_MASK
+)
+
+# Xauthority address families
+FAMILY_INTERNET = 0
+FAMILY_LOCAL = 256
+FAMILY_WILD = 65535
+
+AUTH_COOKIE_NAME = b"MIT-MAGIC-COOKIE-1"
+X11_UNIX_SOCKET = "/tmp/.X11-unix/X{display}"
+X11_TCP_PORT = 6000
+
+
+def _pad(length: int) -> int:
+    """Return the number of bytes needed to pad length to a 4-byte boundary."""
+    return -length % 4
+
+
+def parse_display(display: str) -> Tuple[str, int]:
+    """
+    Split a DISPLAY string into host (or socket path) and display number.
+    
+    Args:
+        display: Value such as ":0", ":1.0", "unix:0", "host:10.0" or
+            "/path/to/socket:0".
+    
+    Returns:
+        Tuple of (host, display_number). Host is "" for the local socket.
+    """
+    host, sep, rest = display.rpartition(":")
+    if not sep:
+        raise ClipboardAccessError(f"Invalid DISPLAY value: {display!r}")
+    number = rest.split(".", 1)[0]
+    if not number.isdigit():
+        raise ClipboardAccessError(f"Invalid DISPLAY value: {display!r}")
+    if host == "unix":
+        host = ""
+    return host, int(number)
+
+
+def read_xauthority(
+    display_number: int,
+    path: Optional[str] = None,
+    hostname: Optional[str] = None,
+) -> Tuple[bytes, bytes]:
+    """
+    Look up the MIT-MAGIC-COOKIE-1 entry for a local display.
+    
+    Args:
+        display_number: Display number to match.
+        path: Xauthority file. Defaults to $XAUTHORITY or ~/.Xauthority.
+        hostname: Local host name. Defaults to socket.gethostname().
+    
+    Returns:
+        Tuple of (auth_name, auth_data), both empty if no entry matches.
+    """
+    if path is None:
+        path = os.environ.get("XAUTHORITY") or os.path.expanduser("~/.Xauthority")
+    if hostname is None:
+        hostname = socket.gethostname()
+    try:
+        with open(path, "rb") as f:
+            blob = f.read()
+    except OSError:
+        return b"", b""
+    
+    wanted_number = str(display_number).encode()
+    wanted_host = hostname.encode()
+    offset = 0
+    while offset + 2 <= len(blob):
+        family = struct.unpack_from(">H", blob, offset)[0]
+        offset += 2
+        fields = []
+        for _ in range(4):
+            if offset + 2 > len(blob):
+                return b"", b""
+            length = struct.unpack_from(">H", blob, offset)[0]
+            offset += 2
+            fields.append(blob[offset:offset + length])
+            offset += length
+        address, number, name, data = fields
+        if name != AUTH_COOKIE_NAME or number not in (b"", wanted_number):
+            continue
+        if family == FAMILY_WILD or (family == FAMILY_LOCAL and address == wanted_host):
+            return name, data
+    return b"", b""
+
+
+class XConnection:
+    """A thread-safe connection to an X server."""
+    
+    def __init__(self, display: Optional[str] = None, timeout: float = X11_TIMEOUT):
+        """
+        Connect to the X server and perform the setup handshake.
+        
+        Args:
+            display: DISPLAY string. Defaults to the DISPLAY environment variable.
+            timeout: Seconds to wait for any single reply.
+        """
+        display = display if display is not None else os.environ.get("DISPLAY")
+        if not display:
+            raise ClipboardAccessError("DISPLAY is not set; no X server to connect to")
+        self.display = display
+        self.timeout = timeout
+        self._host, self._display_number = parse_display(display)
+        self._sock = self._connect()
+        
+        self._atom_cache: Dict[str, int] = {}
+        self._atom_names: Dict[int, str] = {}
+        self._closed = False
+        self._next_id = 0
+        self._pending: Dict[int, Future] = {}
+        self._send_lock = threading.Lock()
+        self._handlers: List[Callable[[bytes], None]] = []
+        self._queues: Dict[int, Callable[[bytes], None]] = {}
+        self._seq = 0
+        self._xfixes: Optional[Tuple[int, int]] = None
+        self._xfixes_checked = False
+        
+        try:
+            self._handshake()
+        except Exception:
+            self._sock.close()
+            raise
+        
+        self._reader = threading.Thread(target=self._read_loop, name="zclipboard-x11", daemon=True)
+        self._reader.start()
+    
+    def _connect(self) -> socket.socket:
+        """Open the transport socket for the configured display."""
+        if self._host.startswith("/"):
+            paths = [self._host]
+        elif not self._host:
+            path = X11_UNIX_SOCKET.format(display=self._display_number)
+            paths = ["\0" + path, path]
+        else:
+            try:
+                return socket.create_connection(
+                    (self._host, X11_TCP_PORT + self._display_number), timeout=self.timeout
+                )
+            except OSError as e:
+                raise ClipboardAccessError(f"Cannot connect to X server {self._host}: {e}")
+        
+        last_error: Optional[OSError] = None
+        for path in paths:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                sock.connect(path)
+                return sock
+            except OSError as e:
+                sock.close()
+                last_error = e
+        raise ClipboardAccessError(f"Cannot connect to X server socket: {last_error}")
+    
+    def _handshake(self) -> None:
+        """Send the connection setup request and parse the server's reply."""
+        if self._host and not self._host.startswith("/"):
+            auth_name, auth_data = b"", b""
+        else:
+            auth_name, auth_data = read_xauthority(self._display_number)
+        
+        setup = struct.pack(
+            "<BxHHHHxx", 0x6C, 11, 0, len(auth_name), len(auth_data)
+        )
+        setup += auth_name + b"\0" * _pad(len(auth_name))
+        setup += auth_data + b"\0" * _pad(len(auth_data))
+        self._sock.settimeout(self.timeout)
+        self._sock.sendall(setup)
+        
+        status, reason_length, _, _, length = struct.unpack("<BBHHH", self._recv_exact(8))
+        body = self._recv_exact(length * 4)
+        if status != 1:
+            reason = body[:reason_length].decode("latin-1", errors="replace")
+            raise ClipboardAccessError(f"X server refused connection: {reason or 'authentication required'}")
+        
+        self.resource_id_base, self.resource_id_mask = struct.unpack_from("<II", body, 4)
+        vendor_length, max_request_length = struct.unpack_from("<HH", body, 16)
+        format_count = body[21]
+        screens_offset = 32 + vendor_length + _pad(vendor_length) + 8 * format_count
+        self.root = struct.unpack_from("<I", body, screens_offset)[0]
+        self.max_request_bytes = max_request_length * 4
+        self._sock.settimeout(None)
+    
+    def _recv_exact(self, size: int) -> bytes:
+        """Read exactly size bytes from the socket."""
+        buffer = bytearray(size)
+        view = memoryview(buffer)
+        received = 0
+        while received < size:
+            count = self._sock.recv_into(view[received:])
+            if count == 0:
+                raise ConnectionError("X server closed the connection")
+            received += count
+        return bytes(buffer)
+    
+    def _read_loop(self) -> None:
+        """Route replies to pending requests and events to subscribers."""
+        try:
+            while True:
+                packet = self._recv_exact(32)
+                code = packet[0] & 0x7F
+                if code == 1 or code == GENERIC_EVENT:
+                    extra = struct.unpack_from("<I", packet, 4)[0]
+                    if extra:
+                        packet += self._recv_exact(extra * 4)
+                if code == 0:
+                    seq = struct.unpack_from("<H", packet, 2)[0]
+                    future = self._pending.pop(seq, None)
+                    if future is not None:
+                        error_code = packet[1]
+                        major = packet[10]
+                        future.set_exception(
+                            ClipboardAccessError(f"X error {error_code} for request {major}")
+                        )
+                elif code == 1:
+                    seq = struct.unpack_from("<H", packet, 2)[0]
+                    future = self._pending.pop(seq, None)
+                    if future is not None:
+                        future.set_result(packet)
+                else:
+                    for handler in list(self._handlers):
+                        handler(packet)
+        except (OSError, ConnectionError, ValueError):
+            pass
+        finally:
+            self._closed = True
+            error = ClipboardAccessError("Connection to X server lost")
+            for future in list(self._pending.values()):
+                if not future.done():
+                    future.set_exception(error)
+            self._pending.clear()
+    
+    @property
+    def closed(self) -> bool:
+        """True once the connection has been closed or lost."""
+        return self._closed
+    
+    def alloc_id(self) -> int:
+        """Allocate a new resource ID from the client's ID range."""
+        with self._send_lock:
+            self._next_id += 1
+            step = self.resource_id_mask & -self.resource_id_mask
+            return self.resource_id_base | ((self._next_id * step) & self.resource_id_mask)
+    
+    def close(self) -> None:
+        """Close the connection."""
+        if not self._closed:
+            self._closed = True
+            try:
+                self._sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            self._sock.close()
+    
+    def request(self, opcode: int, data: int = 0, body: bytes = b"", reply: bool = False) -> Optional[Future]:
+        """
+        Send a request.
+        
+        Args:
+            opcode: Major opcode.
+            data: Value for the request's second header byte.
+            body: Request body; padded to a multiple of 4 bytes.
+            reply: Whether the request generates a reply.
+        
+        Returns:
+            A Future resolving to the raw reply if reply is True, else None.
+        """
+        body += b"\0" * _pad(len(body))
+        header = struct.pack("<BBH", opcode, data, 1 + len(body) // 4)
+        future: Optional[Future] = Future() if reply else None
+        with self._send_lock:
+            if self._closed:
+                raise ClipboardAccessError("Connection to X server is closed")
+            self._seq = (self._seq + 1) & 0xFFFF
+            if future is not None:
+                self._pending[self._seq] = future
+            try:
+                self._sock.sendall(header + body)
+            except OSError as e:
+                self._pending.pop(self._seq, None)
+                raise ClipboardAccessError(f"Failed to write to X server: {e}")
+        return future
+    
+    def wait(self, future: Future) -> bytes:
+        """Wait for a reply future, translating timeouts."""
+        try:
+            return future.result(self.timeout)
+        except FutureTimeoutError:
+            raise ClipboardTimeoutError("X server did not reply in time")
+    
+    def add_handler(self, handler: Callable[[bytes], None]) -> None:
+        """
+        Call handler with every event read from the server.
+        
+        Handlers run on the reader thread and must not block or wait for
+        replies.
+        """
+        self._handlers.append(handler)
+    
+    def remove_handler(self, handler: Callable[[bytes], None]) -> None:
+        """Stop calling a handler registered with add_handler()."""
+        if handler in self._handlers:
+            self._handlers.remove(handler)
+    
+    def subscribe(self, match: Optional[Callable[[bytes], bool]] = None) -> "queue.Queue[bytes]":
+        """
+        Return a queue receiving events read from the server.
+        
+        Args:
+            match: Optional predicate; only matching events are queued.
+        """
+        events: "queue.Queue[bytes]" = queue.Queue()
+        
+        def handler(event: bytes) -> None:
+            if match is None or match(event):
+                events.put(event)
+        
+        self._queues[id(events)] = handler
+        self.add_handler(handler)
+        return events
+    
+    def unsubscribe(self, events: "queue.Queue[bytes]") -> None:
+        """Stop delivering events to a queue returned by subscribe()."""
+        handler = self._queues.pop(id(events), None)
+        if handler is not None:
+            self.remove_handler(handler)
+    
+    def sync(self) -> None:
+        """Round-trip to the server so all previous requests are processed."""
+        self.wait(self.request(OP_GET_INPUT_FOCUS, reply=True))
+    
+    # Core requests
+    
+    def atom_name(self, atom: int) -> str:
+        """Return the name of an atom, caching the result."""
+        name = self._atom_names.get(atom)
+        if name is None:
+            reply = self.wait(self.request(OP_GET_ATOM_NAME, body=struct.pack("<I", atom), reply=True))
+            length = struct.unpack_from("<H", reply, 8)[0]
+            name = reply[32:32 + length].decode("latin-1")
+            self._atom_names[atom] = name
+            self._atom_cache.setdefault(name, atom)
+        return name
+    
+    def atom_names(self, atoms: List[int]) -> List[str]:
+        """Return names for several atoms, pipelining uncached lookups."""
+        futures = {}
+        for atom in atoms:
+            if atom not in self._atom_names and atom not in futures:
+                futures[atom] = self.request(OP_GET_ATOM_NAME, body=struct.pack("<I", atom), reply=True)
+        for atom, future in futures.items():
+            reply = self.wait(future)
+            length = struct.unpack_from("<H", reply, 8)[0]
+            name = reply[32:32 + length].decode("latin-1")
+            self._atom_names[atom] = name
+            self._atom_cache.setdefault(name, atom)
+        return [self._atom_names[atom] for atom in atoms]
+    
+    def change_property(
+        self,
+        window: int,
+        prop: int,
+        prop_type: int,
+        fmt: int,
+        data: bytes,
+        mode: int = PROP_MODE_REPLACE,
+    ) -> None:
+        """Change a window property. data length must be a multiple of fmt/8."""
+        units = len(data) // (fmt // 8)
+        body = struct.pack("<IIIBxxxI", window, prop, prop_type, fmt, units) + data
+        self.request(OP_CHANGE_PROPERTY, mode, body)
+    
+    def change_window_event_mask(self, window: int, mask: int) -> None:
+        """Select events on a window (ChangeWindowAttributes with event-mask)."""
+        self.request(OP_CHANGE_WINDOW_ATTRIBUTES, 0, struct.pack("<III", window, CW_EVENT_MASK, mask))
+    
+    def convert_selection(self, requestor: int, selection: int, target: int, prop: int, time: int) -> None:
+        """Ask the selection owner to convert the selection to target."""
+        body = struct.pack("<IIIII", requestor, selection, target, prop, time)
+        self.request(OP_CONVERT_SELECTION, 0, body)
+    
+    def create_window(self, event_mask: int = PROPERTY_CHANGE_MASK) -> int:
+        """Create an unmapped InputOnly child of the root window."""
+        window = self.alloc_id()
+        body = struct.pack(
+            "<IIhhHHHHIII",
+            window, self.root, 0, 0, 1, 1, 0, WINDOW_CLASS_INPUT_ONLY, 0, CW_EVENT_MASK, event_mask,
+        )
+        self.request(OP_CREATE_WINDOW, 0, body)
+        return window
+    
+    def delete_property(self, window: int, prop: int) -> None:
+        """Delete a window property."""
+        self.request(OP_DELETE_PROPERTY, 0, struct.pack("<II", window, prop))
+    
+    def destroy_window(self, window: int) -> None:
+        """Destroy a window."""
+        self.request(OP_DESTROY_WINDOW, 0, struct.pack("<I", window))
+    
+    def get_property(
+        self,
+        window: int,
+        prop: int,
+        delete: bool = False,
+        prop_type: int = ANY_PROPERTY_TYPE,
+    ) -> Tuple[int, int, bytes]:
+        """
+        Read a whole window property.
+        
+        Returns:
+            Tuple of (type, format, value). type is NONE if the property
+            does not exist.
+        """
+        body = struct.pack("<IIIII", window, prop, prop_type, 0, 0x1FFFFFFF)
+        reply = self.wait(self.request(OP_GET_PROPERTY, int(delete), body, reply=True))
+        fmt = reply[1]
+        actual_type, _, value_length = struct.unpack_from("<III", reply, 8)
+        size = value_length * (fmt // 8)
+        return actual_type, fmt, reply[32:32 + size]
+    
+    def get_selection_owner(self, selection: int) -> int:
+        """Return the window currently owning a selection, or NONE."""
+        reply = self.wait(self.request(OP_GET_SELECTION_OWNER, body=struct.pack("<I", selection), reply=True))
+        return struct.unpack_from("<I", reply, 8)[0]
+    
+    def intern_atom(self, name: str, only_if_exists: bool = False) -> int:
+        """Return the atom for name, creating it unless only_if_exists."""
+        atom = self._atom_cache.get(name)
+        if atom is None:
+            encoded = name.encode("latin-1")
+            body = struct.pack("<Hxx", len(encoded)) + encoded
+            reply = self.wait(self.request(OP_INTERN_ATOM, int(only_if_exists), body, reply=True))
+            atom = struct.unpack_from("<I", reply, 8)[0]
+            if atom == NONE:
+                return NONE
+            self._atom_cache[name] = atom
+            self._atom_names.setdefault(atom, name)
+        return atom
+    
+    def query_extension(self, name: str) -> Optional[Tuple[int, int, int]]:
+        """
+        Look up an extension.
+        
+        Returns:
+            Tuple of (major_opcode, first_event, first_error), or None if the
+            server does not support the extension.
+        """
+        encoded = name.encode("latin-1")
+        body = struct.pack("<Hxx", len(encoded)) + encoded
+        reply = self.wait(self.request(OP_QUERY_EXTENSION, body=body, reply=True))
+        if not reply[8]:
+            return None
+        return reply[9], reply[10], reply[11]
+    
+    def select_selection_input(self, window: int, selection: int, mask: int = XFIXES_ALL_SELECTION_EVENTS) -> bool:
+        """
+        Ask for XFixesSelectionNotify events about a selection's ownership.
+        
+        Returns:
+            False if the server lacks the XFIXES extension.
+        """
+        xfixes = self.xfixes()
+        if xfixes is None:
+            return False
+        body = struct.pack("<III", window, selection, mask)
+        self.request(xfixes[0], XFIXES_SELECT_SELECTION_INPUT, body)
+        return True
+    
+    def send_event(self, destination: int, event: bytes, event_mask: int = 0) -> None:
+        """Send a 32-byte event to the client owning destination."""
+        event = event.ljust(32, b"\0")
+        self.request(OP_SEND_EVENT, 0, struct.pack("<II", destination, event_mask) + event)
+    
+    def xfixes(self) -> Optional[Tuple[int, int]]:
+        """
+        Initialise the XFIXES extension once.
+        
+        Returns:
+            Tuple of (major_opcode, first_event), or None if unsupported.
+        """
+        if not self._xfixes_checked:
+            extension = self.query_extension("XFIXES")
+            if extension is not None:
+                major, first_event, _ = extension
+                body = struct.pack("<II", 5, 0)
+                self.wait(self.request(major, XFIXES_QUERY_VERSION, body, reply=True))
+                self._xfixes = (major, first_event)
+            self._xfixes_checked = True
+        return self._xfixes
+    
+    def set_selection_owner(self, owner: int, selection: int, time: int) -> None:
+        """Set (or, with owner NONE, release) the owner of a selection."""
+        self.request(OP_SET_SELECTION_OWNER, 0, struct.pack("<III", owner, selection, time))
@@ -0,0 +1,121 @@
+"""X selection target negotiation shared by the Linux backends."""
+
+import codecs
+from typing import Dict, List, Optional, Sequence
+
+from zclipboard.data_types import ClipboardFormat
+
+# Preferred targets per format, best first. Targets not listed here but
+# recognised by classify_target() rank after these. Only raster encodings
+# the codec or Pillow can convert to PNG count as images.
+HTML_TARGETS = ("text/html;charset=utf-8", "text/html")
+IMAGE_TARGETS = ("image/png", "image/jpeg", "image/bmp", "image/tiff", "image/x-bmp", "image/gif", "image/webp")
+RTF_TARGETS = ("text/rtf", "application/rtf", "text/richtext")
+TEXT_TARGETS = ("UTF8_STRING", "text/plain;charset=utf-8", "text/plain", "STRING")
+
+TARGET_PREFERENCES = {
+    ClipboardFormat.HTML: HTML_TARGETS,
+    ClipboardFormat.IMAGE: IMAGE_TARGETS,
+    ClipboardFormat.PLAIN_TEXT: TEXT_TARGETS,
+    ClipboardFormat.RTF: RTF_TARGETS,
+}
+
+# Targets whose charset is fixed by convention rather than a MIME parameter.
+_TARGET_ENCODINGS = {
+    "STRING": "latin-1",
+    "UTF8_STRING": "utf-8",
+}
+
+
+def _charset(target: str) -> Optional[str]:
+    """Return the charset parameter of a MIME target, if any."""
+    for param in target.split(";")[1:]:
+        key, _, value = param.strip().partition("=")
+        if key.strip().lower() == "charset":
+            return value.strip().strip('"').lower()
+    return None
+
+
+def classify_target(target: str) -> Optional[ClipboardFormat]:
+    """Map one X target name to the ClipboardFormat it carries, if any."""
+    if target in _TARGET_ENCODINGS:
+        return ClipboardFormat.PLAIN_TEXT
+    mime = target.split(";", 1)[0].strip().lower()
+    if mime == "text/plain":
+        return ClipboardFormat.PLAIN_TEXT if _decodable(target) else None
+    if mime == "text/html":
+        return ClipboardFormat.HTML if _decodable(target) else None
+    if mime in RTF_TARGETS:
+        return ClipboardFormat.RTF
+    if mime in IMAGE_TARGETS:
+        return ClipboardFormat.IMAGE
+    return None
+
+
+def decode_text(data: bytes, target: str) -> str:
+    """Decode text-like data using the charset implied by its target."""
+    encoding = _TARGET_ENCODINGS.get(target) or _charset(target)
+    if encoding is None:
+        if data.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+            encoding = "utf-16"
+        else:
+            encoding = "utf-8"
+    return data.decode(encoding, errors="ignore")
+
+
+def utf8_encoded(target: str) -> Optional[bool]:
+    """
+    Whether data for a text target is UTF-8.
+    
+    Returns None when the target does not say, in which case decode_text()
+    treats data with a UTF-16 byte order mark as UTF-16 and all else as UTF-8.
+    """
+    encoding = _TARGET_ENCODINGS.get(target) or _charset(target)
+    if encoding is None:
+        return None
+    try:
+        return codecs.lookup(encoding).name == "utf-8"
+    except LookupError:
+        return False
+
+
+def _decodable(target: str) -> bool:
+    """Whether Python has a codec for the target's charset."""
+    charset = _charset(target)
+    if charset is None:
+        return True
+    try:
+        codecs.lookup(charset)
+        return True
+    except LookupError:
+        return False
+
+
+class TargetMap:
+    """Precomputed mapping from the targets an owner offers to clipboard formats."""
+    
+    def __init__(self, targets: Sequence[str]):
+        self.targets = tuple(targets)
+        self.formats: List[ClipboardFormat] = []
+        candidates: Dict[ClipboardFormat, List[str]] = {}
+        for target in self.targets:
+            format_type = classify_target(target)
+            if format_type is None:
+                continue
+            if format_type not in candidates:
+                candidates[format_type] = []
+                self.formats.append(format_type)
+            candidates[format_type].append(target)
+        
+        self._best: Dict[ClipboardFormat, str] = {}
+        for format_type, offered in candidates.items():
+            preferences = TARGET_PREFERENCES[format_type]
+            rank = {target: index for index, target in enumerate(preferences)}
+            self._best[format_type] = min(offered, key=lambda t: rank.get(t, len(preferences)))
+    
+    def __repr__(self) -> str:
+        return f"TargetMap(formats={[f.name for f in self.formats]})"
+    
+    def best(self, format_type: ClipboardFormat) -> Optional[str]:
+        """Return the best offered target for format_type, or None."""
+        return self._best.get(format_type)
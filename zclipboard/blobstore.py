@@ -0,0 +1,264 @@
+"""Content-addressed on-disk store for clipboard payloads too large to keep in memory."""
+
+import atexit
+import hashlib
+import mmap
+import os
+import shutil
+import tempfile
+import threading
+from typing import Optional, Set, Union
+
+DEFAULT_SPILL_THRESHOLD = 16 * 1024 * 1024
+
+
+class Blob:
+    """A stored payload, mapped read-only into memory."""
+    
+    def __init__(self, path: str, digest: str, size: int):
+        self.digest = digest
+        self.path = path
+        self.size = size
+        self._map: Optional[mmap.mmap] = None
+        if size:
+            with open(path, "rb") as file:
+                self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    
+    def __enter__(self) -> "Blob":
+        return self
+    
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+    
+    def __len__(self) -> int:
+        return self.size
+    
+    def __repr__(self) -> str:
+        return f"Blob(digest={self.digest[:16]}, size={self.size})"
+    
+    @property
+    def view(self) -> memoryview:
+        """Read-only view of the payload. Valid for as long as it is referenced."""
+        if self._map is None:
+            return memoryview(b"")
+        return memoryview(self._map)
+    
+    def close(self) -> None:
+        """Unmap the payload unless views of it are still alive."""
+        if self._map is not None:
+            try:
+                self._map.close()
+            except BufferError:
+                return
+            self._map = None
+
+
+class BlobWriter:
+    """Write a payload into the store in chunks; commit() files it under its digest."""
+    
+    def __init__(self, store: "BlobStore"):
+        self._digest = hashlib.blake2b(digest_size=32)
+        self._size = 0
+        self._store = store
+        fd, self._path = tempfile.mkstemp(dir=store.directory, suffix=".part")
+        self._file = os.fdopen(fd, "wb")
+    
+    def __enter__(self) -> "BlobWriter":
+        return self
+    
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if not self._file.closed:
+            self.abort()
+    
+    @property
+    def size(self) -> int:
+        return self._size
+    
+    def write(self, chunk: Union[bytes, bytearray, memoryview]) -> None:
+        self._digest.update(chunk)
+        self._file.write(chunk)
+        self._size += len(chunk)
+    
+    def abort(self) -> None:
+        """Discard what was written."""
+        self._file.close()
+        try:
+            os.unlink(self._path)
+        except FileNotFoundError:
+            pass
+    
+    def commit(self) -> Blob:
+        """Finish the payload and return it mapped read-only."""
+        self._file.close()
+        digest = self._digest.hexdigest()
+        path = self._store.path_for(digest)
+        # Identical content may already be stored, and mapped: Windows cannot
+        # replace a mapped file, so keep the stored copy and drop this one.
+        if self._store._reuse(digest):
+            os.unlink(self._path)
+        else:
+            try:
+                os.replace(self._path, path)
+            except PermissionError:
+                # Another writer stored it meanwhile.
+                if not os.path.exists(path):
+                    raise
+                os.unlink(self._path)
+        return Blob(path, digest, self._size)
+
+
+class BlobStore:
+    """
+    Directory of payloads named by their BLAKE2b digest.
+    
+    Storing identical content twice keeps one file. Files remain until
+    remove() or close(); a store without an explicit directory uses a
+    private temporary directory that close() deletes. Windows cannot delete
+    a mapped file, so there remove() may leave it in place until a later
+    call finds it unmapped; it no longer opens either way.
+    """
+    
+    def __init__(self, directory: Optional[str] = None):
+        """
+        Args:
+            directory: Where to keep payloads. Created if missing. None uses
+                a temporary directory, created on first use.
+        """
+        self._directory = directory
+        self._lock = threading.Lock()
+        self._owns_directory = directory is None
+        self._removed: Set[str] = set()
+    
+    @property
+    def directory(self) -> str:
+        with self._lock:
+            if self._directory is None:
+                self._directory = tempfile.mkdtemp(prefix="zclipboard-blobs-")
+            else:
+                os.makedirs(self._directory, exist_ok=True)
+            return self._directory
+    
+    def close(self) -> None:
+        """Delete the temporary directory, if this store created one."""
+        with self._lock:
+            if self._owns_directory and self._directory is not None:
+                shutil.rmtree(self._directory, ignore_errors=True)
+                self._directory = None
+            self._removed.clear()
+    
+    def open(self, digest: str) -> Optional[Blob]:
+        """Return the stored payload with this digest, or None."""
+        self._purge_removed()
+        with self._lock:
+            if digest in self._removed:
+                return None
+        path = self.path_for(digest)
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            return None
+        return Blob(path, digest, size)
+    
+    def path_for(self, digest: str) -> str:
+        return os.path.join(self.directory, digest)
+    
+    def put(self, data: Union[bytes, bytearray, memoryview]) -> Blob:
+        """Store data and return it mapped read-only."""
+        with self.writer() as writer:
+            writer.write(data)
+            return writer.commit()
+    
+    def remove(self, digest: str) -> None:
+        """Delete a payload. Existing mappings of it stay readable."""
+        with self._lock:
+            self._removed.add(digest)
+        self._purge_removed()
+    
+    def writer(self) -> BlobWriter:
+        return BlobWriter(self)
+    
+    def _purge_removed(self) -> None:
+        """Delete removed payloads that are no longer mapped."""
+        if not self._removed:
+            return
+        directory = self.directory
+        with self._lock:
+            for digest in list(self._removed):
+                try:
+                    os.unlink(os.path.join(directory, digest))
+                except FileNotFoundError:
+                    pass
+                except PermissionError:
+                    continue
+                self._removed.discard(digest)
+    
+    def _reuse(self, digest: str) -> bool:
+        """Claim an already stored payload for a new commit, returning whether one exists."""
+        with self._lock:
+            self._removed.discard(digest)
+        return os.path.exists(self.path_for(digest))
+
+
+class Spool:
+    """
+    Collect a payload in memory, moving it to a BlobStore once it exceeds a threshold.
+    
+    At most threshold bytes (plus one chunk) are ever held in memory.
+    """
+    
+    def __init__(self, store: BlobStore, threshold: int = DEFAULT_SPILL_THRESHOLD):
+        self.threshold = threshold
+        self._buffer = bytearray()
+        self._store = store
+        self._writer: Optional[BlobWriter] = None
+    
+    @property
+    def size(self) -> int:
+        return self._writer.size if self._writer is not None else len(self._buffer)
+    
+    @property
+    def spilled(self) -> bool:
+        return self._writer is not None
+    
+    def write(self, chunk: Union[bytes, bytearray, memoryview]) -> None:
+        if self._writer is not None:
+            self._writer.write(chunk)
+            return
+        if len(self._buffer) + len(chunk) <= self.threshold:
+            self._buffer += chunk
+            return
+        self._writer = self._store.writer()
+        self._writer.write(self._buffer)
+        self._writer.write(chunk)
+        self._buffer = bytearray()
+    
+    def abort(self) -> None:
+        """Discard the payload."""
+        if self._writer is not None:
+            self._writer.abort()
+            self._writer = None
+        self._buffer = bytearray()
+    
+    def finish(self) -> Union[bytes, Blob]:
+        """Return the payload: bytes if it stayed under the threshold, else a Blob."""
+        if self._writer is not None:
+            blob = self._writer.commit()
+            self._writer = None
+            return blob
+        data = bytes(self._buffer)
+        self._buffer = bytearray()
+        return data
+
+
+_default_store: Optional[BlobStore] = None
+_default_store_lock = threading.Lock()
+
+
+def default_store() -> BlobStore:
+    """The process-wide store in a temporary directory, deleted at exit."""
+    global _default_store
+    with _default_store_lock:
+        if _default_store is None:
+            _default_store = BlobStore()
+            atexit.register(_default_store.close)
+        return _default_store
@@ -0,0 +1,267 @@
+"""Read-through caching layer for Clipboard."""
+
+import sys
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Tuple
+
+from zclipboard.backends.base import ClipboardBackend, ContentProvider
+from zclipboard.clipboard import Clipboard, FileTarget
+from zclipboard.data_types import ClipboardData, ClipboardFormat
+from zclipboard.exceptions import ClipboardError, ClipboardFormatError
+from zclipboard.watch import ChangeSource, ClipboardChange, ClipboardWatcher
+
+DEFAULT_CACHE_BYTES = 64 * 1024 * 1024
+TEXT_FORMATS = (ClipboardFormat.PLAIN_TEXT, ClipboardFormat.HTML, ClipboardFormat.RTF)
+
+_UNSET = object()
+
+
+class CachedClipboard(Clipboard):
+    """
+    Clipboard that remembers decoded payloads until the clipboard changes.
+    
+    Every read first compares the backend's fingerprint() with the one the
+    cache was filled under and drops everything if it differs. Payloads are
+    kept per format within a byte budget, least recently used first out.
+    
+    With start_refresher(), a ClipboardWatcher invalidates and re-fills the
+    cache on every change instead, and reads no longer probe the backend at
+    all. Reads may then lag a change by the watcher's debounce interval.
+    """
+    
+    def __init__(self, backend: Optional[ClipboardBackend] = None, max_bytes: int = DEFAULT_CACHE_BYTES):
+        """
+        Initialize the cached clipboard.
+        
+        Args:
+            backend: Custom backend instance. If None, auto-detects platform.
+            max_bytes: Budget for cached payloads. Larger payloads are
+                returned but not cached.
+        """
+        super().__init__(backend)
+        self.hits = 0
+        self.misses = 0
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[ClipboardFormat, Tuple[Any, int]]" = OrderedDict()
+        self._formats: Optional[List[ClipboardFormat]] = None
+        self._generation = 0
+        self._lock = threading.RLock()
+        self._size = 0
+        self._token: Any = _UNSET
+        self._watcher: Optional[ClipboardWatcher] = None
+        self._warm_formats: Tuple[ClipboardFormat, ...] = ()
+    
+    @property
+    def cached_bytes(self) -> int:
+        """Bytes currently held by cached payloads."""
+        return self._size
+    
+    @property
+    def refreshing(self) -> bool:
+        """True while a background refresher keeps the cache current."""
+        return self._watcher is not None
+    
+    def invalidate(self) -> None:
+        """Drop every cached payload and the cached format list."""
+        with self._lock:
+            self._reset(None)
+            self._token = _UNSET
+    
+    def _reset(self, formats: Optional[List[ClipboardFormat]]) -> None:
+        """Empty the cache; fetches started before this are not stored. Call with the lock held."""
+        self._entries.clear()
+        self._formats = formats
+        self._generation += 1
+        self._size = 0
+    
+    def _validate(self) -> None:
+        """Empty the cache if the clipboard changed since it was filled."""
+        if self._watcher is not None:
+            return
+        token = self._backend.fingerprint()
+        with self._lock:
+            if token != self._token:
+                self._reset(None)
+                self._token = token
+    
+    @staticmethod
+    def _sizeof(value: Any) -> int:
+        return sys.getsizeof(value) if value is not None else 0
+    
+    def _store(self, format_type: ClipboardFormat, value: Any, generation: int) -> None:
+        size = self._sizeof(value)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if generation != self._generation:
+                return
+            previous = self._entries.pop(format_type, None)
+            if previous is not None:
+                self._size -= previous[1]
+            self._entries[format_type] = (value, size)
+            self._size += size
+            while self._size > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._size -= evicted
+    
+    def _read(self, format_type: ClipboardFormat, limit: Optional[int] = None) -> Any:
+        getters = {
+            ClipboardFormat.HTML: self._backend.get_html,
+            ClipboardFormat.IMAGE: self._backend.get_image,
+            ClipboardFormat.PLAIN_TEXT: self._backend.get_text,
+            ClipboardFormat.RTF: self._backend.get_rtf,
+        }
+        if format_type not in getters:
+            raise ClipboardFormatError(f"Unsupported format: {format_type}")
+        self._validate()
+        with self._lock:
+            entry = self._entries.get(format_type)
+            if entry is not None:
+                self._entries.move_to_end(format_type)
+                self.hits += 1
+                return entry[0] if limit is None or entry[0] is None else entry[0][:limit]
+            if self._formats is not None and format_type not in self._formats:
+                self.hits += 1
+                return None
+            generation = self._generation
+        self.misses += 1
+        if limit is not None:
+            # A prefix is not worth caching; read just that much.
+            return self._read_prefix(format_type, limit)
+        value = getters[format_type]()
+        self._store(format_type, value, generation)
+        return value
+    
+    def fingerprint(self) -> Hashable:
+        return self._backend.fingerprint()
+    
+    def get(self, format_type: Optional[ClipboardFormat] = None) -> Optional[ClipboardData]:
+        if format_type is None:
+            available = self.get_available_formats()
+            if not available:
+                return None
+            format_type = available[0]
+        data = self._read(format_type)
+        if data is not None:
+            return ClipboardData(data, format_type)
+        return None
+    
+    def get_available_formats(self) -> List[ClipboardFormat]:
+        self._validate()
+        with self._lock:
+            if self._formats is not None:
+                self.hits += 1
+                return list(self._formats)
+            generation = self._generation
+        self.misses += 1
+        formats = self._backend.get_available_formats()
+        with self._lock:
+            if generation == self._generation:
+                self._formats = list(formats)
+        return formats
+    
+    def get_html(self, max_chars: Optional[int] = None) -> Optional[str]:
+        return self._read(ClipboardFormat.HTML, max_chars)
+    
+    def get_image(self, max_bytes: Optional[int] = None) -> Optional[bytes]:
+        return self._read(ClipboardFormat.IMAGE, max_bytes)
+    
+    def get_rtf(self, max_chars: Optional[int] = None) -> Optional[str]:
+        return self._read(ClipboardFormat.RTF, max_chars)
+    
+    def get_text(self, max_chars: Optional[int] = None) -> Optional[str]:
+        return self._read(ClipboardFormat.PLAIN_TEXT, max_chars)
+    
+    # Writes go straight to the backend and drop the cache.
+    
+    def clear(self) -> None:
+        super().clear()
+        self.invalidate()
+    
+    def set(self, data: ClipboardData, plain_text_fallback: Optional[str] = None) -> None:
+        super().set(data, plain_text_fallback)
+        self.invalidate()
+    
+    def set_from_file(self, format_type: ClipboardFormat, source: FileTarget) -> None:
+        super().set_from_file(format_type, source)
+        self.invalidate()
+    
+    def set_html(self, html_content: str, plain_text_fallback: Optional[str] = None) -> None:
+        super().set_html(html_content, plain_text_fallback)
+        self.invalidate()
+    
+    def set_image(self, image_data: bytes) -> None:
+        super().set_image(image_data)
+        self.invalidate()
+    
+    def set_lazy(self, providers: Dict[ClipboardFormat, ContentProvider]) -> None:
+        super().set_lazy(providers)
+        self.invalidate()
+    
+    def set_rtf(self, rtf_content: str, plain_text_fallback: Optional[str] = None) -> None:
+        super().set_rtf(rtf_content, plain_text_fallback)
+        self.invalidate()
+    
+    def set_text(self, text: str) -> None:
+        super().set_text(text)
+        self.invalidate()
+    
+    # Background refresher
+    
+    def start_refresher(
+        self,
+        formats: Iterable[ClipboardFormat] = TEXT_FORMATS,
+        source: Optional[ChangeSource] = None,
+        debounce: float = 0.05,
+    ) -> None:
+        """
+        Keep the cache current from a background watcher.
+        
+        Args:
+            formats: Formats fetched into the cache after every change.
+            source: Change source for the watcher. Defaults to XFIXES events
+                where available, otherwise fingerprint polling.
+            debounce: Seconds of quiet required before a change is handled.
+        """
+        if self._watcher is not None:
+            raise RuntimeError("Refresher already running")
+        self._warm_formats = tuple(formats)
+        watcher = ClipboardWatcher(Clipboard(self._backend), source=source, debounce=debounce)
+        self._watcher = watcher
+        self._warm(watcher.formats)
+        watcher.start(self._on_change)
+    
+    def stop_refresher(self) -> None:
+        """Stop the background refresher; reads validate against the backend again."""
+        watcher, self._watcher = self._watcher, None
+        if watcher is not None:
+            watcher.stop()
+        self.invalidate()
+    
+    def _on_change(self, change: ClipboardChange) -> None:
+        try:
+            self._warm(change.formats)
+        except Exception:
+            # Without a refresher, reads must validate against the backend again.
+            watcher, self._watcher = self._watcher, None
+            if watcher is not None:
+                watcher.stop()
+            self.invalidate()
+            raise
+    
+    def _warm(self, available: List[ClipboardFormat]) -> None:
+        """Reset the cache to the available formats and fetch the warm ones; failed fetches are left to reads."""
+        with self._lock:
+            self._reset(list(available))
+            generation = self._generation
+        for format_type in self._warm_formats:
+            if format_type not in available:
+                continue
+            try:
+                self._read(format_type)
+            except ClipboardError:
+                # The format list may be as stale as the failed read; look both up again on demand.
+                with self._lock:
+                    if generation == self._generation:
+                        self._formats = None
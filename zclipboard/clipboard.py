@@ -1,11 +1,21 @@
 """Main clipboard interface - platform-agnostic API."""
 
+import io
+import os
 import sys
-from typing import List, Optional, Type
+from typing import IO, Any, BinaryIO, Callable, ContextManager, Dict, Hashable, Iterable, List, Optional, Type, Union
 
-from zclipboard.backends.base import ClipboardBackend
-from zclipboard.data_types import ClipboardData, ClipboardFormat
+from zclipboard.backends.base import ClipboardBackend, ContentProvider
+from zclipboard.blobstore import Blob, BlobStore, Spool, default_store
+from zclipboard.data_types import ClipboardData, ClipboardFormat, ClipboardInfo
 from zclipboard.exceptions import ClipboardFormatError, ClipboardPlatformError
+from zclipboard.image import ClipboardImage, encode_png
+from zclipboard.snapshot import DEFAULT_RETRIES, ClipboardSnapshot, take_snapshot
+from zclipboard.transaction import ClipboardTransaction
+from zclipboard.watch import ChangeSource, ClipboardChange, ClipboardWatcher
+
+# A filesystem path, or a binary file object already open.
+FileTarget = Union[str, "os.PathLike[str]", BinaryIO]
 
 
 def _get_platform_backend() -> Type[ClipboardBackend]:
@@ -28,13 +38,25 @@ def _get_platform_backend() -> Type[ClipboardBackend]:
 class Clipboard:
     """Cross-platform clipboard interface."""
     
-    def __init__(self, backend: Optional[ClipboardBackend] = None):
+    def __init__(
+        self,
+        backend: Optional[ClipboardBackend] = None,
+        spill_threshold: Optional[int] = None,
+        blob_store: Optional[BlobStore] = None,
+    ):
         """
         Initialize clipboard with optional custom backend.
         
         Args:
             backend: Custom backend instance. If None, auto-detects platform.
+            spill_threshold: If set, get() streams payloads and returns those
+                larger than this many bytes as read-only memoryviews over a
+                file in blob_store instead of in memory.
+            blob_store: Where spilled payloads go. Defaults to a temporary
+                directory removed at exit.
         """
+        self._blob_store = blob_store
+        self._spill_threshold = spill_threshold
         if backend is not None:
             self._backend = backend
         else:
@@ -50,15 +72,26 @@ class Clipboard:
         """Clear all clipboard contents."""
         self._backend.clear()
     
+    def fingerprint(self) -> Hashable:
+        """
+        Return an opaque token that changes whenever the clipboard contents change.
+        
+        Compare tokens to detect changes without transferring the contents.
+        Tokens are only comparable between calls on the same backend.
+        """
+        return self._backend.fingerprint()
+    
     def get(self, format_type: Optional[ClipboardFormat] = None) -> Optional[ClipboardData]:
         """
         Get clipboard content in the specified format.
         
         Args:
             format_type: Desired format. If None, returns first available format.
-            
+        
         Returns:
-            ClipboardData object or None if clipboard is empty.
+            ClipboardData object or None if clipboard is empty. With a
+            spill_threshold, payloads over it are memoryviews of the UTF-8
+            (text formats) or PNG (IMAGE) bytes.
         """
         if format_type is None:
             available = self.get_available_formats()
@@ -66,6 +99,9 @@ class Clipboard:
                 return None
             format_type = available[0]
         
+        if self._spill_threshold is not None:
+            return self._get_spooled(format_type)
+        
         data = None
         if format_type == ClipboardFormat.PLAIN_TEXT:
             data = self._backend.get_text()
@@ -82,26 +118,198 @@ class Clipboard:
             return ClipboardData(data, format_type)
         return None
     
+    def _get_spooled(self, format_type: ClipboardFormat) -> Optional[ClipboardData]:
+        """Stream one format, spilling it to the blob store past the threshold."""
+        spool = Spool(self._blob_store or default_store(), self._spill_threshold)
+        try:
+            available = self._backend.read_into(format_type, spool.write)
+        except BaseException:
+            spool.abort()
+            raise
+        if not available:
+            spool.abort()
+            return None
+        payload = spool.finish()
+        if isinstance(payload, Blob):
+            return ClipboardData(payload.view, format_type)
+        if format_type == ClipboardFormat.IMAGE:
+            return ClipboardData(payload, format_type)
+        return ClipboardData(payload.decode("utf-8", errors="ignore"), format_type)
+    
     def get_available_formats(self) -> List[ClipboardFormat]:
         """Get list of available formats currently on clipboard."""
         return self._backend.get_available_formats()
     
-    def get_html(self) -> Optional[str]:
-        """Get HTML content from clipboard."""
+    def get_many(
+        self, formats: Iterable[ClipboardFormat], retries: int = DEFAULT_RETRIES
+    ) -> Dict[ClipboardFormat, Any]:
+        """
+        Get several formats, all from the same clipboard contents.
+        
+        Args:
+            formats: Formats to read.
+            retries: Further attempts if the clipboard changes mid-read.
+        
+        Returns:
+            Mapping of each requested format that is available to its content.
+        
+        Raises:
+            ClipboardChangedError: The clipboard kept changing on every attempt.
+        """
+        snapshot = take_snapshot(self._backend, formats, retries)
+        return {format_type: data for format_type, data in snapshot.loaded.items() if data is not None}
+    
+    def get_html(self, max_chars: Optional[int] = None) -> Optional[str]:
+        """
+        Get HTML content from clipboard.
+        
+        Args:
+            max_chars: Return at most this many characters, stopping the
+                transfer once they have arrived.
+        """
+        if max_chars is not None:
+            return self._read_prefix(ClipboardFormat.HTML, max_chars)
         return self._backend.get_html()
     
-    def get_image(self) -> Optional[bytes]:
-        """Get image data from clipboard as PNG bytes."""
+    def get_info(self, format_type: ClipboardFormat = ClipboardFormat.IMAGE) -> Optional[ClipboardInfo]:
+        """
+        Describe clipboard content without transferring all of it.
+        
+        Reads the first few hundred bytes (more only if an image header is
+        further in) and parses them: PNG, JPEG, BMP/DIB, TIFF, GIF and WebP
+        headers give the image's MIME type, width, height and mode. The
+        size is known when the content ends within those bytes, when the
+        platform reports it (Windows, or an X owner offering LENGTH), or
+        when the backend holds the payload in memory anyway.
+        
+        Args:
+            format_type: Format to describe.
+        
+        Returns:
+            The description, or None if the format is not available.
+        """
+        return self._backend.get_info(format_type)
+    
+    def get_image(self, max_bytes: Optional[int] = None) -> Optional[bytes]:
+        """
+        Get image data from clipboard as PNG bytes.
+        
+        Args:
+            max_bytes: Return at most this many leading bytes, stopping the
+                transfer once they have arrived. Enough to inspect headers.
+        """
+        if max_bytes is not None:
+            return self._read_prefix(ClipboardFormat.IMAGE, max_bytes)
         return self._backend.get_image()
     
-    def get_rtf(self) -> Optional[str]:
-        """Get RTF content from clipboard."""
+    def get_image_object(self) -> Optional[ClipboardImage]:
+        """
+        Get the clipboard image without converting it.
+        
+        The returned ClipboardImage holds the bytes and MIME type the
+        clipboard owner offered; to_png() and to_format() convert on
+        demand and remember the result.
+        """
+        return self._backend.get_image_object()
+    
+    def get_image_array(self) -> Any:
+        """
+        Get the clipboard image as a NumPy array of shape (height, width, channels).
+        
+        Decodes straight from the native encoding; see ClipboardImage.to_array().
+        Requires NumPy; BMP and PNG decode without Pillow, other encodings need it.
+        
+        Raises:
+            ClipboardFormatError: A required package is missing or the image is unreadable.
+        """
+        image = self.get_image_object()
+        return image.to_array() if image is not None else None
+    
+    def get_image_thumbnail(self, max_size: int = 256, format_name: str = "PNG") -> Optional[bytes]:
+        """
+        Get the clipboard image scaled down to fit in max_size x max_size pixels.
+        
+        Decodes at reduced resolution where the codec allows it and skips
+        the conversion to full-size PNG; see ClipboardImage.thumbnail().
+        
+        Raises:
+            ClipboardFormatError: Pillow is not installed or the image is unreadable.
+        """
+        image = self.get_image_object()
+        return image.thumbnail(max_size, format_name) if image is not None else None
+    
+    def get_rtf(self, max_chars: Optional[int] = None) -> Optional[str]:
+        """
+        Get RTF content from clipboard.
+        
+        Args:
+            max_chars: Return at most this many characters, stopping the
+                transfer once they have arrived.
+        """
+        if max_chars is not None:
+            return self._read_prefix(ClipboardFormat.RTF, max_chars)
         return self._backend.get_rtf()
     
-    def get_text(self) -> Optional[str]:
-        """Get plain text from clipboard."""
+    def get_text(self, max_chars: Optional[int] = None) -> Optional[str]:
+        """
+        Get plain text from clipboard.
+        
+        Args:
+            max_chars: Return at most this many characters, stopping the
+                transfer once they have arrived. Cheap previews of large
+                clipboards.
+        """
+        if max_chars is not None:
+            return self._read_prefix(ClipboardFormat.PLAIN_TEXT, max_chars)
         return self._backend.get_text()
     
+    def _read_prefix(self, format_type: ClipboardFormat, limit: int) -> Any:
+        """Read up to limit characters (bytes for IMAGE) of one format, then abandon the transfer."""
+        if limit < 0:
+            raise ValueError("Limit must not be negative")
+        stream = self.open(format_type, "rb" if format_type == ClipboardFormat.IMAGE else "r")
+        if stream is None:
+            return None
+        with stream:
+            return stream.read(limit)
+    
+    def get_to_file(self, format_type: ClipboardFormat, destination: FileTarget) -> bool:
+        """
+        Write clipboard content to a file without holding all of it in memory.
+        
+        Text formats are written as UTF-8 and IMAGE as PNG. Where the
+        backend allows it (xclip on Linux), data the owner already offers
+        in that encoding is spliced into the file by the kernel.
+        
+        Args:
+            format_type: Format to write.
+            destination: Path of the file to create or replace, or a binary
+                file object open for writing.
+        
+        Returns:
+            False if the format is not available. A destination path is
+            then left untouched.
+        """
+        if not isinstance(format_type, ClipboardFormat):
+            raise ClipboardFormatError(f"Unsupported format: {format_type}")
+        if not isinstance(destination, (str, os.PathLike)):
+            return self._backend.read_to_file(format_type, destination)
+        if not self.has_format(format_type):
+            return False
+        with open(destination, "wb") as file:
+            available = self._backend.read_to_file(format_type, file)
+        if not available:
+            os.unlink(destination)
+        return available
+    
+    def get_image_to_file(self, destination: FileTarget) -> bool:
+        """Write the clipboard image to a PNG file; see get_to_file()."""
+        return self.get_to_file(ClipboardFormat.IMAGE, destination)
+    
+    def get_text_to_file(self, destination: FileTarget) -> bool:
+        """Write the clipboard text to a UTF-8 file; see get_to_file()."""
+        return self.get_to_file(ClipboardFormat.PLAIN_TEXT, destination)
+    
     def has_format(self, format_type: ClipboardFormat) -> bool:
         """Check if clipboard contains data in the specified format."""
         return format_type in self.get_available_formats()
@@ -110,6 +318,45 @@ class Clipboard:
         """Check if clipboard is empty."""
         return len(self.get_available_formats()) == 0
     
+    def open(self, format_type: ClipboardFormat, mode: str = "rb") -> Optional[IO]:
+        """
+        Open clipboard content as a readable stream.
+        
+        Where the backend allows it (xclip on Linux), data is transferred
+        only as it is read; closing the stream stops the transfer and the
+        process producing it. Other backends read the payload up front.
+        
+        Args:
+            format_type: Format to read.
+            mode: "rb" for bytes (UTF-8 for text formats, PNG for IMAGE),
+                or "r" for text decoded incrementally.
+        
+        Returns:
+            The stream, or None if the format is not available. Use it as
+            a context manager or close it when done.
+        """
+        if mode not in ("r", "rb"):
+            raise ValueError(f"Invalid mode: {mode!r}")
+        if not isinstance(format_type, ClipboardFormat):
+            raise ClipboardFormatError(f"Unsupported format: {format_type}")
+        if mode == "r" and format_type == ClipboardFormat.IMAGE:
+            raise ClipboardFormatError("Images can only be opened in binary mode")
+        stream = self._backend.open_stream(format_type)
+        if stream is None or mode == "rb":
+            return stream
+        return io.TextIOWrapper(stream, encoding="utf-8", errors="ignore", newline="")
+    
+    def session(self) -> ContextManager[Any]:
+        """
+        Hold the clipboard across several reads and writes.
+        
+        On Windows the clipboard is opened once for the whole block rather
+        than once per call; other programs cannot read or change it until
+        the block ends, so keep it short. Calls from other threads wait for
+        the block to end. Other backends ignore it or only serialize calls.
+        """
+        return self._backend.session()
+    
     def set(self, data: ClipboardData, plain_text_fallback: Optional[str] = None) -> None:
         """
         Set clipboard content from ClipboardData object.
@@ -129,6 +376,36 @@ class Clipboard:
         else:
             raise ClipboardFormatError(f"Unsupported format: {data.format_type}")
     
+    def set_from_file(self, format_type: ClipboardFormat, source: FileTarget) -> None:
+        """
+        Set clipboard content from a file without loading it into memory.
+        
+        Where the backend allows it (xclip on Linux), a regular file is sent
+        to the process serving the clipboard with sendfile(); other backends
+        and non-regular files are read as a whole.
+        
+        Args:
+            format_type: Format of the content: UTF-8 text for text formats,
+                PNG for IMAGE.
+            source: Path of the file, or a binary file object open for
+                reading; its content from the current position is used.
+        """
+        if not isinstance(format_type, ClipboardFormat):
+            raise ClipboardFormatError(f"Unsupported format: {format_type}")
+        if not isinstance(source, (str, os.PathLike)):
+            self._backend.set_from_file(format_type, source)
+            return
+        with open(source, "rb") as file:
+            self._backend.set_from_file(format_type, file)
+    
+    def set_image_from_file(self, source: FileTarget) -> None:
+        """Set the clipboard image from a PNG file; see set_from_file()."""
+        self.set_from_file(ClipboardFormat.IMAGE, source)
+    
+    def set_text_from_file(self, source: FileTarget) -> None:
+        """Set the clipboard text from a UTF-8 file; see set_from_file()."""
+        self.set_from_file(ClipboardFormat.PLAIN_TEXT, source)
+    
     def set_html(self, html_content: str, plain_text_fallback: Optional[str] = None) -> None:
         """
         Set HTML content to clipboard.
@@ -143,11 +420,54 @@ class Clipboard:
         """
         Set image data to clipboard.
         
+        The data's type is identified from its first bytes. PNG is set as
+        is; other images (JPEG, BMP, TIFF, GIF, WebP) are offered in their
+        own format where the platform has one, and converted to PNG only
+        where it is needed and Pillow is installed.
+        
         Args:
-            image_data: PNG image data as bytes.
+            image_data: Encoded image, preferably PNG.
         """
         self._backend.set_image(image_data)
     
+    def set_image_array(self, array: Any, compress_level: int = 1) -> None:
+        """
+        Set an image array to the clipboard.
+        
+        The array is encoded as PNG by encode_png(), which needs only NumPy
+        and zlib and compresses lightly for speed.
+        
+        Args:
+            array: uint8 array of shape (height, width) or (height, width, 1, 3 or 4).
+            compress_level: zlib level, 0 (fastest) to 9 (smallest).
+        
+        Raises:
+            ClipboardFormatError: NumPy is not installed.
+            ValueError: The array has an unsupported dtype or shape.
+        """
+        self.set_image(encode_png(array, compress_level))
+    
+    def set_lazy(self, providers: Dict[ClipboardFormat, ContentProvider]) -> None:
+        """
+        Offer content that is only produced when someone pastes it.
+        
+        Each provider is called the first time its format is requested and
+        its result is kept until the clipboard changes. Providers return str
+        for text formats and PNG bytes for IMAGE; returning None withholds
+        the format. Backends without deferred rendering call them immediately.
+        
+        Args:
+            providers: Mapping of format to a zero-argument callable.
+        """
+        if not providers:
+            raise ClipboardFormatError("At least one format is required")
+        for format_type, provider in providers.items():
+            if not isinstance(format_type, ClipboardFormat):
+                raise ClipboardFormatError(f"Unsupported format: {format_type}")
+            if not callable(provider):
+                raise ClipboardFormatError(f"Provider for {format_type.name} is not callable")
+        self._backend.set_lazy(providers)
+    
     def set_rtf(self, rtf_content: str, plain_text_fallback: Optional[str] = None) -> None:
         """
         Set RTF content to clipboard.
@@ -166,3 +486,67 @@ class Clipboard:
             text: Text to set.
         """
         self._backend.set_text(text)
+    
+    def snapshot(
+        self, formats: Optional[Iterable[ClipboardFormat]] = None, retries: int = DEFAULT_RETRIES
+    ) -> ClipboardSnapshot:
+        """
+        Capture the available formats and their contents as one consistent view.
+        
+        The given formats are read up front, in parallel on backends that
+        allow it; the rest are read on first access from the snapshot. If
+        the clipboard changes while the formats are read, they are read again.
+        
+        Args:
+            formats: Formats to read immediately. None reads every available format.
+            retries: Further attempts if the clipboard changes mid-read.
+        
+        Returns:
+            A ClipboardSnapshot.
+        
+        Raises:
+            ClipboardChangedError: The clipboard kept changing on every attempt.
+        """
+        return take_snapshot(self._backend, formats, retries)
+    
+    def transaction(self) -> ClipboardTransaction:
+        """
+        Start a write of several formats that replaces the contents in one change.
+        
+        Formats set on the transaction are only written when the with block
+        ends (or commit() is called), all together: one OpenClipboard and
+        EmptyClipboard on Windows, one declareTypes on macOS, one selection
+        owner serving every target on Linux. Other programs never see the
+        clipboard half-written.
+        
+        Returns:
+            A ClipboardTransaction; use it as a context manager.
+        """
+        return ClipboardTransaction(self._backend)
+    
+    def watch(
+        self,
+        callback: Optional[Callable[[ClipboardChange], None]] = None,
+        source: Optional[ChangeSource] = None,
+        debounce: float = 0.05,
+    ) -> ClipboardWatcher:
+        """
+        Watch the clipboard for changes.
+        
+        On X11 servers with the XFIXES extension changes are pushed by the
+        server; otherwise the clipboard is polled with an adaptive interval.
+        
+        Args:
+            callback: If given, called with each ClipboardChange from a
+                background thread until the watcher is stopped.
+            source: Change source to use instead of the default.
+            debounce: Seconds of quiet required before a change is reported.
+        
+        Returns:
+            A ClipboardWatcher; iterate over it if no callback was given,
+            and call stop() when done.
+        """
+        watcher = ClipboardWatcher(self, source=source, debounce=debounce)
+        if callback is not None:
+            watcher.start(callback)
+        return watcher
@@ -0,0 +1,5 @@
+"""Built-in encoders and decoders for clipboard formats that need no third-party packages."""
+
+from zclipboard.codecs.image import Bitmap, decode_image, encode_bmp, encode_dib, encode_png
+
+__all__ = ["Bitmap", "decode_image", "encode_bmp", "encode_dib", "encode_png"]
@@ -0,0 +1,202 @@
+"""The Windows "HTML Format" (CF_HTML) clipboard encoding, on bytes.
+
+A CF_HTML payload is a header of ASCII "Key:Value" lines followed by a
+UTF-8 HTML document. The header gives the byte offsets, from the start of
+the payload, of the document (StartHTML/EndHTML), of the fragment that
+was copied (StartFragment/EndFragment) and optionally of the selection
+within it (StartSelection/EndSelection), plus the SourceURL it came from.
+
+decode() reads only the header and slices everything else by those
+offsets, as memoryviews into the caller's buffer; encode_parts() computes
+the offsets arithmetically, so a fragment of any size is never searched,
+decoded or copied.
+"""
+
+from typing import Dict, List, Optional, Tuple, Union
+
+Buffer = Union[bytes, bytearray, memoryview]
+
+VERSION = "0.9"
+
+# Offsets are written zero-padded to a fixed width, so the header length
+# is known before the offsets are.
+OFFSET_DIGITS = 10
+
+# The header is never searched for beyond this many bytes.
+HEADER_LIMIT = 64 * 1024
+
+START_MARKER = b"<!--StartFragment-->"
+END_MARKER = b"<!--EndFragment-->"
+DOCUMENT_PREFIX = b"<!DOCTYPE html><html><body>" + START_MARKER
+DOCUMENT_SUFFIX = END_MARKER + b"</body></html>"
+
+_OFFSET_FIELDS = ("StartHTML", "EndHTML", "StartFragment", "EndFragment", "StartSelection", "EndSelection")
+
+
+class HtmlFormat:
+    """
+    A decoded CF_HTML payload.
+    
+    html, fragment and selection are memoryviews into the buffer passed to
+    decode(); decode one with str(view, "utf-8") when text is needed.
+    """
+    
+    def __init__(
+        self,
+        data: memoryview,
+        offsets: Dict[str, int],
+        version: Optional[str] = None,
+        source_url: Optional[str] = None,
+        body_start: int = 0,
+    ):
+        """
+        Args:
+            data: The whole payload.
+            offsets: Valid byte offsets from the header, by field name.
+            version: The Version field.
+            source_url: The SourceURL field.
+            body_start: Where the header ends.
+        """
+        self.data = data
+        self.offsets = offsets
+        self.source_url = source_url
+        self.version = version
+        self._body_start = body_start
+    
+    def __repr__(self) -> str:
+        return f"HtmlFormat(version={self.version!r}, source_url={self.source_url!r}, bytes={len(self.data)})"
+    
+    @property
+    def html(self) -> memoryview:
+        """The whole HTML document, or everything after the header if StartHTML/EndHTML are missing."""
+        span = self._span("StartHTML", "EndHTML")
+        if span is not None:
+            return self.data[span[0] : span[1]]
+        return self.data[self._body_start : _content_end(self.data)]
+    
+    @property
+    def fragment(self) -> memoryview:
+        """
+        The copied fragment.
+        
+        Located by StartFragment/EndFragment; payloads without usable
+        offsets fall back to the fragment comment markers, then to the
+        whole document.
+        """
+        span = self._span("StartFragment", "EndFragment")
+        if span is not None:
+            return self.data[span[0] : span[1]]
+        html = self.html
+        content = html.tobytes()
+        start = content.find(START_MARKER)
+        end = content.find(END_MARKER, start + 1)
+        if start != -1 and end != -1:
+            return html[start + len(START_MARKER) : end]
+        return html
+    
+    @property
+    def selection(self) -> Optional[memoryview]:
+        """The selection within the fragment, if the header has StartSelection/EndSelection."""
+        span = self._span("StartSelection", "EndSelection")
+        return self.data[span[0] : span[1]] if span is not None else None
+    
+    def _span(self, start_field: str, end_field: str) -> Optional[Tuple[int, int]]:
+        start, end = self.offsets.get(start_field), self.offsets.get(end_field)
+        if start is None or end is None or start > end:
+            return None
+        return start, end
+
+
+def _content_end(data: memoryview) -> int:
+    """Length of data without the NUL terminators clipboard data is stored with."""
+    end = len(data)
+    while end and data[end - 1] == 0:
+        end -= 1
+    return end
+
+
+def decode(data: Buffer) -> HtmlFormat:
+    """
+    Parse the header of a CF_HTML payload.
+    
+    Only the header is read. Offsets that are missing, -1 (the spec's
+    "none") or outside the payload are dropped, and the HtmlFormat
+    properties fall back accordingly, so plain HTML also decodes.
+    """
+    view = memoryview(data).cast("B")
+    head = data if isinstance(data, bytes) else view[:HEADER_LIMIT].tobytes()
+    fields: Dict[str, str] = {}
+    position = 0
+    while True:
+        end = head.find(b"\n", position, HEADER_LIMIT)
+        if end == -1:
+            break
+        key, separator, value = head[position:end].rstrip(b"\r").partition(b":")
+        if not separator or not key.isalnum():
+            break
+        fields[key.decode("ascii")] = value.decode("utf-8", errors="replace").strip()
+        position = end + 1
+    offsets = {}
+    size = _content_end(view)
+    for name in _OFFSET_FIELDS:
+        try:
+            offset = int(fields.get(name, ""))
+        except ValueError:
+            continue
+        if position <= offset <= size:
+            offsets[name] = offset
+    return HtmlFormat(view, offsets, fields.get("Version"), fields.get("SourceURL"), position)
+
+
+def encode_parts(
+    fragment: Union[str, Buffer],
+    source_url: Optional[str] = None,
+    selection: Optional[Tuple[int, int]] = None,
+) -> List[Buffer]:
+    """
+    Encode an HTML fragment as CF_HTML, in pieces that concatenate to the payload.
+    
+    The fragment is wrapped in a minimal document. Buffers are passed
+    through as they are, so a writer that accepts the pieces, such as the
+    Windows backend, copies the fragment only once.
+    
+    Args:
+        fragment: The HTML fragment; bytes must be UTF-8.
+        source_url: Address the fragment came from, for the SourceURL field.
+        selection: (start, end) byte offsets of the selection within the
+            fragment, for the StartSelection and EndSelection fields.
+    
+    Raises:
+        ValueError: source_url contains a line break, or selection is not
+            within the fragment.
+    """
+    body = fragment.encode("utf-8") if isinstance(fragment, str) else fragment
+    length = memoryview(body).nbytes
+    names = list(_OFFSET_FIELDS[:4])
+    if selection is not None:
+        if not 0 <= selection[0] <= selection[1] <= length:
+            raise ValueError(f"Selection {selection} is not within the {length}-byte fragment")
+        names += _OFFSET_FIELDS[4:]
+    source = b""
+    if source_url is not None:
+        if "\r" in source_url or "\n" in source_url:
+            raise ValueError("SourceURL cannot contain line breaks")
+        source = b"SourceURL:" + source_url.encode("utf-8") + b"\r\n"
+    version = f"Version:{VERSION}\r\n".encode("ascii")
+    header_size = len(version) + sum(len(name) + OFFSET_DIGITS + 3 for name in names) + len(source)
+    start_fragment = header_size + len(DOCUMENT_PREFIX)
+    end_fragment = start_fragment + length
+    offsets = [header_size, end_fragment + len(DOCUMENT_SUFFIX), start_fragment, end_fragment]
+    if selection is not None:
+        offsets += [start_fragment + selection[0], start_fragment + selection[1]]
+    lines = b"".join(b"%s:%0*d\r\n" % (name.encode(), OFFSET_DIGITS, offset) for name, offset in zip(names, offsets))
+    return [version + lines + source + DOCUMENT_PREFIX, body, DOCUMENT_SUFFIX]
+
+
+def encode(
+    fragment: Union[str, Buffer],
+    source_url: Optional[str] = None,
+    selection: Optional[Tuple[int, int]] = None,
+) -> bytes:
+    """Encode an HTML fragment as a CF_HTML payload; see encode_parts()."""
+    return b"".join(encode_parts(fragment, source_url, selection))
@@ -0,0 +1,708 @@
+"""PNG, BMP and DIB encoding and decoding with zlib and struct alone.
+
+Nearly every clipboard image is one of these three: PNG on every platform,
+and DIB (a BMP without its file header) on Windows and from many X11
+clients. Converting between them needs no imaging library, so the
+backends fall back to this module when Pillow is missing instead of
+handing back unconverted bytes.
+
+Pixels are decoded to 8 bits per channel in mode "L", "LA", "RGB" or
+"RGBA". Channel reordering and palette lookups are done by bytes slicing
+and bytes.translate(), which run in C. PNG row filters are vectorized with
+NumPy when it is installed. Without NumPy, Sub and Up rows are still
+undone a whole row at a time, using bytewise arithmetic on Python
+integers; Average and Paeth rows are undone a byte at a time.
+
+Interlaced PNGs and RLE, JPEG or PNG-compressed BMPs raise
+ClipboardFormatError.
+"""
+
+import struct
+import sys
+import zlib
+from array import array
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+from zclipboard.exceptions import ClipboardFormatError
+from zclipboard.sniff import is_dib, sniff_image_type
+
+Buffer = Union[bytes, bytearray, memoryview]
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+# PNG row filter types.
+FILTER_NONE = 0
+FILTER_SUB = 1
+FILTER_UP = 2
+FILTER_AVERAGE = 3
+FILTER_PAETH = 4
+
+# BMP compression types.
+BI_RGB = 0
+BI_BITFIELDS = 3
+BI_ALPHABITFIELDS = 6
+
+MODE_CHANNELS = {"L": 1, "LA": 2, "RGB": 3, "RGBA": 4}
+
+# Pillow format names transcode() reads and writes.
+DECODABLE_FORMATS = ("BMP", "PNG")
+ENCODABLE_FORMATS = ("BMP", "DIB", "PNG")
+
+_PNG_CHANNELS = {0: 1, 2: 3, 3: 1, 4: 2, 6: 4}
+_PNG_COLOR_TYPES = {"L": 0, "LA": 4, "RGB": 2, "RGBA": 6}
+_PNG_MODES = {0: "L", 2: "RGB", 4: "LA", 6: "RGBA"}
+
+# Magnitude of each byte read as a signed value; filters are judged by the sum.
+_SIGNED_MAGNITUDE = bytes(min(value, 256 - value) for value in range(256))
+
+# 96 DPI, as BMP headers record it.
+_PIXELS_PER_METRE = 3780
+
+
+class Bitmap:
+    """Decoded pixels at 8 bits per channel, rows top to bottom without padding."""
+    
+    def __init__(self, width: int, height: int, mode: str, pixels: Buffer):
+        """
+        Args:
+            width: Width in pixels.
+            height: Height in pixels.
+            mode: "L", "LA", "RGB" or "RGBA".
+            pixels: width * height * channels bytes, channels interleaved.
+        
+        Raises:
+            ValueError: The mode is unknown or pixels has the wrong length.
+        """
+        if mode not in MODE_CHANNELS:
+            raise ValueError(f"Unsupported mode {mode!r}")
+        expected = width * height * MODE_CHANNELS[mode]
+        if len(pixels) != expected:
+            raise ValueError(f"Expected {expected} bytes of {mode} pixels, got {len(pixels)}")
+        self.height = height
+        self.mode = mode
+        self.pixels = pixels
+        self.width = width
+    
+    def __repr__(self) -> str:
+        return f"Bitmap(width={self.width}, height={self.height}, mode={self.mode!r})"
+    
+    @property
+    def channels(self) -> int:
+        """Bytes per pixel."""
+        return MODE_CHANNELS[self.mode]
+    
+    def convert(self, mode: str) -> "Bitmap":
+        """
+        The same pixels in another mode.
+        
+        Gray is copied into each color channel and a missing alpha channel
+        is opaque.
+        
+        Raises:
+            ValueError: mode is unknown, or is "L" or "LA" for a color bitmap.
+        """
+        if mode == self.mode:
+            return self
+        if mode not in MODE_CHANNELS:
+            raise ValueError(f"Unsupported mode {mode!r}")
+        color = self.mode.startswith("RGB")
+        if color and not mode.startswith("RGB"):
+            raise ValueError(f"Cannot convert {self.mode} to {mode}")
+        source = bytes(self.pixels)
+        channels = self.channels
+        if mode.startswith("RGB"):
+            planes = [source[index::channels] for index in range(3)] if color else [source[::channels]] * 3
+        else:
+            planes = [source[::channels]]
+        if mode.endswith("A"):
+            if self.mode.endswith("A"):
+                planes.append(source[channels - 1 :: channels])
+            else:
+                planes.append(b"\xff" * (self.width * self.height))
+        return Bitmap(self.width, self.height, mode, _interleave(planes))
+
+
+def _numpy() -> Any:
+    """NumPy, or None if it is not installed."""
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+def _interleave(planes: Sequence[Buffer]) -> bytes:
+    """Interleave equally long channel planes into pixels."""
+    if len(planes) == 1:
+        return bytes(planes[0])
+    count = len(planes)
+    pixels = bytearray(len(planes[0]) * count)
+    for index, plane in enumerate(planes):
+        pixels[index::count] = plane
+    return bytes(pixels)
+
+
+def _unpack_bits(packed: bytes, rows: int, line: int, width: int, depth: int, scale: bool) -> bytes:
+    """
+    Spread 1, 2 or 4-bit samples, most significant first, to a byte each.
+    
+    Args:
+        packed: rows of line bytes each.
+        width: Samples per row; the rest of each row is padding.
+        scale: Stretch the samples to 0-255, as for gray levels, instead of
+            keeping their values, as for palette indices.
+    """
+    per_byte = 8 // depth
+    mask = (1 << depth) - 1
+    factor = 255 // mask if scale else 1
+    samples = bytearray(len(packed) * per_byte)
+    for index in range(per_byte):
+        shift = 8 - depth * (index + 1)
+        samples[index::per_byte] = packed.translate(bytes((value >> shift & mask) * factor for value in range(256)))
+    row = line * per_byte
+    if row == width:
+        return bytes(samples)
+    return b"".join(samples[y * row : y * row + width] for y in range(rows))
+
+
+def _lookup(indices: bytes, colors: Sequence[Sequence[int]], alphas: Optional[bytes] = None) -> bytes:
+    """Palette indices to RGB pixels, or RGBA if alphas are given. Indices past the palette are black."""
+    colors = colors[:256]
+    padding = bytes(256 - len(colors))
+    planes = [indices.translate(bytes(color[channel] for color in colors) + padding) for channel in range(3)]
+    if alphas is not None:
+        alphas = bytes(alphas[:256])
+        planes.append(indices.translate(alphas + b"\xff" * (256 - len(alphas))))
+    return _interleave(planes)
+
+
+# Bytewise arithmetic on whole rows held as big-endian integers: the low
+# seven bits of each byte are added or subtracted with the top bit masked
+# off, so no carry crosses into the next byte, and the top bit is fixed up
+# with XOR. high has 0x80 in every byte of the row and low has 0x7F.
+
+
+def _add_bytes(a: int, b: int, high: int, low: int) -> int:
+    return ((a & low) + (b & low)) ^ ((a ^ b) & high)
+
+
+def _sub_bytes(a: int, b: int, high: int, low: int) -> int:
+    return ((a | high) - (b & low)) ^ ((a ^ ~b) & high)
+
+
+def _unaverage(line: bytes, previous: bytes, bpp: int) -> bytes:
+    row = bytearray(line)
+    for index in range(bpp):
+        row[index] = (row[index] + (previous[index] >> 1)) & 0xFF
+    for index in range(bpp, len(row)):
+        row[index] = (row[index] + ((row[index - bpp] + previous[index]) >> 1)) & 0xFF
+    return bytes(row)
+
+
+def _unpaeth(line: bytes, previous: bytes, bpp: int) -> bytes:
+    row = bytearray(line)
+    for index in range(bpp):
+        row[index] = (row[index] + previous[index]) & 0xFF
+    for index in range(bpp, len(row)):
+        left, up, corner = row[index - bpp], previous[index], previous[index - bpp]
+        pa, pb, pc = abs(up - corner), abs(left - corner), abs(left + up - 2 * corner)
+        if pa <= pb and pa <= pc:
+            predictor = left
+        elif pb <= pc:
+            predictor = up
+        else:
+            predictor = corner
+        row[index] = (row[index] + predictor) & 0xFF
+    return bytes(row)
+
+
+def _unfilter_rows(raw: bytes, height: int, stride: int, bpp: int) -> bytes:
+    """Undo PNG row filters without NumPy."""
+    high = int.from_bytes(b"\x80" * stride, "big")
+    low = int.from_bytes(b"\x7f" * stride, "big")
+    # Sub is a running sum along the row: log2(pixels) shifted additions.
+    shifts = []
+    shift = 8 * bpp
+    while shift < 8 * stride:
+        shifts.append(shift)
+        shift *= 2
+    rows: List[bytes] = []
+    previous = bytes(stride)
+    for y in range(height):
+        start = y * (stride + 1)
+        kind = raw[start]
+        line = raw[start + 1 : start + 1 + stride]
+        if kind == FILTER_NONE:
+            row = line
+        elif kind == FILTER_SUB:
+            value = int.from_bytes(line, "big")
+            for shift in shifts:
+                value = _add_bytes(value, value >> shift, high, low)
+            row = value.to_bytes(stride, "big")
+        elif kind == FILTER_UP:
+            value = _add_bytes(int.from_bytes(line, "big"), int.from_bytes(previous, "big"), high, low)
+            row = value.to_bytes(stride, "big")
+        elif kind == FILTER_AVERAGE:
+            row = _unaverage(line, previous, bpp)
+        elif kind == FILTER_PAETH:
+            row = _unpaeth(line, previous, bpp)
+        else:
+            raise ClipboardFormatError(f"Unknown PNG filter type {kind}")
+        rows.append(row)
+        previous = row
+    return b"".join(rows)
+
+
+def _unfilter_vectorized(numpy: Any, raw: bytes, height: int, stride: int, bpp: int) -> bytes:
+    """Undo PNG row filters with NumPy."""
+    lines = numpy.frombuffer(raw, numpy.uint8, height * (stride + 1)).reshape(height, stride + 1)
+    kinds = lines[:, 0]
+    data = lines[:, 1:]
+    last = int(kinds.max())
+    if last > FILTER_PAETH:
+        raise ClipboardFormatError(f"Unknown PNG filter type {last}")
+    if last == FILTER_NONE:
+        return data.tobytes()
+    if last >= FILTER_AVERAGE:
+        return _unfilter_wavefront(numpy, data, kinds, bpp)
+    rows = numpy.empty((height, stride), numpy.uint8)
+    previous = numpy.zeros(stride, numpy.uint8)
+    for y, kind in enumerate(kinds.tolist()):
+        if kind == FILTER_SUB:
+            numpy.cumsum(data[y].reshape(-1, bpp), axis=0, dtype=numpy.uint8, out=rows[y].reshape(-1, bpp))
+        elif kind == FILTER_UP:
+            numpy.add(data[y], previous, out=rows[y])
+        else:
+            rows[y] = data[y]
+        previous = rows[y]
+    return rows.tobytes()
+
+
+def _unfilter_wavefront(numpy: Any, data: Any, kinds: Any, bpp: int) -> bytes:
+    """
+    Undo any mix of PNG filters, one anti-diagonal of pixels at a time.
+    
+    A pixel depends only on its left, upper and upper-left neighbours,
+    which all lie on earlier anti-diagonals, so each diagonal is one
+    vector step: width + height steps instead of width * height.
+    """
+    height, stride = data.shape
+    width = stride // bpp
+    span = width + height
+    # Skew the image so that anti-diagonal d is row d: pixel (y, x) moves
+    # to (x + y, y).
+    skewed = numpy.zeros((height, span, bpp), numpy.uint8)
+    _diagonal_view(numpy, skewed, width)[...] = data.reshape(height, width, bpp)
+    filtered = numpy.ascontiguousarray(skewed.transpose(1, 0, 2))
+    # Two leading diagonals and a leading row of zeros are the neighbours
+    # outside the image; pixel (y, x) is decoded into rows[x + y + 2, y + 1].
+    rows = numpy.zeros((span + 1, height + 1, bpp), numpy.uint8)
+    # Predictors are picked by ANDing with masks of all ones or all zeros,
+    # which is several times faster than numpy.where(). Each row has one
+    # mask per filter type, set for the type it uses.
+    masks = [numpy.repeat(-(kinds == kind).astype(numpy.int16)[:, None], bpp, 1) for kind in range(1, 5)]
+    for diagonal in range(span - 1):
+        first, last = max(0, diagonal - width + 1), min(height, diagonal + 1)
+        left = rows[diagonal + 1, first + 1 : last + 1].astype(numpy.int16)
+        up = rows[diagonal + 1, first:last].astype(numpy.int16)
+        corner = rows[diagonal, first:last].astype(numpy.int16)
+        pa, pb, pc = numpy.abs(up - corner), numpy.abs(left - corner), numpy.abs(left + up - 2 * corner)
+        use_left = -((pa <= pb) & (pa <= pc)).astype(numpy.int16)
+        use_up = -(pb <= pc).astype(numpy.int16) & ~use_left
+        paeth = (left & use_left) | (up & use_up) | (corner & ~(use_left | use_up))
+        sub, up_, average, paeth_ = (mask[first:last] for mask in masks)
+        predictor = (left & sub) | (up & up_) | (((left + up) >> 1) & average) | (paeth & paeth_)
+        rows[diagonal + 2, first + 1 : last + 1] = filtered[diagonal, first:last] + predictor
+    decoded = numpy.ascontiguousarray(rows[2:, 1:].transpose(1, 0, 2))
+    return _diagonal_view(numpy, decoded, width).tobytes()
+
+
+def _diagonal_view(numpy: Any, skewed: Any, width: int) -> Any:
+    """View of a (height, width + height, bpp) array whose element (y, x) is skewed[y, x + y]."""
+    strides = skewed.strides
+    shape = (skewed.shape[0], width, skewed.shape[2])
+    return numpy.lib.stride_tricks.as_strided(skewed, shape, (strides[0] + strides[1],) + strides[1:])
+
+
+def _unfilter(raw: bytes, height: int, stride: int, bpp: int) -> bytes:
+    numpy = _numpy()
+    if numpy is not None:
+        return _unfilter_vectorized(numpy, raw, height, stride, bpp)
+    return _unfilter_rows(raw, height, stride, bpp)
+
+
+def decode_png(data: Buffer) -> Bitmap:
+    """
+    Decode a PNG image.
+    
+    16-bit samples are reduced to 8 bits, 1, 2 and 4-bit gray is scaled
+    to 8 bits, and palette images become RGB, or RGBA if the palette has
+    transparency. Ancillary chunks, including gamma, are ignored.
+    
+    Raises:
+        ClipboardFormatError: data is not a PNG, is corrupt, or is interlaced.
+    """
+    data = bytes(data)
+    if not data.startswith(PNG_SIGNATURE):
+        raise ClipboardFormatError("Not a PNG image")
+    header = palette = transparency = None
+    chunks = []
+    position = len(PNG_SIGNATURE)
+    while position + 8 <= len(data):
+        length, kind = struct.unpack_from(">I4s", data, position)
+        body = data[position + 8 : position + 8 + length]
+        position += 12 + length
+        if kind == b"IHDR":
+            header = body
+        elif kind == b"PLTE":
+            palette = body
+        elif kind == b"tRNS":
+            transparency = body
+        elif kind == b"IDAT":
+            chunks.append(body)
+        elif kind == b"IEND":
+            break
+    if header is None or len(header) < 13 or not chunks:
+        raise ClipboardFormatError("Truncated PNG image")
+    width, height, depth, color_type, _, _, interlace = struct.unpack_from(">IIBBBBB", header)
+    valid_depths = {0: (1, 2, 4, 8, 16), 3: (1, 2, 4, 8)}.get(color_type, (8, 16))
+    if color_type not in _PNG_CHANNELS or depth not in valid_depths:
+        raise ClipboardFormatError(f"Invalid PNG color type {color_type} at bit depth {depth}")
+    if interlace:
+        raise ClipboardFormatError("Interlaced PNG images are not supported")
+    if not width or not height:
+        raise ClipboardFormatError("PNG image has no pixels")
+    bits = _PNG_CHANNELS[color_type] * depth
+    stride = (width * bits + 7) // 8
+    expected = height * (stride + 1)
+    try:
+        # Never inflate more than the header promises.
+        raw = zlib.decompressobj().decompress(b"".join(chunks), expected)
+    except zlib.error as e:
+        raise ClipboardFormatError(f"Corrupt PNG image data: {e}")
+    if len(raw) < expected:
+        raise ClipboardFormatError("Truncated PNG image data")
+    samples = _unfilter(raw, height, stride, max(1, bits // 8))
+    if depth == 16:
+        samples = samples[::2]
+    elif depth < 8:
+        samples = _unpack_bits(samples, height, stride, width, depth, scale=color_type == 0)
+    if color_type != 3:
+        return Bitmap(width, height, _PNG_MODES[color_type], samples)
+    if palette is None:
+        raise ClipboardFormatError("PNG palette image has no palette")
+    colors = [palette[index : index + 3] for index in range(0, len(palette) - 2, 3)]
+    return Bitmap(width, height, "RGB" if transparency is None else "RGBA", _lookup(samples, colors, transparency))
+
+
+def _png_chunk(kind: bytes, data: Buffer) -> bytes:
+    return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(data, zlib.crc32(kind)))
+
+
+def _filter_rows(pixels: bytes, height: int, stride: int, bpp: int, kinds: Sequence[int]) -> bytes:
+    """Filter each row with the best of kinds (None, Sub or Up) without NumPy."""
+    high = int.from_bytes(b"\x80" * stride, "big")
+    low = int.from_bytes(b"\x7f" * stride, "big")
+    parts = []
+    previous = 0
+    for y in range(height):
+        line = pixels[y * stride : (y + 1) * stride]
+        value = int.from_bytes(line, "big")
+        candidates = []
+        for kind in kinds:
+            if kind == FILTER_NONE:
+                candidates.append((kind, line))
+                continue
+            other = value >> 8 * bpp if kind == FILTER_SUB else previous
+            candidates.append((kind, _sub_bytes(value, other, high, low).to_bytes(stride, "big")))
+        kind, filtered = min(candidates, key=lambda candidate: sum(candidate[1].translate(_SIGNED_MAGNITUDE)))
+        parts.append(bytes([kind]))
+        parts.append(filtered)
+        previous = value
+    return b"".join(parts)
+
+
+def _filter_vectorized(numpy: Any, pixels: Buffer, height: int, stride: int, bpp: int, kinds: Sequence[int]) -> Any:
+    """Filter each row with the best of kinds (None, Sub or Up) with NumPy."""
+    rows = numpy.frombuffer(pixels, numpy.uint8).reshape(height, stride)
+    filtered = numpy.empty((len(kinds), height, stride + 1), numpy.uint8)
+    for candidate, kind in zip(filtered, kinds):
+        candidate[:, 0] = kind
+        if kind == FILTER_SUB:
+            candidate[:, 1 : 1 + bpp] = rows[:, :bpp]
+            numpy.subtract(rows[:, bpp:], rows[:, :-bpp], out=candidate[:, 1 + bpp :])
+        elif kind == FILTER_UP:
+            candidate[0, 1:] = rows[0]
+            numpy.subtract(rows[1:], rows[:-1], out=candidate[1:, 1:])
+        else:
+            candidate[:, 1:] = rows
+    if len(kinds) == 1:
+        return filtered[0]
+    costs = [numpy.abs(candidate[:, 1:].view(numpy.int8), dtype=numpy.int16).sum(axis=1) for candidate in filtered]
+    return filtered[numpy.argmin(costs, axis=0), numpy.arange(height)]
+
+
+def encode_png(bitmap: Bitmap, compress_level: int = 6, filter_type: Optional[int] = None) -> bytes:
+    """
+    Encode a bitmap as an 8-bit PNG.
+    
+    By default each row gets whichever of the None, Sub and Up filters
+    leaves the smallest sum of signed byte magnitudes, libpng's heuristic.
+    A fixed filter_type is faster; FILTER_NONE is the fastest.
+    
+    Args:
+        bitmap: The pixels.
+        compress_level: zlib level, 0 (none) to 9 (smallest).
+        filter_type: FILTER_NONE, FILTER_SUB, FILTER_UP, or None to choose per row.
+    
+    Raises:
+        ValueError: The bitmap is empty or filter_type is not supported.
+    """
+    if filter_type is None:
+        kinds: Sequence[int] = (FILTER_NONE, FILTER_SUB, FILTER_UP)
+    elif filter_type in (FILTER_NONE, FILTER_SUB, FILTER_UP):
+        kinds = (filter_type,)
+    else:
+        raise ValueError(f"Unsupported PNG filter type {filter_type}")
+    if not bitmap.width or not bitmap.height:
+        raise ValueError("Cannot encode an image without pixels")
+    stride = bitmap.width * bitmap.channels
+    numpy = _numpy()
+    if numpy is not None:
+        rows = _filter_vectorized(numpy, bitmap.pixels, bitmap.height, stride, bitmap.channels, kinds)
+    else:
+        rows = _filter_rows(bytes(bitmap.pixels), bitmap.height, stride, bitmap.channels, kinds)
+    header = struct.pack(">IIBBBBB", bitmap.width, bitmap.height, 8, _PNG_COLOR_TYPES[bitmap.mode], 0, 0, 0)
+    return b"".join(
+        [
+            PNG_SIGNATURE,
+            _png_chunk(b"IHDR", header),
+            _png_chunk(b"IDAT", zlib.compress(rows, compress_level)),
+            _png_chunk(b"IEND", b""),
+        ]
+    )
+
+
+def _mask_bits(mask: int) -> Tuple[int, int]:
+    """(shift, width) of a contiguous bit mask."""
+    if not mask:
+        return 0, 0
+    shift = (mask & -mask).bit_length() - 1
+    return shift, (mask >> shift).bit_length()
+
+
+def _bitfield_planes(packed: bytes, bits: int, masks: Sequence[int]) -> List[bytes]:
+    """Extract each masked channel of 16 or 32-bit little-endian pixels, scaled to 8 bits."""
+    planes = []
+    numpy = _numpy()
+    if numpy is not None:
+        values = numpy.frombuffer(packed, "<u2" if bits == 16 else "<u4")
+        for mask in masks:
+            shift, width = _mask_bits(mask)
+            channel = (values & mask) >> shift
+            if width > 8:
+                channel = channel >> (width - 8)
+            elif width:
+                channel = channel * 255 // ((1 << width) - 1)
+            planes.append(channel.astype(numpy.uint8).tobytes())
+        return planes
+    values = array("H" if bits == 16 else "I")
+    values.frombytes(packed)
+    if sys.byteorder == "big":
+        values.byteswap()
+    for mask in masks:
+        shift, width = _mask_bits(mask)
+        if width > 8:
+            shift += width - 8
+            planes.append(bytes((value & mask) >> shift for value in values))
+        else:
+            scale = bytes(value * 255 // ((1 << width) - 1) if width else 0 for value in range(1 << width))
+            planes.append(bytes(scale[(value & mask) >> shift] for value in values))
+    return planes
+
+
+def _decode_dib(data: bytes, base: int, pixel_offset: Optional[int]) -> Bitmap:
+    """Decode the DIB at data[base:]; pixel_offset is relative to base."""
+    if len(data) < base + 16:
+        raise ClipboardFormatError("Truncated bitmap header")
+    header_size = struct.unpack_from("<I", data, base)[0]
+    if header_size == 12:
+        width, height, _, bits = struct.unpack_from("<HHHH", data, base + 4)
+        compression, colors_used, entry_size = BI_RGB, 0, 3
+    elif header_size >= 40 and len(data) >= base + header_size:
+        width, height, _, bits, compression = struct.unpack_from("<iiHHI", data, base + 4)
+        colors_used = struct.unpack_from("<I", data, base + 32)[0]
+        entry_size = 4
+    else:
+        raise ClipboardFormatError(f"Unsupported bitmap header of {header_size} bytes")
+    table = base + header_size
+    masks: Optional[Tuple[int, ...]] = None
+    if compression in (BI_BITFIELDS, BI_ALPHABITFIELDS):
+        count = 4 if header_size >= 56 or (header_size == 40 and compression == BI_ALPHABITFIELDS) else 3
+        if len(data) < base + 40 + 4 * count:
+            raise ClipboardFormatError("Truncated bitmap header")
+        masks = struct.unpack_from(f"<{count}I", data, base + 40)
+        if header_size == 40:
+            # Masks follow a BITMAPINFOHEADER rather than being part of it.
+            table += 4 * count
+    elif compression != BI_RGB:
+        raise ClipboardFormatError(f"Compressed bitmaps (compression type {compression}) are not supported")
+    if width <= 0 or height == 0 or bits not in (1, 2, 4, 8, 16, 24, 32):
+        raise ClipboardFormatError(f"Unsupported {width}x{height} bitmap of {bits} bits per pixel")
+    colors: List[Tuple[int, int, int]] = []
+    if bits <= 8:
+        count = min(colors_used or 1 << bits, 256)
+        if len(data) < table + entry_size * count:
+            raise ClipboardFormatError("Truncated bitmap palette")
+        # Palette entries are stored blue, green, red.
+        entries = range(table, table + entry_size * count, entry_size)
+        colors = [(data[start + 2], data[start + 1], data[start]) for start in entries]
+        table += entry_size * (colors_used or 1 << bits)
+    offset = table if pixel_offset is None else base + pixel_offset
+    rows = abs(height)
+    line = (width * bits + 7) // 8
+    stride = (line + 3) // 4 * 4
+    if offset < base or offset + stride * (rows - 1) + line > len(data):
+        raise ClipboardFormatError("Truncated bitmap pixel data")
+    order = range(rows) if height < 0 else range(rows - 1, -1, -1)
+    if height < 0 and line == stride:
+        packed = data[offset : offset + stride * rows]
+    else:
+        packed = b"".join(data[offset + y * stride : offset + y * stride + line] for y in order)
+    if bits <= 8:
+        indices = packed if bits == 8 else _unpack_bits(packed, rows, line, width, bits, scale=False)
+        return Bitmap(width, rows, "RGB", _lookup(indices, colors))
+    if masks is None:
+        masks = (0x7C00, 0x3E0, 0x1F) if bits == 16 else (0xFF0000, 0xFF00, 0xFF)
+    masks = masks if len(masks) > 3 and masks[3] else masks[:3]
+    if bits == 24:
+        planes = [packed[2::3], packed[1::3], packed[0::3]]
+    elif bits == 32 and masks in ((0xFF0000, 0xFF00, 0xFF), (0xFF0000, 0xFF00, 0xFF, 0xFF000000)):
+        planes = [packed[2::4], packed[1::4], packed[0::4], packed[3::4]][: len(masks)]
+    else:
+        planes = _bitfield_planes(packed, bits, masks)
+    return Bitmap(width, rows, "RGBA" if len(masks) > 3 else "RGB", _interleave(planes))
+
+
+def decode_dib(data: Buffer) -> Bitmap:
+    """
+    Decode a device-independent bitmap: a BMP without its file header, as
+    the Windows CF_DIB and CF_DIBV5 formats hold.
+    
+    Palette images become RGB. 16 and 32-bit pixels are read through
+    their BI_BITFIELDS masks, and are RGBA if there is an alpha mask; 32-bit
+    BI_RGB pixels are RGB, their fourth byte unused.
+    
+    Raises:
+        ClipboardFormatError: data is truncated, compressed, or not a bitmap.
+    """
+    return _decode_dib(bytes(data), 0, None)
+
+
+def decode_bmp(data: Buffer) -> Bitmap:
+    """
+    Decode a BMP file; see decode_dib().
+    
+    Raises:
+        ClipboardFormatError: data is truncated, compressed, or not a BMP.
+    """
+    data = bytes(data)
+    if sniff_image_type(data) != "image/bmp":
+        raise ClipboardFormatError("Not a BMP image")
+    return _decode_dib(data, 14, struct.unpack_from("<I", data, 10)[0] - 14)
+
+
+def decode_image(data: Buffer) -> Bitmap:
+    """
+    Decode a PNG, BMP or DIB, whichever data holds.
+    
+    Raises:
+        ClipboardFormatError: data is none of them or cannot be decoded.
+    """
+    mime_type = sniff_image_type(data)
+    if mime_type == "image/png":
+        return decode_png(data)
+    if mime_type == "image/bmp":
+        return decode_bmp(data)
+    if mime_type is None and is_dib(data):
+        return decode_dib(data)
+    raise ClipboardFormatError(f"Cannot decode {mime_type or 'unrecognised'} image data without Pillow")
+
+
+def _dib_parts(bitmap: Bitmap) -> Tuple[bytes, bytes, bytes]:
+    """(info header, palette, bottom-up rows) of a bitmap."""
+    if bitmap.mode == "LA":
+        bitmap = bitmap.convert("RGBA")
+    source = bytes(bitmap.pixels)
+    channels = bitmap.channels
+    palette = b""
+    if channels == 1:
+        packed = source
+        palette = b"".join(bytes((level, level, level, 0)) for level in range(256))
+    else:
+        planes = [source[2::channels], source[1::channels], source[0::channels], source[3::channels]]
+        packed = _interleave(planes[:channels])
+    line = bitmap.width * channels
+    padding = bytes(-line % 4)
+    parts = []
+    for y in range(bitmap.height - 1, -1, -1):
+        parts.append(packed[y * line : (y + 1) * line])
+        if padding:
+            parts.append(padding)
+    rows = b"".join(parts)
+    header = struct.pack(
+        "<IiiHHIIiiII",
+        40,
+        bitmap.width,
+        bitmap.height,
+        1,
+        8 * channels,
+        BI_RGB,
+        len(rows),
+        _PIXELS_PER_METRE,
+        _PIXELS_PER_METRE,
+        256 if palette else 0,
+        0,
+    )
+    return header, palette, rows
+
+
+def encode_dib(bitmap: Bitmap) -> bytes:
+    """
+    Encode a bitmap as a DIB with a BITMAPINFOHEADER.
+    
+    RGB is written as 24-bit and RGBA, like LA, as 32-bit BGRA; gray as
+    8-bit with a gray palette.
+    """
+    return b"".join(_dib_parts(bitmap))
+
+
+def encode_bmp(bitmap: Bitmap) -> bytes:
+    """Encode a bitmap as a BMP file; see encode_dib()."""
+    header, palette, rows = _dib_parts(bitmap)
+    offset = 14 + len(header) + len(palette)
+    return b"".join([b"BM", struct.pack("<I4xI", offset + len(rows), offset), header, palette, rows])
+
+
+_ENCODERS: Dict[str, Callable[..., bytes]] = {"BMP": encode_bmp, "DIB": encode_dib, "PNG": encode_png}
+
+
+def transcode(data: Buffer, format_name: str, **options: Any) -> bytes:
+    """
+    Re-encode a PNG, BMP or DIB as one of ENCODABLE_FORMATS.
+    
+    Args:
+        data: The encoded image.
+        format_name: "PNG", "BMP" or "DIB".
+        **options: compress_level for PNG, as Pillow takes it.
+    
+    Raises:
+        ClipboardFormatError: data cannot be decoded.
+        ValueError: format_name or an option is not supported.
+    """
+    encoder = _ENCODERS.get(format_name.upper())
+    if encoder is None:
+        raise ValueError(f"Cannot encode {format_name} images without Pillow")
+    if set(options) - ({"compress_level"} if encoder is encode_png else set()):
+        raise ValueError(f"Unsupported {format_name} options without Pillow: {sorted(options)}")
+    return encoder(decode_image(data), **options)
@@ -0,0 +1,124 @@
+"""Process-wide cache of format conversions, keyed by the digest of their input."""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional, Tuple, Union
+
+DEFAULT_CONVERSION_BYTES = 32 * 1024 * 1024
+
+Buffer = Union[bytes, bytearray, memoryview]
+ConversionKey = Tuple[str, str, str, Hashable]
+
+
+def digest(data: Buffer) -> str:
+    """Hex BLAKE2b digest of data, the hash BlobStore also names payloads by."""
+    return hashlib.blake2b(data, digest_size=32).hexdigest()
+
+
+class ConversionCache:
+    """
+    Converted payloads, keyed by (source digest, source type, target format, options).
+    
+    A clipboard that has not changed yields the same bytes on every read,
+    so converting them again is wasted work: a lookup costs one hash of
+    the source instead of a decode and encode. Results are kept within a
+    byte budget, least recently used first out; results larger than the
+    budget are returned but not kept.
+    """
+    
+    def __init__(self, max_bytes: int = DEFAULT_CONVERSION_BYTES):
+        """
+        Args:
+            max_bytes: Budget for cached results. 0 disables caching.
+        """
+        self.hits = 0
+        self.misses = 0
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[ConversionKey, bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._size = 0
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    @property
+    def cached_bytes(self) -> int:
+        """Bytes currently held by cached results."""
+        return self._size
+    
+    def clear(self) -> None:
+        """Drop every cached result and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+            self.hits = 0
+            self.misses = 0
+    
+    def convert(
+        self,
+        data: Buffer,
+        source_type: str,
+        target_format: str,
+        converter: Callable[[], Optional[bytes]],
+        options: Hashable = (),
+    ) -> Optional[bytes]:
+        """
+        Return the cached conversion of data, running converter() on a miss.
+        
+        Args:
+            data: The source payload; only its digest is kept.
+            source_type: MIME type of data, such as "image/jpeg".
+            target_format: What data is converted to, such as "PNG".
+            converter: Produces the result. Exceptions propagate and nothing
+                is cached; neither is a None result.
+            options: Hashable description of any settings that change the
+                result, such as encoder options.
+        """
+        if self.max_bytes <= 0:
+            return converter()
+        key = (digest(data), source_type, target_format, options)
+        with self._lock:
+            result = self._entries.get(key)
+            if result is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return result
+            self.misses += 1
+        result = converter()
+        if result is not None:
+            self._store(key, bytes(result))
+        return result
+    
+    def _store(self, key: ConversionKey, result: bytes) -> None:
+        if len(result) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= len(previous)
+            self._entries[key] = result
+            self._size += len(result)
+            while self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+
+
+_default_cache: Optional[ConversionCache] = None
+_default_cache_lock = threading.Lock()
+
+
+def default_cache() -> ConversionCache:
+    """The process-wide cache used by the backends' image conversions."""
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = ConversionCache()
+        return _default_cache
+
+
+def cached_conversion(
+    data: Buffer, source_type: str, target_format: str, converter: Callable[[], Optional[bytes]], **options: Any
+) -> Optional[bytes]:
+    """Convert through default_cache(); see ConversionCache.convert()."""
+    return default_cache().convert(data, source_type, target_format, converter, tuple(sorted(options.items())))
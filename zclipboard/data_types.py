@@ -34,3 +34,38 @@ class ClipboardData:
     
     def __repr__(self) -> str:
         return f"ClipboardData(format={self.format_type.name}, data_type={type(self.data).__name__})"
+
+
+class ClipboardInfo:
+    """Size and, for images, type and dimensions of clipboard content, learned from its first bytes."""
+    
+    def __init__(
+        self,
+        format_type: ClipboardFormat,
+        size: Optional[int] = None,
+        mime_type: Optional[str] = None,
+        width: Optional[int] = None,
+        height: Optional[int] = None,
+        mode: Optional[str] = None,
+    ):
+        """
+        Args:
+            format_type: The format described.
+            size: Bytes of content as the owner offered it, or None if unknown.
+            mime_type: Type of that content, such as "image/jpeg".
+            width: Image width in pixels, if known.
+            height: Image height in pixels, if known.
+            mode: Pillow-style pixel layout, such as "RGB" or "RGBA", if known.
+        """
+        self.format_type = format_type
+        self.height = height
+        self.mime_type = mime_type
+        self.mode = mode
+        self.size = size
+        self.width = width
+    
+    def __repr__(self) -> str:
+        details = f"format={self.format_type.name}, size={self.size}, mime_type={self.mime_type!r}"
+        if self.width is not None:
+            details += f", width={self.width}, height={self.height}, mode={self.mode!r}"
+        return f"ClipboardInfo({details})"
@@ -11,6 +11,11 @@ class ClipboardAccessError(ClipboardError):
     pass
 
 
+class ClipboardChangedError(ClipboardError):
+    """Raised when clipboard contents change during a multi-part read."""
+    pass
+
+
 class ClipboardFormatError(ClipboardError):
     """Raised when clipboard format is not supported or invalid."""
     pass
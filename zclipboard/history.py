@@ -0,0 +1,417 @@
+"""Persistent clipboard history backed by SQLite."""
+
+import functools
+import hashlib
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Tuple
+
+from zclipboard.data_types import ClipboardData, ClipboardFormat
+from zclipboard.exceptions import ClipboardFormatError
+
+DEFAULT_BATCH_SIZE = 64
+
+TEXT_FORMATS = frozenset({ClipboardFormat.HTML, ClipboardFormat.PLAIN_TEXT, ClipboardFormat.RTF})
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS blobs (
+    id INTEGER PRIMARY KEY,
+    digest BLOB NOT NULL UNIQUE,
+    data BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS entries (
+    id INTEGER PRIMARY KEY,
+    created REAL NOT NULL,
+    format TEXT NOT NULL,
+    digest BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    text TEXT,
+    blob_id INTEGER REFERENCES blobs(id)
+);
+CREATE INDEX IF NOT EXISTS entries_created ON entries(created);
+"""
+
+# External-content FTS5 index over entries.text, kept in sync by triggers.
+# The trigram tokenizer lets LIKE '%...%' use the index.
+_FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS entries_fts USING fts5(
+    text, content='entries', content_rowid='id', tokenize='trigram'
+);
+CREATE TRIGGER IF NOT EXISTS entries_fts_insert AFTER INSERT ON entries WHEN new.text IS NOT NULL BEGIN
+    INSERT INTO entries_fts(rowid, text) VALUES (new.id, new.text);
+END;
+CREATE TRIGGER IF NOT EXISTS entries_fts_delete AFTER DELETE ON entries WHEN old.text IS NOT NULL BEGIN
+    INSERT INTO entries_fts(entries_fts, rowid, text) VALUES ('delete', old.id, old.text);
+END;
+"""
+
+_ENTRY_COLUMNS = "entries.id, entries.created, entries.format, entries.digest, entries.size, entries.text"
+
+
+def _digest(format_type: ClipboardFormat, payload: bytes) -> bytes:
+    digest = hashlib.blake2b(format_type.name.encode("ascii"), digest_size=16)
+    digest.update(b"\0")
+    digest.update(payload)
+    return digest.digest()
+
+
+def _escape_like(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _casefold(text: Optional[str]) -> Optional[str]:
+    """SQL casefold(): SQLite's own LIKE and lower() only fold ASCII."""
+    return text.casefold() if text is not None else None
+
+
+class HistoryEntry:
+    """One recorded clipboard item. Image data is loaded on first access."""
+    
+    def __init__(
+        self,
+        entry_id: int,
+        created: float,
+        format_type: ClipboardFormat,
+        digest: bytes,
+        size: int,
+        data: Any = None,
+        loader: Optional[Callable[[], Any]] = None,
+    ):
+        self.id = entry_id
+        self.created = created
+        self.format_type = format_type
+        self.digest = digest
+        self.size = size
+        self._data = data
+        self._loader = loader
+    
+    def __repr__(self) -> str:
+        return f"HistoryEntry(id={self.id}, format={self.format_type.name}, size={self.size})"
+    
+    @property
+    def data(self) -> Any:
+        """The recorded content: str for text formats, PNG bytes for IMAGE."""
+        if self._data is None and self._loader is not None:
+            self._data = self._loader()
+            self._loader = None
+        return self._data
+    
+    def to_clipboard_data(self) -> ClipboardData:
+        return ClipboardData(self.data, self.format_type)
+
+
+class ClipboardHistory:
+    """
+    Clipboard history stored in an SQLite database.
+    
+    Entries are buffered and written in batches; every query flushes the
+    buffer first. An entry identical to the one recorded just before it is
+    skipped. Text formats are stored inline and indexed for substring
+    search; images are stored once per distinct content in a separate
+    table, so listing and searching never read them.
+    
+    Retention limits are applied after every write. The history may be
+    shared between threads.
+    """
+    
+    def __init__(
+        self,
+        path: str = ":memory:",
+        max_entries: Optional[int] = None,
+        max_age: Optional[float] = None,
+        max_bytes: Optional[int] = None,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+    ):
+        """
+        Open or create a history database.
+        
+        Args:
+            path: Database file, or ":memory:".
+            max_entries: Keep at most this many entries.
+            max_age: Drop entries older than this many seconds.
+            max_bytes: Keep the newest entries whose sizes sum to at most this.
+            batch_size: Entries buffered before they are written.
+        """
+        self.batch_size = batch_size
+        self.max_age = max_age
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.create_function("casefold", 1, _casefold, deterministic=True)
+        self._lock = threading.RLock()
+        self._pending: List[Tuple[float, ClipboardFormat, bytes, int, Optional[str], Optional[bytes]]] = []
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        try:
+            self._conn.executescript(_FTS_SCHEMA)
+            self._indexed = True
+        except sqlite3.OperationalError:
+            # SQLite built without FTS5 or older than 3.34: fall back to scans.
+            self._indexed = False
+        row = self._conn.execute("SELECT digest FROM entries ORDER BY id DESC LIMIT 1").fetchone()
+        self._last_digest: Optional[bytes] = row[0] if row else None
+    
+    def __enter__(self) -> "ClipboardHistory":
+        return self
+    
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+    
+    def __len__(self) -> int:
+        with self._lock:
+            self.flush()
+            return self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+    
+    @property
+    def indexed(self) -> bool:
+        """True if text search uses the FTS5 index."""
+        return self._indexed
+    
+    @property
+    def total_bytes(self) -> int:
+        """Sum of the sizes of all entries."""
+        with self._lock:
+            self.flush()
+            return self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+    
+    def add(self, data: ClipboardData, timestamp: Optional[float] = None) -> bool:
+        """
+        Record a clipboard item.
+        
+        Args:
+            data: The item. Text formats need str data, IMAGE needs bytes.
+            timestamp: Time of the copy. Defaults to now.
+        
+        Returns:
+            False if the item repeats the previous entry and was skipped.
+        """
+        format_type = data.format_type
+        if format_type in TEXT_FORMATS:
+            if not isinstance(data.data, str):
+                raise ClipboardFormatError(f"{format_type.name} history entries must be str")
+            text: Optional[str] = data.data
+            payload = data.data.encode("utf-8", errors="surrogatepass")
+            blob = None
+        elif format_type == ClipboardFormat.IMAGE:
+            if not isinstance(data.data, (bytes, bytearray, memoryview)):
+                raise ClipboardFormatError("IMAGE history entries must be bytes")
+            text = None
+            payload = blob = bytes(data.data)
+        else:
+            raise ClipboardFormatError(f"Unsupported format: {format_type}")
+        
+        digest = _digest(format_type, payload)
+        created = time.time() if timestamp is None else timestamp
+        with self._lock:
+            if digest == self._last_digest:
+                return False
+            self._last_digest = digest
+            self._pending.append((created, format_type, digest, len(payload), text, blob))
+            if len(self._pending) >= self.batch_size:
+                self.flush()
+        return True
+    
+    def add_many(self, items: Iterable[ClipboardData]) -> int:
+        """Record several items in order; returns how many were not skipped."""
+        with self._lock:
+            return sum(self.add(item) for item in items)
+    
+    def flush(self) -> None:
+        """Write buffered entries and apply the retention limits."""
+        with self._lock:
+            if not self._pending:
+                return
+            pending, self._pending = self._pending, []
+            with self._transaction():
+                for created, format_type, digest, size, text, blob in pending:
+                    blob_id = None
+                    if blob is not None:
+                        self._conn.execute("INSERT OR IGNORE INTO blobs(digest, data) VALUES (?, ?)", (digest, blob))
+                        blob_id = self._conn.execute("SELECT id FROM blobs WHERE digest = ?", (digest,)).fetchone()[0]
+                    self._conn.execute(
+                        "INSERT INTO entries(created, format, digest, size, text, blob_id) VALUES (?, ?, ?, ?, ?, ?)",
+                        (created, format_type.name, digest, size, text, blob_id),
+                    )
+                self._enforce_retention()
+    
+    def enforce_retention(self) -> int:
+        """
+        Apply max_entries, max_age and max_bytes now.
+        
+        Returns:
+            The number of entries removed.
+        """
+        with self._lock:
+            self.flush()
+            with self._transaction():
+                return self._enforce_retention()
+    
+    def _enforce_retention(self) -> int:
+        cutoff = 0
+        if self.max_entries is not None:
+            row = self._conn.execute(
+                "SELECT id FROM entries ORDER BY id DESC LIMIT 1 OFFSET ?", (self.max_entries,)
+            ).fetchone()
+            if row:
+                cutoff = max(cutoff, row[0])
+        if self.max_bytes is not None:
+            row = self._conn.execute(
+                "SELECT id FROM (SELECT id, SUM(size) OVER (ORDER BY id DESC) AS total FROM entries) "
+                "WHERE total > ? ORDER BY id DESC LIMIT 1",
+                (self.max_bytes,),
+            ).fetchone()
+            if row:
+                cutoff = max(cutoff, row[0])
+        removed = 0
+        if cutoff:
+            removed += self._conn.execute("DELETE FROM entries WHERE id <= ?", (cutoff,)).rowcount
+        if self.max_age is not None:
+            removed += self._conn.execute(
+                "DELETE FROM entries WHERE created < ?", (time.time() - self.max_age,)
+            ).rowcount
+        if removed:
+            self._conn.execute(
+                "DELETE FROM blobs WHERE id NOT IN (SELECT blob_id FROM entries WHERE blob_id IS NOT NULL)"
+            )
+        return removed
+    
+    @contextmanager
+    def _transaction(self) -> Iterator[None]:
+        """BEGIN/COMMIT around a block on the autocommit connection; rolls back on error."""
+        self._conn.execute("BEGIN")
+        try:
+            yield
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+        self._conn.execute("COMMIT")
+    
+    def _entry(self, row: Tuple[Any, ...]) -> HistoryEntry:
+        entry_id, created, format_name, digest, size, text = row
+        format_type = ClipboardFormat[format_name]
+        loader = functools.partial(self._load_blob, entry_id) if text is None else None
+        return HistoryEntry(entry_id, created, format_type, digest, size, text, loader)
+    
+    def _load_blob(self, entry_id: int) -> Optional[bytes]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT blobs.data FROM entries JOIN blobs ON blobs.id = entries.blob_id WHERE entries.id = ?",
+                (entry_id,),
+            ).fetchone()
+        return bytes(row[0]) if row else None
+    
+    def clear(self) -> None:
+        """Remove every entry."""
+        with self._lock:
+            self._pending = []
+            self._last_digest = None
+            with self._transaction():
+                self._conn.execute("DELETE FROM entries")
+                self._conn.execute("DELETE FROM blobs")
+    
+    def close(self) -> None:
+        """Write buffered entries and close the database."""
+        with self._lock:
+            self.flush()
+            self._conn.close()
+    
+    def get(self, entry_id: int) -> Optional[HistoryEntry]:
+        """Return the entry with the given id, or None."""
+        with self._lock:
+            self.flush()
+            row = self._conn.execute(f"SELECT {_ENTRY_COLUMNS} FROM entries WHERE id = ?", (entry_id,)).fetchone()
+        return self._entry(row) if row else None
+    
+    def recent(
+        self,
+        limit: int = 50,
+        format_type: Optional[ClipboardFormat] = None,
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+    ) -> List[HistoryEntry]:
+        """
+        List entries, newest first.
+        
+        Args:
+            limit: Maximum number of entries.
+            format_type: Only entries of this format.
+            since: Only entries recorded at or after this time.
+            until: Only entries recorded before this time.
+        """
+        return self._query("entries", "entries.id", [], [], limit, format_type, since, until)
+    
+    def search(
+        self,
+        query: str,
+        prefix: bool = False,
+        limit: int = 50,
+        format_type: Optional[ClipboardFormat] = None,
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+    ) -> List[HistoryEntry]:
+        """
+        Find text entries containing query, newest first. Matching ignores case.
+        
+        Args:
+            query: Text to look for.
+            prefix: Only match entries that start with query.
+            limit: Maximum number of entries.
+            format_type: Only entries of this format.
+            since: Only entries recorded at or after this time.
+            until: Only entries recorded before this time.
+        """
+        pattern = _escape_like(query.casefold()) + "%"
+        if not prefix:
+            pattern = "%" + pattern
+        like = ["casefold(entries.text) LIKE ? ESCAPE '\\'"]
+        if not self._indexed or len(query) < 3:
+            # Trigrams cannot match fewer than three characters.
+            return self._query("entries", "entries.id", like, [pattern], limit, format_type, since, until)
+        # A quoted phrase of trigrams matches any substring; walking the
+        # index newest-first lets LIMIT stop the scan early.
+        phrase = '"' + query.replace('"', '""') + '"'
+        return self._query(
+            "entries_fts JOIN entries ON entries.id = entries_fts.rowid",
+            "entries_fts.rowid",
+            ["entries_fts MATCH ?"] + (like if prefix else []),
+            [phrase] + ([pattern] if prefix else []),
+            limit,
+            format_type,
+            since,
+            until,
+        )
+    
+    def _query(
+        self,
+        source: str,
+        order_key: str,
+        conditions: List[str],
+        params: List[Any],
+        limit: int,
+        format_type: Optional[ClipboardFormat],
+        since: Optional[float],
+        until: Optional[float],
+    ) -> List[HistoryEntry]:
+        conditions = list(conditions)
+        params = list(params)
+        if format_type is not None:
+            conditions.append("entries.format = ?")
+            params.append(format_type.name)
+        if since is not None:
+            conditions.append("entries.created >= ?")
+            params.append(since)
+        if until is not None:
+            conditions.append("entries.created < ?")
+            params.append(until)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        with self._lock:
+            self.flush()
+            rows = self._conn.execute(
+                f"SELECT {_ENTRY_COLUMNS} FROM {source} {where} ORDER BY {order_key} DESC LIMIT ?",
+                params + [limit],
+            ).fetchall()
+        return [self._entry(row) for row in rows]
+
@@ -0,0 +1,365 @@
+"""Clipboard images kept in their native encoding until another one is needed."""
+
+import functools
+import importlib.util
+import threading
+from io import BytesIO
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+from zclipboard.codecs import image as codec
+from zclipboard.conversions import cached_conversion
+from zclipboard.exceptions import ClipboardError, ClipboardFormatError
+from zclipboard.imageinfo import parse_image_header
+from zclipboard.sniff import sniff_image_type
+
+# Pillow format names of the MIME types clipboard owners commonly offer.
+MIME_FORMATS = {
+    "image/bmp": "BMP",
+    "image/gif": "GIF",
+    "image/jpeg": "JPEG",
+    "image/jpg": "JPEG",
+    "image/png": "PNG",
+    "image/tiff": "TIFF",
+    "image/webp": "WEBP",
+    "image/x-bmp": "BMP",
+    "image/x-ms-bmp": "BMP",
+}
+
+# Turns (data, mime_type) into PNG bytes, or None if it cannot.
+PngConverter = Callable[[bytes, str], Optional[bytes]]
+
+# Turns (data, format_name, **options) into re-encoded bytes.
+Transcoder = Callable[..., bytes]
+
+
+def transcode(data: bytes, format_name: str, **options: Any) -> bytes:
+    """
+    Re-encode image data with Pillow.
+    
+    Without Pillow, PNG and BMP data is still converted to PNG, BMP or DIB
+    by the built-in codec, zclipboard.codecs.image.
+    
+    Args:
+        data: Encoded image in any format Pillow reads.
+        format_name: Pillow format to write, such as "PNG" or "JPEG".
+        **options: Passed to Image.save().
+    
+    Raises:
+        ImportError: Pillow is not installed and the conversion needs it.
+        ClipboardFormatError: Pillow is not installed and the built-in codec
+            cannot decode data.
+    """
+    try:
+        from PIL import Image
+    except ImportError:
+        if not _codec_supports(sniff_image_type(data), format_name, options):
+            raise
+        return codec.transcode(data, format_name, **options)
+    with Image.open(BytesIO(data)) as image:
+        return _save(image, format_name, options)
+
+
+def thumbnail(data: bytes, max_size: int, format_name: str = "PNG", **options: Any) -> bytes:
+    """
+    Scale image data down to fit in max_size x max_size and encode it.
+    
+    The image is decoded at reduced resolution where the codec allows it:
+    JPEG decodes at 1/2, 1/4 or 1/8 scale, and other formats are reduced
+    by whole factors before the final resampling. Images already within
+    max_size keep their size.
+    
+    Raises:
+        ImportError: Pillow is not installed.
+    """
+    from PIL import Image
+    
+    with Image.open(BytesIO(data)) as image:
+        # thumbnail() drafts the JPEG decoder and reduce()s down to
+        # reducing_gap times the target before resampling.
+        image.thumbnail((max_size, max_size), reducing_gap=2.0)
+        return _save(image, format_name, options)
+
+
+def _save(image: Any, format_name: str, options: Dict[str, Any]) -> bytes:
+    if format_name.upper() == "JPEG" and image.mode not in ("L", "RGB", "CMYK"):
+        image = image.convert("RGB")
+    output = BytesIO()
+    image.save(output, format=format_name, **options)
+    return output.getvalue()
+
+
+_transcoder: Optional[Transcoder] = None
+
+
+def set_transcoder(transcoder: Optional[Transcoder]) -> None:
+    """
+    Run the backends' conversions through transcoder instead of transcode().
+    
+    Args:
+        transcoder: Called like transcode(), such as ConversionPool.transcode
+            to convert out of process. None restores transcode().
+    """
+    global _transcoder
+    _transcoder = transcoder
+
+
+def cached_transcode(data: bytes, mime_type: str, format_name: str, **options: Any) -> bytes:
+    """
+    transcode(), or its set_transcoder() replacement, through the process-wide conversion cache.
+    
+    Re-reading an unchanged clipboard image costs a hash of data instead
+    of a decode and encode.
+    
+    Raises:
+        ImportError: Pillow is not installed.
+    """
+    format_name = format_name.upper()
+    run = _transcoder or transcode
+    return cached_conversion(data, mime_type, format_name, lambda: run(data, format_name, **options), **options)
+
+
+def pillow_available() -> bool:
+    """True if Pillow can be imported, so conversions between formats are possible."""
+    return importlib.util.find_spec("PIL") is not None
+
+
+def _codec_supports(mime_type: Optional[str], format_name: str, options: Iterable[str] = ()) -> bool:
+    """True if the built-in codec can do transcode(data, format_name, **options) for data of mime_type."""
+    source = MIME_FORMATS.get((mime_type or "").split(";")[0].strip().lower())
+    target = format_name.upper()
+    allowed = {"compress_level"} if target == "PNG" else set()
+    return source in codec.DECODABLE_FORMATS and target in codec.ENCODABLE_FORMATS and set(options) <= allowed
+
+
+def can_transcode(mime_type: Optional[str], format_name: str = "PNG") -> bool:
+    """True if transcode() can convert images of mime_type to format_name, with Pillow or without it."""
+    return pillow_available() or _codec_supports(mime_type, format_name)
+
+
+def convert_to_png(data: bytes, mime_type: str) -> Optional[bytes]:
+    """
+    Convert to PNG, or return the data unchanged if that needs Pillow and
+    it is not installed, as the backends always did.
+    """
+    try:
+        return cached_transcode(data, mime_type, "PNG")
+    except ImportError:
+        return data
+
+
+def _numpy() -> Any:
+    try:
+        import numpy
+    except ImportError:
+        raise ClipboardFormatError("Image arrays require NumPy")
+    return numpy
+
+
+def encode_png(array: Any, compress_level: int = 1) -> bytes:
+    """
+    Encode an image array as PNG with zlib alone.
+    
+    Rows are stored unfiltered and compressed at compress_level, which
+    for screenshots is several times faster than Pillow's defaults.
+    
+    Args:
+        array: uint8 array of shape (height, width) for grayscale or
+            (height, width, channels) with 1, 3 (RGB) or 4 (RGBA) channels.
+        compress_level: zlib level, 0 (none) to 9 (smallest).
+    
+    Raises:
+        ClipboardFormatError: NumPy is not installed.
+        ValueError: The array has an unsupported dtype or shape.
+    """
+    numpy = _numpy()
+    array = numpy.asarray(array)
+    if array.dtype != numpy.uint8:
+        raise ValueError(f"Expected a uint8 array, got {array.dtype}")
+    if array.ndim == 2:
+        array = array[:, :, None]
+    modes = {1: "L", 3: "RGB", 4: "RGBA"}
+    if array.ndim != 3 or array.shape[2] not in modes or not array.size:
+        raise ValueError(f"Unsupported image array shape {array.shape}")
+    height, width, channels = array.shape
+    bitmap = codec.Bitmap(width, height, modes[channels], numpy.ascontiguousarray(array).reshape(-1))
+    return codec.encode_png(bitmap, compress_level, codec.FILTER_NONE)
+
+
+def _bitmap_array(bitmap: codec.Bitmap, numpy: Any) -> Any:
+    """A writable array over a decoded bitmap, shaped like Pillow's: gray images have no channel axis."""
+    shape: Tuple[int, ...] = (bitmap.height, bitmap.width)
+    if bitmap.channels > 1:
+        shape += (bitmap.channels,)
+    array = numpy.frombuffer(bitmap.pixels, numpy.uint8).reshape(shape)
+    return array if array.flags.writeable else array.copy()
+
+
+class ClipboardImage:
+    """
+    An image as the clipboard owner offered it.
+    
+    The original bytes and MIME type are kept; conversions run on first
+    use and are remembered, so callers that save the native encoding or
+    want another format never pay for a PNG round trip.
+    """
+    
+    def __init__(self, data: bytes, mime_type: str, converter: Optional[PngConverter] = None):
+        """
+        Args:
+            data: The image in its native encoding.
+            mime_type: MIME type data was labelled with, such as "image/jpeg".
+                Owners mislabel data; the type its first bytes identify wins.
+            converter: Produces PNG from (data, mime_type). Defaults to
+                convert_to_png().
+        """
+        self.data = data
+        self.mime_type = sniff_image_type(data) or mime_type
+        self._converted: Dict[Tuple[str, Tuple[Tuple[str, Any], ...]], bytes] = {}
+        self._converter = converter or convert_to_png
+        self._lock = threading.Lock()
+        self._png: Optional[bytes] = None
+        self._size: Optional[Tuple[int, int]] = None
+    
+    def __len__(self) -> int:
+        return len(self.data)
+    
+    def __repr__(self) -> str:
+        return f"ClipboardImage(mime_type={self.mime_type!r}, bytes={len(self.data)})"
+    
+    @property
+    def format_name(self) -> Optional[str]:
+        """Pillow format name of the native encoding, if known."""
+        return MIME_FORMATS.get(self.mime_type.split(";")[0].strip().lower())
+    
+    @property
+    def size(self) -> Tuple[int, int]:
+        """
+        (width, height) in pixels, read from the image header.
+        
+        Common formats are parsed directly; others need Pillow.
+        
+        Raises:
+            ClipboardFormatError: Pillow is needed and not installed, or the data is not an image.
+        """
+        header = parse_image_header(self.data) if self._size is None else None
+        if header is not None and header.width is not None:
+            self._size = (header.width, header.height)
+        if self._size is None:
+            try:
+                from PIL import Image
+            except ImportError:
+                raise ClipboardFormatError("Reading image dimensions requires Pillow")
+            try:
+                with Image.open(BytesIO(self.data)) as image:
+                    self._size = image.size
+            except Exception as e:
+                raise ClipboardFormatError(f"Unreadable {self.mime_type} image: {e}")
+        return self._size
+    
+    def to_png(self) -> Optional[bytes]:
+        """
+        The image as PNG, converting it on first call.
+        
+        Returns:
+            PNG bytes, or None if the converter could not produce them.
+        """
+        if self.format_name == "PNG":
+            return self.data
+        with self._lock:
+            if self._png is None:
+                self._png = self._converter(self.data, self.mime_type)
+            return self._png
+    
+    def to_format(self, format_name: str, **options: Any) -> bytes:
+        """
+        The image re-encoded in a Pillow format, such as "JPEG" or "WEBP".
+        
+        The native data is returned as-is if it already is in that format
+        and no save options are given.
+        
+        Args:
+            format_name: Pillow format name.
+            **options: Passed to Image.save(), e.g. quality=85.
+        
+        Raises:
+            ClipboardFormatError: Pillow is not installed or cannot convert the image.
+        """
+        format_name = format_name.upper()
+        if format_name == self.format_name and not options:
+            return self.data
+        return self._convert(
+            format_name, options, lambda: cached_transcode(self.data, self.mime_type, format_name, **options)
+        )
+    
+    def thumbnail(self, max_size: int = 256, format_name: str = "PNG", **options: Any) -> bytes:
+        """
+        The image scaled down to fit in max_size x max_size pixels.
+        
+        Decodes the native encoding at reduced resolution where possible
+        and never goes through PNG first. Thumbnails are remembered per
+        content digest, so previews of an unchanged clipboard are free.
+        
+        Args:
+            max_size: Largest width and height of the result.
+            format_name: Pillow format of the result.
+            **options: Passed to Image.save().
+        
+        Raises:
+            ValueError: max_size is not positive.
+            ClipboardFormatError: Pillow is not installed or cannot read the image.
+        """
+        if max_size <= 0:
+            raise ValueError("max_size must be positive")
+        format_name = format_name.upper()
+        target = f"{format_name} THUMBNAIL {max_size}"
+        render = functools.partial(thumbnail, self.data, max_size, format_name, **options)
+        return self._convert(
+            target, options, lambda: cached_conversion(self.data, self.mime_type, target, render, **options)
+        )
+    
+    def to_array(self) -> Any:
+        """
+        The image as a NumPy array of shape (height, width, channels).
+        
+        BMP, the native bitmap of Windows and of many X11 applications,
+        is decoded by the built-in codec, as is PNG when Pillow is not
+        installed; other encodings are decoded once by Pillow, without
+        going through PNG.
+        
+        Raises:
+            ClipboardFormatError: NumPy is not installed, or the image needs
+                Pillow to decode and it is not installed or cannot read it.
+        """
+        numpy = _numpy()
+        if self.format_name == "BMP" or (self.format_name == "PNG" and not pillow_available()):
+            try:
+                return _bitmap_array(codec.decode_image(self.data), numpy)
+            except ClipboardFormatError:
+                if not pillow_available():
+                    raise
+        try:
+            from PIL import Image
+        except ImportError:
+            raise ClipboardFormatError(f"Decoding {self.mime_type} images requires Pillow")
+        try:
+            with Image.open(BytesIO(self.data)) as image:
+                return numpy.array(image)
+        except Exception as e:
+            raise ClipboardFormatError(f"Unreadable {self.mime_type} image: {e}")
+    
+    def _convert(self, target: str, options: Dict[str, Any], convert: Callable[[], Optional[bytes]]) -> bytes:
+        """Run convert() once per (target, options), reporting failures as ClipboardFormatError."""
+        key = (target, tuple(sorted(options.items())))
+        with self._lock:
+            converted = self._converted.get(key)
+            if converted is None:
+                try:
+                    converted = convert()
+                except ImportError:
+                    raise ClipboardFormatError("Converting images requires Pillow")
+                except ClipboardError:
+                    raise
+                except Exception as e:
+                    raise ClipboardFormatError(f"Cannot convert {self.mime_type} image to {target}: {e}")
+                self._converted[key] = converted
+            return converted
@@ -0,0 +1,228 @@
+"""Image type, dimensions and mode read from the first bytes of an encoded image.
+
+Each parser looks only at the header: the PNG IHDR chunk, the JPEG SOF
+segment, the BMP/DIB info header, the first TIFF IFD, the GIF logical
+screen and the WebP VP8/VP8L/VP8X header. Most need a few dozen bytes;
+JPEG metadata segments and TIFF directories can push that further, so
+probe() reads more only when a parser asks for it.
+"""
+
+import io
+import struct
+from typing import BinaryIO, Callable, Optional
+
+from zclipboard.data_types import ClipboardFormat, ClipboardInfo
+from zclipboard.sniff import sniff_image_type
+
+# Read first, and the most read while looking for a header.
+PROBE_BYTES = 512
+MAX_HEADER_BYTES = 256 * 1024
+
+TEXT_MIME_TYPES = {
+    ClipboardFormat.HTML: "text/html",
+    ClipboardFormat.PLAIN_TEXT: "text/plain",
+    ClipboardFormat.RTF: "text/rtf",
+}
+
+
+class ImageHeader:
+    """What an image header revealed. truncated is True if more bytes could reveal more."""
+    
+    def __init__(
+        self,
+        mime_type: str,
+        width: Optional[int] = None,
+        height: Optional[int] = None,
+        mode: Optional[str] = None,
+        truncated: bool = False,
+    ):
+        self.height = height
+        self.mime_type = mime_type
+        self.mode = mode
+        self.truncated = truncated
+        self.width = width
+    
+    def __repr__(self) -> str:
+        dimensions = f"width={self.width}, height={self.height}, mode={self.mode!r}"
+        return f"ImageHeader(mime_type={self.mime_type!r}, {dimensions})"
+
+
+def _bmp(data: bytes) -> ImageHeader:
+    if len(data) < 30:
+        return ImageHeader("image/bmp", truncated=True)
+    header_size = struct.unpack_from("<I", data, 14)[0]
+    if header_size == 12:
+        width, height, _, bits = struct.unpack_from("<HHHH", data, 18)
+        compression = 0
+    elif header_size >= 40:
+        if len(data) < 34:
+            return ImageHeader("image/bmp", truncated=True)
+        width, height, _, bits, compression = struct.unpack_from("<iiHHI", data, 18)
+    else:
+        return ImageHeader("image/bmp")
+    if bits == 1:
+        mode = "1"
+    elif bits <= 8:
+        mode = "P"
+    elif bits == 32 and compression == 3 and header_size >= 56 and len(data) >= 70:
+        mode = "RGBA" if struct.unpack_from("<I", data, 66)[0] else "RGB"
+    else:
+        mode = "RGB"
+    return ImageHeader("image/bmp", width, abs(height), mode)
+
+
+def _gif(data: bytes) -> ImageHeader:
+    if len(data) < 10:
+        return ImageHeader("image/gif", truncated=True)
+    width, height = struct.unpack_from("<HH", data, 6)
+    return ImageHeader("image/gif", width, height, "P")
+
+
+def _jpeg(data: bytes) -> ImageHeader:
+    position = 2
+    while position + 4 <= len(data):
+        if data[position] != 0xFF:
+            return ImageHeader("image/jpeg")
+        marker = data[position + 1]
+        if marker == 0xFF:
+            position += 1
+            continue
+        if marker == 0x01 or 0xD0 <= marker <= 0xD9:
+            position += 2
+            continue
+        if 0xC0 <= marker <= 0xCF and marker not in (0xC4, 0xC8, 0xCC):
+            if position + 10 > len(data):
+                break
+            height, width, components = struct.unpack_from(">HHB", data, position + 5)
+            return ImageHeader("image/jpeg", width, height, {1: "L", 3: "RGB", 4: "CMYK"}.get(components))
+        if marker == 0xDA:
+            # Scan data before any frame header: nothing more to learn.
+            return ImageHeader("image/jpeg")
+        position += 2 + struct.unpack_from(">H", data, position + 2)[0]
+    return ImageHeader("image/jpeg", truncated=True)
+
+
+def _png(data: bytes) -> ImageHeader:
+    if len(data) < 26:
+        return ImageHeader("image/png", truncated=True)
+    if data[12:16] != b"IHDR":
+        return ImageHeader("image/png")
+    width, height, depth, color_type = struct.unpack_from(">IIBB", data, 16)
+    mode = {0: "L", 2: "RGB", 3: "P", 4: "LA", 6: "RGBA"}.get(color_type)
+    return ImageHeader("image/png", width, height, "1" if mode == "L" and depth == 1 else mode)
+
+
+def _tiff(data: bytes) -> ImageHeader:
+    order = "<" if data[:2] == b"II" else ">"
+    if len(data) < 8:
+        return ImageHeader("image/tiff", truncated=True)
+    offset = struct.unpack_from(order + "I", data, 4)[0]
+    if offset + 2 > len(data):
+        return ImageHeader("image/tiff", truncated=True)
+    count = struct.unpack_from(order + "H", data, offset)[0]
+    if offset + 2 + 12 * count > len(data):
+        return ImageHeader("image/tiff", truncated=True)
+    tags = {}
+    for index in range(count):
+        entry = offset + 2 + 12 * index
+        tag, field_type, values = struct.unpack_from(order + "HHI", data, entry)
+        # Only single SHORT or LONG values are stored inline.
+        if values == 1 and field_type == 3:
+            tags[tag] = struct.unpack_from(order + "H", data, entry + 8)[0]
+        elif values == 1 and field_type == 4:
+            tags[tag] = struct.unpack_from(order + "I", data, entry + 8)[0]
+    samples = tags.get(277, 1)
+    modes = {0: "L", 1: "L", 2: "RGBA" if samples >= 4 else "RGB", 3: "P", 5: "CMYK", 6: "YCbCr"}
+    mode = modes.get(tags.get(262, -1))
+    if mode == "L" and tags.get(258) == 1:
+        mode = "1"
+    return ImageHeader("image/tiff", tags.get(256), tags.get(257), mode)
+
+
+def _webp(data: bytes) -> ImageHeader:
+    if len(data) < 30:
+        return ImageHeader("image/webp", truncated=True)
+    chunk = data[12:16]
+    if chunk == b"VP8X":
+        width = 1 + int.from_bytes(data[24:27], "little")
+        height = 1 + int.from_bytes(data[27:30], "little")
+        return ImageHeader("image/webp", width, height, "RGBA" if data[20] & 0x10 else "RGB")
+    if chunk == b"VP8L" and data[20] == 0x2F:
+        bits = int.from_bytes(data[21:25], "little")
+        width, height = (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+        return ImageHeader("image/webp", width, height, "RGBA" if bits >> 28 & 1 else "RGB")
+    if chunk == b"VP8 " and data[23:26] == b"\x9d\x01\x2a":
+        width, height = struct.unpack_from("<HH", data, 26)
+        return ImageHeader("image/webp", width & 0x3FFF, height & 0x3FFF, "RGB")
+    return ImageHeader("image/webp")
+
+
+_PARSERS = {
+    "image/bmp": _bmp,
+    "image/gif": _gif,
+    "image/jpeg": _jpeg,
+    "image/png": _png,
+    "image/tiff": _tiff,
+    "image/webp": _webp,
+}
+
+
+def parse_image_header(data: bytes) -> Optional[ImageHeader]:
+    """
+    Identify an encoded image from its first bytes.
+    
+    Returns:
+        The header, or None if data does not start like a supported image.
+        A header with truncated set needs more of the image to be complete.
+    """
+    parser = _PARSERS.get(sniff_image_type(data))
+    return parser(data) if parser is not None else None
+
+
+def probe(
+    format_type: ClipboardFormat,
+    stream: BinaryIO,
+    mime_type: Optional[str] = None,
+    size: Optional[int] = None,
+) -> ClipboardInfo:
+    """
+    Describe clipboard content from the start of a stream of it.
+    
+    Reads PROBE_BYTES, and for images up to MAX_HEADER_BYTES while the
+    header is incomplete. The stream is not closed.
+    
+    Args:
+        format_type: Format the stream holds.
+        stream: The content as the owner offered it.
+        mime_type: Type of the content, if known. A type identified from an
+            image header takes precedence.
+        size: Total size in bytes, if known. Otherwise it is taken from the
+            stream when it ends within the bytes read or can seek.
+    """
+    header = b""
+    image = None
+    limit = PROBE_BYTES
+    while True:
+        chunk = stream.read(limit - len(header))
+        header += chunk
+        ended = len(header) < limit
+        if format_type != ClipboardFormat.IMAGE:
+            break
+        image = parse_image_header(header)
+        if ended or image is None or not image.truncated or limit >= MAX_HEADER_BYTES:
+            break
+        limit = min(limit * 8, MAX_HEADER_BYTES)
+    if size is None and ended:
+        size = len(header)
+    elif size is None and _seekable(stream):
+        size = stream.seek(0, io.SEEK_END)
+    if mime_type is None or "/" not in mime_type:
+        mime_type = TEXT_MIME_TYPES.get(format_type)
+    if image is None:
+        return ClipboardInfo(format_type, size, mime_type)
+    return ClipboardInfo(format_type, size, image.mime_type, image.width, image.height, image.mode)
+
+
+def _seekable(stream: BinaryIO) -> bool:
+    seekable: Optional[Callable[[], bool]] = getattr(stream, "seekable", None)
+    return bool(seekable and seekable())
@@ -0,0 +1,229 @@
+"""Image conversion in a bounded pool of worker processes.
+
+Converting in the calling process holds the GIL for the whole decode and
+encode, and a hostile image (a tiny PNG that decodes to 30000x30000
+pixels) can exhaust its memory. ConversionPool runs the conversions in
+worker processes instead: each worker has an address-space limit, each
+image is rejected before decoding if it has too many pixels, and each job
+has a time limit. A worker that dies or hangs is replaced; the calling
+process only sees an exception.
+
+To route the backends' conversions through a pool:
+
+    pool = ConversionPool()
+    set_transcoder(pool.transcode)
+"""
+
+import concurrent.futures
+import os
+import signal
+import threading
+import time
+from concurrent.futures.process import BrokenProcessPool
+from io import BytesIO
+from typing import Any, Callable, Iterable, List, Optional
+
+from zclipboard.exceptions import ClipboardError, ClipboardFormatError, ClipboardTimeoutError
+from zclipboard.image import transcode
+from zclipboard.imageinfo import parse_image_header
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - not available on Windows
+    resource = None
+
+DEFAULT_MAX_PIXELS = 64 * 1024 * 1024
+DEFAULT_MEMORY_LIMIT = 2 * 1024 * 1024 * 1024
+DEFAULT_TIMEOUT = 30.0
+
+# Extra time a job gets beyond its own timeout before the pool is restarted.
+KILL_GRACE = 5.0
+
+
+def _init_worker(memory_limit: Optional[int]) -> None:
+    if memory_limit and resource is not None:
+        _, hard = resource.getrlimit(resource.RLIMIT_AS)
+        if hard != resource.RLIM_INFINITY:
+            memory_limit = min(memory_limit, hard)
+        resource.setrlimit(resource.RLIMIT_AS, (memory_limit, hard))
+
+
+def _on_alarm(signum: int, frame: Any) -> None:
+    raise ClipboardTimeoutError("Image conversion timed out")
+
+
+def _run_job(func: Callable[..., Any], args: tuple, timeout: Optional[float]) -> Any:
+    """
+    Run func(*args) in a worker, interrupted after timeout seconds where signals allow.
+    
+    Failures are reported as clipboard exceptions, which, unlike some
+    decoder errors, always survive the trip back to the parent.
+    """
+    alarm = timeout and hasattr(signal, "setitimer")
+    if alarm:
+        signal.signal(signal.SIGALRM, _on_alarm)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        return func(*args)
+    except MemoryError:
+        raise ClipboardFormatError("Image conversion exceeded the worker memory limit")
+    except (ClipboardError, ImportError):
+        raise
+    except Exception as e:
+        raise ClipboardFormatError(f"Cannot convert image: {e}")
+    finally:
+        if alarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+
+
+def _checked_transcode(data: bytes, format_name: str, max_pixels: Optional[int], options: dict) -> bytes:
+    """transcode(), refusing images with more than max_pixels before decoding them."""
+    if max_pixels:
+        header = parse_image_header(data)
+        if header is not None and header.width is not None and header.height is not None:
+            width, height = header.width, header.height
+        else:
+            from PIL import Image
+            
+            try:
+                with Image.open(BytesIO(data)) as image:
+                    width, height = image.size
+            except Exception as e:
+                raise ClipboardFormatError(f"Unreadable image: {e}")
+        if width * height > max_pixels:
+            raise ClipboardFormatError(f"Image of {width}x{height} pixels exceeds the limit of {max_pixels}")
+    return transcode(data, format_name, **options)
+
+
+class ConversionPool:
+    """
+    Process pool for image conversions with per-job limits.
+    
+    Workers are started on first use and kept until close(). Conversions
+    that need Pillow raise ImportError if it is missing in the workers, like
+    transcode().
+    """
+    
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        max_pixels: Optional[int] = DEFAULT_MAX_PIXELS,
+        memory_limit: Optional[int] = DEFAULT_MEMORY_LIMIT,
+        timeout: Optional[float] = DEFAULT_TIMEOUT,
+    ):
+        """
+        Args:
+            max_workers: Number of worker processes. Defaults to the CPU count.
+            max_pixels: Largest width * height accepted. None disables the check.
+            memory_limit: Address-space limit of each worker in bytes
+                (Unix only). None leaves workers unlimited.
+            timeout: Seconds allowed per conversion. None waits indefinitely.
+        """
+        self.max_pixels = max_pixels
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.memory_limit = memory_limit
+        self.timeout = timeout
+        self._executor: Optional[concurrent.futures.ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+    
+    def __enter__(self) -> "ConversionPool":
+        return self
+    
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+    
+    def close(self) -> None:
+        """Stop the workers, waiting for running conversions."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+    
+    def transcode(self, data: bytes, format_name: str, **options: Any) -> bytes:
+        """
+        Re-encode image data in a worker; a drop-in replacement for image.transcode().
+        
+        Raises:
+            ClipboardFormatError: The image is unreadable, too large, or its
+                worker ran out of memory or died.
+            ClipboardTimeoutError: The conversion did not finish in time.
+            ImportError: Pillow is needed and not installed.
+        """
+        future = self._submit(_checked_transcode, data, format_name, self.max_pixels, options)
+        return self._collect([future])[0]
+    
+    def transcode_many(
+        self, images: Iterable[bytes], format_name: str = "PNG", **options: Any
+    ) -> List[Optional[bytes]]:
+        """
+        Re-encode several images, spread across the workers.
+        
+        Returns:
+            One entry per image, in order: the converted bytes, or None if
+            that image could not be converted.
+        
+        Raises:
+            ClipboardTimeoutError: The batch as a whole overran its time limit.
+        """
+        futures = [
+            self._submit(_checked_transcode, data, format_name, self.max_pixels, options) for data in images
+        ]
+        return self._collect(futures, strict=False)
+    
+    def _get_executor(self) -> concurrent.futures.ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = concurrent.futures.ProcessPoolExecutor(
+                    self.max_workers, initializer=_init_worker, initargs=(self.memory_limit,)
+                )
+            return self._executor
+    
+    def _submit(self, func: Callable[..., Any], *args: Any) -> concurrent.futures.Future:
+        try:
+            return self._get_executor().submit(_run_job, func, args, self.timeout)
+        except BrokenProcessPool:
+            self._restart()
+            return self._get_executor().submit(_run_job, func, args, self.timeout)
+    
+    def _restart(self, broken: Optional[concurrent.futures.ProcessPoolExecutor] = None) -> None:
+        """Discard the workers, killing any that still run, so the next job starts fresh ones."""
+        with self._lock:
+            executor = self._executor
+            if executor is None or (broken is not None and executor is not broken):
+                return
+            self._executor = None
+        # ProcessPoolExecutor cannot cancel a running job; its processes are the only handle.
+        for process in list((getattr(executor, "_processes", None) or {}).values()):
+            process.kill()
+        executor.shutdown(wait=False)
+    
+    def _collect(self, futures: List[concurrent.futures.Future], strict: bool = True) -> List[Any]:
+        """
+        Wait for futures in order, mapping worker failures to clipboard exceptions.
+        
+        The jobs time themselves out inside the workers; the deadline here
+        only catches workers stuck where signals cannot interrupt them.
+        """
+        executor = self._executor
+        deadline = None
+        if self.timeout is not None:
+            rounds = -(-len(futures) // self.max_workers)
+            deadline = time.monotonic() + rounds * self.timeout + KILL_GRACE
+        results: List[Any] = []
+        for future in futures:
+            try:
+                remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+                results.append(future.result(remaining))
+            except concurrent.futures.TimeoutError:
+                self._restart(executor)
+                raise ClipboardTimeoutError("Image conversion worker stopped responding; it was killed")
+            except BrokenProcessPool:
+                self._restart(executor)
+                if strict:
+                    raise ClipboardFormatError("Image conversion worker exited unexpectedly")
+                results.append(None)
+            except ClipboardError:
+                if strict:
+                    raise
+                results.append(None)
+        return results
@@ -0,0 +1,165 @@
+"""Consistent multi-format clipboard reads."""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Hashable, Iterable, List, Optional
+
+from zclipboard.backends.base import ClipboardBackend
+from zclipboard.data_types import ClipboardData, ClipboardFormat
+from zclipboard.exceptions import ClipboardChangedError, ClipboardFormatError
+
+DEFAULT_RETRIES = 3
+
+
+def _read(backend: ClipboardBackend, format_type: ClipboardFormat) -> Any:
+    getters = {
+        ClipboardFormat.HTML: backend.get_html,
+        ClipboardFormat.IMAGE: backend.get_image,
+        ClipboardFormat.PLAIN_TEXT: backend.get_text,
+        ClipboardFormat.RTF: backend.get_rtf,
+    }
+    if format_type not in getters:
+        raise ClipboardFormatError(f"Unsupported format: {format_type}")
+    return getters[format_type]()
+
+
+def _read_many(backend: ClipboardBackend, formats: List[ClipboardFormat]) -> Dict[ClipboardFormat, Any]:
+    """Read formats, in parallel if the backend allows overlapping reads."""
+    if len(formats) < 2 or not backend.supports_concurrent_reads:
+        return {format_type: _read(backend, format_type) for format_type in formats}
+    with ThreadPoolExecutor(max_workers=len(formats), thread_name_prefix="zclipboard-read") as pool:
+        futures = {format_type: pool.submit(_read, backend, format_type) for format_type in formats}
+        return {format_type: future.result() for format_type, future in futures.items()}
+
+
+class ClipboardSnapshot:
+    """
+    The clipboard contents as of one fingerprint().
+    
+    Formats fetched by Clipboard.snapshot() are held in memory. Others are
+    fetched on first access and only accepted if the clipboard has not
+    changed since the snapshot was taken.
+    """
+    
+    def __init__(
+        self,
+        backend: ClipboardBackend,
+        fingerprint: Hashable,
+        formats: List[ClipboardFormat],
+        values: Dict[ClipboardFormat, Any],
+    ):
+        """
+        Args:
+            backend: Backend to fetch further formats from.
+            fingerprint: The backend's fingerprint() when the values were read.
+            formats: Formats available at that time.
+            values: Contents already read, by format.
+        """
+        self.fingerprint = fingerprint
+        self.formats = formats
+        self._backend = backend
+        self._lock = threading.Lock()
+        self._values = dict(values)
+    
+    def __contains__(self, format_type: ClipboardFormat) -> bool:
+        return format_type in self.formats
+    
+    def __repr__(self) -> str:
+        return f"ClipboardSnapshot(formats={[f.name for f in self.formats]}, loaded={[f.name for f in self._values]})"
+    
+    @property
+    def loaded(self) -> Dict[ClipboardFormat, Any]:
+        """Contents read so far, by format."""
+        with self._lock:
+            return dict(self._values)
+    
+    @property
+    def stale(self) -> bool:
+        """True if the clipboard has changed since the snapshot was taken."""
+        return self._backend.fingerprint() != self.fingerprint
+    
+    def get(self, format_type: Optional[ClipboardFormat] = None) -> Optional[ClipboardData]:
+        """
+        Get the snapshot's content in the specified format.
+        
+        Args:
+            format_type: Desired format. If None, returns first available format.
+        
+        Returns:
+            ClipboardData object or None if the format was not available.
+        
+        Raises:
+            ClipboardChangedError: The format had to be fetched and the
+                clipboard changed since the snapshot was taken.
+        """
+        if format_type is None:
+            if not self.formats:
+                return None
+            format_type = self.formats[0]
+        data = self.read(format_type)
+        if data is not None:
+            return ClipboardData(data, format_type)
+        return None
+    
+    def read(self, format_type: ClipboardFormat) -> Any:
+        """Return the content of one format, as the matching Clipboard.get_* would."""
+        with self._lock:
+            if format_type in self._values:
+                return self._values[format_type]
+            if format_type not in self.formats:
+                return None
+            data = _read(self._backend, format_type)
+            if self._backend.fingerprint() != self.fingerprint:
+                raise ClipboardChangedError(f"Clipboard changed before {format_type.name} was read")
+            self._values[format_type] = data
+            return data
+    
+    def get_html(self) -> Optional[str]:
+        """Get HTML content from the snapshot."""
+        return self.read(ClipboardFormat.HTML)
+    
+    def get_image(self) -> Optional[bytes]:
+        """Get image data as PNG bytes from the snapshot."""
+        return self.read(ClipboardFormat.IMAGE)
+    
+    def get_rtf(self) -> Optional[str]:
+        """Get RTF content from the snapshot."""
+        return self.read(ClipboardFormat.RTF)
+    
+    def get_text(self) -> Optional[str]:
+        """Get plain text from the snapshot."""
+        return self.read(ClipboardFormat.PLAIN_TEXT)
+
+
+def take_snapshot(
+    backend: ClipboardBackend,
+    formats: Optional[Iterable[ClipboardFormat]] = None,
+    retries: int = DEFAULT_RETRIES,
+) -> ClipboardSnapshot:
+    """
+    Read formats from backend so that all of them come from the same clipboard contents.
+    
+    The fingerprint is taken before the format list and compared again after
+    the reads; if it moved, everything is read again, up to retries times.
+    
+    Args:
+        backend: Backend to read from.
+        formats: Formats to read up front. None reads every available format.
+        retries: Further attempts after the first when the clipboard changes.
+    
+    Raises:
+        ClipboardChangedError: The clipboard kept changing on every attempt.
+    """
+    requested = list(formats) if formats is not None else None
+    for format_type in requested or ():
+        if not isinstance(format_type, ClipboardFormat):
+            raise ClipboardFormatError(f"Unsupported format: {format_type}")
+    for _ in range(retries + 1):
+        with backend.session():
+            token = backend.fingerprint()
+            available = backend.get_available_formats()
+            wanted = available if requested is None else [f for f in requested if f in available]
+            values = _read_many(backend, wanted)
+            if backend.fingerprint() == token:
+                return ClipboardSnapshot(backend, token, available, values)
+    raise ClipboardChangedError(f"Clipboard changed during each of {retries + 1} attempts to read it")
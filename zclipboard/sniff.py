@@ -0,0 +1,56 @@
+"""Identify image data from its first bytes.
+
+Clipboard owners label data by target or format name, and the labels are
+not always right; callers also hand set_image() whatever they have. The
+signatures here let the backends pass data through untouched when it is
+already in the format wanted, and convert only when it is not.
+"""
+
+import struct
+from typing import Optional, Union
+
+Buffer = Union[bytes, bytearray, memoryview]
+
+# Enough leading bytes for every check below.
+SNIFF_BYTES = 32
+
+# Sizes of the BITMAPCOREHEADER, BITMAPINFOHEADER and its V2 to V5 successors.
+DIB_HEADER_SIZES = (12, 40, 52, 56, 108, 124)
+
+_SIGNATURES = (
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"II*\x00", "image/tiff"),
+    (b"MM\x00*", "image/tiff"),
+    (b"GIF87a", "image/gif"),
+    (b"GIF89a", "image/gif"),
+)
+
+
+def sniff_image_type(data: Buffer) -> Optional[str]:
+    """
+    Return the MIME type of encoded image data, or None if it is not a recognised image.
+    
+    Recognises PNG, JPEG, BMP, TIFF, GIF and WebP. Only the first
+    SNIFF_BYTES are examined.
+    """
+    head = bytes(data[:SNIFF_BYTES])
+    for signature, mime_type in _SIGNATURES:
+        if head.startswith(signature):
+            return mime_type
+    if head[:2] == b"BM" and len(head) >= 18 and struct.unpack_from("<I", head, 14)[0] in DIB_HEADER_SIZES:
+        return "image/bmp"
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "image/webp"
+    return None
+
+
+def is_dib(data: Buffer) -> bool:
+    """True if data looks like a device-independent bitmap: a BMP without its file header."""
+    head = bytes(data[:SNIFF_BYTES])
+    if len(head) < 16:
+        return False
+    header_size = struct.unpack_from("<I", head)[0]
+    if header_size == 12:
+        return struct.unpack_from("<H", head, 8)[0] == 1
+    return header_size in DIB_HEADER_SIZES and struct.unpack_from("<H", head, 12)[0] == 1
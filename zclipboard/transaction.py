@@ -0,0 +1,95 @@
+"""Multi-format clipboard writes that replace the contents in one change."""
+
+from typing import Any, Dict
+
+from zclipboard.backends.base import ClipboardBackend
+from zclipboard.data_types import ClipboardFormat
+from zclipboard.exceptions import ClipboardError, ClipboardFormatError
+from zclipboard.image import encode_png
+
+
+class ClipboardTransaction:
+    """
+    Formats collected for one write, committed together by ClipboardBackend.set_many().
+    
+    Used as a context manager, the transaction commits when the block
+    ends and is discarded if it raises. Setting a format again replaces
+    its content.
+    """
+    
+    def __init__(self, backend: ClipboardBackend):
+        """
+        Args:
+            backend: Backend to commit to.
+        """
+        self.committed = False
+        self._backend = backend
+        self._contents: Dict[ClipboardFormat, Any] = {}
+    
+    def __enter__(self) -> "ClipboardTransaction":
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        if exc_type is None and not self.committed:
+            self.commit()
+    
+    def __repr__(self) -> str:
+        return f"ClipboardTransaction(formats={[f.name for f in self._contents]}, committed={self.committed})"
+    
+    @property
+    def contents(self) -> Dict[ClipboardFormat, Any]:
+        """The formats collected so far, by format."""
+        return dict(self._contents)
+    
+    def commit(self) -> None:
+        """
+        Replace the clipboard contents with the collected formats.
+        
+        Raises:
+            ClipboardError: The transaction was already committed.
+            ClipboardFormatError: Nothing was set, or the backend cannot
+                offer these formats together.
+        """
+        if self.committed:
+            raise ClipboardError("Transaction already committed")
+        if not self._contents:
+            raise ClipboardFormatError("At least one format is required")
+        self._backend.set_many(self._contents)
+        self.committed = True
+    
+    def set(self, format_type: ClipboardFormat, content: Any) -> None:
+        """
+        Add one format to the write.
+        
+        Args:
+            format_type: Format of the content.
+            content: str for text formats, encoded image bytes for IMAGE.
+        """
+        if self.committed:
+            raise ClipboardError("Transaction already committed")
+        if not isinstance(format_type, ClipboardFormat):
+            raise ClipboardFormatError(f"Unsupported format: {format_type}")
+        expected = (bytes, bytearray) if format_type == ClipboardFormat.IMAGE else str
+        if not isinstance(content, expected):
+            raise ClipboardFormatError(f"Invalid content for {format_type.name}: {type(content).__name__}")
+        self._contents[format_type] = bytes(content) if isinstance(content, bytearray) else content
+    
+    def set_html(self, html_content: str) -> None:
+        """Add HTML content."""
+        self.set(ClipboardFormat.HTML, html_content)
+    
+    def set_image(self, image_data: bytes) -> None:
+        """Add an image; see Clipboard.set_image() for the encodings accepted."""
+        self.set(ClipboardFormat.IMAGE, image_data)
+    
+    def set_image_array(self, array: Any, compress_level: int = 1) -> None:
+        """Add an image array, encoded as PNG; see Clipboard.set_image_array()."""
+        self.set(ClipboardFormat.IMAGE, encode_png(array, compress_level))
+    
+    def set_rtf(self, rtf_content: str) -> None:
+        """Add RTF content."""
+        self.set(ClipboardFormat.RTF, rtf_content)
+    
+    def set_text(self, text: str) -> None:
+        """Add plain text."""
+        self.set(ClipboardFormat.PLAIN_TEXT, text)
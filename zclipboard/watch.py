@@ -0,0 +1,358 @@
+"""Clipboard change notification.
+
+A ClipboardWatcher turns signals from a change source into ClipboardChange
+events. Two sources are provided: XFixesChangeSource, which is told by the
+X server whenever the selection changes hands and costs nothing while the
+clipboard is idle, and PollingChangeSource, which compares the backend's
+fingerprint() at an interval that backs off while nothing changes. Neither
+fetches clipboard payloads.
+"""
+
+import hashlib
+import queue
+import struct
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set
+
+from zclipboard.data_types import ClipboardFormat
+from zclipboard.exceptions import ClipboardAccessError, ClipboardError
+
+ALL_FORMATS = frozenset(ClipboardFormat)
+
+
+class ClipboardChange:
+    """A change of clipboard contents, as reported by ClipboardWatcher."""
+    
+    def __init__(
+        self,
+        formats: List[ClipboardFormat],
+        changed: List[ClipboardFormat],
+        removed: List[ClipboardFormat],
+    ):
+        """
+        Args:
+            formats: Formats available after the change.
+            changed: Available formats whose content is new or may have changed.
+            removed: Formats that are no longer available.
+        """
+        self.formats = formats
+        self.changed = changed
+        self.removed = removed
+        self.timestamp = time.time()
+    
+    def __repr__(self) -> str:
+        return (
+            f"ClipboardChange(changed={[f.name for f in self.changed]}, "
+            f"removed={[f.name for f in self.removed]})"
+        )
+
+
+class ChangeSource:
+    """Base class for sources of clipboard change signals."""
+    
+    def wait(self, timeout: Optional[float] = None) -> Optional[Set[ClipboardFormat]]:
+        """
+        Block until the clipboard may have changed.
+        
+        Args:
+            timeout: Seconds to wait. None waits until a change or close().
+        
+        Returns:
+            The formats that may have changed, or None on timeout or close.
+        """
+        raise NotImplementedError
+    
+    def close(self) -> None:
+        """Stop the source; pending and later wait() calls return None."""
+        pass
+    
+    @property
+    def closed(self) -> bool:
+        return False
+
+
+def fingerprint_tokens(clipboard) -> Dict[ClipboardFormat, Any]:
+    """
+    Signature that changes for every format when the fingerprint changes.
+    
+    This is the signature PollingChangeSource compares by default.
+    """
+    return dict.fromkeys(ALL_FORMATS, clipboard.fingerprint())
+
+
+def content_tokens(clipboard) -> Dict[ClipboardFormat, Any]:
+    """
+    Fetch every available format and return a digest per format.
+    
+    Pass it as PollingChangeSource's signature to learn exactly which
+    formats changed, at the cost of transferring every payload per sample.
+    """
+    getters = {
+        ClipboardFormat.HTML: clipboard.get_html,
+        ClipboardFormat.IMAGE: clipboard.get_image,
+        ClipboardFormat.PLAIN_TEXT: clipboard.get_text,
+        ClipboardFormat.RTF: clipboard.get_rtf,
+    }
+    tokens = {}
+    for format_type in clipboard.get_available_formats():
+        content = getters[format_type]()
+        if isinstance(content, str):
+            content = content.encode("utf-8", errors="surrogatepass")
+        tokens[format_type] = hashlib.blake2b(content or b"", digest_size=16).digest()
+    return tokens
+
+
+class PollingChangeSource(ChangeSource):
+    """
+    Detect changes by sampling a per-format signature.
+    
+    The interval starts at min_interval, is multiplied by backoff after
+    every unchanged sample up to max_interval, and drops back to
+    min_interval when a change is seen.
+    """
+    
+    def __init__(
+        self,
+        clipboard,
+        min_interval: float = 0.1,
+        max_interval: float = 2.0,
+        backoff: float = 1.5,
+        signature: Optional[Callable[[Any], Dict[ClipboardFormat, Any]]] = None,
+    ):
+        """
+        Args:
+            clipboard: Clipboard (or backend) to sample.
+            min_interval: Seconds between samples right after a change.
+            max_interval: Upper bound for the interval while idle.
+            backoff: Growth factor of the interval per unchanged sample.
+            signature: Callable returning {format: token} for the clipboard.
+                Defaults to fingerprint_tokens().
+        """
+        if not 0 < min_interval <= max_interval:
+            raise ValueError("Intervals must satisfy 0 < min_interval <= max_interval")
+        if backoff < 1:
+            raise ValueError("backoff must be at least 1")
+        self.interval = min_interval
+        self._backoff = backoff
+        self._clipboard = clipboard
+        self._closed = threading.Event()
+        self._max_interval = max_interval
+        self._min_interval = min_interval
+        self._signature = signature or fingerprint_tokens
+        self._last: Dict[ClipboardFormat, Any] = {}
+        self._last = self._sample()
+        self._next_poll = time.monotonic() + self.interval
+    
+    @property
+    def closed(self) -> bool:
+        return self._closed.is_set()
+    
+    def close(self) -> None:
+        self._closed.set()
+    
+    def _sample(self) -> Dict[ClipboardFormat, Any]:
+        try:
+            return self._signature(self._clipboard)
+        except ClipboardError:
+            return self._last
+    
+    def wait(self, timeout: Optional[float] = None) -> Optional[Set[ClipboardFormat]]:
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        while not self._closed.is_set():
+            wake = self._next_poll if deadline is None else min(self._next_poll, deadline)
+            if self._closed.wait(max(0.0, wake - time.monotonic())):
+                return None
+            if time.monotonic() < self._next_poll:
+                return None
+            
+            current = self._sample()
+            changed = {
+                format_type for format_type in set(current) | set(self._last)
+                if current.get(format_type) != self._last.get(format_type)
+            }
+            self._last = current
+            if changed:
+                self.interval = self._min_interval
+            else:
+                self.interval = min(self.interval * self._backoff, self._max_interval)
+            self._next_poll = time.monotonic() + self.interval
+            if changed:
+                return changed
+            if deadline is not None and time.monotonic() >= deadline:
+                return None
+        return None
+
+
+class XFixesChangeSource(ChangeSource):
+    """Receive selection ownership changes from the X server (XFIXES)."""
+    
+    # How often a waiting call checks whether the connection was lost.
+    _CHECK_INTERVAL = 1.0
+    
+    def __init__(self, display: Optional[str] = None, selection: str = "CLIPBOARD"):
+        """
+        Args:
+            display: DISPLAY string. Defaults to the DISPLAY environment variable.
+            selection: Selection to watch.
+        
+        Raises:
+            ClipboardAccessError: No X server, or it lacks XFIXES.
+        """
+        from zclipboard.backends.xproto import XFIXES_SELECTION_NOTIFY, XConnection
+        
+        self._conn = XConnection(display)
+        try:
+            xfixes = self._conn.xfixes()
+            if xfixes is None:
+                raise ClipboardAccessError("X server does not support the XFIXES extension")
+            self._selection = self._conn.intern_atom(selection)
+            self._window = self._conn.create_window()
+            event_code = xfixes[1] + XFIXES_SELECTION_NOTIFY
+            self._events = self._conn.subscribe(
+                lambda event: event[0] & 0x7F == event_code
+                and struct.unpack_from("<I", event, 12)[0] == self._selection
+            )
+            self._conn.select_selection_input(self._window, self._selection)
+            self._conn.sync()
+        except Exception:
+            self._conn.close()
+            raise
+    
+    @property
+    def closed(self) -> bool:
+        return self._conn.closed
+    
+    def close(self) -> None:
+        self._conn.close()
+        self._events.put(b"")
+    
+    def wait(self, timeout: Optional[float] = None) -> Optional[Set[ClipboardFormat]]:
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        while not self._conn.closed:
+            remaining = self._CHECK_INTERVAL
+            if deadline is not None:
+                remaining = min(remaining, deadline - time.monotonic())
+                if remaining <= 0:
+                    return None
+            try:
+                event = self._events.get(timeout=remaining)
+            except queue.Empty:
+                continue
+            return set(ALL_FORMATS) if event else None
+        return None
+
+
+def default_change_source(clipboard) -> ChangeSource:
+    """Use XFIXES for Linux backends when the X server supports it, otherwise poll."""
+    from zclipboard.backends.linux import LinuxClipboardBackend
+    
+    backend = getattr(clipboard, "backend", clipboard)
+    if isinstance(backend, LinuxClipboardBackend):
+        try:
+            return XFixesChangeSource(getattr(backend, "display", None))
+        except ClipboardError:
+            pass
+    return PollingChangeSource(clipboard)
+
+
+class ClipboardWatcher:
+    """
+    Report clipboard changes as ClipboardChange events.
+    
+    Iterate over the watcher, call wait_for_change(), or pass a callback to
+    start(). Signals arriving within the debounce window of each other are
+    merged into one event.
+    """
+    
+    def __init__(self, clipboard, source: Optional[ChangeSource] = None, debounce: float = 0.05):
+        """
+        Args:
+            clipboard: Clipboard to watch.
+            source: Change source. Defaults to default_change_source().
+            debounce: Seconds of quiet required before a change is reported.
+        """
+        self._clipboard = clipboard
+        self._debounce = debounce
+        self._source = source if source is not None else default_change_source(clipboard)
+        self._thread: Optional[threading.Thread] = None
+        self._formats = self._available_formats()
+    
+    def __enter__(self) -> "ClipboardWatcher":
+        return self
+    
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+    
+    def __iter__(self) -> Iterator[ClipboardChange]:
+        while not self._source.closed:
+            change = self.wait_for_change()
+            if change is not None:
+                yield change
+    
+    @property
+    def formats(self) -> List[ClipboardFormat]:
+        """Formats available as of the last reported change."""
+        return list(self._formats)
+    
+    @property
+    def source(self) -> ChangeSource:
+        """The change source in use."""
+        return self._source
+    
+    def _available_formats(self) -> List[ClipboardFormat]:
+        try:
+            return self._clipboard.get_available_formats()
+        except ClipboardError:
+            return []
+    
+    def start(self, callback: Callable[[ClipboardChange], None]) -> "ClipboardWatcher":
+        """
+        Call callback for every change from a background thread until stop().
+        
+        A ClipboardError raised by the callback skips that change; any other
+        exception ends the thread.
+        """
+        def run() -> None:
+            for change in self:
+                try:
+                    callback(change)
+                except ClipboardError:
+                    continue
+        
+        self._thread = threading.Thread(target=run, name="zclipboard-watch", daemon=True)
+        self._thread.start()
+        return self
+    
+    def stop(self) -> None:
+        """Close the source and end iteration and the callback thread."""
+        self._source.close()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+    
+    def wait_for_change(self, timeout: Optional[float] = None) -> Optional[ClipboardChange]:
+        """
+        Block until the clipboard changes.
+        
+        Args:
+            timeout: Seconds to wait. None waits until a change or stop().
+        
+        Returns:
+            The change, or None on timeout or stop.
+        """
+        hint = self._source.wait(timeout)
+        if hint is None:
+            return None
+        while True:
+            more = self._source.wait(self._debounce)
+            if more is None:
+                break
+            hint |= more
+        
+        previous = self._formats
+        self._formats = self._available_formats()
+        changed = [f for f in self._formats if f in hint or f not in previous]
+        removed = [f for f in previous if f not in self._formats]
+        if not changed and not removed:
+            return None
+        return ClipboardChange(list(self._formats), changed, removed)